@@ -1,12 +1,18 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
-"""This module implements prediction pipeline."""
+"""This module implements the online adaptation pipeline: frames are enhanced
+as they arrive while the model keeps adapting to them.
+"""
 
 from __future__ import annotations
 
+import collections
+import concurrent.futures
+import copy
 import importlib
 import socket
+import threading
 import time
 from typing import Any
 
@@ -89,6 +95,143 @@ hosts = {
 # endregion
 
 
+# region Online Adaptation
+
+class OnlineAdapter:
+    """Enhance frames immediately with the current weights, and adapt the model
+    on micro-batches of the frames seen so far.
+    
+    Inference never waits on a backward pass: every :param:`update_every`
+    frames, the last :param:`micro_batch` frames are used for one optimizer
+    step, either inline or, with :param:`background`, on a worker thread. In
+    the latter case, frames are enhanced by a snapshot of the model whose
+    weights are refreshed after each update; frames arriving while an update is
+    running keep accumulating.
+    
+    This suits zero-reference models (e.g., ZeroDCE, GCENet) whose
+    :meth:`forward_loss` does not need a target.
+    
+    Args:
+        model: The model to adapt.
+        optimizer: The optimizer of :param:`model`.
+        update_every: The number of frames between two updates. Default: ``1``.
+        micro_batch: The number of most recent frames in each update.
+            Default: ``None`` means :param:`update_every`.
+        background: If ``True``, run the updates on a background thread.
+            Default: ``False``.
+        clip_grad: The maximum gradient norm. Default: ``0.1``.
+    """
+    
+    def __init__(
+        self,
+        model       : mon.Model,
+        optimizer   : torch.optim.Optimizer,
+        update_every: int        = 1,
+        micro_batch : int | None = None,
+        background  : bool       = False,
+        clip_grad   : float      = 0.1,
+    ):
+        self.model        = model
+        self.optimizer    = optimizer
+        self.update_every = max(1, update_every)
+        self.micro_batch  = max(1, micro_batch or self.update_every)
+        self.background   = background
+        self.clip_grad    = clip_grad
+        self.frames       = collections.deque(maxlen=self.micro_batch)
+        self.num_new      = 0
+        self.lock         = threading.Lock()
+        self.executor     = None
+        self.future       = None
+        self.stats        = {"frames": 0, "updates": 0, "infer_time": 0.0, "update_time": 0.0}
+        if background:
+            self.infer_model = copy.deepcopy(model)
+            self.infer_model.requires_grad_(False)
+            self.executor    = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="adapt")
+        else:
+            self.infer_model = model
+    
+    @torch.no_grad()
+    def enhance(self, input: torch.Tensor) -> torch.Tensor:
+        """Enhance :param:`input` with the current weights."""
+        start = time.perf_counter()
+        with self.lock:
+            output = self.infer_model(input=input, augment=False, profile=False)
+        output = output[-1] if isinstance(output, list | tuple) else output
+        if input.is_cuda:
+            torch.cuda.synchronize(input.device)
+        self.stats["infer_time"] += time.perf_counter() - start
+        self.stats["frames"]     += input.shape[0]
+        return output
+    
+    def observe(self, input: torch.Tensor):
+        """Add :param:`input` to the frames to adapt on, and start an update
+        when :param:`update_every` new frames have been seen.
+        """
+        for frame in input.detach():
+            self.frames.append(frame)
+        self.num_new += input.shape[0]
+        if self.num_new < self.update_every:
+            return
+        if self.background:
+            if self.future is not None and not self.future.done():
+                return
+            if self.future is not None:
+                self.future.result()  # Re-raise an error of the last update
+        batch        = self.get_batch()
+        self.num_new = 0
+        if self.background:
+            self.future = self.executor.submit(self.update, batch)
+        else:
+            self.update(batch)
+    
+    def get_batch(self) -> torch.Tensor:
+        """Stack the buffered frames that have the same size as the newest."""
+        shape = self.frames[-1].shape
+        return torch.stack([f for f in self.frames if f.shape == shape])
+    
+    def update(self, batch: torch.Tensor):
+        """One optimizer step on :param:`batch`."""
+        start = time.perf_counter()
+        with torch.enable_grad():
+            _, loss = self.model.forward_loss(input=batch, target=None)
+            self.optimizer.zero_grad(set_to_none=True)
+            loss.backward()
+            if self.clip_grad:
+                torch.nn.utils.clip_grad_norm_(self.model.parameters(), self.clip_grad)
+            self.optimizer.step()
+        if self.infer_model is not self.model:
+            with torch.no_grad(), self.lock:
+                for dst, src in zip(self.infer_model.state_dict().values(), self.model.state_dict().values()):
+                    dst.copy_(src)
+        if batch.is_cuda:
+            torch.cuda.synchronize(batch.device)
+        self.stats["update_time"] += time.perf_counter() - start
+        self.stats["updates"]     += 1
+    
+    def close(self):
+        """Wait for the running update and stop the background thread."""
+        if self.future is not None:
+            self.future.result()
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+    
+    def summary(self, wall_time: float) -> dict[str, float]:
+        """Return the inference latency, the update cost, and the end-to-end
+        throughput over :param:`wall_time` seconds.
+        """
+        frames  = max(1, self.stats["frames"])
+        updates = max(1, self.stats["updates"])
+        return {
+            "frames"               : self.stats["frames"],
+            "updates"              : self.stats["updates"],
+            "latency (ms/frame)"   : self.stats["infer_time"]  / frames  * 1000.0,
+            "update (ms/step)"     : self.stats["update_time"] / updates * 1000.0,
+            "throughput (frames/s)": self.stats["frames"] / wall_time if wall_time > 0 else 0.0,
+        }
+
+# endregion
+
+
 # region Function
 
 def predict(args: dict):
@@ -106,10 +249,19 @@ def predict(args: dict):
         devices = torch.device("cpu")
     state_dict  = torch.load(weights, map_location=devices)
     model.load_state_dict(state_dict=state_dict["state_dict"])
+    model       = model.to(devices)
     model.phase = mon.ModelPhase.TRAINING
     
     optimizer = args["model"]["optimizer"]
     optimizer = mon.OPTIMIZERS.build(net=model, config=optimizer[0])
+    adapter   = OnlineAdapter(
+        model        = model,
+        optimizer    = optimizer,
+        update_every = args["update_every"],
+        micro_batch  = args["micro_batch"],
+        background   = args["background"],
+        clip_grad    = args["clip_grad"],
+    )
     
     output_dir = args["output_dir"]
     output_dir.mkdir(parents=True, exist_ok=True)
@@ -150,70 +302,72 @@ def predict(args: dict):
         image_loader = mon.ImageLoader(source=data, to_rgb=True, to_tensor=True, normalize=True)
         video_writer = None
     #
-    with torch.no_grad():
-        sum_time = 0
+    start_time = time.perf_counter()
+    try:
         with mon.get_progress_bar() as pbar:
             for images, indexes, files, rel_paths in pbar.track(
-                sequence    = enumerate(image_loader),
+                sequence    = image_loader,
                 total       = len(image_loader),
                 description = f"[bright_yellow] Inferring"
             ):
                 if resize:
-                    h0, w0   = mon.get_image_size(images)
-                    images   = mon.resize(input=images, size=[h, w])
-                input        = images.to(model.device)
-                start_time   = time.time()
-                output, loss = model.forward_loss(input=input, target=None)
-                
-                optimizer.zero_grad()
-                loss.backward()
-                torch.nn.utils.clip_grad_norm(model.parameters(), 0.1)
-                optimizer.step()
-                
-                run_time    = time.time() - start_time
-                output      = output[-1] if isinstance(output, (list, tuple)) else output
+                    h0, w0 = mon.get_image_size(images)
+                    images = mon.resize(input=images, size=[h, w])
+                input  = images.to(devices)
+                output = adapter.enhance(input)
+                adapter.observe(input)
                 if resize:
-                    output  = mon.resize(input=images, size=[h0, w0])
+                    output = mon.resize(input=output, size=[h0, w0])
                 result_path = output_dir / f"{files[0].stem}.png"
                 torchvision.utils.save_image(output, str(result_path))
-                if data.is_video_file():
+                if video_writer is not None:
                     video_writer.write_batch(images=output)
-                sum_time += run_time
-        avg_time = float(sum_time / len(image_loader))
-        console.log(f"Average time: {avg_time}")
+    finally:
+        adapter.close()
+    summary = adapter.summary(wall_time=time.perf_counter() - start_time)
+    for k, v in summary.items():
+        console.log(f"{k:<21} = {v:.4f}" if isinstance(v, float) else f"{k:<21} = {v}")
 
 
 @click.command(context_settings=dict(
     ignore_unknown_options = True,
     allow_extra_args       = True,
 ))
-@click.option("--data",        default=mon.DATA_DIR,          type=click.Path(exists=True),  help="Source data directory.")
-@click.option("--config",      default="",                    type=click.Path(exists=False), help="The training config to use.")
-@click.option("--root",        default=mon.RUN_DIR/"predict", type=click.Path(exists=False), help="Save results to root/project/name.")
-@click.option("--project",     default=None,                  type=click.Path(exists=False), help="Save results to root/project/name.")
-@click.option("--name",        default=None,                  type=click.Path(exists=False), help="Save results to root/project/name.")
-@click.option("--variant",     default=None,                  type=str,                      help="Model variant.")
-@click.option("--weights",     default=None,                  type=click.Path(exists=False), help="Weights paths.")
-@click.option("--batch-size",  default=1,                     type=int,                      help="Total Batch size for all GPUs.")
-@click.option("--image-size",  default=512,                   type=int,                      help="Image sizes.")
-@click.option("--resize",      is_flag=True)
-@click.option("--output-dir",  default=mon.RUN_DIR/"predict", type=click.Path(exists=False), help="Save results location.")
-@click.option("--verbose",     is_flag=True)
+@click.option("--data",         default=mon.DATA_DIR,          type=click.Path(exists=True),  help="Source data directory.")
+@click.option("--config",       default="",                    type=click.Path(exists=False), help="The training config to use.")
+@click.option("--root",         default=mon.RUN_DIR/"predict", type=click.Path(exists=False), help="Save results to root/project/name.")
+@click.option("--project",      default=None,                  type=click.Path(exists=False), help="Save results to root/project/name.")
+@click.option("--name",         default=None,                  type=click.Path(exists=False), help="Save results to root/project/name.")
+@click.option("--variant",      default=None,                  type=str,                      help="Model variant.")
+@click.option("--weights",      default=None,                  type=click.Path(exists=False), help="Weights paths.")
+@click.option("--batch-size",   default=1,                     type=int,                      help="Total Batch size for all GPUs.")
+@click.option("--image-size",   default=512,                   type=int,                      help="Image sizes.")
+@click.option("--resize",       is_flag=True)
+@click.option("--output-dir",   default=mon.RUN_DIR/"predict", type=click.Path(exists=False), help="Save results location.")
+@click.option("--update-every", default=1,                     type=int,                      help="Number of frames between two updates.")
+@click.option("--micro-batch",  default=None,                  type=int,                      help="Number of recent frames in each update (default: --update-every).")
+@click.option("--background",   is_flag=True,                                                 help="Run the updates on a background thread.")
+@click.option("--clip-grad",    default=0.1,                   type=float,                    help="Maximum gradient norm.")
+@click.option("--verbose",      is_flag=True)
 @click.pass_context
 def main(
     ctx,
-    data       : mon.Path | str,
-    config     : mon.Path | str,
-    root       : mon.Path | str,
-    project    : str,
-    name       : str,
-    variant    : int | str | None,
-    weights    : Any,
-    batch_size : int,
-    image_size : int | list[int],
-    resize     : bool,
-    output_dir : mon.Path | str,
-    verbose    : bool
+    data        : mon.Path | str,
+    config      : mon.Path | str,
+    root        : mon.Path | str,
+    project     : str,
+    name        : str,
+    variant     : int | str | None,
+    weights     : Any,
+    batch_size  : int,
+    image_size  : int | list[int],
+    resize      : bool,
+    output_dir  : mon.Path | str,
+    update_every: int,
+    micro_batch : int | None,
+    background  : bool,
+    clip_grad   : float,
+    verbose     : bool
 ):
     model_kwargs = {
         k.lstrip("--"): ctx.args[i + 1]
@@ -251,6 +405,10 @@ def main(
     args["project"]      = project
     args["image_size"]   = image_size
     args["output_dir"]   = mon.Path(output_dir)
+    args["update_every"] = update_every
+    args["micro_batch"]  = micro_batch
+    args["background"]   = background
+    args["clip_grad"]    = clip_grad
     args["config_file"]  = config_args.__file__,
     args["datamodule"]  |= {
         "root"      : data,
@@ -5,6 +5,13 @@
 
 from __future__ import annotations
 
+import hashlib
+import os
+import shutil
+import threading
+from concurrent import futures
+from typing import Any
+
 import click
 import cv2
 import numpy as np
@@ -131,222 +138,269 @@ def list_images(image_dir: mon.Path, verbose: bool):
     return subdirs, dataset_names, image_grid, image_stem_dict
 
 
-def plot_cv2(
-    image_dir : mon.Path,
-    image_size: int | bool,
-    num_cols  : int,
-    output_dir: mon.Path | str,
-    verbose   : bool
-):
-    subdirs, dataset_names, image_grid, image_stem_dict = list_images(image_dir, verbose)
+class ThumbnailCache:
+    """Store downscaled copies of images on disk so that re-plotting only
+    decodes the images that were added or changed since the last run.
     
-    if output_dir is not None:
-        output_dir = mon.Path(output_dir)
-        if output_dir.exists():
-            mon.delete_dir(paths=output_dir)
-        output_dir.mkdir(parents=True, exist_ok=True)
+    Thumbnails of a source image are stored in a directory keyed by its path,
+    and each file is keyed by the thumbnail size and the source's modification
+    time and size. Writing a new thumbnail removes the stale ones of the same
+    source and size, and :meth:`clear` removes the whole cache. Full-resolution
+    reads (``image_size=None``) are not cached on disk. Thumbnails are saved as lossless PNG files. Images are
+    always downscaled with :attr:`cv2.INTER_AREA`, with or without the disk
+    cache, so the grid does not depend on it. :meth:`read` is safe to call from
+    several threads.
     
-    # Visualize images
-    with mon.get_progress_bar() as pbar:
-        for dn in pbar.track(
-            sequence    = dataset_names,
-            total       = len(dataset_names),
-            description = f"[bright_yellow] Visualizing"
-        ):
-            for image_stem in image_stem_dict[dn]:
-                image_shape = None
-                image_dtype = None
-                # Read images
-                for k, _ in image_grid.items():
-                    path = None
-                    for ext in mon.ImageFormat.values():
-                        temp = image_dir / k / dn / f"{image_stem}{ext}"
-                        if temp.exists():
-                            path = temp
-                    if path is not None and path.exists() and path.is_image_file():
-                        image       = cv2.imread(str(path))[..., ::-1]
-                        image_dtype = image.dtype
-                        if k != "zerodce++":
-                            image_shape = image.shape
-                    else:
-                        image = None
-                    image_grid[k] = image
-                    
-                # Resize
-                for k, v in image_grid.items():
-                    if v is not None and image_size is not None:
-                        h, w          = mon.get_hw(image_size)
-                        image_grid[k] = cv2.resize(v, [w, h])
-                        image_shape   = v.shape
-                
-                # Handle empty images
-                for k, v in image_grid.items():
-                    if v is None:
-                        image_grid[k] = np.full(image_shape, 255, dtype=image_dtype)
-                    elif k == "zerodce++" and image_size is None and image_shape is not None:
-                        image_grid[k] = cv2.resize(v, [image_shape[1], image_shape[0]])
-                
-                # Add texts
-                for k, v in image_grid.items():
-                    top    = 50  # shape[0] = rows
-                    bottom = top
-                    left   = 10  # shape[1] = cols
-                    right  = left
-                    v      = cv2.copyMakeBorder(v, top, bottom, left, right, cv2.BORDER_CONSTANT, None, [255, 255, 255])
-                    #
-                    textsize = cv2.getTextSize(k, cv2.FONT_HERSHEY_SIMPLEX, 1, 2)[0]
-                    if textsize is not None:
-                        text_x = round((v.shape[1] - textsize[0]) / 2)
-                        text_y = textsize[1] + 10  # round((v.shape[0] + textsize[1]) / 2)
-                        cv2.putText(v, k, (text_x, text_y), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 0), 2)
-                    #
-                    image_grid[k] = v
-                    image_shape   = v.shape
-                
-                # Display images
-                num_rows          = mon.math.ceil(len(image_grid) / num_cols)
-                image_grid_values = list(image_grid.values())
-                row_images        = []
-                for i in range(num_rows):
-                    row_image = None
-                    for j in range(num_cols):
-                        idx = i * num_cols + j
-                        if j == 0:
-                            row_image   = image_grid_values[idx]
-                            continue
-                        if idx < len(image_grid):
-                            row_image   = cv2.hconcat([row_image, image_grid_values[idx]])
-                        else:
-                            empty_image = np.full(image_shape, 255, dtype=image_dtype)
-                            row_image   = cv2.hconcat([row_image, empty_image])
-                    row_images.append(row_image)
-                output = cv2.vconcat(row_images)
-                output = output[..., ::-1]
-                #
-                if output_dir is not None:
-                    result_path = output_dir / dn / f"{image_stem}.png"
-                    result_path.parent.mkdir(parents=True, exist_ok=True)
-                    cv2.imwrite(str(result_path), output)
-                #
-                if verbose:
-                    cv2.imshow("Output", output)
-                    cv2.waitKey(1)
-                
+    Args:
+        cache_dir: The directory to store thumbnails in. ``None`` disables the
+            disk cache.
+    """
+    
+    def __init__(self, cache_dir: mon.Path | str | None):
+        self.cache_dir = mon.Path(cache_dir) if cache_dir is not None else None
+        self.hits      = 0
+        self.misses    = 0
+        self.lock      = threading.Lock()
+        if self.cache_dir is not None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+    
+    def key(self, path: mon.Path, image_size: int | None) -> mon.Path:
+        """Return the thumbnail path of :param:`path`, relative to
+        :attr:`cache_dir`.
+        """
+        stat = path.stat()
+        name = hashlib.sha1(str(path.resolve()).encode()).hexdigest()
+        return mon.Path(name) / f"{image_size}-{stat.st_mtime_ns}-{stat.st_size}.png"
+    
+    def evict(self, thumb_path: mon.Path):
+        """Remove the stale thumbnails of the same source and size as
+        :param:`thumb_path`.
+        """
+        image_size = thumb_path.stem.split("-")[0]
+        for p in thumb_path.parent.glob(f"{image_size}-*.png"):
+            if p != thumb_path and not p.name.endswith(".tmp.png"):
+                p.unlink(missing_ok=True)
+    
+    def clear(self):
+        """Remove every cached thumbnail."""
+        if self.cache_dir is not None and self.cache_dir.is_dir():
+            shutil.rmtree(self.cache_dir)
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+    
+    def read(self, path: mon.Path, image_size: int | None) -> np.ndarray | None:
+        """Return an RGB image, resized to :param:`image_size` if given."""
+        if image_size is None or self.cache_dir is None:
+            image = cv2.imread(str(path))
+            if image is not None and image_size is not None:
+                h, w  = mon.get_hw(image_size)
+                image = cv2.resize(image, [w, h], interpolation=cv2.INTER_AREA)
+            return image[..., ::-1] if image is not None else None
+        
+        thumb_path = self.cache_dir / self.key(path, image_size)
+        if thumb_path.is_file():
+            image = cv2.imread(str(thumb_path))
+            if image is not None:
+                with self.lock:
+                    self.hits += 1
+                return image[..., ::-1]
+        with self.lock:
+            self.misses += 1
+        image = cv2.imread(str(path))
+        if image is None:
+            return None
+        h, w  = mon.get_hw(image_size)
+        image = cv2.resize(image, [w, h], interpolation=cv2.INTER_AREA)
+        # Write to a temporary file first so a concurrent reader never sees a
+        # partial thumbnail.
+        thumb_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = thumb_path.with_name(f"{thumb_path.stem}.{threading.get_ident()}.tmp.png")
+        cv2.imwrite(str(tmp_path), image)
+        os.replace(tmp_path, thumb_path)
+        self.evict(thumb_path)
+        return image[..., ::-1]
 
-def plot_cv2_diff(
-    image_dir : mon.Path,
-    image_size: int | bool,
+
+def index_images(
+    image_dir    : mon.Path,
+    image_grid   : dict,
+    dataset_names: list[str],
+) -> dict[tuple[str, str], dict[str, mon.Path]]:
+    """List each (method, dataset) directory once and map image stems to their
+    paths, instead of probing every extension for every image.
+    """
+    extensions = mon.ImageFormat.values()
+    index      = {}
+    for k in image_grid.keys():
+        for dn in dataset_names:
+            d     = image_dir / k / dn
+            stems = {}
+            if d.is_dir():
+                for path in sorted(d.iterdir()):
+                    if path.suffix.lower() in extensions and path.is_file():
+                        stems[path.stem] = path
+            index[(k, dn)] = stems
+    return index
+
+
+def add_labels(image_grid: dict) -> tuple[dict, tuple]:
+    """Add a white border and the method's name on top of each image."""
+    image_shape = None
+    for k, v in image_grid.items():
+        top    = 50  # shape[0] = rows
+        bottom = top
+        left   = 10  # shape[1] = cols
+        right  = left
+        v      = cv2.copyMakeBorder(v, top, bottom, left, right, cv2.BORDER_CONSTANT, None, [255, 255, 255])
+        #
+        textsize = cv2.getTextSize(k, cv2.FONT_HERSHEY_SIMPLEX, 1, 2)[0]
+        if textsize is not None:
+            text_x = round((v.shape[1] - textsize[0]) / 2)
+            text_y = textsize[1] + 10  # round((v.shape[0] + textsize[1]) / 2)
+            cv2.putText(v, k, (text_x, text_y), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 0), 2)
+        #
+        image_grid[k] = v
+        image_shape   = v.shape
+    return image_grid, image_shape
+
+
+def concat_grid(image_grid: dict, num_cols: int, image_shape: tuple, image_dtype: Any) -> np.ndarray:
+    """Tile the images of a grid into one BGR image."""
+    num_rows          = mon.math.ceil(len(image_grid) / num_cols)
+    image_grid_values = list(image_grid.values())
+    row_images        = []
+    for i in range(num_rows):
+        row_image = None
+        for j in range(num_cols):
+            idx = i * num_cols + j
+            if j == 0:
+                row_image   = image_grid_values[idx]
+                continue
+            if idx < len(image_grid):
+                row_image   = cv2.hconcat([row_image, image_grid_values[idx]])
+            else:
+                empty_image = np.full(image_shape, 255, dtype=image_dtype)
+                row_image   = cv2.hconcat([row_image, empty_image])
+        row_images.append(row_image)
+    output = cv2.vconcat(row_images)
+    return output[..., ::-1]
+
+
+def render_cv2(
+    keys      : list[str],
+    paths     : dict[str, mon.Path | None],
+    image_size: int | None,
     num_cols  : int,
-    output_dir: mon.Path | str,
     mode      : str,
     ref       : str,
-    verbose   : bool
+    cache     : ThumbnailCache,
+) -> tuple[np.ndarray | None, np.ndarray | None]:
+    """Render the comparison grid of one image (and its difference grid when
+    :param:`mode` is ``'diff'``) from a single read of each image.
+    """
+    image_shape = None
+    image_dtype = None
+    image_grid  = {}
+    # Read images
+    for k in keys:
+        path  = paths.get(k)
+        image = cache.read(path, image_size) if path is not None else None
+        if image is not None:
+            image_dtype = image.dtype
+            if k != "zerodce++" or image_shape is None:
+                image_shape = image.shape
+        image_grid[k] = image
+    if image_shape is None:
+        return None, None
+    
+    # Handle empty images
+    for k, v in image_grid.items():
+        if v is None:
+            image_grid[k] = np.full(image_shape, 255, dtype=image_dtype)
+        elif k == "zerodce++" and image_size is None and v.shape != image_shape:
+            image_grid[k] = cv2.resize(v, [image_shape[1], image_shape[0]])
+        else:
+            image_grid[k] = np.ascontiguousarray(v)
+    
+    diff_grid = None
+    if mode == "diff" and ref in image_grid:
+        # Difference
+        diff_grid = dict(image_grid)
+        ref_image = cv2.cvtColor(image_grid[ref], cv2.COLOR_RGB2GRAY)
+        for k, v in image_grid.items():
+            if k != ref:
+                v    = cv2.cvtColor(v, cv2.COLOR_RGB2GRAY)
+                diff = cv2.subtract(v, ref_image)
+                diff = (diff * 255).astype("uint8")
+                diff = cv2.merge([diff, diff, diff])
+                diff_grid[k] = diff.astype("uint8")
+    
+    image_grid, label_shape = add_labels(image_grid)
+    output = concat_grid(image_grid, num_cols, label_shape, image_dtype)
+    if diff_grid is not None:
+        diff_grid, label_shape = add_labels(diff_grid)
+        diff_grid = concat_grid(diff_grid, num_cols, label_shape, image_dtype)
+    return output, diff_grid
+
+
+def plot_cv2(
+    image_dir  : mon.Path,
+    image_size : int | bool,
+    num_cols   : int,
+    output_dir : mon.Path | str,
+    mode       : str,
+    ref        : str,
+    cache_dir  : mon.Path | str | None,
+    num_workers: int,
+    verbose    : bool
 ):
+    image_dir = mon.Path(image_dir)
     subdirs, dataset_names, image_grid, image_stem_dict = list_images(image_dir, verbose)
+    index = index_images(image_dir, image_grid, dataset_names)
+    keys  = list(image_grid.keys())
+    cache = ThumbnailCache(cache_dir=cache_dir)
     
     if output_dir is not None:
         output_dir = mon.Path(output_dir)
-        # if output_dir.exists():
-        #     mon.delete_dir(paths=output_dir)
+        if output_dir.exists():
+            mon.delete_dir(paths=output_dir)
         output_dir.mkdir(parents=True, exist_ok=True)
     
-    # Visualize images
-    with mon.get_progress_bar() as pbar:
-        for dn in pbar.track(
-            sequence    = dataset_names,
-            total       = len(dataset_names),
+    def render(dn: str, image_stem: str):
+        paths  = {k: index[(k, dn)].get(image_stem) for k in keys}
+        output, diff = render_cv2(
+            keys       = keys,
+            paths      = paths,
+            image_size = image_size,
+            num_cols   = num_cols,
+            mode       = mode,
+            ref        = ref,
+            cache      = cache,
+        )
+        if output_dir is not None and output is not None:
+            result_path = output_dir / dn / f"{image_stem}.png"
+            result_path.parent.mkdir(parents=True, exist_ok=True)
+            cv2.imwrite(str(result_path), output)
+            if diff is not None:
+                cv2.imwrite(str(output_dir / dn / f"{image_stem}-diff.png"), diff)
+        return output
+    
+    # Visualize images. Decoding, resizing, and encoding release the GIL, so
+    # threads render different grids in parallel.
+    tasks       = [(dn, stem) for dn in dataset_names for stem in image_stem_dict[dn]]
+    num_workers = 1 if verbose else max(1, num_workers)
+    with mon.get_progress_bar() as pbar, futures.ThreadPoolExecutor(max_workers=num_workers) as executor:
+        jobs = [executor.submit(render, dn, stem) for dn, stem in tasks]
+        for job in pbar.track(
+            sequence    = futures.as_completed(jobs),
+            total       = len(jobs),
             description = f"[bright_yellow] Visualizing"
         ):
-            for image_stem in image_stem_dict[dn]:
-                image_shape = None
-                image_dtype = None
-                # Read images
-                for k, _ in image_grid.items():
-                    path = None
-                    for ext in mon.ImageFormat.values():
-                        temp = image_dir / k / dn / f"{image_stem}{ext}"
-                        if temp.exists():
-                            path = temp
-                    if path is not None and path.exists() and path.is_image_file():
-                        image       = cv2.imread(str(path))[..., ::-1]
-                        image_dtype = image.dtype
-                        if k != "zerodce++":
-                            image_shape = image.shape
-                    else:
-                        image = None
-                    image_grid[k] = image
-                    
-                # Resize
-                for k, v in image_grid.items():
-                    if v is not None and image_size is not None:
-                        h, w          = mon.get_hw(image_size)
-                        image_grid[k] = cv2.resize(v, [w, h])
-                        image_shape   = v.shape
-                
-                # Handle empty images
-                for k, v in image_grid.items():
-                    if v is None:
-                        image_grid[k] = np.full(image_shape, 255, dtype=image_dtype)
-                    elif k == "zerodce++" and image_size is None and image_shape is not None:
-                        image_grid[k] = cv2.resize(v, [image_shape[1], image_shape[0]])
-                
-                plot_diff = (mode == "diff" and image_grid[ref].shape != ())
-                if plot_diff:
-                    # Difference
-                    ref_image = cv2.cvtColor(image_grid[ref], cv2.COLOR_RGB2GRAY)
-                    for k, v in image_grid.items():
-                        if k != ref:
-                            v    = cv2.cvtColor(v, cv2.COLOR_RGB2GRAY)
-                            diff = cv2.subtract(v, ref_image)
-                            diff = (diff * 255).astype("uint8")
-                            diff = cv2.merge([diff, diff, diff])
-                            image_grid[k] = diff.astype("uint8")
-                        
-                    # Add texts
-                    for k, v in image_grid.items():
-                        top    = 50  # shape[0] = rows
-                        bottom = top
-                        left   = 10  # shape[1] = cols
-                        right  = left
-                        v      = cv2.copyMakeBorder(v, top, bottom, left, right, cv2.BORDER_CONSTANT, None, [255, 255, 255])
-                        #
-                        textsize = cv2.getTextSize(k, cv2.FONT_HERSHEY_SIMPLEX, 1, 2)[0]
-                        if textsize is not None:
-                            text_x = round((v.shape[1] - textsize[0]) / 2)
-                            text_y = textsize[1] + 10  # round((v.shape[0] + textsize[1]) / 2)
-                            cv2.putText(v, k, (text_x, text_y), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 0), 2)
-                        #
-                        image_grid[k] = v
-                        image_shape   = v.shape
-                
-                    # Display images
-                    num_rows          = mon.math.ceil(len(image_grid) / num_cols)
-                    image_grid_values = list(image_grid.values())
-                    row_images        = []
-                    for i in range(num_rows):
-                        row_image = None
-                        for j in range(num_cols):
-                            idx = i * num_cols + j
-                            if j == 0:
-                                row_image   = image_grid_values[idx]
-                                continue
-                            if idx < len(image_grid):
-                                row_image   = cv2.hconcat([row_image, image_grid_values[idx]])
-                            else:
-                                empty_image = np.full(image_shape, 255, dtype=image_dtype)
-                                row_image   = cv2.hconcat([row_image, empty_image])
-                        row_images.append(row_image)
-                    output = cv2.vconcat(row_images)
-                    output = output[..., ::-1]
-                    #
-                    if output_dir is not None:
-                        result_path = output_dir / dn / f"{image_stem}-diff.png"
-                        result_path.parent.mkdir(parents=True, exist_ok=True)
-                        cv2.imwrite(str(result_path), output)
-                    #
-                    if verbose:
-                        cv2.imshow("Output", output)
-                        cv2.waitKey(1)
+            output = job.result()
+            if verbose and output is not None:
+                cv2.imshow("Output", output)
+                cv2.waitKey(1)
+    if verbose:
+        console.log(f"Thumbnail cache: {cache.hits} hits, {cache.misses} misses.")
                         
 
 def plot_matplotlib(
@@ -354,9 +408,13 @@ def plot_matplotlib(
     image_size: int | bool,
     num_cols  : int,
     output_dir: mon.Path | str,
+    cache_dir : mon.Path | str | None,
     verbose   : bool
 ):
+    image_dir = mon.Path(image_dir)
     subdirs, dataset_names, image_grid, image_stem_dict = list_images(image_dir, verbose)
+    index = index_images(image_dir, image_grid, dataset_names)
+    cache = ThumbnailCache(cache_dir=cache_dir)
     
     if output_dir is not None:
         output_dir = mon.Path(output_dir)
@@ -376,16 +434,9 @@ def plot_matplotlib(
                 image_shape = None
                 image_dtype = None
                 for k, _ in image_grid.items():
-                    path = None
-                    for ext in mon.ImageFormat.values():
-                        temp = image_dir / k / dn / f"{image_stem}{ext}"
-                        if temp.exists():
-                            path = temp
-                    if path is not None and path.exists() and path.is_image_file():
-                        image = cv2.imread(str(path))[..., ::-1]
-                        if image_size is not None:
-                            h, w  = mon.get_hw(image_size)
-                            image = cv2.resize(image, [w, h])
+                    path  = index[(k, dn)].get(image_stem)
+                    image = cache.read(path, image_size) if path is not None else None
+                    if image is not None:
                         image_grid[k] = image
                         if image_shape is None:
                             image_shape = image.shape
@@ -459,18 +510,31 @@ def plot_matplotlib(
 @click.option("--mode",    default="diff",  type=click.Choice(["image", "diff"],     case_sensitive=False))
 @click.option("--ref",     default="input", type=click.Choice(_INCLUDE_DIRS,                 case_sensitive=False))
 @click.option("--backend", default="cv2",   type=click.Choice(["cv2", "matplotlib"], case_sensitive=False))
+@click.option(
+    "--cache-dir",
+    default = mon.RUN_DIR / "cache/thumbnails",
+    type    = click.Path(exists=False),
+    help    = "Thumbnail cache location."
+)
+@click.option("--no-cache",    is_flag=True,          help="Do not read or write cached thumbnails.")
+@click.option("--clear-cache", is_flag=True,          help="Remove cached thumbnails before plotting.")
+@click.option("--num-workers", default=os.cpu_count(), type=int, help="Number of grids rendered in parallel.")
 @click.option("--verbose", is_flag=True)
 @click.pass_context
 def main(
     ctx,
-    image_dir : mon.Path,
-    image_size: int | bool,
-    num_cols  : int,
-    output_dir: mon.Path | str,
-    mode      : str,
-    ref       : str,
-    backend   : str,
-    verbose   : bool
+    image_dir  : mon.Path,
+    image_size : int | bool,
+    num_cols   : int,
+    output_dir : mon.Path | str,
+    mode       : str,
+    ref        : str,
+    backend    : str,
+    cache_dir  : mon.Path | str,
+    no_cache   : bool,
+    clear_cache: bool,
+    num_workers: int,
+    verbose    : bool
 ):
     model_kwargs = {
         k.lstrip("--"): ctx.args[i + 1]
@@ -478,30 +542,30 @@ def main(
             else True for i, k in enumerate(ctx.args) if k.startswith("--")
     }
     
+    if clear_cache:
+        ThumbnailCache(cache_dir=cache_dir).clear()
+        console.log(f"Cleared thumbnail cache: {cache_dir}.")
+    cache_dir = None if no_cache else cache_dir
     if backend in ["cv2"]:
+        # The image and difference grids are rendered in one pass.
         plot_cv2(
-            image_dir  = image_dir,
-            image_size = image_size,
-            num_cols   = num_cols,
-            output_dir = output_dir,
-            verbose    = verbose,
+            image_dir   = image_dir,
+            image_size  = image_size,
+            num_cols    = num_cols,
+            output_dir  = output_dir,
+            mode        = mode,
+            ref         = ref,
+            cache_dir   = cache_dir,
+            num_workers = num_workers,
+            verbose     = verbose,
         )
-        if mode == "diff":
-            plot_cv2_diff(
-                image_dir  = image_dir,
-                image_size = image_size,
-                num_cols   = num_cols,
-                output_dir = output_dir,
-                mode       = mode,
-                ref        = ref,
-                verbose    = verbose,
-            )
     elif backend in ["matplotlib"]:
         plot_matplotlib(
             image_dir  = image_dir,
             image_size = image_size,
             num_cols   = num_cols,
             output_dir = output_dir,
+            cache_dir  = cache_dir,
             verbose    = verbose,
         )
     else:
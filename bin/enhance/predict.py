@@ -5,6 +5,7 @@
 
 from __future__ import annotations
 
+import glob
 import importlib
 import socket
 import time
@@ -91,6 +92,72 @@ hosts = {
 
 # region Function
 
+def resolve_datasets(data: list[mon.Path | str] | mon.Path | str) -> list[mon.Path]:
+    """Expand a list of dataset roots, video files, or glob patterns (e.g.,
+    ``data/llie/test/*/low``) into existing paths, keeping their order and
+    dropping duplicates.
+    """
+    data     = [data] if isinstance(data, mon.Path | str) else data
+    datasets = []
+    for d in data:
+        d = str(d)
+        if any(c in d for c in "*?["):
+            paths = sorted(mon.Path(p) for p in glob.glob(d, recursive=True))
+        else:
+            paths = [mon.Path(d)]
+        for p in paths:
+            if not p.exists():
+                raise ValueError(f"data must be an existing path, but got {p}.")
+            if p not in datasets:
+                datasets.append(p)
+    if len(datasets) == 0:
+        raise ValueError(f"No dataset matches {data}.")
+    return datasets
+
+
+def get_dataset_name(data: mon.Path) -> str:
+    """Return the name of the output sub-directory of a dataset, e.g.,
+    ``data/llie/test/lime/low`` becomes ``lime``.
+    """
+    if data.is_video_file():
+        return data.stem
+    if data.name in ["low", "lq", "input", "images"]:
+        return data.parent.name
+    return data.name
+
+
+def get_dataset_names(datasets: list[mon.Path]) -> list[str]:
+    """Return a unique output sub-directory name for each dataset. Datasets
+    with the same :func:`get_dataset_name` (e.g., ``a/lime/low`` and
+    ``b/lime/low``) are prefixed with their parent directories, joined with
+    ``'-'``, until the names differ (``a-lime`` and ``b-lime``).
+    """
+    names = [get_dataset_name(d) for d in datasets]
+    # The directories above the one that gives the name, nearest first
+    parents = []
+    for d, name in zip(datasets, names):
+        p = d.parent if d.is_video_file() or d.name != name else d
+        p = p.parent if p.name == name else p
+        parents.append([q.name for q in [p, *p.parents] if q.name != ""])
+    depth = [0] * len(datasets)
+    while True:
+        full = [
+            "-".join(list(reversed(parents[i][:depth[i]])) + [names[i]])
+            for i in range(len(datasets))
+        ]
+        clashes = [i for i, n in enumerate(full) if full.count(n) > 1]
+        if len(clashes) == 0:
+            return full
+        if all(depth[i] >= len(parents[i]) for i in clashes):
+            raise ValueError(
+                f"datasets must have distinct output names, but "
+                f"{[str(datasets[i]) for i in clashes]} all map to "
+                f"{full[clashes[0]]}."
+            )
+        for i in clashes:
+            depth[i] = min(depth[i] + 1, len(parents[i]))
+
+
 def predict(args: dict):
     # Initialization
     model_name    = args["model"]["name"]
@@ -99,22 +166,35 @@ def predict(args: dict):
     model_variant = f"{model_name}-{variant}" if variant is not None else f"{model_name}"
     console.rule(f"[bold red] {model_variant}")
     
-    weights = args["model"]["weights"]
-    model: mon.Model = mon.MODELS.build(config=args["model"])
-    if torch.cuda.is_available():
+    weights      = args["model"]["weights"]
+    backend      = args["backend"]
+    check_parity = args["check_parity"] and backend != "torch"
+    if torch.cuda.is_available() and backend != "onnx":
         devices = torch.device(f"cuda:0")
     else:
         devices = torch.device("cpu")
-    state_dict  = torch.load(weights, map_location=devices)
-    model.load_state_dict(state_dict=state_dict["state_dict"])
-    model.phase = mon.ModelPhase.INFERENCE
-    model.eval()
-
-    output_dir = args["output_dir"]
-    output_dir.mkdir(parents=True, exist_ok=True)
     
-    # Measure efficiency score
-    if torch.cuda.is_available():
+    # The eager model is only needed for the default backend, or as the
+    # reference when checking the parity of an exported model.
+    model = None
+    if backend == "torch" or check_parity:
+        model: mon.Model = mon.MODELS.build(config=args["model"])
+        # Training-free models (e.g., PIE) have no weights to load.
+        if weights is not None:
+            state_dict  = torch.load(weights, map_location=devices)
+            model.load_state_dict(state_dict=state_dict["state_dict"])
+        model.phase = mon.ModelPhase.INFERENCE
+        model.eval()
+    engine = mon.build_backend(
+        backend = backend,
+        model   = model,
+        path    = args["backend_file"],
+        device  = devices,
+    )
+    console.log(f"Backend: {engine.name}")
+    
+    # Measure efficiency score once for all datasets
+    if torch.cuda.is_available() and model is not None:
         flops, params, avg_time = mon.calculate_efficiency_score(
             model      = model,
             image_size = args["image_size"],
@@ -126,14 +206,56 @@ def predict(args: dict):
         console.log(f"FLOPs  = {flops:.4f}")
         console.log(f"Params = {params:.4f}")
         console.log(f"Time   = {avg_time:.4f}")
-     
+    else:
+        # Still pay the lazy initialization cost before the timed loops.
+        h, w = mon.get_hw(args["datamodule"]["image_size"])
+        engine.warmup(input_dims=[1, 3, h, w])
+    
     # Data
-    data       = mon.Path(args["datamodule"]["root"])
+    datasets    = resolve_datasets(args["datamodule"]["root"])
+    output_dir  = args["output_dir"]
+    sum_time    = 0
+    num_images  = 0
+    names       = get_dataset_names(datasets)
+    for data, data_name in zip(datasets, names):
+        # A single dataset keeps writing to output_dir as before.
+        data_output_dir = output_dir if len(datasets) == 1 else output_dir / data_name
+        run_time, count = predict_dataset(
+            args         = args,
+            data         = data,
+            output_dir   = data_output_dir,
+            engine       = engine,
+            model        = model,
+            check_parity = check_parity,
+        )
+        check_parity = False
+        sum_time    += run_time
+        num_images  += count
+    if len(datasets) > 1:
+        console.log(f"Average time ({len(datasets)} datasets): {float(sum_time / max(num_images, 1))}")
+
+
+def predict_dataset(
+    args        : dict,
+    data        : mon.Path,
+    output_dir  : mon.Path,
+    engine      : mon.InferenceBackend,
+    model       : mon.Model | None,
+    check_parity: bool = False,
+) -> tuple[float, int]:
+    """Run an already loaded :param:`engine` on one dataset.
+    
+    Return:
+        The total inference time and the number of processed images.
+    """
+    backend    = args["backend"]
     image_size = args["datamodule"]["image_size"]
     h, w       = mon.get_hw(image_size)
     resize     = args["datamodule"]["resize"]
+    output_dir.mkdir(parents=True, exist_ok=True)
     console.log(f"{data}")
     
+    temporal = None
     if data.is_video_file():
         image_loader = mon.VideoLoaderCV(source=data, to_rgb=True, to_tensor=True, normalize=True)
         video_writer = mon.VideoWriterCV(
@@ -145,6 +267,29 @@ def predict(args: dict):
             denormalize = True,
             verbose     = False,
         )
+        # Reuse the curve parameter maps of key frames on the frames between.
+        if args["key_interval"] > 1 and model is not None and backend == "torch":
+            temporal = mon.TemporalCurveEnhancer(
+                model           = model,
+                interval        = args["key_interval"],
+                scene_threshold = args["scene_cut"],
+                warp            = args["warp"],
+                momentum        = args["momentum"],
+            )
+    elif args["bucket"] != "none":
+        # Group mixed-resolution images into same-shape batches instead of
+        # processing them one by one.
+        image_loader = mon.BucketImageLoader(
+            source     = data,
+            batch_size = args["datamodule"]["batch_size"],
+            bucket_by  = args["bucket"],
+            stride     = args["pad_stride"],
+            to_rgb     = True,
+            to_tensor  = True,
+            normalize  = True,
+            verbose    = args["model"]["verbose"],
+        )
+        video_writer = None
     else:
         image_loader = mon.ImageLoader(source=data, to_rgb=True, to_tensor=True, normalize=True)
         video_writer = None
@@ -156,19 +301,24 @@ def predict(args: dict):
         # image_paths.sort()
         sum_time = 0
         with mon.get_progress_bar() as pbar:
-            for images, indexes, files, rel_paths in pbar.track(
+            for batch in pbar.track(
                 sequence    = image_loader,
-                total       = len(image_loader),
+                total       = image_loader.batch_len() if args["bucket"] != "none" else len(image_loader),
                 description = f"[bright_yellow] Inferring"
             ):
+                images, indexes, files, rel_paths = batch[0:4]
+                sizes = batch[4] if len(batch) > 4 else None
                 # console.log(image_path)
                 # image       = mon.read_image(path=image_path, to_rgb=True, to_tensor=True, normalize=True)
                 if resize:
                     h0, w0  = mon.get_image_size(images)
                     images  = mon.resize(input=images, size=[h, w])
-                input       = images.to(model.device)
+                input       = images.to(engine.device)
+                if check_parity:
+                    mon.check_backend_parity(reference=model, backend=engine, input=input)
+                    check_parity = False
                 start_time  = time.time()
-                output      = model(input=input, augment=False, profile=False, out_index=-1)
+                output      = temporal(input) if temporal is not None else engine(input)
                 '''
                 output       = model(input=input, augment=False, profile=False)
                 a, p, output = output[0], output[1], output[2]
@@ -184,11 +334,15 @@ def predict(args: dict):
                 run_time    = time.time() - start_time
                 output      = output[-1] if isinstance(output, (list, tuple)) else output
                 if resize:
-                    output  = mon.resize(input=images, size=[h0, w0])
-
+                    output  = mon.resize(input=output, size=[h0, w0])
+                
                 if args["save_image"]:
-                    result_path = output_dir / f"{files[0].stem}.png"
-                    torchvision.utils.save_image(output, str(result_path))
+                    if sizes is not None:
+                        for file, result in zip(files, mon.BucketImageLoader.unpad(output, sizes)):
+                            torchvision.utils.save_image(result, str(output_dir / f"{file.stem}.png"))
+                    else:
+                        result_path = output_dir / f"{files[0].stem}.png"
+                        torchvision.utils.save_image(output, str(result_path))
                     '''
                     a_path = output_dir / f"{files[0].stem}-a.png"
                     B_path = output_dir / f"{files[0].stem}-b.png"
@@ -204,43 +358,64 @@ def predict(args: dict):
                     if data.is_video_file():
                         video_writer.write_batch(images=output)
                 sum_time += run_time
-        avg_time = float(sum_time / len(image_loader))
+        avg_time = float(sum_time / max(len(image_loader), 1))
         console.log(f"Average time: {avg_time}")
+        if temporal is not None:
+            console.log(f"Reused curve maps on {temporal.reuse_ratio * 100:.1f}% of frames.")
+    return sum_time, len(image_loader)
 
 
 @click.command(context_settings=dict(
     ignore_unknown_options = True,
     allow_extra_args       = True,
 ))
-@click.option("--data",        default=mon.DATA_DIR,          type=click.Path(exists=True),  help="Source data directory.")
+@click.option("--data",        default=[mon.DATA_DIR],        type=str, multiple=True,       help="Source data directories, video files, or glob patterns. Repeat to process several datasets with one loaded model.")
 @click.option("--config",      default="",                    type=click.Path(exists=False), help="The training config to use.")
 @click.option("--root",        default=mon.RUN_DIR/"predict", type=click.Path(exists=False), help="Save results to root/project/name.")
 @click.option("--project",     default=None,                  type=click.Path(exists=False), help="Save results to root/project/name.")
 @click.option("--name",        default=None,                  type=click.Path(exists=False), help="Save results to root/project/name.")
 @click.option("--variant",     default=None,                  type=str,                      help="Model variant.")
 @click.option("--weights",     default=None,                  type=click.Path(exists=False), help="Weights paths.")
+@click.option("--backend",     default="torch",               type=click.Choice(["torch", "torchscript", "onnx"], case_sensitive=False), help="Inference backend.")
+@click.option("--backend-file", default=None,                 type=click.Path(exists=False), help="Exported .pt (TorchScript) or .onnx file for non-torch backends.")
+@click.option("--check-parity", is_flag=True,                                                help="Compare the exported backend against the eager model on the first batch.")
 @click.option("--batch-size",  default=1,                     type=int,                      help="Total Batch size for all GPUs.")
 @click.option("--image-size",  default=512,                   type=int,                      help="Image sizes.")
 @click.option("--resize",      is_flag=True)
+@click.option("--bucket",      default="none",                type=click.Choice(["none", "shape", "aspect_ratio"], case_sensitive=False), help="Batch mixed-resolution images by exact shape or aspect ratio.")
+@click.option("--key-interval", default=1,                    type=int,                      help="Video only: re-estimate curve maps every k frames (1 = every frame).")
+@click.option("--scene-cut",   default=0.08,                  type=float,                    help="Video only: thumbnail difference that forces a new key frame.")
+@click.option("--warp",        is_flag=True,                                                 help="Video only: warp reused curve maps with optical flow.")
+@click.option("--momentum",    default=0.5,                   type=float,                    help="Video only: weight of the previous curve maps when blending them into a new key frame (0 = no blending).")
+@click.option("--pad-stride",  default=None,                  type=int,                      help="Pad bucketed batches to a multiple of this stride.")
 @click.option("--output-dir",  default=mon.RUN_DIR/"predict", type=click.Path(exists=False), help="Save results location.")
 @click.option("--save-image",  is_flag=True)
 @click.option("--verbose",     is_flag=True)
 @click.pass_context
 def main(
     ctx,
-    data       : mon.Path | str,
-    config     : mon.Path | str,
-    root       : mon.Path | str,
-    project    : str,
-    name       : str,
-    variant    : int | str | None,
-    weights    : Any,
-    batch_size : int,
-    image_size : int | list[int],
-    resize     : bool,
-    output_dir : mon.Path | str,
-    save_image : bool,
-    verbose    : bool
+    data        : list[str],
+    config      : mon.Path | str,
+    root        : mon.Path | str,
+    project     : str,
+    name        : str,
+    variant     : int | str | None,
+    weights     : Any,
+    backend     : str,
+    backend_file: mon.Path | str | None,
+    check_parity: bool,
+    batch_size  : int,
+    image_size  : int | list[int],
+    resize      : bool,
+    bucket      : str,
+    pad_stride  : int | None,
+    key_interval: int,
+    scene_cut   : float,
+    warp        : bool,
+    momentum    : float,
+    output_dir  : mon.Path | str,
+    save_image  : bool,
+    verbose     : bool
 ):
     model_kwargs = {
         k.lstrip("--"): ctx.args[i + 1]
@@ -261,7 +436,7 @@ def main(
         config_args    = importlib.import_module(f"config.{config}")
     
     # Prioritize input args --> predefined args --> config file args
-    data        = mon.Path(data)
+    data        = list(data) if len(data) > 0 else [mon.DATA_DIR]
     project     = project or config_args.model["project"]
     project     = str(project).replace(".", "/")
     root        = root        or host_args.get("root",       None)
@@ -295,7 +470,16 @@ def main(
         "verbose": verbose,
     }
     args["model"]      |= model_kwargs
-    args["save_image"]  = save_image
+    args["save_image"]   = save_image
+    args["backend"]      = str(backend).lower()
+    args["backend_file"] = mon.Path(backend_file) if backend_file is not None else None
+    args["check_parity"] = check_parity
+    args["bucket"]       = str(bucket).lower()
+    args["pad_stride"]   = pad_stride
+    args["key_interval"] = key_interval
+    args["scene_cut"]    = scene_cut
+    args["warp"]         = warp
+    args["momentum"]     = momentum
     predict(args=args)
 
 # endregion
@@ -0,0 +1,719 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""This module implements an experiment grid scheduler for low-light image
+enhancement models. It replaces the sequential loops of ``run_llie.sh``.
+
+The grid (models x variants x datasets) is expanded into a DAG of jobs:
+``train`` -> ``predict`` (one per predict dataset) -> ``metric``. Jobs whose
+dependencies are done run concurrently as long as they fit in the CPU and
+memory budgets. A job is skipped when its outputs are up to date: it finished
+successfully before with the same signature, its outputs exist, and none of
+its inputs changed afterward, and no job it depends on runs again. Metric jobs
+run one at a time, as they append to the same result file. The state of every
+job is written to a JSON file after each job, so an interrupted sweep resumes
+where it stopped.
+
+Example:
+    python run_llie.py --model zerodce --model sci --task predict --task evaluate
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import subprocess
+import time
+from concurrent import futures
+from typing import Any
+
+import click
+
+import mon
+
+console = mon.console
+
+_current_dir = mon.Path(__file__).absolute().parent
+_root_dir    = _current_dir.parent.parent
+
+
+# region Grid
+
+models = [
+    "enlightengan",  # https://github.com/arsenyinfo/EnlightenGAN-inference
+    "gcenet",
+    "iat",           # https://github.com/cuiziteng/Illumination-Adaptive-Transformer
+    "kind",          # https://github.com/zhangyhuaee/KinD
+    "kind++",        # https://github.com/zhangyhuaee/KinD_plus
+    "lcdpnet",       # https://github.com/onpix/LCDPNet
+    "lime",          # https://github.com/pvnieo/Low-light-Image-Enhancement
+    "llflow",        # https://github.com/wyf0912/LLFlow
+    "mbllen",        # https://github.com/Lvfeifan/MBLLEN
+    "pie",           # https://github.com/DavidQiuChao/PIE
+    "retinexdip",    # https://github.com/zhaozunjin/RetinexDIP
+    "retinexnet",    # https://github.com/weichen582/RetinexNet
+    "ruas",          # https://github.com/KarelZhang/RUAS
+    "sci",           # https://github.com/vis-opt-group/SCI
+    "sgz",           #
+    "snr",           # https://github.com/dvlab-research/SNR-Aware-Low-Light-Enhance
+    "stablellve",    # https://github.com/zkawfanx/StableLLVE
+    "uretinexnet",   # https://github.com/AndersonYong/URetinex-Net
+    "utvnet",        # https://github.com/CharlieZCJ/UTVNet
+    "zeroadce",      #
+    "zerodce",       #
+    "zerodce++",     #
+]
+
+# Dataset name -> (low, high) directories relative to data/llie.
+train_datasets = {
+    "fivek-c"     : ("train/fivek-c/low",      "train/fivek-c/high"),
+    "fivek-e"     : ("train/fivek-e/low",      "train/fivek-e/high"),
+    "lol-v1"      : ("train/lol-v1/low",       "train/lol-v1/high"),
+    "lol-v2-real" : ("train/lol-v2-real/low",  "train/lol-v2-real/high"),
+    "lol-v2-syn"  : ("train/lol-v2-syn/low",   "train/lol-v2-syn/high"),
+    "sice"        : ("train/sice-part1/low",   "train/sice-part1/high"),
+    "sice-grad"   : ("train/sice-grad/low",    "train/sice-grad/high"),
+    "sice-mix"    : ("train/sice-mix/low",     "train/sice-mix/high"),
+    "sice-zerodce": ("train/sice-zerodce/low", "train/sice-zerodce/high"),
+}
+predict_datasets = {
+    "darkcityscapes": ("test/darkcityscapes/low", "test/darkcityscapes/high"),
+    "darkface"      : ("test/darkface/low",       None),
+    "dicm"          : ("test/dicm/low",           None),
+    "exdark"        : ("test/exdark/low",         None),
+    "fivek-c"       : ("train/fivek-c/low",       None),
+    "fivek-e"       : ("train/fivek-e/low",       None),
+    "fusion"        : ("test/fusion/low",         None),
+    "lime"          : ("test/lime/low",           None),
+    "lol-v1"        : ("test/lol-v1/low",         "test/lol-v1/high"),
+    "lol-v2-real"   : ("test/lol-v2-real/low",    "test/lol-v2-real/high"),
+    "lol-v2-syn"    : ("test/lol-v2-syn/low",     "test/lol-v2-syn/high"),
+    "mef"           : ("test/mef/low",            None),
+    "npe"           : ("test/npe/low",            None),
+    "sice"          : ("test/sice-part2/low",     "test/sice-part2/high"),
+    "vv"            : ("test/vv/low",             None),
+}
+default_predict_datasets = [
+    "dicm", "fusion", "lime", "lol-v1", "lol-v2-real", "lol-v2-syn", "mef",
+    "npe", "vv",
+]
+
+# Models implemented in mon run from this directory; the others from their
+# original code in src/lib.
+mon_models = ["gcenet", "zeroadce"]
+
+# Model -> (script, arguments). Placeholders are filled by Cell.format().
+train_commands = {
+    "gcenet"   : ("train.py", [
+        "--name", "{name}", "--variant", "{variant}", "--max-epochs", "{epochs}",
+    ]),
+    "lcdpnet"  : ("src/train.py", [
+        "name=lcdpnet-lol", "num_epoch={epochs}", "log_every=2000", "valid_every=20",
+    ]),
+    "ruas"     : ("train.py", [
+        "--data", "{train_low}", "--weights", "{weights}", "--load-pretrain", "false",
+        "--epoch", "{epochs}", "--batch-size", "1", "--report-freq", "50", "--gpu", "0",
+        "--seed", "2", "--checkpoints-dir", "{train_dir}",
+    ]),
+    "sci"      : ("train.py", [
+        "--data", "{train_low}", "--weights", "{weights}", "--load-pretrain", "false",
+        "--batch-size", "1", "--epochs", "{epochs}", "--lr", "0.0003", "--stage", "3",
+        "--cuda", "true", "--gpu", "0", "--seed", "2", "--checkpoints-dir", "{train_dir}",
+    ]),
+    "sgz"      : ("train.py", [
+        "--data", "{train_low}", "--weights", "{weights}", "--load-pretrain", "false",
+        "--image-size", "512", "--lr", "0.0001", "--weight-decay", "0.0001",
+        "--grad-clip-norm", "0.1", "--epochs", "{epochs}", "--train-batch-size", "6",
+        "--val-batch-size", "8", "--num-workers", "4", "--display-iter", "10",
+        "--scale-factor", "1", "--num-of-SegClass", "21", "--conv-type", "dsc",
+        "--patch-size", "4", "--exp-level", "0.6", "--checkpoints-iter", "10",
+        "--checkpoints-dir", "{train_dir}",
+    ]),
+    "zeroadce" : ("train.py", [
+        "--name", "{name}", "--variant", "{variant}", "--max-epochs", "{epochs}",
+    ]),
+    "zerodce"  : ("lowlight_train.py", [
+        "--data", "{train_low}", "--weights", "{weights}", "--load-pretrain", "false",
+        "--lr", "0.0001", "--weight-decay", "0.0001", "--grad-clip-norm", "0.1",
+        "--epochs", "{epochs}", "--train-batch-size", "8", "--val-batch-size", "4",
+        "--num-workers", "4", "--display-iter", "10", "--checkpoints-iter", "10",
+        "--checkpoints-dir", "{train_dir}",
+    ]),
+    "zerodce++": ("lowlight_train.py", [
+        "--data", "{train_low}", "--weights", "{weights}", "--load-pretrain", "false",
+        "--lr", "0.0001", "--weight-decay", "0.0001", "--grad-clip-norm", "0.1",
+        "--scale-factor", "1", "--epochs", "{epochs}", "--train-batch-size", "8",
+        "--val-batch-size", "4", "--num-workers", "4", "--display-iter", "10",
+        "--checkpoints-iter", "10", "--checkpoints-dir", "{train_dir}",
+    ]),
+}
+predict_commands = {
+    "enlightengan": ("infer/predict.py", [
+        "--data", "{low}", "--image-size", "512", "--output-dir", "{predict_dir}",
+    ]),
+    "gcenet"      : ("predict.py", [
+        "--data", "{low}", "--config", "{model}_sice_zerodce", "--root", "{predict_dir}",
+        "--project", "{project}/{model}", "--variant", "{variant}", "--weights", "{weights}",
+        "--num_iters", "8", "--image-size", "512", "--save-image", "--output-dir", "{predict_dir}",
+    ]),
+    "iat"         : ("IAT_enhance/predict.py", [
+        "--data", "{low}", "--exposure-weights", "{zoo_dir}/iat-exposure.pth",
+        "--enhance-weights", "{zoo_dir}/iat-lol-v1.pth", "--image-size", "512",
+        "--normalize", "--task", "enhance", "--output-dir", "{predict_dir}",
+    ]),
+    "kind"        : ("test.py", [
+        "--data", "{low}", "--image-size", "512", "--output-dir", "{predict_dir}",
+    ]),
+    "kind++"      : ("test.py", [
+        "--data", "{low}", "--image-size", "512", "--output-dir", "{predict_dir}",
+    ]),
+    "lime"        : ("demo.py", [
+        "--data", "{low}", "--image-size", "512", "--lime", "--output-dir", "{predict_dir}",
+    ]),
+    "llflow"      : ("code/test_unpaired_v2.py", [
+        "--data", "{low}", "--weights", "weights/llflow-lol-smallnet.pth", "--image-size", "512",
+        "--output-dir", "{predict_dir}", "--opt", "code/confs/LOL_smallNet.yml", "--name", "unpaired",
+    ]),
+    "mbllen"      : ("main/test.py", [
+        "--data", "{low}", "--image-size", "512", "--output-dir", "{predict_dir}",
+    ]),
+    "pie"         : ("main.py", [
+        "--data", "{low}", "--image-size", "512", "--output-dir", "{predict_dir}",
+    ]),
+    "retinexdip"  : ("retinexdip.py", [
+        "--data", "{low}", "--weights", "{weights}", "--image-size", "512",
+        "--output-dir", "{predict_dir}",
+    ]),
+    "retinexnet"  : ("predict.py", [
+        "--data", "{low}", "--weights", "{zoo_dir}/", "--image-size", "512",
+        "--output-dir", "{predict_dir}",
+    ]),
+    "ruas"        : ("test.py", [
+        "--data", "{low}", "--weights", "{zoo_dir}/ruas-lol.pt", "--image-size", "512",
+        "--gpu", "0", "--seed", "2", "--output-dir", "{predict_dir}",
+    ]),
+    "sci"         : ("test.py", [
+        "--data", "{low}", "--weights", "{zoo_dir}/sci-medium.pt", "--image-size", "512",
+        "--gpu", "0", "--seed", "2", "--output-dir", "{predict_dir}",
+    ]),
+    "sgz"         : ("test.py", [
+        "--data", "{low}", "--weights", "{zoo_dir}/sgz-lol.pt", "--image-size", "512",
+        "--output-dir", "{predict_dir}",
+    ]),
+    "snr"         : ("predict.py", [
+        "--data", "{low}", "--weights", "{zoo_dir}/snr-lolv1.pth", "--opt", "./options/test/LOLv1.yml",
+        "--image-size", "512", "--output-dir", "{predict_dir}",
+    ]),
+    "stablellve"  : ("test.py", [
+        "--data", "{low}", "--weights", "{zoo_dir}/stablellve-checkpoint.pth",
+        "--image-size", "512", "--output-dir", "{predict_dir}",
+    ]),
+    "uretinexnet" : ("test.py", [
+        "--data", "{low}",
+        "--decom-model-low-weights", "{zoo_dir}/uretinexnet-init_low.pth",
+        "--unfolding-model-weights", "{zoo_dir}/uretinexnet-unfolding.pth",
+        "--adjust-model-weights",    "{zoo_dir}/uretinexnet-L_adjust.pth",
+        "--image-size", "512", "--ratio", "5", "--output-dir", "{predict_dir}",
+    ]),
+    "utvnet"      : ("test.py", [
+        "--data", "{low}", "--image-size", "512", "--output-dir", "{predict_dir}",
+    ]),
+    "zeroadce"    : ("predict.py", [
+        "--data", "{low}", "--config", "{model}_sice_zerodce", "--root", "{predict_dir}",
+        "--project", "{project}/{model}", "--variant", "{variant}", "--weights", "{weights}",
+        "--num_iters", "8", "--image-size", "512", "--save-image", "--output-dir", "{predict_dir}",
+    ]),
+    "zerodce"     : ("lowlight_test.py", [
+        "--data", "{low}", "--weights", "{zoo_dir}/best.pth", "--image-size", "512",
+        "--output-dir", "{predict_dir}",
+    ]),
+    "zerodce++"   : ("lowlight_test.py", [
+        "--data", "{low}", "--weights", "{zoo_dir}/best.pth", "--image-size", "512",
+        "--output-dir", "{predict_dir}",
+    ]),
+}
+# LCDPNet predicts its own test set in one run.
+predict_once_commands = {
+    "lcdpnet": ("src/test.py", ["checkpoint_path={zoo_dir}/lcdpnet-ours.ckpt", "+image_size=512"]),
+}
+metric_commands = [
+    ("metric.py", [
+        "--image-dir", "{predict_dir}", "--target-dir", "{high}", "--result-file", "{result_dir}",
+        "--name", "{model_variant_suffix}", "--image-size", "256", "--resize", "--test-y-channel",
+        "--backend", "piqa", "--append-results",
+        "--metric", "psnr", "--metric", "psnry", "--metric", "ssim", "--metric", "ms-ssim",
+        "--metric", "lpips", "--metric", "brisque", "--metric", "niqe", "--metric", "pi",
+    ]),
+    ("metric.py", [
+        "--image-dir", "{predict_dir}", "--target-dir", "{high}", "--result-file", "{result_dir}",
+        "--name", "{model_variant_suffix}", "--image-size", "256", "--resize", "--test-y-channel",
+        "--backend", "pyiqa", "--append-results",
+        "--metric", "psnry", "--metric", "brisque", "--metric", "niqe", "--metric", "pi",
+    ]),
+]
+
+# Default resources (CPUs, memory in GB) reserved by each kind of job.
+resources = {
+    "train"  : (4, 16.0),
+    "predict": (2, 8.0),
+    "metric" : (1, 4.0),
+}
+# Kinds of jobs that run one at a time: all metric jobs append to the same
+# ``metric.txt``, whose header is written when the file is empty.
+serial_kinds = ["metric"]
+
+
+class Cell:
+    """One (model, variant) pair of the grid with the paths and placeholders
+    shared by its jobs.
+    """
+
+    def __init__(
+        self,
+        model       : str,
+        variant     : str,
+        suffix      : str,
+        train_data  : str,
+        epochs      : int,
+        project     : str,
+        use_data_dir: bool,
+        checkpoint  : str,
+    ):
+        self.model         = model
+        self.variant       = variant
+        self.model_variant = f"{model}-{variant}" if variant not in [None, "", "none"] else model
+        self.suffix        = suffix if suffix not in [None, "", "none"] else None
+        self.train_data    = train_data
+        self.epochs        = epochs
+        self.project       = project
+        self.use_data_dir  = use_data_dir
+        self.checkpoint    = checkpoint
+        if self.suffix is not None:
+            self.name                 = f"{self.model_variant}-{train_data}-{self.suffix}"
+            self.model_variant_suffix = f"{self.model_variant}-{self.suffix}"
+        else:
+            self.name                 = f"{self.model_variant}-{train_data}"
+            self.model_variant_suffix = self.model_variant
+        self.model_dir = _current_dir if model in mon_models else _root_dir / "src" / "lib" / project / model
+        self.zoo_dir   = _root_dir / "zoo" / project / model
+        self.train_dir = _root_dir / "run" / "train" / project / model / self.name
+
+    def weights(self) -> mon.Path:
+        """Resolve the weights like ``run_llie.sh``: the trained checkpoint
+        first, then the zoo. Called when a job starts, so it sees the output
+        of the train job.
+        """
+        candidates = [self.train_dir / "weights" / f"{self.checkpoint}{ext}" for ext in [".pt", ".pth", ".ckpt"]] \
+                   + [self.zoo_dir / f"{self.name}{ext}" for ext in [".pt", ".pth", ".ckpt"]]
+        for c in candidates:
+            if c.is_file():
+                return c
+        return self.zoo_dir / f"{self.name}.pt"
+
+    def predict_dir(self, dataset: str) -> mon.Path:
+        if self.use_data_dir:
+            predict_dir = _root_dir / "data" / "llie" / "predict" / self.model_variant_suffix / dataset
+        else:
+            predict_dir = _root_dir / "run" / "predict" / self.project / self.model_variant_suffix / dataset
+        return predict_dir / "enhance" if dataset == "darkcityscapes" else predict_dir
+
+    def format(self, args: list[str], dataset: str | None = None) -> list[str]:
+        low, high = predict_datasets.get(dataset, (None, None))
+        values    = {
+            "model"               : self.model,
+            "variant"             : self.variant,
+            "name"                : self.name,
+            "epochs"              : self.epochs,
+            "project"             : self.project,
+            "model_variant_suffix": self.model_variant_suffix,
+            "train_low"           : _root_dir / "data" / "llie" / train_datasets[self.train_data][0]
+                                    if self.train_data in train_datasets else "",
+            "train_dir"           : self.train_dir,
+            "zoo_dir"             : self.zoo_dir,
+            "weights"             : self.weights(),
+            "low"                 : _root_dir / "data" / "llie" / low  if low  is not None else "",
+            "high"                : _root_dir / "data" / "llie" / high if high is not None
+                                    else _root_dir / "data" / "llie" / "test" / str(dataset) / "high",
+            "predict_dir"         : self.predict_dir(dataset) if dataset is not None else "",
+            "result_dir"          : _current_dir,
+        }
+        return [a.format(**{k: str(v) for k, v in values.items()}) for a in args]
+
+# endregion
+
+
+# region Job
+
+class Job:
+    """A node of the DAG.
+
+    Args:
+        id: A unique name, also the key in the state file.
+        kind: One of: ``'train'``, ``'predict'``, or ``'metric'``.
+        cell: The grid cell the job belongs to.
+        commands: ``(script, arguments)`` pairs run one after another in
+            :attr:`cell.model_dir`.
+        dataset: The predict dataset, if any.
+        deps: The ids of the jobs that must finish first.
+        inputs: Paths whose modification makes the job out of date.
+        outputs: Paths that must exist for the job to be up to date.
+    """
+
+    def __init__(
+        self,
+        id      : str,
+        kind    : str,
+        cell    : Cell,
+        commands: list[tuple[str, list[str]]],
+        dataset : str | None           = None,
+        deps    : list[str]      | None = None,
+        inputs  : list[mon.Path] | None = None,
+        outputs : list[mon.Path] | None = None,
+    ):
+        self.id       = id
+        self.kind     = kind
+        self.cell     = cell
+        self.commands = commands
+        self.dataset  = dataset
+        self.deps     = deps    or []
+        self.inputs   = inputs  or []
+        self.outputs  = outputs or []
+        self.cpus, self.memory = resources[kind]
+
+    @property
+    def signature(self) -> str:
+        """A hash of everything that defines the job's outputs, except the
+        resolved weights (which only exist after training).
+        """
+        text = json.dumps([self.id, self.cell.epochs, self.cell.checkpoint, self.commands], default=str)
+        return hashlib.sha1(text.encode()).hexdigest()
+
+    def build_commands(self) -> list[list[str]]:
+        return [
+            ["python", "-W", "ignore", script] + self.cell.format(args, self.dataset)
+            for script, args in self.commands
+        ]
+
+    def is_up_to_date(self, state: dict) -> bool:
+        entry = state.get(self.id)
+        if entry is None or entry.get("status") != "done" or entry.get("signature") != self.signature:
+            return False
+        if not all(p.exists() for p in self.outputs):
+            return False
+        finished = entry.get("finished", 0)
+        for p in self.inputs:
+            if p.exists() and _newest_mtime(p) > finished:
+                return False
+        return True
+
+
+def _newest_mtime(path: mon.Path) -> float:
+    """Return the newest modification time of a file, or of a directory and
+    its direct children.
+    """
+    mtime = path.stat().st_mtime
+    if path.is_dir():
+        for p in path.iterdir():
+            mtime = max(mtime, p.stat().st_mtime)
+    return mtime
+
+
+def build_jobs(
+    cells       : list[Cell],
+    tasks       : list[str],
+    predict_data: list[str],
+) -> dict[str, Job]:
+    """Expand the grid into a DAG of jobs. A dependency is only added when the
+    upstream task is also scheduled.
+    """
+    jobs = {}
+    for cell in cells:
+        train_id = None
+        if "train" in tasks and cell.model in train_commands:
+            train_id       = f"train/{cell.name}"
+            jobs[train_id] = Job(
+                id       = train_id,
+                kind     = "train",
+                cell     = cell,
+                commands = [train_commands[cell.model]],
+                inputs   = [_root_dir / "data" / "llie" / train_datasets[cell.train_data][0]]
+                           if cell.train_data in train_datasets else [],
+                outputs  = [cell.train_dir],
+            )
+
+        if cell.model in predict_once_commands:
+            if "predict" in tasks:
+                predict_id       = f"predict/{cell.model_variant_suffix}"
+                jobs[predict_id] = Job(
+                    id       = predict_id,
+                    kind     = "predict",
+                    cell     = cell,
+                    commands = [predict_once_commands[cell.model]],
+                    deps     = [train_id] if train_id else [],
+                )
+            continue
+
+        for dataset in predict_data:
+            low, _      = predict_datasets[dataset]
+            predict_dir = cell.predict_dir(dataset)
+            predict_id  = None
+            if "predict" in tasks and cell.model in predict_commands:
+                predict_id       = f"predict/{cell.model_variant_suffix}/{dataset}"
+                jobs[predict_id] = Job(
+                    id       = predict_id,
+                    kind     = "predict",
+                    cell     = cell,
+                    commands = [predict_commands[cell.model]],
+                    dataset  = dataset,
+                    deps     = [train_id] if train_id else [],
+                    inputs   = [_root_dir / "data" / "llie" / low, cell.train_dir / "weights"],
+                    outputs  = [predict_dir],
+                )
+            if "evaluate" in tasks:
+                metric_id       = f"metric/{cell.model_variant_suffix}/{dataset}"
+                jobs[metric_id] = Job(
+                    id       = metric_id,
+                    kind     = "metric",
+                    cell     = cell,
+                    commands = metric_commands,
+                    dataset  = dataset,
+                    deps     = [predict_id] if predict_id else [],
+                    inputs   = [predict_dir],
+                )
+    return jobs
+
+# endregion
+
+
+# region Scheduler
+
+class Scheduler:
+    """Run a DAG of jobs concurrently within CPU and memory budgets.
+
+    Args:
+        jobs: The jobs, keyed by id.
+        state_file: The JSON file that records the status of every job.
+        max_cpus: The number of CPUs shared by running jobs.
+        max_memory: The memory (in GB) shared by running jobs.
+        log_dir: The directory of the per-job log files.
+        force: If ``True``, run every job even if it is up to date.
+        dry_run: If ``True``, only print the commands.
+    """
+
+    def __init__(
+        self,
+        jobs      : dict[str, Job],
+        state_file: mon.Path,
+        max_cpus  : int,
+        max_memory: float,
+        log_dir   : mon.Path,
+        force     : bool = False,
+        dry_run   : bool = False,
+    ):
+        self.jobs       = jobs
+        self.state_file = mon.Path(state_file)
+        self.max_cpus   = max_cpus
+        self.max_memory = max_memory
+        self.log_dir    = mon.Path(log_dir)
+        self.force      = force
+        self.dry_run    = dry_run
+        self.state      = {}
+        if self.state_file.is_file():
+            self.state = json.loads(self.state_file.read_text())
+
+    def save_state(self):
+        """Write the state file atomically, so a crash never leaves it
+        half-written.
+        """
+        self.state_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.state_file.with_suffix(self.state_file.suffix + ".tmp")
+        tmp.write_text(json.dumps(self.state, indent=2, sort_keys=True))
+        os.replace(tmp, self.state_file)
+
+    def run_job(self, job: Job) -> bool:
+        log_file = self.log_dir / f"{job.id.replace('/', '__')}.log"
+        log_file.parent.mkdir(parents=True, exist_ok=True)
+        # Keep each job's math libraries within its CPU share.
+        env = os.environ | {
+            "OMP_NUM_THREADS": str(job.cpus),
+            "MKL_NUM_THREADS": str(job.cpus),
+        }
+        if job.kind == "predict" and job.dataset is not None:
+            job.cell.predict_dir(job.dataset).mkdir(parents=True, exist_ok=True)
+        with open(log_file, "w") as f:
+            for command in job.build_commands():
+                f.write(" ".join(command) + "\n")
+                f.flush()
+                code = subprocess.call(command, cwd=str(job.cell.model_dir), env=env, stdout=f, stderr=subprocess.STDOUT)
+                if code != 0:
+                    return False
+        return True
+
+    def run(self) -> dict[str, str]:
+        """Run all jobs and return their final status."""
+        status = {}
+        for id, job in self.jobs.items():
+            if not self.force and job.is_up_to_date(self.state):
+                status[id] = "skipped"
+            else:
+                status[id] = "pending"
+        # The outputs of a job below a pending job are about to go stale, so
+        # it must run again too, whatever its own state says.
+        changed = True
+        while changed:
+            changed = False
+            for id, job in self.jobs.items():
+                if status[id] == "skipped" and any(status.get(d) == "pending" for d in job.deps):
+                    status[id] = "pending"
+                    changed    = True
+        console.log(
+            f"{len(self.jobs)} jobs, "
+            f"{sum(s == 'skipped' for s in status.values())} up to date."
+        )
+
+        if self.dry_run:
+            for id, job in self.jobs.items():
+                if status[id] == "pending":
+                    for command in job.build_commands():
+                        console.log(f"[{id}] {' '.join(command)}")
+            return status
+
+        free_cpus   = self.max_cpus
+        free_memory = self.max_memory
+        running     = {}
+        with futures.ThreadPoolExecutor(max_workers=max(1, self.max_cpus)) as executor:
+            while True:
+                # Fail the jobs whose dependencies failed
+                for id, job in self.jobs.items():
+                    if status[id] == "pending" and any(status.get(d) in ["failed", "blocked"] for d in job.deps):
+                        status[id] = "blocked"
+                # Start every ready job that fits in the budgets
+                for id, job in self.jobs.items():
+                    if status[id] != "pending":
+                        continue
+                    if not all(status.get(d, "done") in ["done", "skipped"] for d in job.deps):
+                        continue
+                    # A job larger than the budgets runs alone.
+                    fits = (job.cpus <= free_cpus and job.memory <= free_memory) or len(running) == 0
+                    if not fits:
+                        continue
+                    # Serial jobs (e.g., metrics appending to one result file)
+                    # never run next to each other.
+                    if job.kind in serial_kinds and any(j.kind == job.kind for j in running.values()):
+                        continue
+                    free_cpus     -= job.cpus
+                    free_memory   -= job.memory
+                    status[id]     = "running"
+                    console.log(f"Start {id}")
+                    running[executor.submit(self.run_job, job)] = job
+                    self.state[id] = {"status": "running", "started": time.time()}
+
+                if len(running) == 0:
+                    break
+                done, _ = futures.wait(running, return_when=futures.FIRST_COMPLETED)
+                for future in done:
+                    job          = running.pop(future)
+                    free_cpus   += job.cpus
+                    free_memory += job.memory
+                    try:
+                        ok = future.result()
+                    except Exception as e:
+                        console.log(f"[red]{job.id}: {e}")
+                        ok = False
+                    status[job.id]     = "done" if ok else "failed"
+                    self.state[job.id] = {
+                        "status"   : status[job.id],
+                        "signature": job.signature,
+                        "started"  : self.state[job.id]["started"],
+                        "finished" : time.time(),
+                    }
+                    console.log(f"{'[green]Done' if ok else '[red]Failed'}[/] {job.id}")
+                self.save_state()
+
+        for s in ["done", "skipped", "failed", "blocked"]:
+            console.log(f"{s.capitalize():<8}: {sum(v == s for v in status.values())}")
+        return status
+
+# endregion
+
+
+# region Main
+
+@click.command()
+@click.option("--model",        default=["all"],           type=str, multiple=True, help="Models, or 'all'.")
+@click.option("--variant",      default=["none"],          type=str, multiple=True, help="Model variants.")
+@click.option("--suffix",       default="none",            type=str,                help="Name suffix.")
+@click.option("--task",         default=["train", "predict", "evaluate"], type=click.Choice(["train", "predict", "evaluate"], case_sensitive=False), multiple=True)
+@click.option("--epochs",       default=100,               type=int)
+@click.option("--train-data",   default="lol-v1",          type=click.Choice(list(train_datasets.keys()), case_sensitive=False))
+@click.option("--predict-data", default=["default"],       type=str, multiple=True, help="Predict datasets, 'default', or 'all'.")
+@click.option("--project",      default="vision/enhance/llie", type=str)
+@click.option("--use-data-dir/--no-use-data-dir", default=True,  help="Save predictions to data/llie/predict instead of run/predict.")
+@click.option("--checkpoint",   default="best",            type=click.Choice(["best", "last"], case_sensitive=False))
+@click.option("--max-cpus",     default=os.cpu_count(),    type=int,   help="CPUs shared by concurrent jobs.")
+@click.option("--max-memory",   default=64.0,              type=float, help="Memory (GB) shared by concurrent jobs.")
+@click.option("--state-file",   default=_root_dir/"run"/"schedule"/"llie.json", type=click.Path(exists=False), help="Resumable state file.")
+@click.option("--force",        is_flag=True,                          help="Re-run up-to-date jobs.")
+@click.option("--dry-run",      is_flag=True,                          help="Only print the commands.")
+def main(
+    model       : list[str],
+    variant     : list[str],
+    suffix      : str,
+    task        : list[str],
+    epochs      : int,
+    train_data  : str,
+    predict_data: list[str],
+    project     : str,
+    use_data_dir: bool,
+    checkpoint  : str,
+    max_cpus    : int,
+    max_memory  : float,
+    state_file  : Any,
+    force       : bool,
+    dry_run     : bool,
+):
+    model        = models if "all" in model else [m.lower() for m in model]
+    predict_data = [d.lower() for d in predict_data]
+    if "all" in predict_data:
+        predict_data = list(predict_datasets.keys())
+    elif "default" in predict_data:
+        predict_data = default_predict_datasets
+    for m in model:
+        if m not in models:
+            raise ValueError(f"model must be one of {models}, but got {m}.")
+    for d in predict_data:
+        if d not in predict_datasets:
+            raise ValueError(f"predict_data must be one of {list(predict_datasets.keys())}, but got {d}.")
+
+    cells = [
+        Cell(
+            model        = m,
+            variant      = v,
+            suffix       = suffix,
+            train_data   = train_data,
+            epochs       = epochs,
+            project      = project.lower(),
+            use_data_dir = use_data_dir,
+            checkpoint   = checkpoint,
+        )
+        for m in model for v in variant
+    ]
+    jobs       = build_jobs(cells=cells, tasks=[t.lower() for t in task], predict_data=predict_data)
+    state_file = mon.Path(state_file)
+    scheduler  = Scheduler(
+        jobs       = jobs,
+        state_file = state_file,
+        max_cpus   = max_cpus,
+        max_memory = max_memory,
+        log_dir    = state_file.parent / f"{state_file.stem}-logs",
+        force      = force,
+        dry_run    = dry_run,
+    )
+    scheduler.run()
+
+
+if __name__ == "__main__":
+    main()
+
+# endregion
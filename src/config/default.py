@@ -28,11 +28,13 @@ See Also: :class:`lightning.pytorch.callbacks.lr_monitor.LearningRateMonitor`
 
 model_checkpoint = {
     "name"                   : "model_checkpoint",
+    "async_save"             : False,       # Write checkpoints in a background thread.
     "auto_insert_metric_name": True,        # The checkpoints filenames will contain the metric name.
     "dirpath"                : None,        # Directory to save the model file.
     "every_n_epochs"         : 1,           # Number of epochs between checkpoints.
     "every_n_train_steps"    : 0,           # Number of training steps between checkpoints (0 = disable).
     "filename"               : None,        # Checkpoint filename.
+    "max_pending_saves"      : 4,           # Maximum number of checkpoints waiting to be written (with `async_save`).
     "mode"                   : "min",       # 'min' or 'max'.
     "monitor"                : "loss/val",  # Quantity to monitor.
     "save_last"              : True,        # Save an exact copy of the checkpoint to a file `last.ckpt`.
@@ -141,6 +143,8 @@ See Also: :class:`lightning.pytorch.loggers.tensorboard.TensorBoardLogger`
 debug = {
     "every_best_epoch": True,   # Show only the best epochs.
     "every_n_epochs"  : 500,    # Number of epochs between debugging (0 = disable).
+    "every_n_steps"   : 1,      # Number of steps between debugging in a debug epoch.
+    "diff"            : False,  # Add a |pred - target| heatmap.
     "image_quality"   : 95,     # Image quality to be saved.
     "max_n"           : 8,      # Show max `n` images.
     "nrow"            : 8,      # The maximum number of items to display in a row
@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""PIE (training-free) run on LLIE datasets."""
+
+from __future__ import annotations
+
+from config import default
+from mon import DATA_DIR, RUN_DIR
+
+# region Basic
+
+root         = RUN_DIR / "train"
+project      = "pie"
+model_name   = "pie"
+model_config = None
+data_name    = "llie"
+num_classes  = None
+fullname     = f"{model_name}-{data_name}"
+image_size   = [512, 512]
+
+# endregion
+
+
+# region Model
+
+model = {
+	"config"     : model_config,   # The model's configuration that is used to build the model.
+	"hparams"    : None,           # Model's hyperparameters.
+	"channels"   : 3,              # The first layer's input channel.
+	"num_classes": None,           # A number of classes, which is also the last layer's output channels.
+	"classlabels": None,           # A :class:`mon.nn.data.label.ClassLabels` object that contains all labels in the dataset.
+	"weights"    : None,           # The model's weights.
+	"name"       : model_name,     # The model's name.
+	"variant"    : None,           # The model's variant.
+	"fullname"   : fullname,       # A full model name to save the checkpoint or weight.
+	"root"       : root,           # The root directory of the model.
+	"project"    : project,        # A project name.
+	"phase"      : "inference",    # The model's running phase.
+	"alpha"      : 1000,           # The weight of the illumination smoothness term.
+	"beta"       : 0.01,           # The weight of the reflectance sparsity term.
+	"lam"        : 10,             # The split-Bregman penalty.
+	"gamma"      : 0.1,            # The weight of the illumination prior.
+	"eta_r"      : 0.1,            # Relative change tolerance of the reflectance.
+	"eta_i"      : 0.1,            # Relative change tolerance of the illumination.
+	"max_iters"  : 2,              # The maximum number of iterations.
+	"metrics"    : {
+	    "train": None,
+		"val"  : [{"name": "psnr"}],
+		"test" : [{"name": "psnr"}],
+    },          # A list metrics for validating and testing model.
+	"optimizers" : None,           # PIE is not trainable.
+	"debug"      : default.debug,  # Debug configs.
+	"verbose"    : True,           # Verbosity.
+}
+
+# endregion
+
+
+# region Data
+
+datamodule = {
+    "name"        : data_name,
+    "root"        : DATA_DIR / "llie",  # A root directory where the data is stored.
+    "image_size"  : image_size,   # The desired image size in HW format.
+    "transform"   : None,         # Transformations performing on both the input and target.
+    "to_tensor"   : True,         # If True, convert input and target to :class:`torch.Tensor`.
+    "cache_data"  : False,        # If True, cache data to disk for faster loading next time.
+    "cache_images": False,        # If True, cache images into memory for faster training.
+    "batch_size"  : 8,            # The number of samples in one forward pass.
+    "devices"     : 0,            # A list of devices to use. Default: 0.
+    "shuffle"     : False,        # If True, reshuffle the datapoints at the beginning of every epoch.
+    "verbose"     : True,         # Verbosity.
+}
+
+# endregion
+
+
+# region Training
+
+trainer = default.trainer | {
+	"default_root_dir": root,  # Default path for logs and weights.
+	"logger"          : {
+		"tensorboard": default.tensorboard,
+	},
+}
+
+# endregion
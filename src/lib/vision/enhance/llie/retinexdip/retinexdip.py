@@ -6,6 +6,8 @@
 from __future__ import annotations
 
 import argparse
+import copy
+import functools
 import math
 import time
 from collections import namedtuple
@@ -29,6 +31,87 @@ torch.cuda.manual_seed(0)
 torch.cuda.manual_seed_all(0)
 
 
+@functools.lru_cache(maxsize=None)
+def get_gamma_table(gamma: float) -> np.ndarray:
+    """Return the 256-entry uint8 gamma lookup table, built once per gamma."""
+    table = np.power(np.arange(256) / 255.0, gamma) * 255.0
+    return np.round(table).astype(np.uint8)
+
+
+def weight_init(m):
+    classname = m.__class__.__name__
+    if classname.find("Conv") != -1:
+        n = m.kernel_size[0] * m.kernel_size[1] * m.out_channels
+        m.weight.data.normal_(0.0, 0.5 * math.sqrt(2. / n))
+        if m.bias is not None:
+            m.bias.data.zero_()
+    elif classname.find("BatchNorm") != -1:
+        m.weight.data.fill_(1)
+        m.bias.data.zero_()
+    elif classname.find("Linear") != -1:
+        n = m.weight.size(1)
+        m.weight.data.normal_(0, 0.01)
+        m.bias.data = torch.ones(m.bias.data.size())
+
+
+def build_reflection_net(input_depth: int = 8, pad: str = "zero") -> nn.Module:
+    net = skip(
+        input_depth,
+        num_output_channels = 3,
+        num_channels_down   = [8, 16, 32, 64, 128],
+        num_channels_up     = [8, 16, 32, 64, 128],
+        num_channels_skip   = [0, 0 , 0 , 0 , 0],
+        filter_size_down    = 3,
+        filter_size_up      = 3,
+        filter_skip_size    = 1,
+        upsample_mode       = "bilinear",
+        downsample_mode     = "avg",
+        need_sigmoid        = True,
+        need_bias           = True,
+        pad                 = pad
+    )
+    return net.apply(weight_init)
+
+
+def build_illumination_net(input_depth: int = 8, pad: str = "zero") -> nn.Module:
+    net = skip(
+        input_depth,
+        num_output_channels = 3,
+        num_channels_down   = [8, 16, 32, 64],
+        num_channels_up     = [8, 16, 32, 64],
+        num_channels_skip   = [0, 0 , 0 , 0],
+        filter_size_down    = 3,
+        filter_size_up      = 3,
+        filter_skip_size    = 1,
+        upsample_mode       = "bilinear",
+        downsample_mode     = "avg",
+        need_sigmoid        = True,
+        need_bias           = True,
+        pad                 = pad
+    )
+    return net.apply(weight_init)
+
+
+def enhance_with_illumination(image, illumination: np.ndarray, flag: bool = False) -> np.ndarray:
+    """Divide the original PIL :param:`image` by the estimated illumination
+    map of shape :math:`[3, H, W]` and return a BGR uint8 image.
+    """
+    (R, G, B)        = image.split()
+    ini_illumination = illumination.transpose(1, 2, 0)
+    ini_illumination = cv2.resize(ini_illumination, (image.size[0], image.size[1]))
+    ini_illumination = np.max(ini_illumination, axis=2)
+    # If the input image is extremely dark, setting the flag as True can produce promising result.
+    if flag:
+        ini_illumination = np.clip(ini_illumination, 0.0000002, 255)
+    else:
+        ini_illumination = cv2.LUT((255 * ini_illumination).astype(np.uint8), get_gamma_table(0.5))
+        ini_illumination = np.clip(ini_illumination.astype(np.float32) / 255, 0.0000002, 255)
+    R = R / ini_illumination
+    G = G / ini_illumination
+    B = B / ini_illumination
+    return np.clip(cv2.merge([B, G, R]) * 255, 0.02, 255).astype(np.uint8)
+
+
 class Enhancement(object):
     
     def __init__(
@@ -124,54 +207,11 @@ class Enhancement(object):
                           [p for p in self.illumination_net.parameters()]
 
     def weight_init(self, m):
-        classname = m.__class__.__name__
-        if classname.find("Conv") != -1:
-            n = m.kernel_size[0] * m.kernel_size[1] * m.out_channels
-            m.weight.data.normal_(0.0, 0.5 * math.sqrt(2. / n))
-            if m.bias is not None:
-                m.bias.data.zero_()
-        elif classname.find("BatchNorm") != -1:
-            m.weight.data.fill_(1)
-            m.bias.data.zero_()
-        elif classname.find("Linear") != -1:
-            n = m.weight.size(1)
-            m.weight.data.normal_(0, 0.01)
-            m.bias.data = torch.ones(m.bias.data.size())
+        weight_init(m)
 
     def _init_nets(self):
-        pad = "zero"
-        self.reflection_net = skip(
-            self.input_depth,
-            num_output_channels = 3,
-            num_channels_down   = [8, 16, 32, 64, 128],
-            num_channels_up     = [8, 16, 32, 64, 128],
-            num_channels_skip   = [0, 0 , 0 , 0 , 0],
-            filter_size_down    = 3,
-            filter_size_up      = 3,
-            filter_skip_size    = 1,
-            upsample_mode       = "bilinear",
-            downsample_mode     = "avg",
-            need_sigmoid        = True,
-            need_bias           = True,
-            pad                 = pad
-        )
-        self.reflection_net.apply(self.weight_init).type(self.data_type)
-        self.illumination_net = skip(
-            self.input_depth,
-            num_output_channels = 3,
-            num_channels_down   = [8, 16, 32, 64],
-            num_channels_up     = [8, 16, 32, 64],
-            num_channels_skip   = [0, 0 , 0 , 0],
-            filter_size_down    = 3,
-            filter_size_up      = 3,
-            filter_skip_size    = 1,
-            upsample_mode       = "bilinear",
-            downsample_mode     = "avg",
-            need_sigmoid        = True,
-            need_bias           = True,
-            pad                 = pad
-        )
-        self.illumination_net.apply(self.weight_init).type(self.data_type)
+        self.reflection_net   = build_reflection_net(self.input_depth).type(self.data_type)
+        self.illumination_net = build_illumination_net(self.input_depth).type(self.data_type)
 
     def _init_losses(self):
         self.l1_loss        = nn.SmoothL1Loss().type(self.data_type)  # for illumination
@@ -262,9 +302,7 @@ class Enhancement(object):
             self.get_enhanced(step, flag=True)
         
     def gamma_trans(self, image, gamma):
-        gamma_table = [np.power(x / 255.0, gamma) * 255.0 for x in range(256)]
-        gamma_table = np.round(np.array(gamma_table)).astype(np.uint8)
-        output      = cv2.LUT((255 * image).astype(np.uint8), gamma_table)
+        output      = cv2.LUT((255 * image).astype(np.uint8), get_gamma_table(gamma))
         output      = (output.astype(np.float32)) / 255
         return output
 
@@ -276,22 +314,11 @@ class Enhancement(object):
         return image_gamma_correct
 
     def get_enhanced(self, step, flag: bool = False):
-        (R, G, B)        = self.img.split()
-        ini_illumination = torch_to_np(self.illumination_out).transpose(1, 2, 0)
-        ini_illumination = cv2.resize(ini_illumination, (self.size[0], self.size[1]))
-        # print(ini_illumination.shape)
-        ini_illumination = np.max(ini_illumination, axis=2)
-        # cv2.imwrite("output/illumination/illumination-{}.png".format(step), ini_illumination)
-        # If the input image is extremely dark, setting the flag as True can produce promising result.
-        if flag:
-            # ini_illumination = np.clip(np.max(ini_illumination, axis=2), 0.0000002, 255)
-            ini_illumination = np.clip(ini_illumination, 0.0000002, 255)
-        else:
-            ini_illumination = np.clip(self.adjust_gammma(ini_illumination), 0.0000002, 255)
-        R = R / ini_illumination
-        G = G / ini_illumination
-        B = B / ini_illumination
-        self.best_result = np.clip(cv2.merge([B, G, R]) * 255, 0.02, 255).astype(np.uint8)
+        self.best_result = enhance_with_illumination(
+            image        = self.img,
+            illumination = torch_to_np(self.illumination_out),
+            flag         = flag,
+        )
         cv2.imwrite(str(self.image_name), self.best_result)
     
     def calculate_efficiency_score(
@@ -324,6 +351,167 @@ class Enhancement(object):
         console.log(f"Time   = {avg_time:.4f}")
     
 
+class BatchEnhancement(object):
+    """Optimize the RetinexDIP networks of several images at once.
+    
+    Every image still gets its own reflection and illumination networks, but
+    their parameters are stacked and run with :func:`torch.func.vmap`, so one
+    forward/backward pass (and one Adam step) updates all of them. Images are
+    resized to ``image_size`` like in :class:`Enhancement`, so any images can
+    share a batch.
+    
+    Args:
+        images: A list of RGB PIL images.
+        image_names: The output path of each image.
+        num_iter: The maximum number of iterations. Default: ``500``.
+        warm_start: A state returned by :meth:`state_dict` of a previous batch.
+            Networks (and their noise inputs) start from it instead of a random
+            initialization. Default: ``None``.
+        patience: Stop when the mean loss has not improved by more than
+            :param:`min_delta` (relative) for this many iterations. ``0``
+            disables early stopping. Default: ``0``.
+        min_delta: The relative improvement that resets the patience.
+            Default: ``1e-4``.
+        flag: Passed to :func:`enhance_with_illumination`. Default: ``True``.
+    """
+    
+    def __init__(
+        self,
+        images,
+        image_names,
+        num_iter     : int         = 500,
+        warm_start   : dict | None = None,
+        patience     : int         = 0,
+        min_delta    : float       = 1e-4,
+        flag         : bool        = True,
+        image_size   : int         = 512,
+        input_depth  : int         = 8,
+        learning_rate: float       = 0.01,
+        device       : str         = "cuda",
+    ):
+        self.images        = images
+        self.image_names   = image_names
+        self.num_iter      = num_iter
+        self.patience      = patience
+        self.min_delta     = min_delta
+        self.flag          = flag
+        self.input_depth   = input_depth
+        self.learning_rate = learning_rate
+        self.device        = torch.device(device if torch.cuda.is_available() else "cpu")
+        self.num_steps     = 0
+        
+        resized = [transforms.Resize((image_size, image_size))(image) for image in images]
+        targets, illuminations = [], []
+        for image in resized:
+            i_0 = np.array(np.maximum(np.maximum(*image.split()[0:2]), image.split()[2]))
+            illuminations.append(np.clip(np.asarray([i_0 for _ in range(3)]), 1, 255) / 255)
+            targets.append(pil_to_np(image))
+        # Per-image tensors keep a batch dimension of 1 inside vmap.
+        self.image_torch           = torch.from_numpy(np.stack(targets)).float().unsqueeze(1).to(self.device)
+        self.original_illumination = torch.from_numpy(np.stack(illuminations)).float().unsqueeze(1).to(self.device)
+        
+        size = (image_size, image_size)
+        if warm_start is not None:
+            reflection_input   = warm_start["reflection_input"]
+            illumination_input = warm_start["illumination_input"]
+        else:
+            reflection_input   = get_noise(self.input_depth, "noise", size)
+            illumination_input = get_noise(self.input_depth, "noise", size)
+        b = len(images)
+        self.reflection_net_inputs   = reflection_input.to(self.device).expand(b, -1, -1, -1).unsqueeze(1).detach()
+        self.illumination_net_inputs = illumination_input.to(self.device).expand(b, -1, -1, -1).unsqueeze(1).detach()
+        
+        # Every image starts from the same weights, so the per-image nets stay
+        # comparable and can be averaged into the next warm start.
+        reflection_net         = self._build(build_reflection_net,   warm_start, "reflection")
+        illumination_net       = self._build(build_illumination_net, warm_start, "illumination")
+        self.reflection_nets   = [copy.deepcopy(reflection_net)   for _ in range(b)]
+        self.illumination_nets = [copy.deepcopy(illumination_net) for _ in range(b)]
+        self.reflection_params,   self.reflection_buffers   = torch.func.stack_module_state(self.reflection_nets)
+        self.illumination_params, self.illumination_buffers = torch.func.stack_module_state(self.illumination_nets)
+        self.reflection_base   = copy.deepcopy(self.reflection_nets[0]).to("meta")
+        self.illumination_base = copy.deepcopy(self.illumination_nets[0]).to("meta")
+        
+        self.l1_loss  = nn.SmoothL1Loss()
+        self.mse_loss = nn.MSELoss()
+        self.tv_loss  = TVLoss()
+    
+    def _build(self, builder, warm_start: dict | None, key: str) -> nn.Module:
+        net = builder(self.input_depth)
+        # Each net only sees its own image: use batch statistics, no running
+        # stats. Done before loading, as the warm-start state (from a net
+        # patched the same way) has no running stats either.
+        torch.func.replace_all_batch_norm_modules_(net)
+        if warm_start is not None:
+            net.load_state_dict(warm_start[key])
+        return net.to(self.device)
+    
+    def _loss(self, rp, rb, ip, ib, r_input, i_input, image, original_illumination):
+        illumination = torch.func.functional_call(self.illumination_base, (ip, ib), (i_input,))
+        reflection   = torch.func.functional_call(self.reflection_base,   (rp, rb), (r_input,))
+        loss  = 0.5    * self.tv_loss(illumination, reflection)
+        loss += 0.0001 * self.tv_loss(reflection)
+        loss += self.l1_loss(illumination, original_illumination)
+        loss += self.mse_loss(illumination * reflection, image)
+        return loss, illumination
+    
+    def optimize(self):
+        reg_noise_std = 1 / 10000.0
+        parameters    = list(self.reflection_params.values()) + list(self.illumination_params.values())
+        optimizer     = torch.optim.Adam(parameters, lr=self.learning_rate)
+        loss_fn       = torch.func.vmap(self._loss)
+        best, wait    = math.inf, 0
+        start         = time.time()
+        with torch.enable_grad():
+            for j in range(self.num_iter):
+                optimizer.zero_grad()
+                r_input = self.reflection_net_inputs   + torch.randn_like(self.reflection_net_inputs)   * reg_noise_std
+                i_input = self.illumination_net_inputs + torch.randn_like(self.illumination_net_inputs) * reg_noise_std
+                losses, self.illumination_out = loss_fn(
+                    self.reflection_params,   self.reflection_buffers,
+                    self.illumination_params, self.illumination_buffers,
+                    r_input, i_input, self.image_torch, self.original_illumination,
+                )
+                # Sum, not mean, so each image gets the gradient of its own loss.
+                losses.sum().backward()
+                optimizer.step()
+                self.num_steps = j + 1
+                if self.patience > 0:
+                    loss = float(losses.detach().mean())
+                    if loss < best * (1 - self.min_delta):
+                        best, wait = loss, 0
+                    else:
+                        wait += 1
+                        if wait >= self.patience:
+                            break
+        run_time = time.time() - start
+        
+        results = []
+        for image, name, illumination in zip(self.images, self.image_names, self.illumination_out.detach()):
+            result = enhance_with_illumination(image, illumination[0].cpu().numpy(), flag=self.flag)
+            cv2.imwrite(str(name), result)
+            results.append(result)
+        return results, run_time
+    
+    def state_dict(self) -> dict:
+        """Return the warm-start state for the next batch: the weights averaged
+        over the images of this batch (which all started from the same
+        weights) and the shared noise inputs.
+        """
+        def mean_state(net: nn.Module, params: dict) -> dict:
+            state = copy.deepcopy(net.state_dict())
+            for k, v in params.items():
+                state[k] = v.detach().mean(dim=0).cpu()
+            return state
+        
+        return {
+            "reflection"        : mean_state(self.reflection_nets[0],   self.reflection_params),
+            "illumination"      : mean_state(self.illumination_nets[0], self.illumination_params),
+            "reflection_input"  : self.reflection_net_inputs[0].cpu(),
+            "illumination_input": self.illumination_net_inputs[0].cpu(),
+        }
+
+
 def lowlight_enhancer(image_name, image):
     s = Enhancement(
         image_name           = image_name,
@@ -341,12 +529,45 @@ if __name__ == "__main__":
     parser.add_argument("--weights",    type=str, default=mon.ZOO_DIR/"retinexdip/retinexdip-lol.pt")
     parser.add_argument("--image-size", type=int, default=512)
     parser.add_argument("--output-dir", type=str, default=mon.RUN_DIR/"predict/ruas")
+    parser.add_argument("--batch-size", type=int, default=1,  help="optimize this many images at once")
+    parser.add_argument("--warm-start", action="store_true",  help="start each batch from the previous one")
+    parser.add_argument("--num-iter",   type=int, default=500)
+    parser.add_argument("--patience",   type=int, default=0,  help="early stopping patience, 0 disables it")
     args = parser.parse_args()
     
     args.data       = mon.Path(args.data)
     args.output_dir = mon.Path(args.output_dir)
     args.output_dir.mkdir(parents=True, exist_ok=True)
     
+    # Batch mode
+    if args.batch_size > 1 or args.warm_start or args.patience > 0:
+        image_paths = sorted([path for path in args.data.rglob("*") if path.is_image_file()])
+        batches     = [image_paths[i:i + args.batch_size] for i in range(0, len(image_paths), args.batch_size)]
+        state       = None
+        sum_time    = 0
+        sum_steps   = 0
+        with mon.get_progress_bar() as pbar:
+            for batch in pbar.track(
+                sequence    = batches,
+                total       = len(batches),
+                description = f"[bright_yellow] Inferring"
+            ):
+                s = BatchEnhancement(
+                    images      = [Image.open(path).convert("RGB") for path in batch],
+                    image_names = [args.output_dir / mon.Path(path).name for path in batch],
+                    num_iter    = args.num_iter,
+                    warm_start  = state,
+                    patience    = args.patience,
+                    image_size  = args.image_size,
+                )
+                _, run_time = s.optimize()
+                state       = s.state_dict() if args.warm_start else None
+                sum_time   += run_time
+                sum_steps  += s.num_steps
+        console.log(f"Average time: {float(sum_time / len(image_paths))}")
+        console.log(f"Average iterations per batch: {float(sum_steps / len(batches))}")
+        raise SystemExit(0)
+    
     #
     with torch.no_grad():
         image_paths = list(args.data.rglob("*"))
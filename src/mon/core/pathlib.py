@@ -82,6 +82,12 @@ class Path(type(pathlib.Path())):
         """
         return self == self.stem
     
+    def is_onnx_file(self, exist: bool = True) -> bool:
+        """Return ``True`` if the current path is an ``.onnx`` file. Otherwise,
+        return ``False``.
+        """
+        return (self.is_file() if exist else True) and self.suffix.lower() in [".onnx"]
+
     def is_py_file(self, exist: bool = True) -> bool:
         """Return ``True`` if the current path is a ``.py`` file. Otherwise,
         return ``False``.
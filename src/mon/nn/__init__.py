@@ -40,6 +40,9 @@ import mon.nn.metric
 import mon.nn.model
 import mon.nn.optimizer
 import mon.nn.parsing
+import mon.nn.profiler
+import mon.nn.quantize
+import mon.nn.runtime
 import mon.nn.strategy
 import mon.nn.typing
 import mon.nn.utils
@@ -55,6 +58,9 @@ from mon.nn.metric import *
 from mon.nn.model import *
 from mon.nn.optimizer import *
 from mon.nn.parsing import *
+from mon.nn.profiler import *
+from mon.nn.quantize import *
+from mon.nn.runtime import *
 from mon.nn.strategy import *
 from mon.nn.typing import (
     _ratio_2_t, _ratio_3_t, _ratio_any_t, _scalar_or_tuple_1_t,
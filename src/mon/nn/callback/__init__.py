@@ -11,7 +11,9 @@ import mon.nn.callback.base
 import mon.nn.callback.model_checkpoint
 import mon.nn.callback.rich_model_summary
 import mon.nn.callback.rich_progress
+import mon.nn.callback.throughput
 from mon.nn.callback.base import *
 from mon.nn.callback.model_checkpoint import *
 from mon.nn.callback.rich_model_summary import *
 from mon.nn.callback.rich_progress import *
+from mon.nn.callback.throughput import *
@@ -12,6 +12,7 @@ __all__ = [
 ]
 
 import collections
+import concurrent.futures
 import os
 import time
 from datetime import datetime, timedelta
@@ -21,6 +22,7 @@ from weakref import proxy
 
 import lightning.pytorch as pl
 import torch
+from lightning.fabric.utilities.apply_func import apply_to_collection
 from lightning.pytorch import callbacks
 
 from mon.core import console, error_console, pathlib
@@ -33,6 +35,20 @@ from mon.globals import CALLBACKS
 class ModelCheckpoint(callbacks.ModelCheckpoint):
     """Save the model periodically by monitoring a quantity.
     
+    Args:
+        async_save: If ``True``, each checkpoint is snapshotted to CPU memory
+            in the training loop, and serialized and written to disk by a
+            background thread, so training steps do not wait on disk. Files
+            are written atomically (temp file + rename) and in order. Only
+            supported with a single device or DDP, and the default
+            checkpoint IO. Default: ``False``.
+        max_pending_saves: The maximum number of checkpoint files waiting to
+            be written when :param:`async_save` is ``True``. When it is reached,
+            the next save waits for the oldest one, which bounds the host
+            memory taken by the snapshots. An improved epoch writes up to four
+            files (best and last, ``.ckpt`` and ``.pt``), so keep it at least
+            ``4`` for these saves to never wait. Default: ``4``.
+    
     See Also: :class:`lightning.pytorch.callbacks.model_checkpoint.ModelCheckpoint`.
     """
     
@@ -58,6 +74,8 @@ class ModelCheckpoint(callbacks.ModelCheckpoint):
         every_n_epochs         : int | None       = None,
         save_on_train_epoch_end: bool             = False,
         enable_version_counter : bool             = True,
+        async_save             : bool             = False,
+        max_pending_saves      : int              = 4,
     ):
         self.start_epoch      = 0
         self.start_time       = 0
@@ -66,6 +84,11 @@ class ModelCheckpoint(callbacks.ModelCheckpoint):
         self.keys     = {}
         self.ckpt_dir = dirpath/"weights" if (dirpath is not None) else None
         self.logger   = None
+        #
+        self.async_save        = async_save
+        self.max_pending_saves = max(1, max_pending_saves)
+        self._executor         = None
+        self._pending          = collections.deque()
 
         super().__init__(
             dirpath                 = dirpath,
@@ -110,6 +133,29 @@ class ModelCheckpoint(callbacks.ModelCheckpoint):
             self.ckpt_dir = self.dirpath / "weights"
         if trainer.is_global_zero and stage == "fit":
             self.__warn_if_dir_not_empty(self.dirpath)
+        if self.async_save:
+            self.__check_async_save(trainer)
+    
+    @staticmethod
+    def __check_async_save(trainer: "pl.Trainer"):
+        """Asynchronous saving dumps the checkpoint itself and writes it with
+        :func:`torch.save`, bypassing :meth:`Strategy.save_checkpoint` and the
+        strategy's checkpoint IO. This is only valid when the global zero holds
+        the full state and the default IO is used.
+        """
+        from lightning.pytorch.plugins.io import TorchCheckpointIO
+        from lightning.pytorch.strategies import DDPStrategy, SingleDeviceStrategy
+        strategy = trainer.strategy
+        if type(strategy) not in [SingleDeviceStrategy, DDPStrategy]:
+            raise ValueError(
+                f"async_save is only supported with a single device or DDP, "
+                f"but got {type(strategy).__name__}."
+            )
+        if type(strategy.checkpoint_io) is not TorchCheckpointIO:
+            raise ValueError(
+                f"async_save is only supported with the default checkpoint "
+                f"IO, but got {type(strategy.checkpoint_io).__name__}."
+            )
     
     def on_train_start(
         self,
@@ -158,6 +204,7 @@ class ModelCheckpoint(callbacks.ModelCheckpoint):
         trainer  : "pl.Trainer",
         pl_module: "pl.LightningModule"
     ):
+        self.flush()
         end_time = timer()
         console.log(
             f"\n{trainer.current_epoch - self.start_epoch} epochs completed "
@@ -219,7 +266,7 @@ class ModelCheckpoint(callbacks.ModelCheckpoint):
         trainer : "pl.Trainer",
         filepath: pathlib.Path | str
     ):
-        trainer.save_checkpoint(pathlib.Path(filepath), self.save_weights_only)
+        self._write_checkpoint(trainer, filepath, self.save_weights_only)
         self.last_epoch_saved        = trainer.current_epoch
         self._last_global_step_saved = trainer.global_step
         # Notify loggers
@@ -227,6 +274,113 @@ class ModelCheckpoint(callbacks.ModelCheckpoint):
             for logger in trainer.loggers:
                 logger.after_save_checkpoint(proxy(self))
 
+    def _write_checkpoint(
+        self,
+        trainer     : "pl.Trainer",
+        filepath    : pathlib.Path | str,
+        weights_only: bool = False,
+    ):
+        """Save a checkpoint, either synchronously with
+        :meth:`lightning.pytorch.Trainer.save_checkpoint`, or, when
+        :attr:`async_save` is ``True``, by snapshotting it to CPU memory and
+        queueing the write to the background thread.
+        """
+        filepath = pathlib.Path(filepath)
+        if not self.async_save:
+            trainer.save_checkpoint(filepath, weights_only)
+            return
+        # Every rank takes part in dumping the checkpoint (some strategies
+        # gather states), but only the global zero writes it.
+        checkpoint = trainer._checkpoint_connector.dump_checkpoint(weights_only)
+        if trainer.is_global_zero:
+            checkpoint = apply_to_collection(
+                checkpoint, torch.Tensor, lambda t: t.detach().to("cpu", copy=True)
+            )
+            self._submit(self._atomic_save, checkpoint, filepath)
+        trainer.strategy.barrier("ModelCheckpoint._write_checkpoint")
+    
+    def _remove_checkpoint(self, trainer: "pl.Trainer", filepath: str):
+        if not self.async_save:
+            super()._remove_checkpoint(trainer, filepath)
+            return
+        # Queued behind the pending writes so that a file is never removed
+        # before (or while) it is written.
+        if trainer.is_global_zero:
+            self._submit(trainer.strategy.remove_checkpoint, filepath, bounded=False)
+    
+    def _submit(self, fn: Any, *args, bounded: bool = True):
+        """Queue :param:`fn` to the background thread. If :param:`bounded` is
+        ``True`` (a write holding a snapshot), first wait until fewer than
+        :attr:`max_pending_saves` writes are pending.
+        """
+        if self._executor is None:
+            # One worker keeps the writes (and removes) in submission order.
+            self._executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers        = 1,
+                thread_name_prefix = "checkpoint"
+            )
+        while bounded and sum(b for _, b in self._pending) >= self.max_pending_saves:
+            self._pending.popleft()[0].result()
+        self._pending.append((self._executor.submit(fn, *args), bounded))
+    
+    @staticmethod
+    def _atomic_save(checkpoint: dict, filepath: pathlib.Path):
+        """Write :param:`checkpoint` to a temporary file next to
+        :param:`filepath`, then rename it, so a reader never sees a partially
+        written checkpoint.
+        """
+        filepath.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = filepath.parent / f".{filepath.name}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                torch.save(checkpoint, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, filepath)
+        except BaseException:
+            if tmp_path.exists():
+                tmp_path.unlink()
+            raise
+    
+    def flush(self):
+        """Wait until all pending checkpoints are written, and re-raise the
+        first error that happened in the background thread.
+        """
+        error = None
+        while len(self._pending) > 0:
+            try:
+                self._pending.popleft()[0].result()
+            except Exception as e:
+                error_console.log(f"Failed to write a checkpoint: {e}")
+                error = error or e
+        if error is not None:
+            raise error
+    
+    def teardown(
+        self,
+        trainer  : "pl.Trainer",
+        pl_module: "pl.LightningModule",
+        stage    : str
+    ):
+        try:
+            self.flush()
+        finally:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+    
+    def on_exception(
+        self,
+        trainer  : "pl.Trainer",
+        pl_module: "pl.LightningModule",
+        exception: BaseException
+    ):
+        # Do not mask the original exception with a write error.
+        try:
+            self.flush()
+        except Exception:
+            pass
+    
     def __init_triggers(
         self,
         every_n_train_steps: int | None,
@@ -375,10 +529,12 @@ class ModelCheckpoint(callbacks.ModelCheckpoint):
         
         if is_new_best:
             # Our extension
-            trainer.save_checkpoint(
+            self._write_checkpoint(
+                trainer      = trainer,
                 filepath     = pathlib.Path(filepath).parent / f"{self.CHECKPOINT_NAME_BEST}.ckpt",
             )
-            trainer.save_checkpoint(
+            self._write_checkpoint(
+                trainer      = trainer,
                 filepath     = pathlib.Path(filepath).parent / f"{self.CHECKPOINT_NAME_BEST}.pt",
                 weights_only = True
             )
@@ -389,10 +545,12 @@ class ModelCheckpoint(callbacks.ModelCheckpoint):
             if self.verbose and trainer.is_global_zero:
                 self._log(data=self.keys)
         # Our extension
-        trainer.save_checkpoint(
+        self._write_checkpoint(
+            trainer      = trainer,
             filepath     = pathlib.Path(filepath).parent / f"{self.CHECKPOINT_NAME_LAST}.ckpt",
         )
-        trainer.save_checkpoint(
+        self._write_checkpoint(
+            trainer      = trainer,
             filepath     = pathlib.Path(filepath).parent / f"{self.CHECKPOINT_NAME_LAST}.pt",
             weights_only = True
         )
@@ -0,0 +1,204 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""This module implements a callback that breaks the time of each training
+step down into data loading, host-to-device copy, forward, backward, and
+optimizer time.
+"""
+
+from __future__ import annotations
+
+__all__ = [
+    "TrainingThroughputMonitor",
+]
+
+import collections
+import time
+from typing import Any
+
+import lightning.pytorch as pl
+import torch
+from lightning.pytorch import callbacks
+from lightning.pytorch.utilities import rank_zero_only
+
+from mon.core import console
+from mon.globals import CALLBACKS
+
+
+# region Throughput Monitor
+
+@CALLBACKS.register(name="training_throughput_monitor")
+class TrainingThroughputMonitor(callbacks.Callback):
+    """Measure where the time of each training step goes, and tell whether
+    training is input-bound or compute-bound.
+
+    Each step is split at the following points:
+        - data: from the end of the previous step until the batch is fetched
+          (:meth:`on_before_batch_transfer` of the model), i.e., time blocked
+          on the :class:`~torch.utils.data.DataLoader`.
+        - h2d: until the batch is on the device (:meth:`on_after_batch_transfer`).
+        - forward: until :meth:`on_before_backward`.
+        - backward: until :meth:`on_after_backward`.
+        - optimizer: until :meth:`on_train_batch_end` (step and zero grad).
+
+    Batch transfer is a model hook, not a callback hook. In
+    :meth:`on_train_start`, the model's :meth:`on_before_batch_transfer` and
+    :meth:`on_after_batch_transfer` are replaced by instance attributes that
+    record the time (in training only) and call the original methods. They are
+    removed in :meth:`on_train_end`, which restores the class methods.
+
+    Rolling means over the last :param:`window` steps, and samples/s, are
+    written to the trainer's loggers (e.g., :class:`mon.nn.logger.TensorBoardLogger`)
+    under ``throughput/``.
+
+    Args:
+        window: The number of steps of the rolling summaries. Default: ``50``.
+        log_every_n_steps: Log the summaries every n steps. Default: ``50``.
+        synchronize: If ``True``, synchronize CUDA at every split point so the
+            time is charged to the right phase. This adds a small overhead.
+            Default: ``True``.
+        data_wait_threshold: Warn when the data wait is larger than this
+            fraction of the step time. Default: ``0.3``.
+    """
+
+    phases = ["data", "h2d", "forward", "backward", "optimizer"]
+
+    def __init__(
+        self,
+        window             : int   = 50,
+        log_every_n_steps  : int   = 50,
+        synchronize        : bool  = True,
+        data_wait_threshold: float = 0.3,
+    ):
+        super().__init__()
+        self.window              = window
+        self.log_every_n_steps   = log_every_n_steps
+        self.synchronize         = synchronize
+        self.data_wait_threshold = data_wait_threshold
+        self.history             = collections.deque(maxlen=window)
+        self.marks               = {}
+        self.warned              = False
+        self._hooks              = {}
+
+    def _now(self, pl_module: pl.LightningModule) -> float:
+        if self.synchronize and pl_module.device.type == "cuda":
+            torch.cuda.synchronize(pl_module.device)
+        return time.perf_counter()
+
+    # Batch transfer is a model hook, not a callback hook: wrap the model's
+    # methods for the duration of the fit.
+
+    def on_train_start(self, trainer: pl.Trainer, pl_module: pl.LightningModule):
+        before = pl_module.on_before_batch_transfer
+        after  = pl_module.on_after_batch_transfer
+
+        def on_before_batch_transfer(batch: Any, dataloader_idx: int) -> Any:
+            if pl_module.training:
+                self.marks["fetched"] = self._now(pl_module)
+            return before(batch, dataloader_idx)
+
+        def on_after_batch_transfer(batch: Any, dataloader_idx: int) -> Any:
+            batch = after(batch, dataloader_idx)
+            if pl_module.training:
+                self.marks["transferred"] = self._now(pl_module)
+            return batch
+
+        self._hooks = {"on_before_batch_transfer": before, "on_after_batch_transfer": after}
+        pl_module.on_before_batch_transfer = on_before_batch_transfer
+        pl_module.on_after_batch_transfer  = on_after_batch_transfer
+
+    def on_train_end(self, trainer: pl.Trainer, pl_module: pl.LightningModule):
+        # Drop the instance attributes to restore the class methods.
+        for name in self._hooks:
+            pl_module.__dict__.pop(name, None)
+        self._hooks = {}
+
+    def on_train_epoch_start(self, trainer: pl.Trainer, pl_module: pl.LightningModule):
+        self.marks = {"end": self._now(pl_module)}
+
+    def on_train_batch_start(
+        self,
+        trainer  : pl.Trainer,
+        pl_module: pl.LightningModule,
+        batch    : Any,
+        batch_idx: int,
+    ):
+        now = self._now(pl_module)
+        self.marks.setdefault("fetched", now)
+        self.marks.setdefault("transferred", now)
+        self.marks["start"] = now
+        input = batch[0] if isinstance(batch, list | tuple) else batch
+        self.marks["samples"] = input.shape[0] if isinstance(input, torch.Tensor) and input.ndim > 0 else 1
+
+    def on_before_backward(self, trainer: pl.Trainer, pl_module: pl.LightningModule, loss: torch.Tensor):
+        self.marks["forward"] = self._now(pl_module)
+
+    def on_after_backward(self, trainer: pl.Trainer, pl_module: pl.LightningModule):
+        self.marks["backward"] = self._now(pl_module)
+
+    def on_train_batch_end(
+        self,
+        trainer  : pl.Trainer,
+        pl_module: pl.LightningModule,
+        outputs  : Any,
+        batch    : Any,
+        batch_idx: int,
+    ):
+        now   = self._now(pl_module)
+        marks = self.marks
+        if "end" in marks and "start" in marks:
+            # Without automatic optimization (or on skipped steps) the backward
+            # hooks may not fire; charge the remaining time to forward.
+            forward  = marks.get("forward",  now)
+            backward = marks.get("backward", forward)
+            self.history.append({
+                "data"     : marks["fetched"]     - marks["end"],
+                "h2d"      : marks["transferred"] - marks["fetched"],
+                "forward"  : forward  - marks["start"],
+                "backward" : backward - forward,
+                "optimizer": now      - backward,
+                "total"    : now      - marks["end"],
+                "samples"  : marks["samples"],
+            })
+        self.marks = {"end": now}
+
+        if len(self.history) > 0 and (trainer.global_step % self.log_every_n_steps == 0):
+            self.log_summary(trainer)
+
+    def summary(self) -> dict[str, float]:
+        """Return the rolling mean of each phase (in ms), its share of the
+        step time, and the throughput in samples/s.
+        """
+        n       = len(self.history)
+        total   = sum(h["total"] for h in self.history)
+        samples = sum(h["samples"] for h in self.history)
+        result  = {}
+        for p in self.phases:
+            t = sum(h[p] for h in self.history)
+            result[f"{p}_ms"]    = t / n * 1000.0
+            result[f"{p}_ratio"] = t / total if total > 0 else 0.0
+        result["step_ms"]        = total / n * 1000.0
+        result["samples_per_sec"] = samples / total if total > 0 else 0.0
+        return result
+
+    @rank_zero_only
+    def log_summary(self, trainer: pl.Trainer):
+        summary = self.summary()
+        metrics = {f"throughput/{k}": v for k, v in summary.items()}
+        for logger in trainer.loggers:
+            logger.log_metrics(metrics, step=trainer.global_step)
+
+        if summary["data_ratio"] > self.data_wait_threshold:
+            if not self.warned:
+                console.log(
+                    f"[yellow]Training is input-bound: "
+                    f"{summary['data_ratio'] * 100:.1f}% of each step "
+                    f"({summary['data_ms']:.1f} ms) is spent waiting for data. "
+                    f"Consider more `num_workers`, `pin_memory=True`, or "
+                    f"lighter transforms."
+                )
+                self.warned = True
+        else:
+            self.warned = False
+
+# endregion
@@ -200,6 +200,10 @@ class DataModule(lightning.LightningDataModule, ABC):
             - Prepare train/val/test splits.
             - Apply transformations.
             - Define :attr:`collate_fn` for your custom dataset.
+        
+        Datasets must be constructed in the same order on every rank: image
+        datasets list their samples on the global rank 0 only and broadcast
+        them (see :func:`mon.nn.data.dataset.run_on_rank_zero`).
 
         Args:
             phase: The model phase. One of:
@@ -8,18 +8,56 @@ from __future__ import annotations
 __all__ = [
     "ChainDataset", "ConcatDataset", "Dataset", "IterableDataset",
     "LabeledDataset", "Subset", "TensorDataset", "UnlabeledDataset",
-    "random_split",
+    "random_split", "run_on_rank_zero",
 ]
 
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import Any, Callable
 
+from torch import distributed
 from torch.utils.data import dataset
 from torch.utils.data.dataset import *
 
 from mon.core import console, pathlib
 
 
+# region Helper
+
+def run_on_rank_zero(fn: Callable[[], Any]) -> Any:
+    """Call :param:`fn` on the global rank 0 only, and share its result with
+    all the other ranks through the process group.
+    
+    This is used to build a dataset's sample index once instead of walking the
+    same file tree concurrently in every process. All ranks must call it in the
+    same order (e.g., when constructing datasets in
+    :meth:`mon.nn.data.datamodule.DataModule.setup`). Without an initialized
+    process group, :param:`fn` is simply called.
+    
+    Args:
+        fn: A function without arguments returning a picklable object.
+    
+    Return:
+        The result of :param:`fn` on the global rank 0. An exception raised by
+        :param:`fn` is re-raised on every rank.
+    """
+    if not (distributed.is_available() and distributed.is_initialized()) \
+        or distributed.get_world_size() == 1:
+        return fn()
+    result = [None]
+    if distributed.get_rank() == 0:
+        try:
+            result = [(fn(), None)]
+        except Exception as e:
+            result = [(None, e)]
+    distributed.broadcast_object_list(result, src=0)
+    value, error = result[0]
+    if error is not None:
+        raise error
+    return value
+
+# endregion
+
+
 # region Dataset
 
 # noinspection PyMethodMayBeStatic
@@ -14,6 +14,7 @@ __all__ = [
     "sparsity", "strip_optimizer",
 ]
 
+import json
 import os
 from abc import ABC, abstractmethod
 from typing import Any
@@ -31,6 +32,7 @@ from mon.globals import (
     LOSSES, LR_SCHEDULERS, METRICS, ModelPhase, MODELS, OPTIMIZERS, ZOO_DIR,
 )
 from mon.nn import data as mdata, loss as mloss, metric as mmetric, parsing
+from mon.nn.profiler import LayerProfiler
 
 StepOutput  = lightning.pytorch.utilities.types.STEP_OUTPUT
 EpochOutput = Any  # lightning.pytorch.utilities.types.EPOCH_OUTPUT
@@ -446,6 +448,10 @@ class Model(lightning.LightningModule, ABC):
             ``None``.
         optimizers: Optimizer(s) for a training model. Default: ``None``.
         debug: Debug configs. Default: ``None``.
+        log_every_n_steps: Log the (rank-local) loss every n steps. Metrics are
+            only accumulated during the steps, and are synced and logged once at
+            the end of each epoch. Default: ``None`` means the trainer's
+            :attr:`log_every_n_steps`. ``0`` disables per-step logging.
         verbose: Verbosity. Default: ``True``.
     """
     
@@ -454,49 +460,51 @@ class Model(lightning.LightningModule, ABC):
     
     def __init__(
         self,
-        config     : Any                      = None,
-        hparams    : dict | None              = None,
-        channels   : int                      = 3,
-        num_classes: int  | None              = None,
-        classlabels: mdata.ClassLabels | None = None,
-        weights    : Any                      = None,
+        config           : Any                      = None,
+        hparams          : dict | None              = None,
+        channels         : int                      = 3,
+        num_classes      : int  | None              = None,
+        classlabels      : mdata.ClassLabels | None = None,
+        weights          : Any                      = None,
         # For saving/loading
-        name       : str  | None              = None,
-        variant    : int  | str | None        = None,
-        fullname   : str  | None              = None,
-        root       : pathlib.Path             = pathlib.Path(),
-        project    : str  | None              = None,
+        name             : str  | None              = None,
+        variant          : int  | str | None        = None,
+        fullname         : str  | None              = None,
+        root             : pathlib.Path             = pathlib.Path(),
+        project          : str  | None              = None,
         # For training                        
-        phase      : ModelPhase | str         = ModelPhase.TRAINING,
-        loss       : Any                      = None,
-        metrics    : Any                      = None,
-        optimizers : Any                      = None,
-        debug      : dict | None              = None,
-        verbose    : bool                     = True,
+        phase            : ModelPhase | str         = ModelPhase.TRAINING,
+        loss             : Any                      = None,
+        metrics          : Any                      = None,
+        optimizers       : Any                      = None,
+        debug            : dict | None              = None,
+        log_every_n_steps: int  | None              = None,
+        verbose          : bool                     = True,
         *args, **kwargs
     ):
         super().__init__(*args, **kwargs)
-        self.config        = config
+        self.config            = config
         #
-        self.hyperparams   = hparams
-        self.channels      = channels or self.channels
-        self.num_classes   = num_classes
-        self.weights       = weights
-        self.name          = name     or self.name
-        self.variant       = variant  or self.variant
-        self.fullname      = fullname
-        self.project       = project
-        self.root          = root
-        self.classlabels   = mdata.ClassLabels.from_value(classlabels) \
-                             if classlabels is not None else None
-        self.loss          = loss
-        self.train_metrics = metrics
-        self.val_metrics   = metrics
-        self.test_metrics  = metrics
-        self.optims        = optimizers
-        self.debug         = debug
-        self.verbose       = verbose
-        self.epoch_step    = 0
+        self.hyperparams       = hparams
+        self.channels          = channels or self.channels
+        self.num_classes       = num_classes
+        self.weights           = weights
+        self.name              = name     or self.name
+        self.variant           = variant  or self.variant
+        self.fullname          = fullname
+        self.project           = project
+        self.root              = root
+        self.classlabels       = mdata.ClassLabels.from_value(classlabels) \
+                                 if classlabels is not None else None
+        self.loss              = loss
+        self.train_metrics     = metrics
+        self.val_metrics       = metrics
+        self.test_metrics      = metrics
+        self.optims            = optimizers
+        self.debug             = debug
+        self.verbose           = verbose
+        self.epoch_step        = 0
+        self.log_every_n_steps = log_every_n_steps
         
         # Define model
         if self.config is None:
@@ -787,6 +795,8 @@ class Model(lightning.LightningModule, ABC):
                 self._debug.every_best_epoch = True
             if "every_n_epochs" not in self._debug:
                 self._debug.every_n_epochs = 1
+            if "every_n_steps" not in self._debug:
+                self._debug.every_n_steps = 1
             if "save_to_subdir" not in self._debug:
                 self._debug.save_to_subdir = True
             if "image_quality" not in self._debug:
@@ -797,6 +807,8 @@ class Model(lightning.LightningModule, ABC):
                 self._debug.nrow = 8
             if "wait_time" not in self._debug:
                 self._debug.wait_time = 0.01
+            if "diff" not in self._debug:
+                self._debug.diff = False
     
     # Initialize Model
     
@@ -1042,30 +1054,125 @@ class Model(lightning.LightningModule, ABC):
 
         Args:
             input: An input of shape :math:`[N, C, H, W]`.
-            profile: Measure processing time. Default: ``False``.
+            profile: Measure each layer's time, FLOPs, activation size, and
+                peak memory with a :class:`mon.nn.profiler.LayerProfiler`,
+                print the table, and keep it in :attr:`profiler`. Default:
+                ``False``.
             out_index: Return specific layer's output from :param:`out_index`.
                 Default: ``-1`` means the last layer.
                 
         Return:
             Predictions.
         """
-        x     = input
-        y, dt = [], []
-        for m in self.model:
-            # console.log(f"{m.i}")
-            if m.f != -1:  # Get features from the previous layer
-                if isinstance(m.f, int):
-                    x = y[m.f]  # From directly previous layer
-                else:
-                    x = [x if j == -1 else y[j] for j in m.f]  # From earlier layers
-            x = m(x)  # pass features through current layer
-            y.append(x if m.i in self.save else None)
+        plan = self.get_forward_plan(out_index=out_index)
+        if profile:
+            self.profiler = LayerProfiler()
+            output        = self.profiler.run(model=self.model, plan=plan, input=input)
+            self.profiler.print()
+            return output
+        return plan.run(model=self.model, input=input)
+    
+    def get_forward_plan(self, out_index: int = -1) -> parsing.ForwardPlan:
+        """Return the :class:`mon.nn.parsing.ForwardPlan` of :attr:`model`,
+        built once per :param:`out_index` and rebuilt only when the layers'
+        routing changes.
+        """
+        plans = self.__dict__.setdefault("_forward_plans", {})
+        plan  = plans.get(out_index)
+        if plan is None or plan.num_layers != len(self.model) \
+            or plan.signature != parsing.ForwardPlan.get_signature(self.model):
+            plan = parsing.ForwardPlan(model=self.model, save=self.save or [], out_index=out_index)
+            plans[out_index] = plan
+        return plan
+    
+    def to_graph_module(self, out_index: int = -1) -> torch.fx.GraphModule:
+        """Emit the forward plan of :attr:`model` as a
+        :class:`torch.fx.GraphModule`, e.g., to pass it to :func:`torch.compile`.
+        """
+        return self.get_forward_plan(out_index=out_index).to_graph_module(model=self.model)
+    
+    # Logging
+    
+    def log_step(
+        self,
+        phase    : str,
+        loss     : torch.Tensor | None,
+        pred     : Any,
+        target   : Any,
+        batch_idx: int = 0,
+    ):
+        """Accumulate the loss and metrics of one step.
         
-        if out_index > -1 and out_index in self.save:
-            output = y[out_index]
-        else:
-            output = x
-        return output
+        Syncing a value across processes on every step (``sync_dist=True``
+        with ``on_step=True``) costs one all-reduce per value per step. Here,
+        the epoch loss is accumulated by Lightning and reduced once at the end
+        of the epoch, metrics only :meth:`update` their local states (see
+        :meth:`log_epoch`), and the rank-local loss is logged every
+        :attr:`log_every_n_steps` batches of each phase without syncing.
+        
+        Args:
+            phase: One of ``'train'``, ``'val'``, or ``'test'``.
+            loss: The loss of the step.
+            pred: The predictions of the step.
+            target: The ground-truths of the step.
+            batch_idx: The index of the batch in the current epoch of
+                :param:`phase`. Default: ``0``.
+        """
+        batch_size = pred.shape[0] if isinstance(pred, torch.Tensor) else 1
+        if loss is not None:
+            self.log(
+                name       = f"{phase}/loss",
+                value      = loss,
+                prog_bar   = False,
+                logger     = True,
+                on_step    = False,
+                on_epoch   = True,
+                sync_dist  = True,
+                batch_size = batch_size,
+            )
+            n = self.log_every_n_steps
+            if n is None:
+                n = self.trainer.log_every_n_steps if self._trainer is not None else 1
+            if n > 0 and batch_idx % n == 0:
+                self.log(
+                    name           = f"{phase}/loss_step",
+                    value          = loss.detach(),
+                    prog_bar       = False,
+                    logger         = True,
+                    on_step        = True,
+                    on_epoch       = False,
+                    sync_dist      = False,
+                    rank_zero_only = True,
+                    batch_size     = batch_size,
+                )
+        metrics = getattr(self, f"{phase}_metrics")
+        if metrics and target is not None:
+            for metric in metrics:
+                metric.update(pred.detach(), target)
+    
+    def log_epoch(self, phase: str):
+        """Compute, log, and reset the metrics accumulated by :meth:`log_step`.
+        :meth:`torchmetrics.Metric.compute` syncs each metric's states across
+        processes once.
+        
+        Args:
+            phase: One of ``'train'``, ``'val'``, or ``'test'``.
+        """
+        metrics = getattr(self, f"{phase}_metrics")
+        if not metrics:
+            return
+        for metric in metrics:
+            if metric.update_called:
+                self.log(
+                    name      = f"{phase}/{metric.name}",
+                    value     = metric.compute(),
+                    prog_bar  = False,
+                    logger    = True,
+                    on_step   = False,
+                    on_epoch  = True,
+                    sync_dist = False,
+                )
+            metric.reset()
     
     # Training
     
@@ -1105,43 +1212,21 @@ class Model(lightning.LightningModule, ABC):
             target = target,
             *args, **kwargs
         )
-        # Loss
-        self.log(
-            name           = f"train/loss",
-            value          = loss,
-            prog_bar       = False,
-            logger         = True,
-            on_step        = True,
-            on_epoch       = True,
-            sync_dist      = True,
-            rank_zero_only = True,
-            batch_size     = 1,
+        # Loss and metrics
+        self.log_step(
+            phase     = "train",
+            loss      = loss,
+            pred      = pred,
+            target    = target,
+            batch_idx = batch_idx,
         )
-        # Metric
-        if self.train_metrics:
-            for i, metric in enumerate(self.train_metrics):
-                value = metric(pred, target)
-                self.log(
-                    name           = f"train/{metric.name}",
-                    value          = value,
-                    prog_bar       = False,
-                    logger         = True,
-                    on_step        = True,
-                    on_epoch       = True,
-                    sync_dist      = True,
-                    rank_zero_only = True,
-                    batch_size     = 1,
-                )
         # Debug
         self.epoch_step += 1
         return loss
 
     def on_train_epoch_end(self):
         """Called in the training loop at the very end of the epoch."""
-        if self.train_metrics:
-            for i, metric in enumerate(self.train_metrics):
-                # value = metric.compute()
-                metric.reset()
+        self.log_epoch(phase="train")
         """
         # Loss
         loss = torch.stack([x["loss"] for x in epoch_output]).mean()
@@ -1200,58 +1285,32 @@ class Model(lightning.LightningModule, ABC):
             target = target,
             *args, **kwargs
         )
-        # Loss
-        self.log(
-            name           = f"val/loss",
-            value          = loss,
-            prog_bar       = False,
-            logger         = True,
-            on_step        = True,
-            on_epoch       = True,
-            sync_dist      = True,
-            rank_zero_only = True,
-            batch_size     = 1,
+        # Loss and metrics
+        self.log_step(
+            phase     = "val",
+            loss      = loss,
+            pred      = pred,
+            target    = target,
+            batch_idx = batch_idx,
         )
-        # Metric
-        if self.val_metrics:
-            for i, metric in enumerate(self.val_metrics):
-                value = metric(pred, target)
-                self.log(
-                    name           = f"val/{metric.name}",
-                    value          = value,
-                    prog_bar       = False,
-                    logger         = True,
-                    on_step        = True,
-                    on_epoch       = True,
-                    sync_dist      = True,
-                    rank_zero_only = True,
-                    batch_size     = 1,
-                )
         # Debug
-        epoch = self.current_epoch + 1
-        if self.debug \
-            and epoch % self.debug["every_n_epochs"] == 0 \
-            and self.epoch_step < self.debug["max_n"]:
-            if self.trainer.is_global_zero:
-                self.show_results(
-                    input    = input,
-                    target   = target,
-                    pred     = pred,
-                    file_path= self.debug_image_file_path,
-                    **self.debug | {
-                        "max_n": input[0],
-                        "nrow" : input[0],
-                    }
-                )
+        if self.should_debug() and self.trainer.is_global_zero:
+            self.show_results(
+                input    = input,
+                target   = target,
+                pred     = pred,
+                file_path= self.debug_image_file_path,
+                **self.debug | {
+                    "max_n": input.shape[0],
+                    "nrow" : input.shape[0],
+                }
+            )
         self.epoch_step += 1
         return loss
 
     def on_validation_epoch_end(self):
         """Called in the validation loop at the very end of the epoch."""
-        if self.val_metrics:
-            for i, metric in enumerate(self.val_metrics):
-                # value = metric.compute()
-                metric.reset()
+        self.log_epoch(phase="val")
 
     def on_test_start(self) -> None:
         """Called at the very beginning of testing."""
@@ -1286,73 +1345,53 @@ class Model(lightning.LightningModule, ABC):
             target = target,
             *args, **kwargs
         )
-        # Loss
-        self.log(
-            name           = f"test/loss",
-            value          = loss,
-            prog_bar       = False,
-            logger         = True,
-            on_step        = True,
-            on_epoch       = True,
-            sync_dist      = True,
-            rank_zero_only = True,
-            batch_size     = 1,
+        # Loss and metrics
+        self.log_step(
+            phase     = "test",
+            loss      = loss,
+            pred      = pred,
+            target    = target,
+            batch_idx = batch_idx,
         )
-        # Metric
-        if self.test_metrics:
-            for i, metric in enumerate(self.test_metrics):
-                value = metric(pred, target)
-                self.log(
-                    name           = f"test/{metric.name}",
-                    value          = value,
-                    prog_bar       = False,
-                    logger         = True,
-                    on_step        = True,
-                    on_epoch       = True,
-                    sync_dist      = True,
-                    rank_zero_only = True,
-                    batch_size     = 1,
-                )
         # Debug
-        epoch = self.current_epoch + 1
-        if self.debug \
-            and epoch % self.debug["every_n_epochs"] == 0 \
-            and self.epoch_step < self.debug["max_n"]:
-            if self.trainer.is_global_zero:
-                self.show_results(
-                    input    = input,
-                    target   = target,
-                    pred     = pred,
-                    file_path= self.debug_image_file_path,
-                    **self.debug | {
-                        "max_n": input[0],
-                        "nrow" : input[0],
-                    }
-                )
+        if self.should_debug() and self.trainer.is_global_zero:
+            self.show_results(
+                input    = input,
+                target   = target,
+                pred     = pred,
+                file_path= self.debug_image_file_path,
+                **self.debug | {
+                    "max_n": input.shape[0],
+                    "nrow" : input.shape[0],
+                }
+            )
         self.epoch_step += 1
         return loss
     
     def on_test_epoch_end(self):
         """Called in the test loop at the very end of the epoch."""
-        if self.test_metrics:
-            for i, metric in enumerate(self.test_metrics):
-                # value = metric.compute()
-                metric.reset()
+        self.log_epoch(phase="test")
     
     def export_to_onnx(
         self,
         input_dims   : list[int]    | None = None,
         file_path    : pathlib.Path | None = None,
-        export_params: bool = True
+        export_params: bool = True,
+        dynamic_axes : bool = True,
+        opset_version: int  = 17,
     ):
         """Export the model to ``onnx`` format.
 
         Args:
-            input_dims: Input dimensions in :math:`[C, H, W]` format. Default:
-                ``None``.
+            input_dims: Input dimensions in :math:`[B, C, H, W]` format.
+                Default: ``None``.
             file_path: Path to save the model. If ``None`` or empty, then save
                 to :attr:`root`. Default: ``None``.
             export_params: Should export parameters? Default: ``True``.
+            dynamic_axes: If ``True``, mark the batch, height, and width axes of
+                the input as dynamic so the exported model accepts images of
+                any size. Default: ``True``.
+            opset_version: The ONNX opset version. Default: ``17``.
         """
         # Check file_path
         if file_path in [None, ""]:
@@ -1365,10 +1404,17 @@ class Model(lightning.LightningModule, ABC):
         else:
             raise ValueError(f"input_dims must be defined.")
         
+        kwargs = {}
+        if dynamic_axes:
+            kwargs["input_names"]  = ["input"]
+            kwargs["dynamic_axes"] = {"input": {0: "batch", 2: "height", 3: "width"}}
+
         self.to_onnx(
             file_path     = file_path,
             input_sample  = input_sample,
-            export_params = export_params
+            export_params = export_params,
+            opset_version = opset_version,
+            **kwargs
         )
     
     def export_to_torchscript(
@@ -1398,7 +1444,12 @@ class Model(lightning.LightningModule, ABC):
             raise ValueError(f"'input_dims' must be defined.")
         
         script = self.to_torchscript(method=method, example_inputs=input_sample)
-        torch.jit.save(script, file_path)
+        # Record the input shape, so that runtime backends know whether the
+        # exported graph is tied to it.
+        torch.jit.save(
+            script, file_path,
+            _extra_files = {"input_dims": json.dumps({"dims": list(input_dims), "method": method})},
+        )
     
     @abstractmethod
     def show_results(
@@ -1412,6 +1463,7 @@ class Model(lightning.LightningModule, ABC):
         nrow         : int | None          = 8,
         wait_time    : float               = 0.01,
         save         : bool                = False,
+        diff         : bool                = False,
         verbose      : bool                = False,
         *args, **kwargs
     ):
@@ -1431,11 +1483,27 @@ class Model(lightning.LightningModule, ABC):
             wait_time: Wait for some time (in seconds) to display the figure
                 then reset. Default: ``0.01``.
             save: Save debug image. Default: ``False``.
+            diff: If ``True``, add a heatmap of the absolute difference between
+                :param:`pred` and :param:`target`. Default: ``False``.
             verbose: If ``True`` shows the results on the screen. Default:
                 ``False``.
         """
         pass
     
+    def should_debug(self) -> bool:
+        """Return ``True`` if the current step should be shown/saved: every
+        ``every_n_epochs`` epochs, every ``every_n_steps`` steps, and for at
+        most ``max_n`` steps of the epoch.
+        """
+        if not self.debug:
+            return False
+        every_n_epochs = self.debug["every_n_epochs"]
+        every_n_steps  = max(1, self.debug["every_n_steps"])
+        if every_n_epochs <= 0 or (self.current_epoch + 1) % every_n_epochs != 0:
+            return False
+        return self.epoch_step % every_n_steps == 0 \
+            and self.epoch_step // every_n_steps < self.debug["max_n"]
+    
     def print_info(self):
         if self.verbose and self.model is not None:
             console.log(f"[red]{self.fullname}")
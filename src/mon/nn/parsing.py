@@ -6,9 +6,10 @@
 from __future__ import annotations
 
 __all__ = [
-    "parse_model"
+    "ForwardPlan", "parse_model"
 ]
 
+import torch
 from torch import nn
 
 from mon import core as mf
@@ -112,3 +113,118 @@ def parse_model(
     return nn.Sequential(*layers), sorted(save), info
 
 # endregion
+
+
+# region Forward Plan
+
+class ForwardPlan:
+    """A static execution plan for a model built by :func:`parse_model`.
+    
+    :meth:`mon.nn.model.Model.forward_once` resolves each layer's inputs from
+    ``m.f`` and keeps every saved output until the end of the pass. The plan
+    does that work once:
+        - :attr:`sources`: the absolute index of each layer's input(s), where
+          ``-1`` is the network input.
+        - :attr:`last_use`: the last layer that reads each kept output.
+        - :attr:`release`: the outputs that are dead after each layer, so they
+          are dropped as soon as possible, which lowers the peak memory of deep
+          configs with long skip connections.
+    
+    Args:
+        model: A :class:`torch.nn.Sequential` whose layers have the ``.i`` and
+            ``.f`` attributes.
+        save: The layer indexes whose outputs are saved during forward pass.
+        out_index: The layer whose output is returned. Default: ``-1`` means
+            the last layer.
+    """
+    
+    def __init__(
+        self,
+        model    : nn.Sequential,
+        save     : list[int],
+        out_index: int = -1,
+    ):
+        num_layers = len(model)
+        # The output of a specific layer is only returned if it is saved, as
+        # in forward_once().
+        out_index  = out_index if out_index > -1 and out_index in save else num_layers - 1
+        sources    = []
+        for k, m in enumerate(model):
+            f = getattr(m, "f", -1)
+            if isinstance(f, int):
+                sources.append(k - 1 if f == -1 else (f if f >= 0 else k + f))
+            else:
+                sources.append([k - 1 if j == -1 else (j if j >= 0 else k + j) for j in f])
+        
+        last_use = {}
+        for k, src in enumerate(sources):
+            for j in ([src] if isinstance(src, int) else src):
+                last_use[j] = k
+        last_use[out_index] = num_layers  # Never released
+        
+        release = [[] for _ in range(num_layers)]
+        for j, k in last_use.items():
+            if k < num_layers:
+                release[k].append(j)
+        # A layer's output that nobody reads is dropped right away.
+        for k in range(num_layers):
+            if k not in last_use:
+                release[k].append(k)
+        
+        self.num_layers = num_layers
+        self.out_index  = out_index
+        self.sources    = sources
+        self.last_use   = last_use
+        self.release    = release
+        self.signature  = self.get_signature(model)
+    
+    @staticmethod
+    def get_signature(model: nn.Sequential) -> tuple:
+        """Return the routing of :param:`model`; the plan must be rebuilt when
+        it changes.
+        """
+        return tuple(
+            getattr(m, "f", -1) if isinstance(getattr(m, "f", -1), int) else tuple(m.f)
+            for m in model
+        )
+    
+    @property
+    def peak_live(self) -> int:
+        """Return the maximum number of outputs kept alive at the same time."""
+        live = set([-1])
+        peak = 1
+        for k in range(self.num_layers):
+            live.add(k)
+            peak = max(peak, len(live))
+            live.difference_update(self.release[k])
+        return peak
+    
+    def run(self, model: nn.Sequential, input: torch.Tensor) -> torch.Tensor:
+        """Execute the plan. The result is the same as
+        :meth:`mon.nn.model.Model.forward_once`.
+        """
+        outputs = {-1: input}
+        for k, m in enumerate(model):
+            src = self.sources[k]
+            x   = outputs[src] if isinstance(src, int) else [outputs[j] for j in src]
+            outputs[k] = m(x)
+            for j in self.release[k]:
+                outputs.pop(j, None)
+        return outputs[self.out_index]
+    
+    def to_graph_module(self, model: nn.Sequential) -> torch.fx.GraphModule:
+        """Emit the plan as a :class:`torch.fx.GraphModule` that calls the
+        layers of :param:`model` directly, e.g., for :func:`torch.compile`.
+        Layers are not traced into, so any layer is supported.
+        """
+        graph   = torch.fx.Graph()
+        outputs = {-1: graph.placeholder("input")}
+        for k in range(self.num_layers):
+            src        = self.sources[k]
+            x          = outputs[src] if isinstance(src, int) else [outputs[j] for j in src]
+            outputs[k] = graph.call_module(str(k), args=(x, ))
+        graph.output(outputs[self.out_index])
+        graph.lint()
+        return torch.fx.GraphModule(model, graph)
+
+# endregion
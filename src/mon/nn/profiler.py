@@ -0,0 +1,209 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""This module implements a per-layer profiler for models built from a config
+by :meth:`mon.nn.parsing.parse_model`.
+
+It runs the model's :class:`mon.nn.parsing.ForwardPlan` one layer at a time and
+measures, for each layer: the wall time (after warm-up, synchronized with
+:func:`mon.nn.device.time_synchronized`), the FLOPs, the size of its output
+activations, and the increase of the peak allocated CUDA memory. It is used by
+:meth:`mon.nn.model.Model.forward_once` when ``profile=True``.
+"""
+
+from __future__ import annotations
+
+__all__ = [
+    "LayerProfiler",
+]
+
+import csv
+import math
+from typing import Any
+
+import torch
+from torch import nn
+
+from mon.core import console, pathlib, rich
+from mon.nn.device import time_synchronized
+from mon.nn.parsing import ForwardPlan
+
+try:
+    from torch.utils.flop_counter import FlopCounterMode
+except ImportError:  # torch < 2.1
+    FlopCounterMode = None
+
+
+# region Helper
+
+def _num_bytes(x: Any) -> int:
+    if isinstance(x, torch.Tensor):
+        return x.numel() * x.element_size()
+    if isinstance(x, list | tuple):
+        return sum(_num_bytes(v) for v in x)
+    if isinstance(x, dict):
+        return sum(_num_bytes(v) for v in x.values())
+    return 0
+
+
+def _count_flops(m: nn.Module, x: Any) -> float:
+    """Count the FLOPs of one call of :param:`m`. Return ``nan`` when they
+    cannot be counted.
+    """
+    if FlopCounterMode is None:
+        return math.nan
+    try:
+        counter = FlopCounterMode(display=False)
+        with counter:
+            m(x)
+        return float(counter.get_total_flops())
+    except Exception:
+        return math.nan
+
+# endregion
+
+
+# region Profiler
+
+class LayerProfiler:
+    """Profile each layer of a config-parsed model.
+
+    Args:
+        warmup: The number of untimed calls of each layer before timing.
+            Default: ``3``.
+        runs: The number of timed calls of each layer. Default: ``10``.
+        count_flops: If ``True``, count the FLOPs of each layer.
+            Default: ``True``.
+    """
+
+    def __init__(
+        self,
+        warmup     : int  = 3,
+        runs       : int  = 10,
+        count_flops: bool = True,
+    ):
+        self.warmup      = warmup
+        self.runs        = max(1, runs)
+        self.count_flops = count_flops
+        self.records     = []
+
+    def run(
+        self,
+        model: nn.Sequential,
+        plan : ForwardPlan,
+        input: torch.Tensor,
+    ) -> torch.Tensor:
+        """Execute :param:`plan` like :meth:`ForwardPlan.run` while profiling
+        each layer, and return the same output.
+
+        The warm-up, timed, and FLOP-counting calls run under
+        :func:`torch.no_grad` in eval mode, so stateful layers (e.g., the
+        running statistics of batch norms) are not updated by them. The output
+        passed to the next layer comes from one more call in the caller's grad
+        and train mode.
+        """
+        device   = input.device
+        use_cuda = device.type == "cuda"
+        outputs  = {-1: input}
+        records  = []
+        for k, m in enumerate(model):
+            src = plan.sources[k]
+            x   = outputs[src] if isinstance(src, int) else [outputs[j] for j in src]
+
+            modes = [(mod, mod.training) for mod in m.modules()]
+            m.eval()
+            try:
+                with torch.no_grad():
+                    for _ in range(self.warmup):
+                        m(x)
+                    start = time_synchronized(device) if use_cuda else time_synchronized()
+                    for _ in range(self.runs):
+                        m(x)
+                    end   = time_synchronized(device) if use_cuda else time_synchronized()
+                    flops = _count_flops(m, x) if self.count_flops else math.nan
+            finally:
+                for mod, training in modes:
+                    mod.training = training
+
+            if use_cuda:
+                torch.cuda.reset_peak_memory_stats(device)
+                mem_before = torch.cuda.memory_allocated(device)
+            y = m(x)
+            peak = (torch.cuda.max_memory_allocated(device) - mem_before) if use_cuda else 0
+
+            records.append({
+                "index"     : getattr(m, "i", k),
+                "from"      : getattr(m, "f", -1),
+                "module"    : getattr(m, "t", m.__class__.__name__),
+                "params"    : getattr(m, "np", sum(p.numel() for p in m.parameters())),
+                "time (ms)" : (end - start) / self.runs * 1000.0,
+                "GFLOPs"    : flops * 1e-9,
+                "act (MB)"  : _num_bytes(y) / 2 ** 20,
+                "peak (MB)" : peak / 2 ** 20,
+            })
+            outputs[k] = y
+            for j in plan.release[k]:
+                outputs.pop(j, None)
+
+        total = sum(r["time (ms)"] for r in records)
+        for r in records:
+            r["time (%)"] = r["time (ms)"] / total * 100.0 if total > 0 else 0.0
+        self.records = records
+        return outputs[plan.out_index]
+
+    def print(self, top: int | None = None):
+        """Print the records as a table, optionally only the :param:`top`
+        slowest layers.
+        """
+        if len(self.records) == 0:
+            console.log(f"[yellow]No layer has been profiled.")
+            return
+        records = self.records
+        if top is not None:
+            records = sorted(records, key=lambda r: r["time (ms)"], reverse=True)[:top]
+        rich.print_table([
+            {k: f"{v:.4f}" if isinstance(v, float) else v for k, v in r.items()}
+            for r in records
+        ])
+
+    def to_csv(self, path: pathlib.Path | str):
+        """Write the records to a ``.csv`` file."""
+        path = pathlib.Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", newline="") as f:
+            if len(self.records) == 0:
+                return
+            writer = csv.DictWriter(f, fieldnames=list(self.records[0].keys()))
+            writer.writeheader()
+            writer.writerows(self.records)
+
+    def to_tensorboard(self, writer: Any, tag: str = "profile", step: int = 0):
+        """Write the records to TensorBoard.
+
+        Args:
+            writer: A :class:`torch.utils.tensorboard.SummaryWriter`, or a log
+                directory to create one in.
+            tag: The prefix of the scalars. Default: ``'profile'``.
+            step: The global step. Default: ``0``.
+        """
+        if len(self.records) == 0:
+            return
+        close = False
+        if isinstance(writer, pathlib.Path | str):
+            from torch.utils.tensorboard import SummaryWriter
+            writer = SummaryWriter(log_dir=str(writer))
+            close  = True
+        for r in self.records:
+            name = f"{r['index']:03d}-{r['module'].split('.')[-1]}"
+            for key in ["time (ms)", "GFLOPs", "act (MB)", "peak (MB)"]:
+                value = r[key]
+                if not math.isnan(value):
+                    writer.add_scalar(f"{tag}/{key.split(' ')[0]}/{name}", value, step)
+        header = "| " + " | ".join(self.records[0].keys()) + " |\n" \
+               + "|" + "---|" * len(self.records[0]) + "\n"
+        rows   = "".join("| " + " | ".join(f"{v}" for v in r.values()) + " |\n" for r in self.records)
+        writer.add_text(tag, header + rows, step)
+        if close:
+            writer.close()
+
+# endregion
@@ -0,0 +1,378 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""This module implements post-training static quantization (PTQ) for models
+built from a config by :meth:`mon.nn.parsing.parse_model`.
+
+Such a model is an :class:`torch.nn.Sequential` walked by
+:meth:`mon.nn.model.Model.forward_once`, where each layer carries its routing
+attributes (``.i``, ``.f``, ``.t``, ``.np``). We keep that routing intact and
+only quantize *segments*: maximal runs of consecutive single-input layers whose
+intermediate outputs are not saved for later layers. Each segment that contains
+a convolution or linear layer is traced with :mod:`torch.fx`, calibrated, and
+converted to int8 (per-channel symmetric weights, histogram-calibrated
+activations). The first layer of a segment is replaced by the quantized
+segment and the remaining layers by pass-through :class:`torch.nn.Identity`
+layers, so feature indexes do not change. Segments that fail to trace or that
+degrade the output too much are kept in fp32.
+"""
+
+from __future__ import annotations
+
+__all__ = [
+    "find_quantizable_segments", "get_calibration_data", "quantize_model_ptq",
+]
+
+import copy
+import math
+import time
+from typing import Any
+
+import torch
+from torch import nn
+from torch.ao import quantization as tq
+from torch.ao.quantization import quantize_fx
+from torchmetrics.functional import (
+    peak_signal_noise_ratio, structural_similarity_index_measure,
+)
+
+from mon.core import console, rich
+from mon.globals import DATASETS
+
+
+# region Calibration Data
+
+def get_calibration_data(
+    dataset    : str | dict,
+    split      : str = "train",
+    num_samples: int = 32,
+    **kwargs
+) -> list[tuple[torch.Tensor, torch.Tensor | None]]:
+    """Load calibration samples from any dataset registered in
+    :attr:`mon.globals.DATASETS`.
+
+    Args:
+        dataset: A registered dataset's name, or a :class:`dict` of the
+            dataset's arguments containing the ``'name'`` key.
+        split: The data split to sample from. Default: ``'train'``.
+        num_samples: The number of samples to load. They are spread evenly over
+            the split. Default: ``32``.
+        **kwargs: Additional arguments (such as ``root``, ``transform``) passed
+            to the dataset.
+
+    Return:
+        A :class:`list` of (input, target) pairs. Each input has a shape of
+        :math:`[1, C, H, W]`; target is ``None`` for unlabeled datasets.
+    """
+    config = {"name": dataset} if isinstance(dataset, str) else copy.deepcopy(dataset)
+    config = config | kwargs | {"split": split, "to_tensor": True, "verbose": False}
+    data   = DATASETS.build(config=config)
+    if data is None:
+        raise ValueError(f"dataset must be a registered dataset, but got {dataset}.")
+
+    step    = max(1, len(data) // max(1, num_samples))
+    samples = []
+    for index in range(0, len(data), step)[:num_samples]:
+        input, target, _ = data[index]
+        target = target if isinstance(target, torch.Tensor) else None
+        samples.append((input, target))
+    return samples
+
+# endregion
+
+
+# region Segment
+
+def find_quantizable_segments(
+    model: nn.Sequential,
+    save : list[int],
+) -> list[list[int]]:
+    """Group the layers of a parsed model into segments that can be quantized
+    as a single traced graph.
+
+    A segment starts at a layer taking a single input (``m.f`` is an
+    :class:`int`) and is extended while the next layer reads from its direct
+    predecessor (``m.f == -1``) and the predecessor's output is not in
+    :param:`save`. Only segments containing a :class:`torch.nn.Conv2d` or
+    :class:`torch.nn.Linear` are returned.
+
+    Args:
+        model: A :class:`torch.nn.Sequential` returned by
+            :meth:`mon.nn.parsing.parse_model`.
+        save: The layer indexes whose outputs are saved during forward pass.
+
+    Return:
+        A :class:`list` of segments, each one a :class:`list` of layer indexes.
+    """
+    segments = []
+    current  = []
+    for k, m in enumerate(model):
+        f = getattr(m, "f", -1)
+        if current and f == -1 and (k - 1) not in save:
+            current.append(k)
+            continue
+        if current:
+            segments.append(current)
+        current = [k] if isinstance(f, int) else []
+    if current:
+        segments.append(current)
+
+    quantizable = (nn.Conv2d, nn.Linear)
+    return [
+        s for s in segments
+        if any(isinstance(x, quantizable) for k in s for x in model[k].modules())
+    ]
+
+
+def _tag(module: nn.Module, like: nn.Module, f: Any = None) -> nn.Module:
+    """Copy the routing attributes of :param:`like` to :param:`module`."""
+    module.i  = like.i
+    module.f  = like.f if f is None else f
+    module.t  = like.t
+    module.np = like.np
+    return module
+
+
+def _set_segment(model: nn.Sequential, segment: list[int], layers: list[nn.Module] | nn.Module):
+    """Place either the original :param:`layers` or a single fused module at
+    the positions given by :param:`segment`.
+    """
+    if isinstance(layers, list):
+        for k, layer in zip(segment, layers):
+            model[k] = layer
+    else:
+        model[segment[0]] = layers
+        for k in segment[1:]:
+            model[k] = _tag(nn.Identity(), like=model[k], f=-1)
+
+# endregion
+
+
+# region Quantization
+
+def _psnr(pred: torch.Tensor, target: torch.Tensor) -> float:
+    return float(peak_signal_noise_ratio(pred.clamp(0, 1), target.clamp(0, 1), data_range=1.0))
+
+
+def _ssim(pred: torch.Tensor, target: torch.Tensor) -> float:
+    return float(structural_similarity_index_measure(pred.clamp(0, 1), target.clamp(0, 1), data_range=1.0))
+
+
+def _forward(model: nn.Module, input: torch.Tensor) -> torch.Tensor:
+    output = model(input)
+    return output[-1] if isinstance(output, list | tuple) else output
+
+
+@torch.no_grad()
+def quantize_model_ptq(
+    model                : nn.Module,
+    calibration_data     : list[tuple[torch.Tensor, torch.Tensor | None]] | list[torch.Tensor],
+    backend              : str             = "fbgemm",
+    skip_layers          : list[int] | None = None,
+    sensitivity_threshold: float | None    = 40.0,
+    verbose              : bool            = True,
+) -> tuple[nn.Module, dict]:
+    """Post-training static int8 quantization of a config-parsed model.
+
+    Args:
+        model: A :class:`mon.nn.model.Model` whose :attr:`model` was built by
+            :meth:`mon.nn.parsing.parse_model` (for example: ZeroDCE, HINet,
+            FFANet). The model is not modified; a quantized copy is returned.
+        calibration_data: Calibration samples, either tensors of shape
+            :math:`[B, C, H, W]`, (input, target) pairs as returned by
+            :meth:`get_calibration_data`, or the (input, target, meta) batches
+            of a data loader. The observers are calibrated on all of them.
+        backend: The quantized engine. One of: ``'fbgemm'`` (x86) or
+            ``'qnnpack'`` (ARM). It is only set while quantizing; the caller's
+            :attr:`torch.backends.quantized.engine` is restored afterward.
+            Default: ``'fbgemm'``.
+        skip_layers: Layer indexes that must stay in fp32. Any segment
+            containing one of them is skipped. Default: ``None``.
+        sensitivity_threshold: If given, each quantized segment is evaluated
+            alone, and it falls back to fp32 when the PSNR between the model's
+            output with only that segment quantized and the fp32 output is
+            below this value (in dB). Default: ``40.0``.
+        verbose: If ``True``, print the per-segment decisions and the final
+            report. Default: ``True``.
+
+    Return:
+        The quantized model (on CPU, in eval mode).
+        A report :class:`dict` with the quantized/skipped segments, the
+        PSNR/SSIM of the fp32 and int8 models (against the targets when
+        available, and of int8 against fp32), and their mean CPU latency per
+        sample.
+    """
+    if getattr(model, "model", None) is None or not isinstance(model.model, nn.Sequential):
+        raise ValueError(
+            f"model must be built from a config by parse_model(), but got "
+            f"{model.__class__.__name__}."
+        )
+    samples = [_to_sample(s) for s in calibration_data]
+    if len(samples) == 0:
+        raise ValueError(f"calibration_data must not be empty.")
+
+    # The engine is a process-wide setting: restore the caller's afterward.
+    engine = torch.backends.quantized.engine
+    torch.backends.quantized.engine = backend
+    try:
+        return _quantize_model_ptq(
+            model                 = model,
+            samples               = samples,
+            backend               = backend,
+            skip_layers           = skip_layers,
+            sensitivity_threshold = sensitivity_threshold,
+            verbose               = verbose,
+        )
+    finally:
+        torch.backends.quantized.engine = engine
+
+
+def _to_sample(sample: Any) -> tuple[torch.Tensor, torch.Tensor | None]:
+    """Return the (input, target) pair of a calibration tensor, pair, or
+    (input, target, meta) batch from a data loader.
+    """
+    if isinstance(sample, torch.Tensor):
+        return sample, None
+    input  = sample[0]
+    target = sample[1] if len(sample) > 1 and isinstance(sample[1], torch.Tensor) else None
+    return input, target
+
+
+def _latency(model: nn.Module, samples: list[tuple[torch.Tensor, Any]]) -> float:
+    """Return the mean time (in ms) of one forward pass over :param:`samples`,
+    after one warmup pass.
+    """
+    _forward(model, samples[0][0].cpu())
+    start = time.perf_counter()
+    for x, _ in samples:
+        _forward(model, x.cpu())
+    return (time.perf_counter() - start) * 1000.0 / len(samples)
+
+
+def _quantize_model_ptq(
+    model                : nn.Module,
+    samples              : list[tuple[torch.Tensor, torch.Tensor | None]],
+    backend              : str,
+    skip_layers          : list[int] | None,
+    sensitivity_threshold: float | None,
+    verbose              : bool,
+) -> tuple[nn.Module, dict]:
+    fp32  = copy.deepcopy(model).cpu().eval()
+    qnet  = copy.deepcopy(model).cpu().eval()
+    skip  = set(skip_layers or [])
+    seq   = qnet.model
+    save  = list(qnet.save or [])
+
+    qconfig = tq.QConfig(
+        activation = tq.HistogramObserver.with_args(reduce_range=(backend == "fbgemm")),
+        weight     = tq.PerChannelMinMaxObserver.with_args(
+            dtype   = torch.qint8,
+            qscheme = torch.per_channel_symmetric,
+        ),
+    )
+    qconfig_mapping = tq.get_default_qconfig_mapping(backend).set_global(qconfig)
+
+    # fp32 reference outputs and the input of every segment on the first sample
+    segments = [s for s in find_quantizable_segments(seq, save) if not skip.intersection(s)]
+    inputs   = {}
+    hooks    = [
+        seq[s[0]].register_forward_pre_hook(
+            lambda m, args, k=s[0]: inputs.setdefault(k, args[0])
+        )
+        for s in segments
+    ]
+    refs = [_forward(fp32, x.cpu()) for x, _ in samples]
+    _forward(qnet, samples[0][0].cpu())
+    for h in hooks:
+        h.remove()
+
+    # Prepare (insert observers) segment by segment
+    originals = {}
+    observed  = {}
+    failed    = []
+    for s in segments:
+        layers = [seq[k] for k in s]
+        try:
+            prepared = quantize_fx.prepare_fx(
+                nn.Sequential(*layers),
+                qconfig_mapping = qconfig_mapping,
+                example_inputs  = (inputs[s[0]],),
+            )
+        except Exception as e:
+            failed.append({"layers": s, "reason": f"{type(e).__name__}: {e}"})
+            continue
+        originals[s[0]] = layers
+        observed[s[0]]  = _tag(prepared, like=layers[0])
+        _set_segment(seq, s, observed[s[0]])
+    segments = [s for s in segments if s[0] in observed]
+
+    # Calibrate the observers on every sample (or batch)
+    for x, _ in samples:
+        _forward(qnet, x.cpu())
+
+    # Convert, then put the fp32 layers back until each segment is accepted
+    converted = {}
+    for s in segments:
+        converted[s[0]] = _tag(quantize_fx.convert_fx(observed[s[0]]), like=originals[s[0]][0])
+        _set_segment(seq, s, originals[s[0]])
+
+    # Sensitivity analysis: quantize one segment at a time
+    accepted  = []
+    sensitive = []
+    for s in segments:
+        _set_segment(seq, s, converted[s[0]])
+        if sensitivity_threshold is not None:
+            psnr = sum(_psnr(_forward(qnet, x.cpu()), r) for (x, _), r in zip(samples, refs)) / len(samples)
+            _set_segment(seq, s, originals[s[0]])
+            if psnr < sensitivity_threshold:
+                sensitive.append({"layers": s, "psnr": round(psnr, 4)})
+                continue
+        accepted.append(s)
+    for s in accepted:
+        _set_segment(seq, s, converted[s[0]])
+
+    # Report
+    psnr_q, ssim_q, psnr_fp, ssim_fp, psnr_gt_q, ssim_gt_q = [], [], [], [], [], []
+    for (x, y), r in zip(samples, refs):
+        q = _forward(qnet, x.cpu())
+        psnr_q.append(_psnr(q, r))
+        ssim_q.append(_ssim(q, r))
+        if y is not None and y.shape == r.shape:
+            y = y.cpu()
+            psnr_fp.append(_psnr(r, y))
+            ssim_fp.append(_ssim(r, y))
+            psnr_gt_q.append(_psnr(q, y))
+            ssim_gt_q.append(_ssim(q, y))
+
+    latency_fp32 = _latency(fp32, samples)
+    latency_int8 = _latency(qnet, samples)
+
+    mean   = lambda v: sum(v) / len(v) if len(v) > 0 else math.nan
+    report = {
+        "backend"             : backend,
+        "num_samples"         : len(samples),
+        "quantized_segments"  : accepted,
+        "sensitive_segments"  : sensitive,
+        "failed_segments"     : failed,
+        "skipped_layers"      : sorted(skip),
+        "psnr_int8_vs_fp32"   : mean(psnr_q),
+        "ssim_int8_vs_fp32"   : mean(ssim_q),
+        "psnr_fp32"           : mean(psnr_fp),
+        "psnr_int8"           : mean(psnr_gt_q),
+        "psnr_delta"          : mean(psnr_gt_q) - mean(psnr_fp),
+        "ssim_fp32"           : mean(ssim_fp),
+        "ssim_int8"           : mean(ssim_gt_q),
+        "ssim_delta"          : mean(ssim_gt_q) - mean(ssim_fp),
+        "latency_fp32_ms"     : latency_fp32,
+        "latency_int8_ms"     : latency_int8,
+        "speedup"             : latency_fp32 / latency_int8 if latency_int8 > 0 else math.nan,
+    }
+    if verbose:
+        for f in failed:
+            console.log(f"[yellow]Layers {f['layers']} kept in fp32, cannot trace: {f['reason']}")
+        for f in sensitive:
+            console.log(f"[yellow]Layers {f['layers']} kept in fp32, PSNR {f['psnr']:.2f} dB < {sensitivity_threshold} dB.")
+        rich.print_table({k: v for k, v in report.items() if "segments" not in k})
+    return qnet, report
+
+# endregion
@@ -0,0 +1,327 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""This module implements execution backends for running trained or exported
+models during inference.
+
+A backend hides how the forward pass is executed: eagerly with the original
+:class:`mon.nn.model.Model`, with a TorchScript file produced by
+:meth:`mon.nn.model.Model.export_to_torchscript`, or with an ``.onnx`` file
+produced by :meth:`mon.nn.model.Model.export_to_onnx` and executed by
+:mod:`onnxruntime`. All backends take and return :class:`torch.Tensor` so the
+same pre-/post-processing code can be shared between them.
+"""
+
+from __future__ import annotations
+
+__all__ = [
+    "EagerBackend", "InferenceBackend", "ONNXRuntimeBackend",
+    "TorchScriptBackend", "build_backend", "check_backend_parity",
+]
+
+import json
+from abc import ABC, abstractmethod
+from typing import Any
+
+import numpy as np
+import torch
+from torch import nn
+
+from mon.core import console, pathlib
+
+
+# region Backend
+
+class InferenceBackend(ABC):
+    """The base class for all inference backends.
+
+    Args:
+        device: The device to run the forward pass on. Default: ``'cpu'``.
+    """
+
+    def __init__(self, device: Any = "cpu"):
+        self.device = torch.device(device)
+
+    def __call__(self, input: torch.Tensor) -> torch.Tensor | tuple[torch.Tensor, ...]:
+        return self.forward(input=input)
+
+    @property
+    @abstractmethod
+    def name(self) -> str:
+        """Return the name of the backend."""
+        pass
+
+    @property
+    def input_shape(self) -> list[int | None] | None:
+        """Return the input shape the backend expects in :math:`[B, C, H, W]`
+        format, with ``None`` for dynamic axes, or ``None`` if unknown.
+        """
+        return None
+
+    @abstractmethod
+    def forward(self, input: torch.Tensor) -> torch.Tensor | tuple[torch.Tensor, ...]:
+        """Forward pass.
+
+        Args:
+            input: An input of shape :math:`[B, C, H, W]`.
+
+        Return:
+            Predictions. A single :class:`torch.Tensor` if the model has one
+            output, otherwise a :class:`tuple` of tensors in the same order as
+            the eager model returns them.
+        """
+        pass
+
+    def warmup(self, input_dims: list[int], runs: int = 3):
+        """Run a few forward passes on random data so that lazy initialization
+        (memory arenas, kernel selection, graph optimization) happens before the
+        timed inference loop.
+
+        Args:
+            input_dims: Input dimensions in :math:`[B, C, H, W]` format. The
+                static axes of :attr:`input_shape` (e.g., of a model exported
+                without dynamic axes) take precedence.
+            runs: The number of warm-up passes. Default: ``3``.
+        """
+        shape = self.input_shape
+        if shape is not None and len(shape) == len(input_dims):
+            input_dims = [s if s is not None else d for s, d in zip(shape, input_dims)]
+        input = torch.rand(input_dims, device=self.device)
+        for _ in range(runs):
+            self.forward(input=input)
+
+
+class EagerBackend(InferenceBackend):
+    """Run the original PyTorch model.
+
+    Args:
+        model: A :class:`mon.nn.model.Model` or :class:`torch.nn.Module`.
+        device: The device to run the forward pass on. Default: ``'cpu'``.
+    """
+
+    def __init__(self, model: nn.Module, device: Any = "cpu"):
+        super().__init__(device=device)
+        self.model = model.to(self.device)
+        self.model.eval()
+
+    @property
+    def name(self) -> str:
+        return "torch"
+
+    @torch.inference_mode()
+    def forward(self, input: torch.Tensor) -> torch.Tensor | tuple[torch.Tensor, ...]:
+        input = input.to(self.device)
+        if hasattr(self.model, "forward_once"):
+            return self.model(input=input, augment=False, profile=False, out_index=-1)
+        return self.model(input)
+
+
+class TorchScriptBackend(InferenceBackend):
+    """Run a TorchScript file exported by
+    :meth:`mon.nn.model.Model.export_to_torchscript`.
+
+    Args:
+        path: A path to the ``.pt`` TorchScript file.
+        device: The device to run the forward pass on. Default: ``'cpu'``.
+    """
+
+    def __init__(self, path: pathlib.Path | str, device: Any = "cpu"):
+        super().__init__(device=device)
+        self.path = pathlib.Path(path)
+        if not self.path.is_weights_file():
+            raise ValueError(
+                f"path must be a valid path to a .pt file, but got {self.path}."
+            )
+        extra_files = {"input_dims": ""}
+        self.model  = torch.jit.load(str(self.path), map_location=self.device, _extra_files=extra_files)
+        self.model.eval()
+        self.export_info = json.loads(extra_files["input_dims"]) if extra_files["input_dims"] else None
+
+    @property
+    def name(self) -> str:
+        return "torchscript"
+
+    @property
+    def input_shape(self) -> list[int | None] | None:
+        """Return the input shape recorded by
+        :meth:`mon.nn.model.Model.export_to_torchscript`. A traced graph may be
+        tied to all of it; a scripted one only to the number of channels.
+        """
+        if self.export_info is None:
+            return None
+        dims = self.export_info["dims"]
+        if self.export_info.get("method") == "trace":
+            return list(dims)
+        return [None, dims[1], None, None] if len(dims) == 4 else None
+
+    @torch.inference_mode()
+    def forward(self, input: torch.Tensor) -> torch.Tensor | tuple[torch.Tensor, ...]:
+        output = self.model(input.to(self.device))
+        return tuple(output) if isinstance(output, list) else output
+
+
+class ONNXRuntimeBackend(InferenceBackend):
+    """Run an ``.onnx`` file exported by :meth:`mon.nn.model.Model.export_to_onnx`
+    using :mod:`onnxruntime` on the CPU execution provider.
+
+    Input and output buffers are bound with :meth:`onnxruntime.InferenceSession.io_binding`,
+    so the input tensor's memory is handed to the runtime without an extra
+    copy. The model should be exported with dynamic height and width axes to
+    accept images of any size; :meth:`warmup` follows the static axes of models
+    exported without them.
+
+    Args:
+        path: A path to the ``.onnx`` file.
+        num_threads: The number of intra-op threads. Default: ``None`` means
+            let :mod:`onnxruntime` decide.
+    """
+
+    def __init__(self, path: pathlib.Path | str, num_threads: int | None = None):
+        super().__init__(device="cpu")
+        # onnxruntime is an optional dependency, only needed for this backend.
+        import onnxruntime
+
+        self.path = pathlib.Path(path)
+        if not self.path.is_onnx_file():
+            raise ValueError(
+                f"path must be a valid path to a .onnx file, but got {self.path}."
+            )
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads is not None:
+            options.intra_op_num_threads = num_threads
+        self.session      = onnxruntime.InferenceSession(
+            str(self.path),
+            sess_options = options,
+            providers    = ["CPUExecutionProvider"],
+        )
+        self.input_name   = self.session.get_inputs()[0].name
+        self.output_names = [o.name for o in self.session.get_outputs()]
+
+    @property
+    def name(self) -> str:
+        return "onnx"
+
+    @property
+    def input_shape(self) -> list[int | None]:
+        """Return the input shape of the session. Dynamic axes have a symbolic
+        name (or no value) in the model and are returned as ``None``.
+        """
+        return [d if isinstance(d, int) and d > 0 else None for d in self.session.get_inputs()[0].shape]
+
+    def forward(self, input: torch.Tensor) -> torch.Tensor | tuple[torch.Tensor, ...]:
+        # Keep a reference to the contiguous buffer until the run finishes.
+        x       = input.detach().to(device="cpu", dtype=torch.float32).contiguous()
+        binding = self.session.io_binding()
+        binding.bind_input(
+            name         = self.input_name,
+            device_type  = "cpu",
+            device_id    = 0,
+            element_type = np.float32,
+            shape        = tuple(x.shape),
+            buffer_ptr   = x.data_ptr(),
+        )
+        for name in self.output_names:
+            binding.bind_output(name, "cpu")
+        self.session.run_with_iobinding(binding)
+        output = [torch.from_numpy(o) for o in binding.copy_outputs_to_cpu()]
+        return output[0] if len(output) == 1 else tuple(output)
+
+
+def build_backend(
+    backend: str,
+    model  : nn.Module | None           = None,
+    path   : pathlib.Path | str | None  = None,
+    device : Any                        = "cpu",
+) -> InferenceBackend:
+    """Build an inference backend.
+
+    Args:
+        backend: The backend's name. One of: ``'torch'``, ``'torchscript'``, or
+            ``'onnx'``.
+        model: The eager model. Only used when :param:`backend` is
+            ``'torch'``. Default: ``None``.
+        path: The exported file. Only used when :param:`backend` is
+            ``'torchscript'`` or ``'onnx'``. Default: ``None``.
+        device: The device to run the forward pass on. Default: ``'cpu'``.
+    """
+    backend = str(backend).lower()
+    if backend in ["torch", "eager"]:
+        if model is None:
+            raise ValueError(f"model must be defined for the '{backend}' backend.")
+        return EagerBackend(model=model, device=device)
+    elif backend in ["torchscript", "jit"]:
+        if path is None:
+            raise ValueError(f"path must be defined for the '{backend}' backend.")
+        return TorchScriptBackend(path=path, device=device)
+    elif backend in ["onnx", "onnxruntime"]:
+        if path is None:
+            raise ValueError(f"path must be defined for the '{backend}' backend.")
+        if torch.device(device).type != "cpu":
+            console.log(f"[yellow]ONNX backend only runs on CPU, ignoring device={device}.")
+        return ONNXRuntimeBackend(path=path)
+    else:
+        raise ValueError(
+            f"backend must be one of: 'torch', 'torchscript', or 'onnx', "
+            f"but got {backend}."
+        )
+
+# endregion
+
+
+# region Parity Check
+
+def check_backend_parity(
+    reference: InferenceBackend | nn.Module,
+    backend  : InferenceBackend,
+    input    : torch.Tensor,
+    atol     : float = 1e-4,
+    rtol     : float = 1e-3,
+    verbose  : bool  = True,
+) -> tuple[bool, list[float]]:
+    """Compare the outputs of an exported :param:`backend` against the eager
+    :param:`reference` model on the same input.
+
+    Args:
+        reference: The eager model or an :class:`EagerBackend`.
+        backend: The backend to check.
+        input: An input of shape :math:`[B, C, H, W]`.
+        atol: Absolute tolerance. Default: ``1e-4``.
+        rtol: Relative tolerance. Default: ``1e-3``.
+        verbose: If ``True``, log the maximum absolute error of each output.
+            Default: ``True``.
+
+    Return:
+        ``True`` if all outputs match within the tolerances.
+        A :class:`list` of the maximum absolute error of each output.
+    """
+    if not isinstance(reference, InferenceBackend):
+        reference = EagerBackend(model=reference, device=input.device)
+
+    y_ref = reference(input)
+    y     = backend(input)
+    y_ref = list(y_ref) if isinstance(y_ref, list | tuple) else [y_ref]
+    y     = list(y)     if isinstance(y,     list | tuple) else [y]
+    if len(y_ref) != len(y):
+        raise ValueError(
+            f"reference and backend must return the same number of outputs, "
+            f"but got {len(y_ref)} and {len(y)}."
+        )
+
+    errors  = []
+    matched = True
+    for r, o in zip(y_ref, y):
+        r = r.detach().float().cpu()
+        o = o.detach().float().cpu()
+        errors.append(float((r - o).abs().max()) if r.numel() > 0 else 0.0)
+        matched &= r.shape == o.shape and torch.allclose(r, o, atol=atol, rtol=rtol)
+
+    if verbose:
+        status = "[green]passed" if matched else "[red]failed"
+        console.log(
+            f"Parity check ({reference.name} vs. {backend.name}) {status}[/], "
+            f"max abs error: {[f'{e:.6f}' for e in errors]}."
+        )
+    return matched, errors
+
+# endregion
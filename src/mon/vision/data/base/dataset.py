@@ -89,17 +89,10 @@ class UnlabeledImageDataset(nn.UnlabeledDataset, ABC):
         self.classlabels = nn.ClassLabels.from_value(value=classlabels)
         self.images: list[label.ImageLabel] = []
         
-        cache_file = self.root / f"{self.split}.cache"
-        if cache_data or not cache_file.is_file():
-            self.get_images()
-        else:
-            cache = torch.load(cache_file)
-            self.images = cache["images"]
-        
-        self.filter()
-        self.verify()
-        if cache_data or not cache_file.is_file():
-            self.cache_data(path=cache_file)
+        # Scan the file tree on the global rank 0 only; dataloader workers get
+        # the index with the pickled dataset.
+        index       = nn.run_on_rank_zero(lambda: self.build_index(cache_data=cache_data))
+        self.images = index["images"]
         if cache_images:
             self.cache_images()
     
@@ -127,6 +120,31 @@ class UnlabeledImageDataset(nn.UnlabeledDataset, ABC):
             
         return image, None, meta
         
+    def build_index(self, cache_data: bool = False) -> dict:
+        """List, filter, and verify the samples, or load them from the cache
+        file. In distributed runs, this is only called on the global rank 0.
+        
+        Args:
+            cache_data: If ``True``, rebuild the index and overwrite the cache
+                file. Default: ``False``.
+        
+        Return:
+            A :class:`dict` of ``{'images': ...}``.
+        """
+        cache_file = self.root / f"{self.split}.cache"
+        rebuild    = cache_data or not cache_file.is_file()
+        if rebuild:
+            self.get_images()
+        else:
+            cache = torch.load(cache_file)
+            self.images = cache["images"]
+        
+        self.filter()
+        self.verify()
+        if rebuild:
+            self.cache_data(path=cache_file)
+        return {"images": self.images}
+    
     @abstractmethod
     def get_images(self):
         """Get image files."""
@@ -482,19 +500,11 @@ class LabeledImageDataset(nn.LabeledDataset, ABC):
         if not hasattr(self, "labels"):
             self.labels = []
         
-        cache_file = self.root / f"{self.split}.cache"
-        if cache_data or not cache_file.is_file():
-            self.get_images()
-            self.get_labels()
-        else:
-            cache       = torch.load(cache_file)
-            self.images = cache["images"]
-            self.labels = cache["labels"]
-            
-        self.filter()
-        self.verify()
-        if cache_data or not cache_file.is_file():
-            self.cache_data(path=cache_file)
+        # Scan the file tree on the global rank 0 only; dataloader workers get
+        # the index with the pickled dataset.
+        index       = nn.run_on_rank_zero(lambda: self.build_index(cache_data=cache_data))
+        self.images = index["images"]
+        self.labels = index["labels"]
         if cache_images:
             self.cache_images()
     
@@ -513,6 +523,33 @@ class LabeledImageDataset(nn.LabeledDataset, ABC):
         """
         pass
     
+    def build_index(self, cache_data: bool = False) -> dict:
+        """List, filter, and verify the samples, or load them from the cache
+        file. In distributed runs, this is only called on the global rank 0.
+        
+        Args:
+            cache_data: If ``True``, rebuild the index and overwrite the cache
+                file. Default: ``False``.
+        
+        Return:
+            A :class:`dict` of ``{'images': ..., 'labels': ...}``.
+        """
+        cache_file = self.root / f"{self.split}.cache"
+        rebuild    = cache_data or not cache_file.is_file()
+        if rebuild:
+            self.get_images()
+            self.get_labels()
+        else:
+            cache       = torch.load(cache_file)
+            self.images = cache["images"]
+            self.labels = cache["labels"]
+        
+        self.filter()
+        self.verify()
+        if rebuild:
+            self.cache_data(path=cache_file)
+        return {"images": self.images, "labels": self.labels}
+    
     @abstractmethod
     def get_images(self):
         """Get image files."""
@@ -1,21 +1,161 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
-"""This module implements basic image adjustment functions."""
+"""This module implements basic image adjustment functions.
+
+Point-wise adjustments (gamma, contrast curves) are applied through 256-entry
+lookup tables (LUTs) that are built once per parameter set and cached. Every
+function accepts:
+    - A uint8 :class:`numpy.ndarray` of shape :math:`[H, W]`,
+      :math:`[H, W, C]`, or :math:`[B, H, W, C]`.
+    - A uint8 :class:`torch.Tensor` in :math:`[0, 255]`, or a floating point
+      :class:`torch.Tensor` in :math:`[0.0, 1.0]`, of shape :math:`[C, H, W]`
+      or :math:`[B, C, H, W]`.
+and returns an image of the same type, shape, and dtype.
+"""
 
 from __future__ import annotations
 
 __all__ = [
-    "adjust_gamma",
+    "adjust_contrast", "adjust_gamma", "adjust_sigmoid", "apply_lut", "clahe",
+    "equalize_histogram", "get_contrast_lut", "get_gamma_lut",
+    "get_sigmoid_lut",
 ]
 
+import functools
+from typing import Callable
+
 import cv2
+import kornia
 import numpy as np
+import torch
+
+
+# region LUT
+
+@functools.lru_cache(maxsize=128)
+def get_gamma_lut(gamma: float = 1.0) -> np.ndarray:
+    """Return the LUT of :math:`O = I ^ {(1 / G)}` as a read-only
+    :class:`numpy.ndarray` of 256 float values in :math:`[0.0, 1.0]`.
+    """
+    lut = np.power(np.arange(256) / 255.0, 1.0 / gamma)
+    lut.setflags(write=False)
+    return lut
+
+
+@functools.lru_cache(maxsize=128)
+def get_contrast_lut(factor: float = 1.0, pivot: float = 0.5) -> np.ndarray:
+    """Return the LUT of the linear contrast curve
+    :math:`O = (I - pivot) * factor + pivot`, clipped to :math:`[0.0, 1.0]`.
+    """
+    lut = np.clip((np.arange(256) / 255.0 - pivot) * factor + pivot, 0.0, 1.0)
+    lut.setflags(write=False)
+    return lut
+
+
+@functools.lru_cache(maxsize=128)
+def get_sigmoid_lut(cutoff: float = 0.5, gain: float = 10.0) -> np.ndarray:
+    """Return the LUT of the sigmoid contrast curve
+    :math:`O = 1 / (1 + exp(gain * (cutoff - I)))`, rescaled so that :math:`0`
+    and :math:`1` are kept.
+    """
+    x   = np.arange(256) / 255.0
+    lut = 1.0 / (1.0 + np.exp(gain * (cutoff - x)))
+    lo  = 1.0 / (1.0 + np.exp(gain * cutoff))
+    hi  = 1.0 / (1.0 + np.exp(gain * (cutoff - 1.0)))
+    lut = (lut - lo) / (hi - lo)
+    lut.setflags(write=False)
+    return lut
+
+
+def _lut_to_table(
+    lut   : np.ndarray,
+    uint8 : bool,
+    device: str | None = None,
+) -> np.ndarray | torch.Tensor:
+    """Convert :param:`lut` to a uint8 or float32 table, on :param:`device` if
+    given.
+    """
+    table = np.round(lut * 255.0).clip(0, 255).astype(np.uint8) if uint8 else lut.astype(np.float32)
+    if device is not None:
+        table = torch.from_numpy(table).to(device)
+    return table
+
+
+_lut_getters = {
+    "contrast": get_contrast_lut,
+    "gamma"   : get_gamma_lut,
+    "sigmoid" : get_sigmoid_lut,
+}
+
+
+@functools.lru_cache(maxsize=128)
+def _get_lut_table(
+    name  : str,
+    params: tuple[float, ...],
+    uint8 : bool,
+    device: str | None = None,
+) -> np.ndarray | torch.Tensor:
+    """Return the table of a named LUT built by its ``get_*_lut()`` function,
+    converted to uint8 and/or moved to a device once per parameter set.
+    """
+    return _lut_to_table(_lut_getters[name](*params), uint8=uint8, device=device)
+
+
+def _apply_table(
+    image    : np.ndarray | torch.Tensor,
+    get_table: Callable[..., np.ndarray | torch.Tensor],
+) -> np.ndarray | torch.Tensor:
+    """Map every pixel of an image through the table returned by
+    ``get_table(uint8, device)``.
+    """
+    if isinstance(image, np.ndarray):
+        if image.dtype != np.uint8:
+            raise ValueError(f"image must be a uint8 numpy.ndarray, but got {image.dtype}.")
+        return get_table(True, None)[image]
+    elif isinstance(image, torch.Tensor):
+        device = str(image.device)
+        if image.dtype == torch.uint8:
+            return get_table(True, device)[image.long()]
+        table = get_table(False, device)
+        x     = image.float().clamp(0.0, 1.0) * 255.0
+        i0    = x.floor().long().clamp(max=254)
+        w     = x - i0
+        y     = table[i0] * (1.0 - w) + table[i0 + 1] * w
+        return y.to(image.dtype)
+    else:
+        raise TypeError(
+            f"image must be a numpy.ndarray or a torch.Tensor, "
+            f"but got {type(image)}."
+        )
+
+
+def apply_lut(
+    image: np.ndarray | torch.Tensor,
+    lut  : np.ndarray,
+) -> np.ndarray | torch.Tensor:
+    """Map every pixel of an image through a LUT.
+
+    Args:
+        image: An image, see the module's docstring for the supported types.
+        lut: A LUT of 256 float values in :math:`[0.0, 1.0]`, as returned by the
+            ``get_*_lut()`` functions.
+
+    Return:
+        The adjusted image. Floating point tensors are linearly interpolated
+        between the LUT's entries.
+    """
+    return _apply_table(image, functools.partial(_lut_to_table, lut))
+
+# endregion
 
 
 # region Adjust
 
-def adjust_gamma(image: np.ndarray, gamma: float = 1.0) -> np.ndarray:
+def adjust_gamma(
+    image: np.ndarray | torch.Tensor,
+    gamma: float = 1.0,
+) -> np.ndarray | torch.Tensor:
     """Adjust gamma value in the image using the Power Law Transform.
     
     First, our image pixel intensities must be scaled from the range
@@ -36,12 +176,136 @@ def adjust_gamma(image: np.ndarray, gamma: float = 1.0) -> np.ndarray:
     Returns:
         A gamma-corrected image.
     """
-    # Build a lookup table mapping the pixel values [0, 255] to their adjusted
-    # gamma values.
-    inv_gamma = 1.0 / gamma
-    table     = np.array([((i / 255.0) ** inv_gamma) * 255 for i in np.arange(0, 256)])
-    table.astype("uint8")
-    # Apply gamma correction using the lookup table
-    return cv2.LUT(image, table)
+    return _apply_table(image, functools.partial(_get_lut_table, "gamma", (float(gamma),)))
+
+
+def adjust_contrast(
+    image : np.ndarray | torch.Tensor,
+    factor: float = 1.0,
+    pivot : float = 0.5,
+) -> np.ndarray | torch.Tensor:
+    """Stretch (:param:`factor` > 1) or compress (:param:`factor` < 1) the
+    intensities around :param:`pivot` with a linear contrast curve.
+    """
+    return _apply_table(image, functools.partial(_get_lut_table, "contrast", (float(factor), float(pivot))))
+
+
+def adjust_sigmoid(
+    image : np.ndarray | torch.Tensor,
+    cutoff: float = 0.5,
+    gain  : float = 10.0,
+) -> np.ndarray | torch.Tensor:
+    """Apply an S-shaped (sigmoid) contrast curve centered at :param:`cutoff`."""
+    return _apply_table(image, functools.partial(_get_lut_table, "sigmoid", (float(cutoff), float(gain))))
+
+# endregion
+
+
+# region Histogram
+
+def _equalize_luts(
+    values: np.ndarray | torch.Tensor,
+) -> np.ndarray | torch.Tensor:
+    """Build one equalization LUT per row of :param:`values` (uint8 intensities
+    of shape :math:`[N, P]`) with a single offset :func:`bincount`.
+    """
+    n = values.shape[0]
+    if isinstance(values, np.ndarray):
+        offset = (np.arange(n) * 256)[:, None]
+        hist   = np.bincount((values.astype(np.int64) + offset).ravel(), minlength=n * 256)
+        cdf    = hist.reshape(n, 256).cumsum(axis=1)
+        cdf_lo = np.where(hist.reshape(n, 256) > 0, cdf, cdf[:, -1:]).min(axis=1, keepdims=True)
+        denom  = np.maximum(cdf[:, -1:] - cdf_lo, 1)
+        return np.clip(np.round((cdf - cdf_lo) * 255.0 / denom), 0, 255).astype(np.uint8)
+    offset = (torch.arange(n, device=values.device) * 256)[:, None]
+    hist   = torch.bincount((values.long() + offset).flatten(), minlength=n * 256).view(n, 256)
+    cdf    = hist.cumsum(dim=1)
+    cdf_lo = torch.where(hist > 0, cdf, cdf[:, -1:]).amin(dim=1, keepdim=True)
+    denom  = (cdf[:, -1:] - cdf_lo).clamp(min=1)
+    return torch.round((cdf - cdf_lo) * 255.0 / denom).clamp(0, 255)
+
+
+def equalize_histogram(image: np.ndarray | torch.Tensor) -> np.ndarray | torch.Tensor:
+    """Equalize the histogram of each channel of each image independently.
+
+    The histograms of the whole batch are computed in one pass, then every
+    pixel is mapped through its own image/channel's LUT.
+    """
+    if isinstance(image, np.ndarray):
+        if image.dtype != np.uint8:
+            raise ValueError(f"image must be a uint8 numpy.ndarray, but got {image.dtype}.")
+        if image.ndim == 2:
+            x = image[None, :, :, None]
+        elif image.ndim == 3:
+            x = image[None]
+        else:
+            x = image
+        b, h, w, c = x.shape
+        values     = x.transpose(0, 3, 1, 2).reshape(b * c, h * w)
+        luts       = _equalize_luts(values)
+        y          = np.take_along_axis(luts, values.astype(np.int64), axis=1)
+        return y.reshape(b, c, h, w).transpose(0, 2, 3, 1).reshape(image.shape)
+    elif isinstance(image, torch.Tensor):
+        x      = image if image.ndim == 4 else image.unsqueeze(0)
+        b, c   = x.shape[:2]
+        uint8  = x.dtype == torch.uint8
+        values = x if uint8 else (x.float().clamp(0.0, 1.0) * 255.0).round()
+        values = values.reshape(b * c, -1)
+        luts   = _equalize_luts(values)
+        y      = torch.gather(luts, 1, values.long()).view_as(x)
+        y      = y.to(torch.uint8) if uint8 else (y / 255.0).to(image.dtype)
+        return y.view_as(image)
+    else:
+        raise TypeError(
+            f"image must be a numpy.ndarray or a torch.Tensor, "
+            f"but got {type(image)}."
+        )
+
+
+@functools.lru_cache(maxsize=16)
+def _get_clahe(clip_limit: float, grid_size: tuple[int, int]) -> cv2.CLAHE:
+    return cv2.createCLAHE(clipLimit=clip_limit, tileGridSize=grid_size)
+
+
+def clahe(
+    image     : np.ndarray | torch.Tensor,
+    clip_limit: float           = 40.0,
+    grid_size : tuple[int, int] = (8, 8),
+) -> np.ndarray | torch.Tensor:
+    """Contrast Limited Adaptive Histogram Equalization of each channel.
+
+    NumPy images go through a :class:`cv2.CLAHE` object cached per
+    (:param:`clip_limit`, :param:`grid_size`). Tensors are processed as a whole
+    batch on their device with :func:`kornia.enhance.equalize_clahe`.
+
+    Args:
+        image: An image.
+        clip_limit: The threshold for contrast limiting. Default: ``40.0``.
+        grid_size: The number of tiles along the height and width.
+            Default: ``(8, 8)``.
+    """
+    grid_size = tuple(grid_size)
+    if isinstance(image, np.ndarray):
+        if image.dtype != np.uint8:
+            raise ValueError(f"image must be a uint8 numpy.ndarray, but got {image.dtype}.")
+        op = _get_clahe(float(clip_limit), grid_size)
+        if image.ndim == 2:
+            return op.apply(image)
+        x = image if image.ndim == 4 else image[None]
+        y = np.empty_like(x)
+        for i in range(x.shape[0]):
+            for j in range(x.shape[-1]):
+                y[i, ..., j] = op.apply(np.ascontiguousarray(x[i, ..., j]))
+        return y.reshape(image.shape)
+    elif isinstance(image, torch.Tensor):
+        uint8 = image.dtype == torch.uint8
+        x     = image.float() / 255.0 if uint8 else image.float()
+        y     = kornia.enhance.equalize_clahe(x, clip_limit=float(clip_limit), grid_size=grid_size)
+        return (y * 255.0).round().to(torch.uint8) if uint8 else y.to(image.dtype)
+    else:
+        raise TypeError(
+            f"image must be a numpy.ndarray or a torch.Tensor, "
+            f"but got {type(image)}."
+        )
 
 # endregion
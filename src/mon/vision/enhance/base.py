@@ -90,6 +90,7 @@ class ImageEnhancementModel(nn.Model, ABC):
         nrow         : int          | None = 8,
         wait_time    : float               = 0.01,
         save         : bool                = False,
+        diff         : bool                = False,
         verbose      : bool                = False,
         *args, **kwargs
     ):
@@ -109,7 +110,9 @@ class ImageEnhancementModel(nn.Model, ABC):
                 in the :class:`list`. Default: ``8``.
             wait_time: Wait for some time (in seconds) to display the figure
                 then reset. Default: ``0.01``.
-            save: Save debug image. Default: ``False``.
+            save: Save debug image (in the background). Default: ``False``.
+            diff: If ``True``, add a heatmap of the absolute difference between
+                :param:`pred` and :param:`target`. Default: ``False``.
             verbose: If ``True`` shows the results on the screen.
                 Default: ``False``.
         """
@@ -125,18 +128,20 @@ class ImageEnhancementModel(nn.Model, ABC):
                 result["pred"] = pred
         
         save_config = {
-            "filepath"  : file_path or self.debug_image_file_path ,
-            "pil_kwargs": dict(quality=image_quality)
+            "filepath": file_path or self.debug_image_file_path,
+            "quality" : image_quality,
         } if save else None
         view.imshow_enhancement(
             winname     = self.fullname,  # self.phase.value,
             image       = result,
             denormalize = True,
-            scale       = 2,
+            scale       = 1,
             save_config = save_config,
             max_n       = max_n,
             nrow        = nrow,
             wait_time   = wait_time,
+            diff        = diff,
+            show        = verbose,
         )
 
 # endregion
@@ -7,9 +7,13 @@ from __future__ import annotations
 
 import mon.vision.enhance.llie.base
 import mon.vision.enhance.llie.gcenet
+import mon.vision.enhance.llie.pie
+import mon.vision.enhance.llie.temporal
 import mon.vision.enhance.llie.zeroadce
 import mon.vision.enhance.llie.zerodce
 from mon.vision.enhance.llie.base import *
 from mon.vision.enhance.llie.gcenet import *
+from mon.vision.enhance.llie.pie import *
+from mon.vision.enhance.llie.temporal import *
 from mon.vision.enhance.llie.zeroadce import *
 from mon.vision.enhance.llie.zerodce import *
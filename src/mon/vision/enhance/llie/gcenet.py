@@ -30,108 +30,15 @@ _current_dir = core.Path(__file__).absolute().parent
 
 # region Loss
 
-class ZeroReferenceLoss(nn.Loss):
+class ZeroReferenceLoss(nn.FusedZeroReferenceLoss):
+    """The zero-reference loss of GCE-Net.
     
-    def __init__(
-        self,
-        bri_gamma      : float = 2.8,
-        exp_patch_size : int   = 16,
-        exp_mean_val   : float = 0.6,
-        spa_num_regions: int   = 4,     # 4
-        spa_patch_size : int   = 4,     # 4
-        weight_bri     : float = 1,
-        weight_col     : float = 5,
-        weight_crl     : float = 1,     # 20
-        weight_edge    : float = 5,
-        weight_exp     : float = 10,
-        weight_kl      : float = 5,     # 5
-        weight_spa     : float = 1,
-        weight_tvA     : float = 1600,  # 200
-        reduction      : str   = "mean",
-        verbose        : bool  = False,
-        *args, **kwargs
-    ):
-        super().__init__(*args, **kwargs)
-        self.weight_bri  = weight_bri
-        self.weight_col  = weight_col
-        self.weight_crl  = weight_crl
-        self.weight_edge = weight_edge
-        self.weight_exp  = weight_exp
-        self.weight_kl   = weight_kl
-        self.weight_spa  = weight_spa
-        self.weight_tvA  = weight_tvA
-        self.verbose     = verbose
-        
-        self.loss_bri  = nn.BrightnessConstancyLoss(reduction=reduction, gamma=bri_gamma)
-        self.loss_col  = nn.ColorConstancyLoss(reduction=reduction)
-        self.loss_crl  = nn.ChannelRatioConsistencyLoss(reduction=reduction)
-        self.loss_kl   = nn.ChannelConsistencyLoss(reduction=reduction)
-        self.loss_edge = nn.EdgeConstancyLoss(reduction=reduction)
-        self.loss_exp  = nn.ExposureControlLoss(
-            reduction  = reduction,
-            patch_size = exp_patch_size,
-            mean_val   = exp_mean_val,
-        )
-        self.loss_spa  = nn.SpatialConsistencyLoss(
-            num_regions = spa_num_regions,
-            patch_size  = spa_patch_size,
-            reduction   = reduction,
-        )
-        self.loss_tvA  = nn.IlluminationSmoothnessLoss(reduction=reduction)
+    See Also: :class:`mon.vision.nn.loss.FusedZeroReferenceLoss`.
+    """
     
     def __str__(self) -> str:
         return f"zero-reference loss"
     
-    def forward(
-        self,
-        input   : torch.Tensor | list[torch.Tensor],
-        target  : list[torch.Tensor],
-        previous: torch.Tensor = None,
-        **_
-    ) -> tuple[torch.Tensor, torch.Tensor]:
-        if isinstance(target, list | tuple):
-            if len(target) == 2:
-                a       = target[-2]
-                enhance = target[-1]
-            elif len(target) == 3:
-                a       = target[-3]
-                p       = target[-2]
-                enhance = target[-1]
-        else:
-            raise TypeError
-        loss_bri  = self.loss_bri(input=p, target=input)              if self.weight_bri  > 0 else 0
-        loss_col  = self.loss_col(input=enhance)                      if self.weight_col  > 0 else 0
-        loss_edge = self.loss_edge(input=enhance, target=input)       if self.weight_edge > 0 else 0
-        loss_exp  = self.loss_exp(input=enhance)                      if self.weight_exp  > 0 else 0
-        loss_kl   = self.loss_kl(input=enhance, target=input)         if self.weight_kl   > 0 else 0
-        loss_spa  = self.loss_spa(input=enhance, target=input)        if self.weight_spa  > 0 else 0
-        loss_tvA  = self.loss_tvA(input=a)                            if self.weight_tvA  > 0 else 0
-        if previous is not None and (enhance.shape == previous.shape):
-            loss_crl = self.loss_crl(input=enhance, target=previous)  if self.weight_crl  > 0 else 0
-        else:                                                                             
-            loss_crl = self.loss_crl(input=enhance, target=input)     if self.weight_crl  > 0 else 0
-        
-        loss = (
-             self.weight_bri   * loss_bri
-            + self.weight_col  * loss_col
-            + self.weight_crl  * loss_crl
-            + self.weight_edge * loss_edge
-            + self.weight_exp  * loss_exp
-            + self.weight_tvA  * loss_tvA
-            + self.weight_kl   * loss_kl
-            + self.weight_spa  * loss_spa
-        )
-        
-        if self.verbose:
-            console.log(f"{self.loss_bri.__str__():<30} : {loss_bri}")
-            console.log(f"{self.loss_col.__str__():<30} : {loss_col}")
-            console.log(f"{self.loss_edge.__str__():<30}: {loss_edge}")
-            console.log(f"{self.loss_exp.__str__():<30} : {loss_exp}")
-            console.log(f"{self.loss_kl.__str__():<30}  : {loss_kl}")
-            console.log(f"{self.loss_spa.__str__():<30} : {loss_spa}")
-            console.log(f"{self.loss_tvA.__str__():<30} : {loss_tvA}")
-        return loss, enhance
-        
 # endregion
 
 
@@ -500,6 +407,21 @@ class GCENet(base.LowLightImageEnhancementModel):
         Return:
             Predictions.
         """
+        a = self.estimate_curve(input=input)
+        y = self.apply_curve(input=input, curve=a)
+        return a, y
+
+    def estimate_curve(self, input: torch.Tensor) -> torch.Tensor:
+        """Estimate the curve parameter maps. This is the expensive part of
+        :meth:`forward_once`, and it can be skipped on frames where the maps
+        of a previous frame are reused.
+        
+        Args:
+            input: An input of shape :math:`[N, C, H, W]`.
+        
+        Return:
+            Curve parameter maps of shape :math:`[N, C', H, W]`.
+        """
         x = input
         
         # Downsampling
@@ -519,7 +441,22 @@ class GCENet(base.LowLightImageEnhancementModel):
         # Upsampling
         if self.scale_factor != 1:
             a = self.upsample(a)
-
+        return a
+    
+    def apply_curve(self, input: torch.Tensor, curve: torch.Tensor) -> torch.Tensor:
+        """Enhance :param:`input` with the curve parameter maps estimated by
+        :meth:`estimate_curve`.
+        
+        Args:
+            input: An input of shape :math:`[N, C, H, W]`.
+            curve: Curve parameter maps of shape :math:`[N, C', H, W]`.
+        
+        Return:
+            The enhanced image of shape :math:`[N, C, H, W]`.
+        """
+        x = input
+        a = curve
+        
         # Enhancement
         if self.out_channels == 3:
             if self.phase == ModelPhase.TRAINING:
@@ -552,8 +489,8 @@ class GCENet(base.LowLightImageEnhancementModel):
         if self.unsharp_sigma is not None:
             y = kornia.filters.unsharp_mask(y, (3, 3), (self.unsharp_sigma, self.unsharp_sigma))
 
-        return a, y
-
+        return y
+    
     def forward_once_variant(
         self,
         input    : torch.Tensor,
@@ -0,0 +1,245 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""This module implements PIE (Probabilistic Image Enhancement) as a batched,
+training-free enhancement model.
+
+It is a port of :mod:`lib.vision.enhance.llie.pie.pie` (`<https://github.com/DavidQiuChao/PIE>`__)
+that runs the alternating reflectance/illumination updates in :mod:`torch.fft`
+with float32 tensors on a whole batch, caches the derivative OTFs per image
+shape, and stops as soon as the relative change of both estimates falls below
+the given tolerances.
+"""
+
+from __future__ import annotations
+
+__all__ = [
+    "PIE",
+]
+
+import functools
+from typing import Any
+
+import kornia
+import torch
+
+import mon
+from mon.globals import MODELS
+from mon.vision import core, nn
+from mon.vision.enhance.llie import base
+from mon.vision.nn import functional as F
+
+console      = core.console
+_current_dir = core.Path(__file__).absolute().parent
+
+
+# region Helper
+
+def _psf2otf(psf: torch.Tensor, size: tuple[int, int]) -> torch.Tensor:
+    """Convert a point-spread function to an optical transfer function of the
+    given size (same as MATLAB's ``psf2otf``).
+    """
+    otf = torch.zeros(size, dtype=torch.float64)
+    otf[:psf.shape[0], :psf.shape[1]] = psf
+    for i, s in enumerate(psf.shape):
+        otf = torch.roll(otf, -int(s / 2), dims=i)
+    return torch.fft.fft2(otf)
+
+
+@functools.lru_cache(maxsize=8)
+def _get_derivative_otfs(
+    h     : int,
+    w     : int,
+    device: str,
+) -> tuple[torch.Tensor, torch.Tensor, torch.Tensor]:
+    fd_h  = _psf2otf(torch.tensor([[1.0], [-1.0]]), (h + 1, w))[1:, :]
+    fd_v  = _psf2otf(torch.tensor([[1.0, -1.0]]),   (h, w + 1))[:, 1:]
+    denom = fd_h.abs() ** 2 + fd_v.abs() ** 2
+    return (
+        fd_h.to(device=device, dtype=torch.complex64),
+        fd_v.to(device=device, dtype=torch.complex64),
+        denom.to(device=device, dtype=torch.float32),
+    )
+
+
+def get_derivative_otfs(
+    h     : int,
+    w     : int,
+    device: Any = "cpu",
+) -> tuple[torch.Tensor, torch.Tensor, torch.Tensor]:
+    """Return the OTFs of the vertical and horizontal first-order derivative
+    operators for an image of size :math:`[H, W]`, and the sum of their squared
+    magnitudes. The last few ``(h, w, device)`` are cached, so a dataset of
+    mixed resolutions does not keep every table alive.
+    """
+    return _get_derivative_otfs(h, w, str(device))
+
+
+def _sobel(input: torch.Tensor) -> tuple[torch.Tensor, torch.Tensor]:
+    """3x3 Sobel derivatives with reflect-101 borders, as :func:`cv2.Sobel`."""
+    kx = torch.tensor(
+        [[-1.0, 0.0, 1.0], [-2.0, 0.0, 2.0], [-1.0, 0.0, 1.0]],
+        dtype=input.dtype, device=input.device,
+    ).view(1, 1, 3, 3)
+    x  = F.pad(input, [1, 1, 1, 1], mode="reflect")
+    gv = F.conv2d(x, kx)
+    gh = F.conv2d(x, kx.transpose(2, 3))
+    return gv, gh
+
+
+def _shrink(input: torch.Tensor, lam: float) -> torch.Tensor:
+    abs_x = input.abs()
+    return input / (abs_x + 1e-10) * torch.clamp(abs_x - lam, min=0)
+
+
+def _relative_change(old: torch.Tensor, new: torch.Tensor) -> torch.Tensor:
+    """Per-image relative change in Frobenius norm."""
+    return torch.linalg.vector_norm(new - old, dim=(1, 2, 3)) \
+        / (torch.linalg.vector_norm(old, dim=(1, 2, 3)) + 1e-10)
+
+# endregion
+
+
+# region Model
+
+@MODELS.register(name="pie")
+class PIE(base.LowLightImageEnhancementModel):
+    """PIE (Probabilistic Image Enhancement) model. It has no trainable
+    parameters: the V channel of each image is decomposed into reflectance
+    :math:`R` and illumination :math:`I` by alternating minimization, then
+    replaced by :math:`R \\cdot I^{1/2.2}`.
+
+    Args:
+        alpha: The weight of the illumination smoothness term. Default: ``1000``.
+        beta: The weight of the reflectance sparsity term. Default: ``0.01``.
+        lam: The split-Bregman penalty. Default: ``10``.
+        gamma: The weight of the illumination prior (the mean intensity).
+            Default: ``0.1``.
+        eta_r: The relative change of :math:`R` below which it has converged.
+            Default: ``0.1``.
+        eta_i: The relative change of :math:`I` below which it has converged.
+            Default: ``0.1``.
+        max_iters: The maximum number of iterations. Default: ``2`` as in the
+            reference implementation.
+
+    See Also: :class:`mon.vision.enhance.llie.base.LowLightImageEnhancementModel`
+    """
+
+    configs     = {}
+    zoo         = {}
+    map_weights = {}
+
+    def __init__(
+        self,
+        config   : Any         = None,
+        loss     : Any         = None,
+        alpha    : float | str = 1000,
+        beta     : float | str = 0.01,
+        lam      : float | str = 10,
+        gamma    : float | str = 0.1,
+        eta_r    : float | str = 0.1,
+        eta_i    : float | str = 0.1,
+        max_iters: int   | str = 2,
+        *args, **kwargs
+    ):
+        super().__init__(
+            config = config,
+            loss   = loss,
+            *args, **kwargs
+        )
+        self.alpha     = mon.to_float(alpha)
+        self.beta      = mon.to_float(beta)
+        self.lam       = mon.to_float(lam)
+        self.gamma     = mon.to_float(gamma)
+        self.eta_r     = mon.to_float(eta_r)
+        self.eta_i     = mon.to_float(eta_i)
+        self.max_iters = mon.to_int(max_iters)
+        self.num_iters = 0
+
+    def forward_loss(
+        self,
+        input : torch.Tensor,
+        target: torch.Tensor | None,
+        *args, **kwargs
+    ) -> tuple[torch.Tensor, torch.Tensor | None]:
+        """Forward pass with loss value. PIE is not trainable, so the loss is
+        always ``None``.
+        """
+        pred = self.forward(input=input, *args, **kwargs)
+        return pred, None
+
+    @torch.no_grad()
+    def forward_once(
+        self,
+        input    : torch.Tensor,
+        profile  : bool = False,
+        out_index: int  = -1,
+        *args, **kwargs
+    ) -> torch.Tensor:
+        """Forward pass once. Implement the logic for a single forward pass.
+
+        Args:
+            input: An RGB input in :math:`[0.0, 1.0]` of shape :math:`[N, 3, H, W]`.
+            profile: Measure processing time. Default: ``False``.
+            out_index: Return specific layer's output from :param:`out_index`.
+                Default: ``-1`` means the last layer.
+
+        Return:
+            The enhanced image of shape :math:`[N, 3, H, W]`.
+        """
+        x = input.float()
+        v = torch.amax(x, dim=1, keepdim=True)  # HSV's V channel
+        y = self.solve(v * 255.0) / 255.0
+        # Replacing V while keeping H and S scales the RGB values.
+        y = x * (y / (v + 1e-10))
+        return torch.clamp(y, 0.0, 1.0).to(input.dtype)
+
+    def solve(self, s: torch.Tensor) -> torch.Tensor:
+        """Decompose the intensity :param:`s` (in :math:`[0, 255]`, shape
+        :math:`[N, 1, H, W]`) and return the enhanced intensity.
+        """
+        eps            = 1e-10
+        h, w           = s.shape[-2:]
+        fd_h, fd_v, dd = get_derivative_otfs(h, w, s.device)
+        fd_h_cj        = torch.conj(fd_h)
+        fd_v_cj        = torch.conj(fd_v)
+        ahp            = self.beta * self.lam
+        denom_r        = dd * ahp + 1
+        denom_i        = dd * self.alpha + self.gamma + 1
+
+        i  = kornia.filters.gaussian_blur2d(s, (5, 5), (1.1, 1.1), border_type="reflect")
+        i0 = s.mean(dim=(1, 2, 3), keepdim=True)
+        r  = torch.zeros_like(s)
+        bv = torch.zeros_like(s)
+        bh = torch.zeros_like(s)
+
+        self.num_iters = 0
+        for _ in range(self.max_iters):
+            # Reflectance sparsity (shrinkage)
+            dv_r, dh_r = _sobel(r)
+            difv = _shrink(dv_r + bv, 1.0 / (2 * self.lam)) - bv
+            difh = _shrink(dh_r + bh, 1.0 / (2 * self.lam)) - bh
+            # Reflectance
+            f1   = torch.fft.fft2(s / (i + eps)) \
+                 + ahp * (fd_v_cj * torch.fft.fft2(difv) + fd_h_cj * torch.fft.fft2(difh))
+            r_n  = torch.clamp(torch.fft.ifft2(f1 / denom_r).abs(), 0.0, 1.0)
+            dv_r, dh_r = _sobel(r_n)
+            bv   = dv_r - difv
+            bh   = dh_r - difh
+            # Illumination
+            f1   = torch.fft.fft2(self.gamma * i0 + s / (r_n + eps))
+            i_n  = torch.clamp(torch.fft.ifft2(f1 / denom_i).abs(), 0.0, 255.0)
+            i_n  = torch.maximum(i_n, s)
+
+            converged = (_relative_change(r, r_n) <= self.eta_r) \
+                      & (_relative_change(i, i_n) <= self.eta_i)
+            r, i = r_n, i_n
+            self.num_iters += 1
+            if bool(converged.all()):
+                break
+
+        # Gamma correction
+        i = 255.0 * torch.pow(i / 255.0, 1 / 2.2)
+        return r * i
+
+# endregion
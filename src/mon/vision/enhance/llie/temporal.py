@@ -0,0 +1,225 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""This module implements temporal reuse of curve parameter maps for enhancing
+videos with curve-estimation models (Zero-DCE, Zero-DCE++, GCE-Net).
+
+Consecutive video frames are nearly identical, so the curve parameter maps
+estimated for one frame are also a good fit for the next few frames. Only the
+cheap part of the model (applying the curves) then needs to run on every frame.
+"""
+
+from __future__ import annotations
+
+__all__ = [
+    "TemporalCurveEnhancer",
+]
+
+import cv2
+import numpy as np
+import torch
+
+from mon.nn import parsing
+from mon.vision import core, nn
+from mon.vision.enhance.llie import zerodce
+from mon.vision.nn import functional as F
+
+console = core.console
+
+
+# region Temporal Reuse
+
+class TemporalCurveEnhancer:
+    """Enhance a video frame by frame, re-estimating the curve parameter maps
+    only on key frames and reusing them in between.
+
+    A frame becomes a key frame when:
+        - :param:`interval` frames have passed since the last key frame, or
+        - a scene change is detected: the mean absolute difference between the
+          low-resolution luminance thumbnails of the frame and of the last key
+          frame exceeds :param:`scene_threshold`, or
+        - the frame size changes.
+
+    On the other frames, the maps of the last key frame are reused, optionally
+    warped to the current frame with a dense optical flow computed on small
+    thumbnails. On key frames without a scene change, the new maps are blended
+    with the previous ones, which reduces flickering.
+
+    The model must either implement ``estimate_curve(input)`` and
+    ``apply_curve(input, curve)`` (like :class:`mon.vision.enhance.llie.gcenet.GCENet`),
+    or be built from a config whose last layer is
+    :class:`mon.vision.enhance.llie.zerodce.PixelwiseHigherOrderLECurve`
+    (like :class:`mon.vision.enhance.llie.zerodce.ZeroDCE`).
+
+    Args:
+        model: A curve-estimation model in inference mode.
+        interval: Re-estimate the maps every :param:`interval` frames.
+            Default: ``4``.
+        scene_threshold: The thumbnail difference (in :math:`[0.0, 1.0]`)
+            above which a frame is considered a scene change. Default: ``0.08``.
+        warp: If ``True``, warp the reused maps with optical flow.
+            Default: ``False``.
+        momentum: The weight of the previous maps when blending them with the
+            maps of a new key frame. ``0.0`` disables blending. Default: ``0.5``.
+        thumbnail_size: The size of the thumbnails used for scene change
+            detection and optical flow. Default: ``64``.
+    """
+
+    def __init__(
+        self,
+        model          : nn.Module,
+        interval       : int   = 4,
+        scene_threshold: float = 0.08,
+        warp           : bool  = False,
+        momentum       : float = 0.5,
+        thumbnail_size : int   = 64,
+    ):
+        if interval < 1:
+            raise ValueError(f"interval must be >= 1, but got {interval}.")
+        if not 0.0 <= momentum < 1.0:
+            raise ValueError(f"momentum must be in [0.0, 1.0), but got {momentum}.")
+        if not (hasattr(model, "estimate_curve") and hasattr(model, "apply_curve")) \
+            and not isinstance(getattr(model, "model", [None])[-1], zerodce.PixelwiseHigherOrderLECurve):
+            raise ValueError(
+                f"model must implement estimate_curve() and apply_curve(), or "
+                f"end with a PixelwiseHigherOrderLECurve layer, but got "
+                f"{model.__class__.__name__}."
+            )
+        self.model           = model
+        self.interval        = interval
+        self.scene_threshold = scene_threshold
+        self.warp            = warp
+        self.momentum        = momentum
+        self.thumbnail_size  = thumbnail_size
+        self.num_frames      = 0
+        self.num_keyframes   = 0
+        self._head_plans     = None
+        self.reset()
+
+    def __call__(self, input: torch.Tensor) -> tuple[torch.Tensor, torch.Tensor]:
+        return self.forward(input=input)
+
+    @property
+    def reuse_ratio(self) -> float:
+        """Return the ratio of frames that reused the maps of a key frame."""
+        if self.num_frames == 0:
+            return 0.0
+        return 1.0 - self.num_keyframes / self.num_frames
+
+    def reset(self):
+        """Forget the last key frame, e.g., when starting a new video."""
+        self.curve     = None
+        self.key_thumb = None
+        self.since_key = 0
+
+    @torch.no_grad()
+    def forward(self, input: torch.Tensor) -> tuple[torch.Tensor, torch.Tensor]:
+        """Enhance a batch of consecutive frames.
+
+        Args:
+            input: Frames of shape :math:`[B, C, H, W]` in temporal order.
+
+        Return:
+            The curve parameter maps used for each frame and the enhanced
+            frames, as the model's :meth:`forward` returns them.
+        """
+        curves  = []
+        outputs = []
+        for x in torch.split(input, 1, dim=0):
+            thumb  = self.thumbnail(x)
+            is_cut = self.is_scene_change(x, thumb)
+            if is_cut or self.since_key >= self.interval:
+                curve = self.estimate_curve(x)
+                if not is_cut and self.momentum > 0:
+                    curve = self.momentum * self.curve + (1.0 - self.momentum) * curve
+                self.curve          = curve
+                self.key_thumb      = thumb
+                self.since_key      = 0
+                self.num_keyframes += 1
+            elif self.warp:
+                curve = self.warp_curve(self.curve, self.key_thumb, thumb)
+            else:
+                curve = self.curve
+            curves.append(curve)
+            outputs.append(self.apply_curve(x, curve))
+            self.since_key  += 1
+            self.num_frames += 1
+        return torch.cat(curves, dim=0), torch.cat(outputs, dim=0)
+
+    def get_head_plans(self) -> tuple[parsing.ForwardPlan, parsing.ForwardPlan]:
+        """Return the plans that compute the two inputs of the model's curve
+        head: the curve parameter maps and the image the curves are applied
+        to. Both are derived from the model's own
+        :class:`mon.nn.parsing.ForwardPlan`, and rebuilt when it changes.
+        """
+        plan = self.model.get_forward_plan()
+        if self._head_plans is None or self._head_plans[0] is not plan:
+            curve_src, image_src = plan.sources[-1]
+            save       = list(self.model.save or [])
+            curve_body = self.model.model[:curve_src + 1]
+            image_body = self.model.model[:image_src + 1]
+            self._head_plans = (
+                plan,
+                (curve_body, parsing.ForwardPlan(model=curve_body, save=save + [curve_src], out_index=curve_src)),
+                (image_body, parsing.ForwardPlan(model=image_body, save=save + [image_src], out_index=image_src)),
+            )
+        return self._head_plans[1], self._head_plans[2]
+
+    def estimate_curve(self, input: torch.Tensor) -> torch.Tensor:
+        if hasattr(self.model, "estimate_curve"):
+            return self.model.estimate_curve(input=input)
+        (body, plan), _ = self.get_head_plans()
+        return plan.run(model=body, input=input)
+
+    def apply_curve(self, input: torch.Tensor, curve: torch.Tensor) -> torch.Tensor:
+        if hasattr(self.model, "apply_curve"):
+            return self.model.apply_curve(input=input, curve=curve)
+        # The head's image input is not necessarily the raw frame, so run the
+        # (cheap) layers that produce it.
+        _, (body, plan) = self.get_head_plans()
+        return self.model.model[-1]([curve, plan.run(model=body, input=input)])[-1]
+
+    def thumbnail(self, input: torch.Tensor) -> torch.Tensor:
+        """Compute a low-resolution luminance thumbnail of a frame."""
+        gray = input.mean(dim=1, keepdim=True) if input.shape[1] > 1 else input
+        return F.adaptive_avg_pool2d(gray.float(), self.thumbnail_size)
+
+    def is_scene_change(self, input: torch.Tensor, thumb: torch.Tensor) -> bool:
+        """Return ``True`` if the maps of the last key frame cannot be reused
+        for :param:`input`.
+        """
+        if self.curve is None or self.curve.shape[-2:] != input.shape[-2:]:
+            return True
+        return float((thumb - self.key_thumb).abs().mean()) > self.scene_threshold
+
+    def warp_curve(
+        self,
+        curve: torch.Tensor,
+        src  : torch.Tensor,
+        dst  : torch.Tensor,
+    ) -> torch.Tensor:
+        """Warp the curve parameter maps of the key frame to the current frame
+        with a dense optical flow estimated between the two thumbnails.
+        """
+        src  = (src[0, 0].cpu().numpy() * 255).clip(0, 255).astype(np.uint8)
+        dst  = (dst[0, 0].cpu().numpy() * 255).clip(0, 255).astype(np.uint8)
+        # Flow from the current frame to the key frame, so each output pixel
+        # knows where to sample the key frame's maps.
+        flow = cv2.calcOpticalFlowFarneback(dst, src, None, 0.5, 3, 9, 3, 5, 1.1, 0)
+        flow = torch.from_numpy(flow).to(device=curve.device, dtype=curve.dtype)
+        flow = flow.permute(2, 0, 1).unsqueeze(0)
+        h, w = curve.shape[-2:]
+        flow = F.interpolate(flow, size=(h, w), mode="bilinear", align_corners=False)
+        # Flow is in thumbnail pixels, the sampling grid is in [-1, 1].
+        flow[:, 0] *= 2.0 / self.thumbnail_size
+        flow[:, 1] *= 2.0 / self.thumbnail_size
+        ys, xs = torch.meshgrid(
+            torch.linspace(-1.0, 1.0, h, device=curve.device, dtype=curve.dtype),
+            torch.linspace(-1.0, 1.0, w, device=curve.device, dtype=curve.dtype),
+            indexing="ij",
+        )
+        grid = torch.stack([xs, ys], dim=-1).unsqueeze(0)
+        grid = grid + flow.permute(0, 2, 3, 1)
+        return F.grid_sample(curve, grid, mode="bilinear", padding_mode="border", align_corners=True)
+
+# endregion
@@ -9,11 +9,14 @@ __all__ = [
     "DeepEmbedder", "Embedder",
 ]
 
+import concurrent.futures
+import threading
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import Any, Callable
 
 import numpy as np
 import torch
+import torchvision
 
 from mon.vision import core, nn
 
@@ -24,8 +27,28 @@ _current_dir = core.Path(__file__).absolute().parent
 # region Embedder
 
 class Embedder(ABC):
-    """The base class for all embedders."""
-
+    """The base class for all embedders.
+    
+    Args:
+        num_workers: The number of threads used by :meth:`embed_batch`.
+            Default: ``0`` means the calling thread.
+        cache_every: Recompute the feature of each index (e.g., a track id) at
+            most every n calls of :meth:`embed_batch`, and reuse the cached one
+            in between. Default: ``1`` means no caching.
+    """
+    
+    def __init__(
+        self,
+        num_workers: int = 0,
+        cache_every: int = 1,
+        *args, **kwargs
+    ):
+        self.num_workers = num_workers
+        self.cache_every = max(1, cache_every)
+        self.cache       = {}
+        self._executor   = None
+        self._local      = threading.local()
+    
     @abstractmethod
     def embed(self, *args, **kwargs) -> list[np.ndarray]:
         """Extract features in the images.
@@ -38,7 +61,122 @@ class Embedder(ABC):
            A 2-D :class:`list` of feature vectors.
         """
         pass
+    
+    @property
+    def feature_shape(self) -> tuple[int, ...] | None:
+        """The shape of the feature of one image, used to return an empty
+        :math:`[0, ...]` array from :meth:`embed_batch`. ``None`` if unknown.
+        """
+        return None
+    
+    @property
+    def feature_dtype(self) -> np.dtype:
+        """The data type of the features."""
+        return np.float32
+    
+    @property
+    def supports_threads(self) -> bool:
+        """``True`` if the subclass overrides :meth:`embed_one`, so that
+        :meth:`embed_batch` may call it from worker threads.
+        """
+        return type(self).embed_one is not Embedder.embed_one
+    
+    def embed_one(self, image: np.ndarray) -> np.ndarray:
+        """Extract a fixed-shape feature from one image.
+        
+        Subclasses override it to make :meth:`embed_batch` multi-threaded. It
+        is then called from the worker threads, so it must only use per-thread
+        state (see :meth:`get_local`). By default, it falls back to
+        :meth:`embed` on the calling thread.
+        """
+        return np.asarray(self.embed([None], [image])[0])
+    
+    def embed_batch(
+        self,
+        indexes: np.ndarray | list | None,
+        images : np.ndarray | list[np.ndarray],
+    ) -> np.ndarray:
+        """Extract the features of many images (e.g., the crops of all the
+        objects in a frame) with a thread pool, and return them as a single
+        contiguous matrix.
+        
+        Args:
+            indexes: The ids of :param:`images` (e.g., track ids) used as the
+                keys of the cache. ``None`` disables the cache for this call.
+            images: Images of shape :math:`[N, H, W, C]`, or a list of images
+                of different sizes.
         
+        Return:
+            An array of shape :math:`[N, ...]`.
+        """
+        n = len(images)
+        if n == 0:
+            shape = self.feature_shape
+            return np.empty((0, *shape) if shape is not None else (0, 0), dtype=self.feature_dtype)
+        if indexes is None or self.cache_every == 1:
+            keys    = [None] * n
+            missing = list(range(n))
+        else:
+            keys    = [int(i) for i in indexes]
+            missing = []
+            for j, k in enumerate(keys):
+                entry = self.cache.get(k)
+                if entry is None or entry[0] >= self.cache_every:
+                    missing.append(j)
+        
+        if self.supports_threads:
+            computed = self.map(self.embed_one, [images[j] for j in missing])
+        else:
+            computed = [self.embed_one(images[j]) for j in missing]
+        results  = [None] * n
+        for j, f in zip(missing, computed):
+            results[j] = f
+            if keys[j] is not None:
+                self.cache[keys[j]] = [0, f]
+        for j, k in enumerate(keys):
+            if results[j] is None:
+                results[j] = self.cache[k][1]
+            if k is not None:
+                self.cache[k][0] += 1
+        
+        output = np.empty((n, *results[0].shape), dtype=results[0].dtype)
+        for j, f in enumerate(results):
+            output[j] = f
+        return output
+    
+    def forget(self, indexes: np.ndarray | list | None = None):
+        """Drop the cached features of :param:`indexes` (e.g., finished
+        tracks), or of all indexes if ``None``.
+        """
+        if indexes is None:
+            self.cache.clear()
+        else:
+            for i in indexes:
+                self.cache.pop(int(i), None)
+    
+    def map(self, fn: Callable, items: list) -> list:
+        """Apply :param:`fn` to every item, on :attr:`num_workers` threads.
+        OpenCV releases the GIL, so the calls run in parallel.
+        """
+        if self.num_workers <= 0 or len(items) <= 1:
+            return [fn(x) for x in items]
+        if self._executor is None:
+            self._executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers        = self.num_workers,
+                thread_name_prefix = "embedder"
+            )
+        return list(self._executor.map(fn, items))
+    
+    def get_local(self, name: str, factory: Callable[[], Any]) -> Any:
+        """Return the calling thread's instance of :param:`name`, created by
+        :param:`factory` on first use (e.g., a :class:`cv2.HOGDescriptor`).
+        """
+        value = getattr(self._local, name, None)
+        if value is None:
+            value = factory()
+            setattr(self._local, name, value)
+        return value
+    
     
 class DeepEmbedder(Embedder, ABC):
     """The base class for all deep learning-based embedders. It loads a
@@ -54,6 +192,10 @@ class DeepEmbedder(Embedder, ABC):
             ``'cpu'``.
         to_numpy: If ``True``, convert the embedded feature vectors to
             :class:`np.ndarray`. Default: ``False``.
+        buckets: The batch sizes that :meth:`embed_boxes` pads the number of
+            crops up to, so the backbone only sees a few distinct shapes. Larger
+            counts are split into chunks of the largest bucket.
+            Default: ``(8, 16, 32, 64)``.
     
     See Also: :class:`Embedder`.
     """
@@ -65,14 +207,17 @@ class DeepEmbedder(Embedder, ABC):
         image_size: int | list[int] = 224,
         device    : int | str | list[int | str] = "cpu",
         to_numpy  : bool = False,
+        buckets   : list[int] = (8, 16, 32, 64),
         *args, **kwargs
     ):
-        super().__init__()
-        self.config     = config
-        self.weight     = weight
-        self.image_size = core.get_hw(size=image_size)
-        self.device     = nn.select_device(device=device)
-        self.to_numpy   = to_numpy
+        super().__init__(*args, **kwargs)
+        self.config      = config
+        self.weight      = weight
+        self.image_size  = core.get_hw(size=image_size)
+        self.device      = nn.select_device(device=device)
+        self.to_numpy    = to_numpy
+        self.buckets     = sorted(buckets)
+        self.feature_dim = None
         # Load model
         self.model = None
         self.init_model()
@@ -126,6 +271,88 @@ class DeepEmbedder(Embedder, ABC):
         )
         return instances
     
+    @torch.no_grad()
+    def embed_boxes(
+        self,
+        frames: torch.Tensor,
+        boxes : torch.Tensor | list[torch.Tensor],
+    ) -> torch.Tensor | np.ndarray:
+        """Embed many detections at once: the crops are cut and resized on the
+        device with :func:`torchvision.ops.roi_align`, and run through the
+        backbone in padded batches.
+
+        Args:
+            frames: Frames in :math:`[0.0, 1.0]` of shape :math:`[B, C, H, W]`
+                or :math:`[C, H, W]`.
+            boxes: Boxes in :math:`[x1, y1, x2, y2]` pixel coordinates: a tensor
+                of shape :math:`[N, 4]` (of the only frame), a list of :math:`B`
+                tensors of shape :math:`[N_i, 4]`, or a tensor of shape
+                :math:`[N, 5]` whose first column is the frame index.
+
+        Returns:
+            L2-normalized embeddings of shape :math:`[N, D]`, in the order of
+            :param:`boxes`. Without boxes, an empty :math:`[0, D]` array.
+        """
+        if self.model is None:
+            raise ValueError(f"model has not been defined yet!")
+        if frames.ndim == 3:
+            frames = frames.unsqueeze(0)
+        frames = frames.to(self.device, non_blocking=True).float()
+        if isinstance(boxes, list | tuple):
+            boxes = [b.to(self.device).float() for b in boxes]
+        else:
+            boxes = boxes.to(self.device).float()
+            if boxes.shape[-1] == 4:
+                boxes = [boxes]
+        n = sum(len(b) for b in boxes) if isinstance(boxes, list) else len(boxes)
+        if n == 0:
+            if self.feature_dim is None:
+                # Probe the backbone once with a blank crop to learn D.
+                probe = frames.new_zeros((1, frames.shape[1], *self.image_size))
+                self.embed_crops(self.preprocess_crops(probe))
+            output = torch.empty(0, self.feature_dim, device=self.device)
+            return output.cpu().numpy() if self.to_numpy else output
+        
+        crops = torchvision.ops.roi_align(
+            input          = frames,
+            boxes          = boxes,
+            output_size    = self.image_size,
+            spatial_scale  = 1.0,
+            sampling_ratio = 2,
+            aligned        = True,
+        )
+        output = self.embed_crops(self.preprocess_crops(crops))
+        return output.cpu().numpy() if self.to_numpy else output
+    
+    def embed_crops(self, crops: torch.Tensor) -> torch.Tensor:
+        """Run preprocessed crops of shape :math:`[N, C, H, W]` through the
+        backbone in batches padded to :attr:`buckets`, and return their
+        L2-normalized embeddings of shape :math:`[N, D]`. :attr:`feature_dim`
+        is set to :math:`D`.
+        """
+        n        = len(crops)
+        features = []
+        max_size = self.buckets[-1]
+        for i in range(0, n, max_size):
+            chunk = crops[i:i + max_size]
+            size  = next(b for b in self.buckets if b >= len(chunk))
+            if size > len(chunk):
+                pad   = chunk.new_zeros((size - len(chunk), *chunk.shape[1:]))
+                chunk = torch.cat([chunk, pad], dim=0)
+            pred = self.forward(chunk)
+            pred = pred[0] if isinstance(pred, list | tuple) else pred
+            features.append(pred[:min(max_size, n - i)].flatten(1))
+        output           = nn.functional.normalize(torch.cat(features, dim=0).float(), p=2, dim=1)
+        self.feature_dim = output.shape[1]
+        return output
+    
+    def preprocess_crops(self, crops: torch.Tensor) -> torch.Tensor:
+        """Prepare the crops of :meth:`embed_boxes` (of shape :math:`[N, C, H,
+        W]`, in :math:`[0.0, 1.0]`) for the backbone, e.g., normalize them. By
+        default, they are passed as is.
+        """
+        return crops
+    
     @abstractmethod
     def preprocess(self, images: np.ndarray) -> torch.Tensor:
         """Preprocessing step.
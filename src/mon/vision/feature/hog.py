@@ -50,6 +50,10 @@ class HOGEmbedder(base.Embedder):
             orientation bins can provide more detailed information about the
             orientations, but may also increase the dimensionality of the
             feature vector and require more computation. Default: ``9``.
+        num_workers: The number of threads used by :meth:`embed_batch`.
+            Default: ``0``.
+        cache_every: Recompute the feature of each track at most every n calls
+            of :meth:`embed_batch`. Default: ``1`` means no caching.
         
     See Also:
         - :class:`mon.vision.model.embedding.base.Embedder`.
@@ -63,15 +67,25 @@ class HOGEmbedder(base.Embedder):
         block_stride: int       = (8, 8),
         cell_size   : int       = (8, 8),
         nbins       : int       = 9,
+        num_workers : int       = 0,
+        cache_every : int       = 1,
         *args, **kwargs
     ):
-        super().__init__()
-        self.hog = cv2.HOGDescriptor(
-            winSize     = win_size,
-            blockSize   = block_size,
-            blockStride = block_stride,
-            cellSize    = cell_size,
-            nbins       = nbins,
+        super().__init__(num_workers=num_workers, cache_every=cache_every)
+        self.win_size     = tuple(win_size)
+        self.block_size   = tuple(block_size)
+        self.block_stride = tuple(block_stride)
+        self.cell_size    = tuple(cell_size)
+        self.nbins        = nbins
+        self.hog          = self.create_hog()
+    
+    def create_hog(self) -> cv2.HOGDescriptor:
+        return cv2.HOGDescriptor(
+            _winSize     = self.win_size,
+            _blockSize   = self.block_size,
+            _blockStride = self.block_stride,
+            _cellSize    = self.cell_size,
+            _nbins       = self.nbins,
         )
         
     def embed(self, indexes: np.ndarray, images: np.ndarray) -> list[np.ndarray]:
@@ -91,4 +105,17 @@ class HOGEmbedder(base.Embedder):
             features.append(hog)
         return features
     
+    @property
+    def feature_shape(self) -> tuple[int, ...]:
+        return (self.hog.getDescriptorSize(),)
+    
+    def embed_one(self, image: np.ndarray) -> np.ndarray:
+        """Resize one crop to :attr:`win_size` and compute its HOG descriptor,
+        of length :attr:`hog.getDescriptorSize()`.
+        """
+        hog  = self.get_local("hog", self.create_hog)
+        gray = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY) if image.ndim == 3 else image
+        gray = cv2.resize(gray, self.win_size, interpolation=cv2.INTER_LINEAR)
+        return hog.compute(gray).reshape(-1)
+    
 # endregion
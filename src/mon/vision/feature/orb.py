@@ -52,6 +52,12 @@ class ORBEmbedder(base.Embedder):
             Of course, on smaller pyramid layers, the perceived image area
             covered by a feature will be larger.
         fast_threshold: The fast threshold.
+        crop_size: Resize each crop to this size in :math:`[H, W]` format in
+            :meth:`embed_batch`. Default: ``None`` means no resizing.
+        num_workers: The number of threads used by :meth:`embed_batch`.
+            Default: ``0``.
+        cache_every: Recompute the feature of each track at most every n calls
+            of :meth:`embed_batch`. Default: ``1`` means no caching.
     
     See Also:
         - :class:`mon.vision.model.embedding.base.Embedder`.
@@ -69,20 +75,26 @@ class ORBEmbedder(base.Embedder):
         score_type    : int   = cv2.ORB_HARRIS_SCORE,
         patch_size    : int   = 31,
         fast_threshold: int   = 20,
+        crop_size     : int | list[int] | None = None,
+        num_workers   : int   = 0,
+        cache_every   : int   = 1,
         *args, **kwargs
     ):
-        super().__init__()
-        self.orb = cv2.ORB_create(
-            nfeatures     = num_features,
-            scaleFactor   = scale_factor,
-            nlevels       = num_levels,
-            edgeThreshold = edge_threshold,
-            firstLevel    = first_level,
-            WTA_K         = wta_k,
-            scoreType     = score_type,
-            patchSize     = patch_size,
-            fastThreshold = fast_threshold,
-        )
+        super().__init__(num_workers=num_workers, cache_every=cache_every)
+        self.num_features = num_features
+        self.crop_size    = core.get_hw(size=crop_size) if crop_size is not None else None
+        self.orb_kwargs   = {
+            "nfeatures"    : num_features,
+            "scaleFactor"  : scale_factor,
+            "nlevels"      : num_levels,
+            "edgeThreshold": edge_threshold,
+            "firstLevel"   : first_level,
+            "WTA_K"        : wta_k,
+            "scoreType"    : score_type,
+            "patchSize"    : patch_size,
+            "fastThreshold": fast_threshold,
+        }
+        self.orb = cv2.ORB_create(**self.orb_kwargs)
         
     def embed(self, indexes: np.ndarray, images: np.ndarray) -> list[np.ndarray]:
         """Extract features in the images.
@@ -102,4 +114,29 @@ class ORBEmbedder(base.Embedder):
             features.append(feature)
         return features
     
+    @property
+    def feature_shape(self) -> tuple[int, ...]:
+        return (self.num_features, 32)
+    
+    @property
+    def feature_dtype(self) -> np.dtype:
+        return np.uint8
+    
+    def embed_one(self, image: np.ndarray) -> np.ndarray:
+        """Compute the ORB descriptors of one crop as an array of shape
+        :math:`[num\_features, 32]`. When fewer keypoints are found, the
+        remaining rows are zero, so ``np.any(feature, axis=-1)`` gives the valid
+        rows.
+        """
+        orb = self.get_local("orb", lambda: cv2.ORB_create(**self.orb_kwargs))
+        if self.crop_size is not None:
+            h, w  = self.crop_size
+            image = cv2.resize(image, (w, h), interpolation=cv2.INTER_LINEAR)
+        feature = np.zeros((self.num_features, 32), dtype=np.uint8)
+        _, des  = orb.detectAndCompute(image, None)
+        if des is not None:
+            k = min(len(des), self.num_features)
+            feature[:k] = des[:k]
+        return feature
+    
 # endregion
@@ -6,11 +6,14 @@
 from __future__ import annotations
 
 __all__ = [
-    "guided_filter",
+    "box_filter_torch", "fast_guided_filter_torch", "guided_filter",
+    "guided_filter_torch", "guided_upsample_torch",
 ]
 
 import cv2
 import numpy as np
+import torch
+from torch.nn import functional as F
 
 from mon.vision import core
 
@@ -86,4 +89,215 @@ def guided_filter(
     output  = mean_a * input + mean_b
     return output
 
+
+
+def _diff_x(input: torch.Tensor, r: int) -> torch.Tensor:
+    """Window sums along the height axis from a cumulative sum."""
+    left   = input[:, :, r:2 * r + 1]
+    middle = input[:, :, 2 * r + 1:] - input[:, :, :-2 * r - 1]
+    right  = input[:, :, -1:] - input[:, :, -2 * r - 1:-r - 1]
+    return torch.cat([left, middle, right], dim=2)
+
+
+def _diff_y(input: torch.Tensor, r: int) -> torch.Tensor:
+    """Window sums along the width axis from a cumulative sum."""
+    left   = input[:, :, :, r:2 * r + 1]
+    middle = input[:, :, :, 2 * r + 1:] - input[:, :, :, :-2 * r - 1]
+    right  = input[:, :, :, -1:] - input[:, :, :, -2 * r - 1:-r - 1]
+    return torch.cat([left, middle, right], dim=3)
+
+
+def box_filter_torch(input: torch.Tensor, radius: int) -> torch.Tensor:
+    """Mean filter with a :math:`(2r + 1) \\times (2r + 1)` window, computed
+    with integral images (cumulative sums), so the cost per pixel does not
+    depend on the radius. Near the borders, the mean is taken over the part of
+    the window that lies inside the image.
+    
+    Args:
+        input: An image in :math:`[B, C, H, W]` format, with
+            :math:`H, W > 2r + 1`.
+        radius: The radius :math:`r` of the window.
+    
+    Returns:
+        A filtered image of the same shape.
+    """
+    if input.ndim != 4:
+        raise ValueError(f"input must be a 4D tensor, but got {input.ndim}D.")
+    h, w = input.shape[-2:]
+    if h <= 2 * radius + 1 or w <= 2 * radius + 1:
+        raise ValueError(
+            f"input's height and width must be > 2 * radius + 1, but got "
+            f"{[h, w]} and radius={radius}."
+        )
+    ones = torch.ones((1, 1, h, w), dtype=input.dtype, device=input.device)
+    n    = _diff_y(_diff_x(ones.cumsum(dim=2), radius).cumsum(dim=3), radius)
+    sums = _diff_y(_diff_x(input.cumsum(dim=2), radius).cumsum(dim=3), radius)
+    return sums / n
+
+
+def _guided_filter_coefficients(
+    input : torch.Tensor,
+    guide : torch.Tensor,
+    radius: int,
+    eps   : float,
+) -> tuple[torch.Tensor, torch.Tensor]:
+    """Compute the box-filtered linear coefficients :math:`(\\bar{a}, \\bar{b})`
+    of the guided filter so that the output is
+    :math:`\\sum_k \\bar{a}_k I_k + \\bar{b}`.
+    """
+    mean_i = box_filter_torch(guide, radius)
+    mean_p = box_filter_torch(input, radius)
+    if guide.shape[1] == 1:
+        cov_ip = box_filter_torch(guide * input, radius) - mean_i * mean_p
+        var_i  = box_filter_torch(guide * guide, radius) - mean_i * mean_i
+        a      = cov_ip / (var_i + eps)                          # [B, C, H, W]
+        b      = mean_p - a * mean_i
+        return box_filter_torch(a, radius).unsqueeze(2), box_filter_torch(b, radius)
+    
+    # Color guide: solve (Sigma + eps * U) a = cov(I, p) at every pixel.
+    c      = guide.shape[1]
+    cov_ip = torch.stack([
+        box_filter_torch(guide * input[:, j:j + 1], radius) - mean_i * mean_p[:, j:j + 1]
+        for j in range(input.shape[1])
+    ], dim=1)                                                    # [B, C, Cg, H, W]
+    ii     = guide.unsqueeze(1) * guide.unsqueeze(2)             # [B, Cg, Cg, H, W]
+    var_i  = box_filter_torch(ii.flatten(1, 2), radius).unflatten(1, (c, c))
+    var_i  = var_i - mean_i.unsqueeze(1) * mean_i.unsqueeze(2)
+    var_i  = var_i + eps * torch.eye(c, dtype=guide.dtype, device=guide.device)[None, :, :, None, None]
+    a      = torch.linalg.solve(
+        var_i.permute(0, 3, 4, 1, 2),                            # [B, H, W, Cg, Cg]
+        cov_ip.permute(0, 3, 4, 2, 1),                           # [B, H, W, Cg, C]
+    ).permute(0, 4, 3, 1, 2)                                     # [B, C, Cg, H, W]
+    b      = mean_p - (a * mean_i.unsqueeze(1)).sum(dim=2)
+    mean_a = box_filter_torch(a.flatten(1, 2), radius).unflatten(1, a.shape[1:3])
+    return mean_a, box_filter_torch(b, radius)
+
+
+def guided_filter_torch(
+    input : torch.Tensor,
+    guide : torch.Tensor | None = None,
+    radius: int                 = 8,
+    eps   : float               = 0.01,
+) -> torch.Tensor:
+    """Batched guided filter on :class:`torch.Tensor` (CPU or GPU).
+    
+    All box filters are computed with integral images, so the cost per pixel
+    does not depend on :param:`radius`.
+    
+    Args:
+        input: An image in :math:`[B, C, H, W]` format.
+        guide: A guidance image in :math:`[B, 1, H, W]` (gray) or
+            :math:`[B, 3, H, W]` (color) format. Default: ``None`` means using
+            :param:`input` itself (channel by channel).
+        radius: The radius of the window. Default: ``8``.
+        eps: Value controlling sharpness. Default: ``0.01``.
+    
+    Returns:
+        A filtered image of the same shape as :param:`input`.
+    
+    References:
+        - `<https://github.com/wuhuikai/DeepGuidedFilter>`__
+    """
+    dtype = input.dtype
+    input = input.float()
+    if guide is None:
+        return torch.cat([
+            guided_filter_torch(input[:, j:j + 1], input[:, j:j + 1], radius, eps)
+            for j in range(input.shape[1])
+        ], dim=1).to(dtype)
+    guide = guide.float()
+    if guide.shape[1] not in [1, 3]:
+        raise ValueError(f"guide must have 1 or 3 channels, but got {guide.shape[1]}.")
+    if guide.shape[-2:] != input.shape[-2:]:
+        raise ValueError(
+            f"input and guide must have the same spatial size, but got "
+            f"{list(input.shape[-2:])} and {list(guide.shape[-2:])}."
+        )
+    mean_a, mean_b = _guided_filter_coefficients(input, guide, radius, eps)
+    output = (mean_a * guide.unsqueeze(1)).sum(dim=2) + mean_b
+    return output.to(dtype)
+
+
+def guided_upsample_torch(
+    input    : torch.Tensor,
+    guide    : torch.Tensor,
+    radius   : int                 = 1,
+    eps      : float               = 1e-4,
+    guide_low: torch.Tensor | None = None,
+) -> torch.Tensor:
+    """Upsample a low-resolution map (e.g., an illumination or curve parameter
+    map) to the resolution of a high-resolution guide. The guided filter
+    coefficients are computed at low resolution, then bilinearly upsampled and
+    applied to the full-resolution guide.
+    
+    Args:
+        input: A low-resolution map in :math:`[B, C, h, w]` format.
+        guide: A high-resolution guidance image in :math:`[B, 1, H, W]` or
+            :math:`[B, 3, H, W]` format.
+        radius: The radius of the window at low resolution. Default: ``1``.
+        eps: Value controlling sharpness. Default: ``1e-4``.
+        guide_low: The guide at low resolution. Default: ``None`` means
+            bilinearly downsampling :param:`guide`.
+    
+    Returns:
+        The upsampled map in :math:`[B, C, H, W]` format.
+    
+    References:
+        - `<https://arxiv.org/abs/1505.00996>`__
+    """
+    dtype = input.dtype
+    input = input.float()
+    guide = guide.float()
+    if guide.shape[1] not in [1, 3]:
+        raise ValueError(f"guide must have 1 or 3 channels, but got {guide.shape[1]}.")
+    if guide_low is None:
+        guide_low = F.interpolate(guide, size=input.shape[-2:], mode="bilinear", align_corners=False)
+    mean_a, mean_b = _guided_filter_coefficients(input, guide_low.float(), radius, eps)
+    size   = guide.shape[-2:]
+    mean_a = F.interpolate(mean_a.flatten(1, 2), size=size, mode="bilinear", align_corners=False)
+    mean_a = mean_a.unflatten(1, (input.shape[1], guide.shape[1]))
+    mean_b = F.interpolate(mean_b, size=size, mode="bilinear", align_corners=False)
+    output = (mean_a * guide.unsqueeze(1)).sum(dim=2) + mean_b
+    return output.to(dtype)
+
+
+def fast_guided_filter_torch(
+    input : torch.Tensor,
+    guide : torch.Tensor,
+    radius: int   = 8,
+    eps   : float = 0.01,
+    scale : int   = 4,
+) -> torch.Tensor:
+    """Fast guided filter: subsample :param:`input` and :param:`guide` by
+    :param:`scale`, compute the coefficients at low resolution with radius
+    :math:`r / s`, and apply the upsampled coefficients to the full-resolution
+    guide. The cost is reduced by about :math:`s^2`.
+    
+    Args:
+        input: An image in :math:`[B, C, H, W]` format.
+        guide: A guidance image in :math:`[B, 1, H, W]` or :math:`[B, 3, H, W]`
+            format.
+        radius: The radius of the window at full resolution. Default: ``8``.
+        eps: Value controlling sharpness. Default: ``0.01``.
+        scale: The subsampling ratio :math:`s`. Default: ``4``.
+    
+    Returns:
+        A filtered image of the same shape as :param:`input`.
+    
+    References:
+        - `<https://arxiv.org/abs/1505.00996>`__
+    """
+    if scale <= 1:
+        return guided_filter_torch(input=input, guide=guide, radius=radius, eps=eps)
+    size      = [max(1, input.shape[-2] // scale), max(1, input.shape[-1] // scale)]
+    input_low = F.interpolate(input.float(), size=size, mode="nearest")
+    guide_low = F.interpolate(guide.float(), size=size, mode="nearest")
+    return guided_upsample_torch(
+        input     = input_low,
+        guide     = guide,
+        radius    = max(1, radius // scale),
+        eps       = eps,
+        guide_low = guide_low,
+    ).to(input.dtype)
+
 # endregion
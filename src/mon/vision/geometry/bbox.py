@@ -1,378 +1,476 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
-"""This module implements geometry functions for bounding boxes."""
+"""This module implements geometry functions for bounding boxes.
+
+Every function accepts :class:`numpy.ndarray` and :class:`torch.Tensor` inputs
+of shape :math:`[..., 4]` (e.g., :math:`[N, 4]` or :math:`[B, N, 4]`, extra
+columns such as scores or class ids are ignored), works on views of the
+coordinates without copying the input, and returns the same type.
+"""
 
 from __future__ import annotations
 
 __all__ = [
-    "bbox_coco_to_voc", "bbox_coco_to_yolo", "bbox_cxcywhn_to_xywh",
-    "bbox_cxcywhn_to_xyxy", "bbox_cxcywhn_to_xyxyn", "bbox_voc_to_coco",
-    "bbox_voc_to_yolo", "bbox_xywh_to_cxcywhn", "bbox_xywh_to_xyxy",
-    "bbox_xywh_to_xyxyn", "bbox_xyxy_to_cxcywhn", "bbox_xyxy_to_xywh",
+    "bbox_batched_nms", "bbox_coco_to_voc", "bbox_coco_to_yolo",
+    "bbox_cxcywhn_to_xywh", "bbox_cxcywhn_to_xyxy", "bbox_cxcywhn_to_xyxyn",
+    "bbox_nms", "bbox_voc_to_coco", "bbox_voc_to_yolo", "bbox_xywh_to_cxcywhn",
+    "bbox_xywh_to_xyxy", "bbox_xywh_to_xyxyn", "bbox_xyxy_to_cxcywhn",
     "bbox_xyxy_to_xywh", "bbox_xyxy_to_xyxyn", "bbox_xyxyn_to_cxcywhn",
     "bbox_xyxyn_to_xywh", "bbox_xyxyn_to_xyxy", "bbox_yolo_to_coco",
-    "bbox_yolo_to_voc", "convert_bbox", "get_bbox_area", "get_bbox_center",
-    "get_bbox_corners", "get_bbox_corners_points",
+    "bbox_yolo_to_voc", "clip_bbox", "convert_bbox", "get_bbox_area",
+    "get_bbox_center", "get_bbox_ciou", "get_bbox_corners",
+    "get_bbox_corners_points", "get_bbox_diou", "get_bbox_giou",
     "get_bbox_intersection_union", "get_bbox_iou", "get_bbox_iou2",
     "get_enclosing_bbox", "get_single_bbox_iou",
 ]
 
+import math
+
 import numpy as np
 import torch
+import torchvision
 
 from mon.globals import ShapeCode
-from mon.vision import core, nn
+from mon.vision import core
 
 console      = core.console
 _current_dir = core.Path(__file__).absolute().parent
 
+Array = np.ndarray | torch.Tensor
+
+
+# region Helper
+
+def _stack(values: list[Array], like: Array) -> Array:
+    if isinstance(like, torch.Tensor):
+        return torch.stack(values, dim=-1)
+    return np.stack(values, axis=-1)
+
+
+def _maximum(x: Array, y: Array) -> Array:
+    return torch.maximum(x, y) if isinstance(x, torch.Tensor) else np.maximum(x, y)
+
+
+def _minimum(x: Array, y: Array) -> Array:
+    return torch.minimum(x, y) if isinstance(x, torch.Tensor) else np.minimum(x, y)
+
+
+def _clamp(x: Array, min: float | None = None, max: float | None = None) -> Array:
+    return x.clamp(min=min, max=max) if isinstance(x, torch.Tensor) else np.clip(x, min, max)
+
+
+def _pairwise(bbox1: Array, bbox2: Array) -> tuple[Array, Array]:
+    """Broadcast :math:`[..., N, 4]` and :math:`[..., M, 4]` boxes to
+    :math:`[..., N, 1, 4]` and :math:`[..., 1, M, 4]` views.
+    """
+    return bbox1[..., :, None, :], bbox2[..., None, :, :]
+
+
+def _atan(x: Array) -> Array:
+    return torch.atan(x) if isinstance(x, torch.Tensor) else np.arctan(x)
+
+# endregion
+
 
 # region Property
 
-def get_bbox_area(bbox: np.ndarray) -> np.ndarray:
+def get_bbox_area(bbox: Array) -> Array:
     """Compute the area of bounding boxes.
     
     Args:
-        bbox: Bounding boxes in XYXY format.
+        bbox: Bounding boxes of shape :math:`[..., 4]` in XYXY format.
     
     Returns:
-        The area value for each bbox.
+        The area value for each bbox of shape :math:`[...]`.
     """
-    x1, y1, x2, y2, *_ = bbox.T
-    area = (x2 - x1) * (y2 - y1)
-    return area
+    return (bbox[..., 2] - bbox[..., 0]) * (bbox[..., 3] - bbox[..., 1])
 
 
-def get_bbox_center(bbox: np.ndarray) -> np.ndarray:
+def get_bbox_center(bbox: Array) -> Array:
     """Compute the center of bounding box(es).
     
     Args:
-        bbox: Bounding boxes in XYXY format.
+        bbox: Bounding boxes of shape :math:`[..., 4]` in XYXY format.
     
     Returns:
-        The center for each bbox described by the coordinates (cx, cy).
+        The center for each bbox described by the coordinates (cx, cy) of
+        shape :math:`[..., 2]`.
     """
-    x1, y1, x2, y2, *_ = bbox.T
-    cx     = x1 + (x2 - x1) / 2
-    cy     = y1 + (y2 - y1) / 2
-    center = np.stack((cx, cy), -1)
-    return center
+    cx = (bbox[..., 0] + bbox[..., 2]) / 2
+    cy = (bbox[..., 1] + bbox[..., 3]) / 2
+    return _stack([cx, cy], like=bbox)
 
 
-def get_bbox_corners(bbox: np.ndarray) -> np.ndarray:
+def get_bbox_corners(bbox: Array) -> Array:
     """Get corners of bounding boxes.
     
     Args:
-        bbox: Bounding boxes in XYXY format.
+        bbox: Bounding boxes of shape :math:`[..., 4]` in XYXY format.
     
     Returns:
-        A tensor of shape `N x 8` containing N bounding boxes each described by
-        their corner coordinates (x1 y1 x2 y2 x3 y3 x4 y4).
+        Bounding boxes of shape :math:`[..., 8]` each described by their
+        corner coordinates (x1 y1 x2 y2 x3 y3 x4 y4).
     """
-    x1, y1, x2, y2, *_ = bbox.T
-    w       = x2 - x1
-    h       = y2 - y1
-    c_x1    = x1
-    c_y1    = y1
-    c_x2    = x1 + w
-    c_y2    = y1
-    c_x3    = x2
-    c_y3    = y2
-    c_x4    = x1
-    c_y4    = y1 + h
-    corners = np.hstack((c_x1, c_y1, c_x2, c_y2, c_x3, c_y3, c_x4, c_y4))
-    return corners
-
-
-def get_bbox_corners_points(bbox: np.ndarray) -> np.ndarray:
-    """Get corners of bounding boxes as points.
+    x1, y1, x2, y2 = bbox[..., 0], bbox[..., 1], bbox[..., 2], bbox[..., 3]
+    return _stack([x1, y1, x2, y1, x2, y2, x1, y2], like=bbox)
+
+
+def get_bbox_corners_points(bbox: Array) -> Array:
+    """Get corners of bounding boxes as integer points.
     
     Args:
-        bbox: Bounding boxes in XYXY format.
+        bbox: Bounding boxes of shape :math:`[..., 4]` in XYXY format.
     
     Returns:
-        Corners.
+        Corners of shape :math:`[..., 4, 2]`.
     """
-    x1, y1, x2, y2, *_ = bbox.T
-    w      = x2 - x1
-    h      = y2 - y1
-    c_x1   = x1
-    c_y1   = y1
-    c_x2   = x1 + w
-    c_y2   = y1
-    c_x3   = x2
-    c_y3   = y2
-    c_x4   = x1
-    c_y4   = y1 + h
-    points = np.array([[c_x1, c_y1], [c_x2, c_y2], [c_x3, c_y3], [c_x4, c_y4]], np.int32)
-    return points
-
-
-def get_bbox_intersection_union(
-    bbox1: np.ndarray,
-    bbox2: np.ndarray
-) -> tuple[np.ndarray, np.ndarray]:
-    """Compute the intersection and union of two sets of boxes.
+    corners = get_bbox_corners(bbox=bbox)
+    points  = corners.reshape(*corners.shape[:-1], 4, 2)
+    return points.int() if isinstance(points, torch.Tensor) else points.astype(np.int32)
+
+
+def get_enclosing_bbox(bbox: Array) -> Array:
+    """Get an enclosing bbox for rotated corners of a bounding box.
+    
+    Args:
+        bbox: Bounding of shape :math:`[..., 8]`, containing bounding boxes
+            each described by their corner coordinates
+            (x1 y1 x2 y2 x3 y3 x4 y4), and optionally extra columns.
+    
+    Returns:
+        Bounding boxes of shape :math:`[..., 4]` in XYXY format, followed by
+        the extra columns.
+    """
+    x = bbox[..., 0:8:2]
+    y = bbox[..., 1:8:2]
+    if isinstance(bbox, torch.Tensor):
+        xyxy = torch.stack([x.amin(-1), y.amin(-1), x.amax(-1), y.amax(-1)], dim=-1)
+        return torch.cat([xyxy, bbox[..., 8:]], dim=-1)
+    xyxy = np.stack([x.min(-1), y.min(-1), x.max(-1), y.max(-1)], axis=-1)
+    return np.concatenate([xyxy, bbox[..., 8:]], axis=-1)
+
+# endregion
+
+
+# region IoU
+
+def get_bbox_intersection_union(bbox1: Array, bbox2: Array) -> tuple[Array, Array]:
+    """Compute the pairwise intersection and union of two sets of boxes.
     
     References:
         `<https://github.com/kuangliu/torchcv/blob/master/torchcv/utils/box.py>`__
     
     Args:
-        bbox1: The first set of boxes in XYXY format.
-        bbox2: The second set of boxes in XYXY format.
-        
+        bbox1: The first set of boxes of shape :math:`[..., N, 4]` in XYXY
+            format.
+        bbox2: The second set of boxes of shape :math:`[..., M, 4]` in XYXY
+            format.
+    
     Returns:
-        Intersection.
-        Union.
+        Intersection of shape :math:`[..., N, M]`.
+        Union of shape :math:`[..., N, M]`.
     """
-    area1 = get_bbox_area(bbox=bbox1)
-    area2 = get_bbox_area(bbox=bbox2)
-    lt    = np.max(bbox1[:, None, :2], bbox2[:, :2])  # [N, M, 2]
-    rb    = np.min(bbox1[:, None, 2:], bbox2[:, 2:])  # [N, M, 2]
-    wh    = nn.upcast(rb - lt).clamp(min=0)  # [N, M, 2]
-    inter = wh[:, :, 0] * wh[:, :, 1]  # [N, M]
-    union = area1[:, None] + area2 - inter
+    b1, b2 = _pairwise(bbox1[..., :4], bbox2[..., :4])
+    lt     = _maximum(b1[..., :2], b2[..., :2])   # [..., N, M, 2]
+    rb     = _minimum(b1[..., 2:], b2[..., 2:])   # [..., N, M, 2]
+    wh     = _clamp(rb - lt, min=0)               # [..., N, M, 2]
+    inter  = wh[..., 0] * wh[..., 1]              # [..., N, M]
+    union  = get_bbox_area(b1) + get_bbox_area(b2) - inter
     return inter, union
 
 
-def get_bbox_iou(bbox1: np.ndarray, bbox2: np.ndarray) -> np.ndarray:
-    """Return the intersection-over-union (Jaccard index) between two sets of
-    boxes.
+def get_bbox_iou(bbox1: Array, bbox2: Array, eps: float = 1e-9) -> Array:
+    """Return the pairwise intersection-over-union (Jaccard index) between two
+    sets of boxes.
     
     Args:
-        bbox1: The first set of boxes in XYXY format.
-        bbox2: The second set of boxes of in XYXY format.
+        bbox1: The first set of boxes of shape :math:`[..., N, 4]` in XYXY
+            format.
+        bbox2: The second set of boxes of shape :math:`[..., M, 4]` in XYXY
+            format.
+        eps: A small value added to the union to avoid dividing by zero, so
+            the IoU of non-degenerate boxes is slightly lower than the exact
+            value. Default: ``1e-9``.
     
     Returns:
-        The NxM matrix containing the pairwise IoU values for every element
-        in :param:`bbox1` and :param:`bbox2`.
+        The :math:`[..., N, M]` matrix containing the pairwise IoU values for
+        every element in :param:`bbox1` and :param:`bbox2`.
     """
     inter, union = get_bbox_intersection_union(bbox1=bbox1, bbox2=bbox2)
-    iou = inter / union
-    return iou
+    return inter / (union + eps)
 
 
-def get_bbox_iou2(bbox1: np.ndarray, bbox2: np.ndarray) -> np.ndarray:
-    """From SORT: Compute IOU between two sets of boxes.
+def get_bbox_iou2(bbox1: Array, bbox2: Array) -> Array:
+    """From SORT: Compute IOU between two sets of boxes. Same as
+    :func:`get_bbox_iou`. Unlike the original SORT code, ``1e-9`` is added to
+    the union, which changes the IoU values by a relative amount of about
+    ``1e-9 / union``.
+    """
+    return get_bbox_iou(bbox1=bbox1, bbox2=bbox2)
+
+
+def _enclosing_and_centers(bbox1: Array, bbox2: Array):
+    """Return the pairwise IoU, the enclosing boxes' width and height, and the
+    squared distance between the boxes' centers.
+    """
+    inter, union = get_bbox_intersection_union(bbox1=bbox1, bbox2=bbox2)
+    b1, b2 = _pairwise(bbox1[..., :4], bbox2[..., :4])
+    lt     = _minimum(b1[..., :2], b2[..., :2])
+    rb     = _maximum(b1[..., 2:], b2[..., 2:])
+    wh     = rb - lt
+    d      = (b1[..., :2] + b1[..., 2:] - b2[..., :2] - b2[..., 2:]) / 2
+    rho2   = d[..., 0] ** 2 + d[..., 1] ** 2
+    return inter, union, wh, rho2
+
+
+def get_bbox_giou(bbox1: Array, bbox2: Array, eps: float = 1e-9) -> Array:
+    """Return the pairwise generalized IoU between two sets of boxes, in
+    :math:`[-1, 1]`.
     
-    Return intersection-over-union (Jaccard index) between two sets of boxes.
-    Both sets of boxes are expected to be in [x1, y1, x2, y2] format with
-    `0 <= x1 < x2` and `0 <= y1 < y2`.
+    References:
+        `<https://giou.stanford.edu/>`__
+    
+    Args:
+        bbox1: The first set of boxes of shape :math:`[..., N, 4]` in XYXY
+            format.
+        bbox2: The second set of boxes of shape :math:`[..., M, 4]` in XYXY
+            format.
+        eps: A small value to avoid dividing by zero. Default: ``1e-9``.
+    
+    Returns:
+        The :math:`[..., N, M]` GIoU matrix.
+    """
+    inter, union, wh, _ = _enclosing_and_centers(bbox1, bbox2)
+    area = wh[..., 0] * wh[..., 1]
+    return inter / (union + eps) - (area - union) / (area + eps)
+
 
+def get_bbox_diou(bbox1: Array, bbox2: Array, eps: float = 1e-9) -> Array:
+    """Return the pairwise distance IoU between two sets of boxes: the IoU
+    penalized by the squared distance between the centers, normalized by the
+    squared diagonal of the enclosing box.
+    
+    References:
+        `<https://arxiv.org/abs/1911.08287>`__
+    
     Args:
-        bbox1: The first set of boxes of shape [N, 4].
-        bbox2: The second set of boxes of shape [M, 4].
+        bbox1: The first set of boxes of shape :math:`[..., N, 4]` in XYXY
+            format.
+        bbox2: The second set of boxes of shape :math:`[..., M, 4]` in XYXY
+            format.
+        eps: A small value to avoid dividing by zero. Default: ``1e-9``.
     
     Returns:
-        The NxM matrix containing the pairwise IoU values for every element in
-        boxes1 and boxes2.
+        The :math:`[..., N, M]` DIoU matrix.
     """
-    assert bbox1.ndim == 2
-    assert bbox2.ndim == 2
-    if isinstance(bbox1, np.ndarray) and type(bbox1) == type(bbox2):
-        bbox1 = np.expand_dims(bbox1, 1)
-        bbox2 = np.expand_dims(bbox2, 0)
-        xx1   = np.maximum(bbox1[..., 0], bbox2[..., 0])
-        yy1   = np.maximum(bbox1[..., 1], bbox2[..., 1])
-        xx2   = np.minimum(bbox1[..., 2], bbox2[..., 2])
-        yy2   = np.minimum(bbox1[..., 3], bbox2[..., 3])
-        w     = np.maximum(0.0, xx2 - xx1)
-        h     = np.maximum(0.0, yy2 - yy1)
-    else:
-        raise TypeError
-    wh  = w * h
-    iou = wh / ((bbox1[..., 2] - bbox1[..., 0]) *
-                (bbox1[..., 3] - bbox1[..., 1]) +
-                (bbox2[..., 2] - bbox2[..., 0]) *
-                (bbox2[..., 3] - bbox2[..., 1]) - wh)
-    return iou
+    inter, union, wh, rho2 = _enclosing_and_centers(bbox1, bbox2)
+    c2 = wh[..., 0] ** 2 + wh[..., 1] ** 2
+    return inter / (union + eps) - rho2 / (c2 + eps)
 
 
-def get_single_bbox_iou(bbox1: np.ndarray, bbox2: np.ndarray) -> np.ndarray | float:
-    """Return intersection-over-union (Jaccard index) between two boxes.
+def get_bbox_ciou(bbox1: Array, bbox2: Array, eps: float = 1e-9) -> Array:
+    """Return the pairwise complete IoU between two sets of boxes: the DIoU
+    further penalized by the inconsistency of the aspect ratios.
+    
+    References:
+        `<https://arxiv.org/abs/1911.08287>`__
     
     Args:
-        bbox1: The first bbox of shape in XYXY format.
-        bbox2: The second bbox of shape in XYXY format.
+        bbox1: The first set of boxes of shape :math:`[..., N, 4]` in XYXY
+            format.
+        bbox2: The second set of boxes of shape :math:`[..., M, 4]` in XYXY
+            format.
+        eps: A small value to avoid dividing by zero. Default: ``1e-9``.
     
     Returns:
-        The IoU value for :param:`bbox1` and :param:`bbox2`.
+        The :math:`[..., N, M]` CIoU matrix.
     """
-    xx1 = np.maximum(bbox1[0], bbox2[0])
-    yy1 = np.maximum(bbox1[1], bbox2[1])
-    xx2 = np.minimum(bbox1[2], bbox2[2])
-    yy2 = np.minimum(bbox1[3], bbox2[3])
-    w   = np.maximum(0.0, xx2 - xx1)
-    h   = np.maximum(0.0, yy2 - yy1)
-    wh  = w * h
-    iou = wh / ((bbox1[2] - bbox1[0]) *
-                (bbox1[3] - bbox1[1]) +
-                (bbox2[2] - bbox2[0]) *
-                (bbox2[3] - bbox2[1]) - wh)
-    return iou
-
-
-def get_enclosing_bbox(bbox: np.ndarray) -> np.ndarray:
-    """Get an enclosing bbox for rotated corners of a bounding box.
+    inter, union, wh, rho2 = _enclosing_and_centers(bbox1, bbox2)
+    iou    = inter / (union + eps)
+    c2     = wh[..., 0] ** 2 + wh[..., 1] ** 2
+    b1, b2 = _pairwise(bbox1[..., :4], bbox2[..., :4])
+    atan1  = _atan((b1[..., 2] - b1[..., 0]) / (b1[..., 3] - b1[..., 1] + eps))
+    atan2  = _atan((b2[..., 2] - b2[..., 0]) / (b2[..., 3] - b2[..., 1] + eps))
+    v      = (4 / math.pi ** 2) * (atan2 - atan1) ** 2
+    alpha  = v / (1 - iou + v + eps)
+    if isinstance(alpha, torch.Tensor):
+        alpha = alpha.detach()
+    return iou - rho2 / (c2 + eps) - alpha * v
+
+
+def get_single_bbox_iou(bbox1: Array, bbox2: Array) -> Array | float:
+    """Return the intersection-over-union (Jaccard index) between aligned
+    boxes, i.e., :param:`bbox1[i]` with :param:`bbox2[i]`.
     
     Args:
-        bbox: Bounding of shape [..., 8], containing N bounding boxes each
-            described by their corner co-ordinates (x1 y1 x2 y2 x3 y3 x4 y4).
-
+        bbox1: The first bbox(es) of shape :math:`[..., 4]` in XYXY format.
+        bbox2: The second bbox(es) of shape :math:`[..., 4]` in XYXY format.
+    
     Returns:
-        Bounding boxes of shape [..., 4] and in XYXY format.
+        The IoU value(s) of shape :math:`[...]`.
     """
-    x_ = bbox[:, [0, 2, 4, 6]]
-    y_ = bbox[:, [1, 3, 5, 7]]
-    x1 = np.min(x_, 1).reshape(-1, 1)
-    y1 = np.min(y_, 1).reshape(-1, 1)
-    x2 = np.max(x_, 1).reshape(-1, 1)
-    y2 = np.max(y_, 1).reshape(-1, 1)
-    return np.hstack((x1, y1, x2, y2, bbox[:, 8:]))
+    w  = _clamp(_minimum(bbox1[..., 2], bbox2[..., 2]) - _maximum(bbox1[..., 0], bbox2[..., 0]), min=0)
+    h  = _clamp(_minimum(bbox1[..., 3], bbox2[..., 3]) - _maximum(bbox1[..., 1], bbox2[..., 1]), min=0)
+    wh = w * h
+    return wh / (get_bbox_area(bbox1) + get_bbox_area(bbox2) - wh)
+
+# endregion
+
+
+# region NMS
 
+def bbox_nms(
+    bbox         : Array,
+    scores       : Array,
+    iou_threshold: float = 0.5,
+) -> Array:
+    """Non-maximum suppression.
+    
+    Tensors go through :func:`torchvision.ops.nms`. Arrays are suppressed
+    greedily, one IoU row per kept box.
+    
+    Args:
+        bbox: Bounding boxes of shape :math:`[N, 4]` in XYXY format.
+        scores: Scores of shape :math:`[N]`.
+        iou_threshold: Boxes overlapping a kept box with an IoU larger than
+            this are discarded. Default: ``0.5``.
+    
+    Returns:
+        The indexes of the kept boxes, sorted by decreasing score.
+    """
+    if isinstance(bbox, torch.Tensor):
+        return torchvision.ops.nms(bbox[:, :4].float(), scores.float(), iou_threshold)
+    order = np.argsort(-scores, kind="stable")
+    area  = get_bbox_area(bbox)
+    keep  = []
+    while order.size > 0:
+        i = order[0]
+        keep.append(i)
+        rest = order[1:]
+        w    = np.maximum(0.0, np.minimum(bbox[i, 2], bbox[rest, 2]) - np.maximum(bbox[i, 0], bbox[rest, 0]))
+        h    = np.maximum(0.0, np.minimum(bbox[i, 3], bbox[rest, 3]) - np.maximum(bbox[i, 1], bbox[rest, 1]))
+        inter = w * h
+        iou   = inter / (area[i] + area[rest] - inter + 1e-9)
+        order = rest[iou <= iou_threshold]
+    return np.array(keep, dtype=np.int64)
+
+
+def bbox_batched_nms(
+    bbox         : Array,
+    scores       : Array,
+    classes      : Array,
+    iou_threshold: float = 0.5,
+) -> Array:
+    """Non-maximum suppression done independently per class, in one call: the
+    boxes of each class are shifted by an offset so that boxes of different
+    classes never overlap.
+    
+    Args:
+        bbox: Bounding boxes of shape :math:`[N, 4]` in XYXY format.
+        scores: Scores of shape :math:`[N]`.
+        classes: Class ids of shape :math:`[N]`.
+        iou_threshold: Boxes overlapping a kept box of the same class with an
+            IoU larger than this are discarded. Default: ``0.5``.
+    
+    Returns:
+        The indexes of the kept boxes, sorted by decreasing score.
+    """
+    if len(bbox) == 0:
+        return bbox_nms(bbox, scores, iou_threshold)
+    if isinstance(bbox, torch.Tensor):
+        return torchvision.ops.batched_nms(bbox[:, :4].float(), scores.float(), classes, iou_threshold)
+    offset = classes.astype(bbox.dtype)[:, None] * (bbox[:, :4].max() + 1)
+    return bbox_nms(bbox[:, :4] + offset, scores, iou_threshold)
 
 # endregion
 
 
 # region Conversion
 
-def bbox_cxcywhn_to_xywh(bbox: np.ndarray, height: int, width: int) -> np.ndarray:
+def bbox_cxcywhn_to_xywh(bbox: Array, height: int, width: int) -> Array:
     """Convert bounding boxes from CXCYWHN format to XYWH format."""
-    cx_norm, cy_norm, w_norm, h_norm, *_ = bbox.T
-    w    = w_norm * width
-    h    = h_norm * height
-    x    = (cx_norm * width) - (w / 2.0)
-    y    = (cy_norm * height) - (h / 2.0)
-    bbox = np.stack((x, y, w, h), axis=-1)
-    return bbox
+    w = bbox[..., 2] * width
+    h = bbox[..., 3] * height
+    x = bbox[..., 0] * width  - w / 2.0
+    y = bbox[..., 1] * height - h / 2.0
+    return _stack([x, y, w, h], like=bbox)
 
 
-def bbox_cxcywhn_to_xyxy(bbox: np.ndarray, height: int, width: int) -> np.ndarray:
+def bbox_cxcywhn_to_xyxy(bbox: Array, height: int, width: int) -> Array:
     """Convert bounding boxes from CXCYWHN format to XYXY format."""
-    cx_norm, cy_norm, w_norm, h_norm, *_ = bbox.T
-    x1   = width  * (cx_norm - w_norm / 2)
-    y1   = height * (cy_norm - h_norm / 2)
-    x2   = width  * (cx_norm + w_norm / 2)
-    y2   = height * (cy_norm + h_norm / 2)
-    bbox = np.stack((x1, y1, x2, y2), axis=-1)
-    return bbox
+    cx, cy, w, h = bbox[..., 0], bbox[..., 1], bbox[..., 2], bbox[..., 3]
+    x1 = width  * (cx - w / 2)
+    y1 = height * (cy - h / 2)
+    x2 = width  * (cx + w / 2)
+    y2 = height * (cy + h / 2)
+    return _stack([x1, y1, x2, y2], like=bbox)
 
 
-def bbox_cxcywhn_to_xyxyn(bbox: np.ndarray) -> np.ndarray:
+def bbox_cxcywhn_to_xyxyn(bbox: Array) -> Array:
     """Convert bounding boxes from CXCYWHN format to XYXYN format."""
-    cx_norm, cy_norm, w_norm, h_norm, *_ = bbox.T
-    x1   = (cx_norm - w_norm / 2)
-    y1   = (cy_norm - h_norm / 2)
-    x2   = (cx_norm + w_norm / 2)
-    y2   = (cy_norm + h_norm / 2)
-    bbox = np.stack((x1, y1, x2, y2), axis=-1)
-    return bbox
+    cx, cy, w, h = bbox[..., 0], bbox[..., 1], bbox[..., 2], bbox[..., 3]
+    return _stack([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], like=bbox)
 
 
-def bbox_xywh_to_cxcywhn(bbox: np.ndarray, height: int, width: int) -> np.ndarray:
+def bbox_xywh_to_cxcywhn(bbox: Array, height: int, width: int) -> Array:
     """Convert bounding boxes from XYWH format to CXCYWHN format."""
-    x, y, w, h, *_ = bbox.T
-    cx      = x + (w / 2.0)
-    cy      = y + (h / 2.0)
-    cx_norm = cx / width
-    cy_norm = cy / height
-    w_norm  = w / width
-    h_norm  = h / height
-    bbox    = np.stack((cx_norm, cy_norm, w_norm, h_norm), axis=-1)
-    return bbox
-
-
-def bbox_xywh_to_xyxy(bbox: np.ndarray) -> np.ndarray:
+    x, y, w, h = bbox[..., 0], bbox[..., 1], bbox[..., 2], bbox[..., 3]
+    cx = (x + w / 2.0) / width
+    cy = (y + h / 2.0) / height
+    return _stack([cx, cy, w / width, h / height], like=bbox)
+
+
+def bbox_xywh_to_xyxy(bbox: Array) -> Array:
     """Convert bounding boxes from XYWH format to XYXY format."""
-    x, y, w, h, *_ = bbox.T
-    x2   = x + w
-    y2   = y + h
-    bbox = np.stack((x, y, x2, y2), axis=-1)
-    return bbox
+    x, y, w, h = bbox[..., 0], bbox[..., 1], bbox[..., 2], bbox[..., 3]
+    return _stack([x, y, x + w, y + h], like=bbox)
 
 
-def bbox_xywh_to_xyxyn(bbox: np.ndarray, height: int, width: int) -> np.ndarray:
+def bbox_xywh_to_xyxyn(bbox: Array, height: int, width: int) -> Array:
     """Convert bounding boxes from XYWH format to XYXYN format."""
-    x, y, w, h, *_ = bbox.T
-    x2      = x + w
-    y2      = y + h
-    x1_norm = x / width
-    y1_norm = y / height
-    x2_norm = x2 / width
-    y2_norm = y2 / height
-    bbox    = np.stack((x1_norm, y1_norm, x2_norm, y2_norm), axis=-1)
-    return bbox
-
-
-def bbox_xyxy_to_cxcywhn(bbox: np.ndarray, height: int, width: int) -> np.ndarray:
+    x, y, w, h = bbox[..., 0], bbox[..., 1], bbox[..., 2], bbox[..., 3]
+    return _stack([x / width, y / height, (x + w) / width, (y + h) / height], like=bbox)
+
+
+def bbox_xyxy_to_cxcywhn(bbox: Array, height: int, width: int) -> Array:
     """Convert bounding boxes from XYXY format to CXCYWHN format."""
-    x1, y1, x2, y2, *_ = bbox.T
-    w       = x2 - x1
-    h       = y2 - y1
-    cx      = x1 + (w / 2.0)
-    cy      = y1 + (h / 2.0)
-    cx_norm = cx / width
-    cy_norm = cy / height
-    w_norm  = w / width
-    h_norm  = h / height
-    bbox    = np.stack((cx_norm, cy_norm, w_norm, h_norm), axis=-1)
-    return bbox
-
-
-def bbox_xyxy_to_xywh(bbox: np.ndarray) -> np.ndarray:
+    x1, y1, x2, y2 = bbox[..., 0], bbox[..., 1], bbox[..., 2], bbox[..., 3]
+    cx = (x1 + x2) / 2.0 / width
+    cy = (y1 + y2) / 2.0 / height
+    return _stack([cx, cy, (x2 - x1) / width, (y2 - y1) / height], like=bbox)
+
+
+def bbox_xyxy_to_xywh(bbox: Array) -> Array:
     """Convert bounding boxes from XYXY format to XYWH format."""
-    x1, y1, x2, y2, *_ = bbox.T
-    w    = x2 - x1
-    h    = y2 - y1
-    bbox = np.stack((x1, y1, w, h), axis=-1)
-    return bbox
+    x1, y1, x2, y2 = bbox[..., 0], bbox[..., 1], bbox[..., 2], bbox[..., 3]
+    return _stack([x1, y1, x2 - x1, y2 - y1], like=bbox)
 
 
-def bbox_xyxy_to_xyxyn(bbox: np.ndarray, height: int, width: int) -> np.ndarray:
+def bbox_xyxy_to_xyxyn(bbox: Array, height: int, width: int) -> Array:
     """Convert bounding boxes from XYXY format to XYXYN format."""
-    x1, y1, x2, y2, *_ = bbox.T
-    x1_norm = x1 / width
-    y1_norm = y1 / height
-    x2_norm = x2 / width
-    y2_norm = y2 / height
-    bbox    = np.stack((x1_norm, y1_norm, x2_norm, y2_norm), axis=-1)
-    return bbox
+    x1, y1, x2, y2 = bbox[..., 0], bbox[..., 1], bbox[..., 2], bbox[..., 3]
+    return _stack([x1 / width, y1 / height, x2 / width, y2 / height], like=bbox)
 
 
-def bbox_xyxyn_to_cxcywhn(bbox: np.ndarray) -> np.ndarray:
+def bbox_xyxyn_to_cxcywhn(bbox: Array) -> Array:
     """Convert bounding boxes from XYXYN format to CXCYWHN format."""
-    x1, y1, x2, y2, *_ = bbox.T
-    w_norm  = x2 - x1
-    h_norm  = y2 - y1
-    cx_norm = x1 + (w_norm / 2.0)
-    cy_norm = y1 + (h_norm / 2.0)
-    bbox    = np.stack((cx_norm, cy_norm, w_norm, h_norm), axis=-1)
-    return bbox
+    x1, y1, x2, y2 = bbox[..., 0], bbox[..., 1], bbox[..., 2], bbox[..., 3]
+    return _stack([(x1 + x2) / 2.0, (y1 + y2) / 2.0, x2 - x1, y2 - y1], like=bbox)
 
 
-def bbox_xyxyn_to_xywh(bbox: np.ndarray, height: int, width: int) -> np.ndarray:
+def bbox_xyxyn_to_xywh(bbox: Array, height: int, width: int) -> Array:
     """Convert bounding boxes from XYXYN format to XYWH format."""
-    x1, y1, x2, y2, *_ = bbox.T
-    x1   = x1 * width
-    x2   = x2 * width
-    y1   = y1 * height
-    y2   = y2 * height
-    w    = x2 - x1
-    h    = y2 - y1
-    bbox = np.stack((x1, y1, w, h), axis=-1)
-    return bbox
-
-
-def bbox_xyxyn_to_xyxy(bbox: np.ndarray, height: int, width: int) -> np.ndarray:
+    x1, y1 = bbox[..., 0] * width, bbox[..., 1] * height
+    x2, y2 = bbox[..., 2] * width, bbox[..., 3] * height
+    return _stack([x1, y1, x2 - x1, y2 - y1], like=bbox)
+
+
+def bbox_xyxyn_to_xyxy(bbox: Array, height: int, width: int) -> Array:
     """Convert bounding boxes from XYXYN format to XYXY format."""
-    x1, y1, x2, y2, *_ = bbox.T
-    x1   = x1 * width
-    x2   = x2 * width
-    y1   = y1 * height
-    y2   = y2 * height
-    bbox = np.stack((x1, y1, x2, y2), axis=-1)
-    return bbox
+    x1, y1 = bbox[..., 0] * width, bbox[..., 1] * height
+    x2, y2 = bbox[..., 2] * width, bbox[..., 3] * height
+    return _stack([x1, y1, x2, y2], like=bbox)
 
 
 bbox_coco_to_voc  = bbox_xywh_to_xyxy
@@ -384,11 +482,11 @@ bbox_yolo_to_voc  = bbox_cxcywhn_to_xyxy
 
 
 def convert_bbox(
-    bbox  : np.ndarray,
+    bbox  : Array,
     code  : ShapeCode | int,
     height: int | None = None,
     width : int | None = None
-) -> np.ndarray:
+) -> Array:
     """Convert bounding box."""
     code = ShapeCode.from_value(value=code)
     match code:
@@ -404,7 +502,7 @@ def convert_bbox(
             return bbox_coco_to_yolo(bbox=bbox, height=height, width=width)
         case ShapeCode.YOLO2VOC | ShapeCode.CXCYN2XYXY:
             return bbox_yolo_to_voc(bbox=bbox, height=height, width=width)
-        case ShapeCode.YOLO2COCO | ShapeCode.CXCYN2XYXY:
+        case ShapeCode.YOLO2COCO | ShapeCode.CXCYN2XYWH:
             return bbox_yolo_to_coco(bbox=bbox, height=height, width=width)
         case _:
             raise ValueError(f"{code}.")
@@ -415,15 +513,15 @@ def convert_bbox(
 # region Affine Transform
 
 def clip_bbox(
-    bbox      : np.ndarray,
+    bbox      : Array,
     image_size: int | list[int],
     drop_ratio: float = 0.0,
-) -> np.ndarray:
+) -> Array:
     """Clip bounding boxes to an image size and removes the bounding boxes,
     which lose too much area as a result of the augmentation.
     
     Args:
-        bbox: Bounding boxes of shape :math:`[..., 4]` and in XYXY format.
+        bbox: Bounding boxes of shape :math:`[N, 4]` and in XYXY format.
         image_size: An image size in :math:`[H, W]` format.
         drop_ratio: If the fraction of a bounding box left in the image after
             being clipped is less than :param:`drop_ratio` the bounding box is
@@ -431,18 +529,23 @@ def clip_bbox(
             Default: ``0.0``.
         
     Returns:
-        Clipped bounding boxes of shape :math:`[N, 4]`.
+        Clipped bounding boxes of shape :math:`[N', 4]`.
     """
-    h, w       = core.get_hw(size=image_size)
-    area       = get_bbox_area(bbox=bbox)
-    bbox[:, 0] = np.clip(0, w)  # x1
-    bbox[:, 1] = np.clip(0, h)  # y1
-    bbox[:, 2] = np.clip(0, w)  # x2
-    bbox[:, 3] = np.clip(0, h)  # y2
-    new_area   = get_bbox_area(bbox=bbox)
-    delta_area = (area - new_area) / area
-    mask       = (delta_area < (1 - drop_ratio)).to(torch.int)
-    bbox       = bbox[mask == 1, :]
-    return bbox
+    h, w     = core.get_hw(size=image_size)
+    area     = get_bbox_area(bbox=bbox)
+    x1       = _clamp(bbox[..., 0], 0, w)
+    y1       = _clamp(bbox[..., 1], 0, h)
+    x2       = _clamp(bbox[..., 2], 0, w)
+    y2       = _clamp(bbox[..., 3], 0, h)
+    clipped  = _stack([x1, y1, x2, y2], like=bbox)
+    if isinstance(bbox, torch.Tensor):
+        clipped = torch.cat([clipped, bbox[..., 4:]], dim=-1)
+    else:
+        clipped = np.concatenate([clipped, bbox[..., 4:]], axis=-1)
+    if drop_ratio <= 0:
+        return clipped
+    new_area = get_bbox_area(bbox=clipped)
+    mask     = new_area >= drop_ratio * area
+    return clipped[mask]
 
 # endregion
@@ -6,11 +6,11 @@
 from __future__ import annotations
 
 __all__ = [
-    "ImageLoader", "ImageWriter", "Loader", "VideoLoader", "VideoLoaderCV",
-    "VideoLoaderFFmpeg", "VideoWriter", "VideoWriterCV", "VideoWriterFFmpeg",
-    "Writer", "read_image", "read_video_ffmpeg", "write_image_cv",
-    "write_image_torch", "write_images_cv", "write_images_torch",
-    "write_video_ffmpeg",
+    "BucketImageLoader", "ImageLoader", "ImageWriter", "Loader", "VideoLoader",
+    "VideoLoaderCV", "VideoLoaderFFmpeg", "VideoWriter", "VideoWriterCV",
+    "VideoWriterFFmpeg", "Writer", "read_image", "read_image_shape",
+    "read_video_ffmpeg", "write_image_cv", "write_image_torch",
+    "write_images_cv", "write_images_torch", "write_video_ffmpeg",
 ]
 
 import glob
@@ -25,6 +25,7 @@ import joblib
 import numpy as np
 import torch
 import torchvision
+from PIL import Image
 
 from mon.vision import core
 
@@ -65,6 +66,35 @@ def read_image(
     return image
 
 
+def read_image_shape(path: core.Path) -> list[int]:
+    """Read the shape of an image from its file header without decoding the
+    pixel data.
+    
+    Args:
+        path: An image file path.
+    
+    Return:
+        The image shape in :math:`[H, W]` format, as :meth:`read_image` would
+        return it (EXIF orientation is taken into account).
+    
+    Raises:
+        IOError: If the file cannot be read as an image.
+    """
+    try:
+        with Image.open(str(path)) as image:
+            w, h = image.size
+            # EXIF orientations 5-8 are transposed, cv2 applies them on read.
+            if image.getexif().get(0x0112, 1) in [5, 6, 7, 8]:
+                h, w = w, h
+    except Exception:
+        # Formats that PIL cannot parse (e.g., raw files) are fully decoded.
+        image = cv2.imread(str(path))
+        if image is None:
+            raise IOError(f"Cannot read the image file: {path}.")
+        h, w = image.shape[0:2]
+    return [h, w]
+
+
 def read_video_ffmpeg(
     process,
     height   : int,
@@ -309,6 +339,203 @@ class ImageLoader(Loader):
         pass
 
 
+class BucketImageLoader(ImageLoader):
+    """An image loader that groups images of different sizes into buckets so
+    that each batch can be stacked without resizing.
+    
+    The image shapes are read from the file headers when the loader is
+    initialized. Images are then grouped either by their exact shape, or by
+    their aspect ratio and area. The area is binned by powers of
+    :param:`area_ratio`, so a small image never shares a bucket (and its
+    padding) with a much larger one of the same aspect ratio. Inside a bucket,
+    images are padded (bottom and right) to the largest height and width of the
+    bucket, optionally rounded up to a multiple of :param:`stride`. Each batch
+    also returns the original size of every image so that the outputs can be
+    cropped back with :meth:`unpad`. Files that cannot be read are skipped.
+    
+    Like every :class:`Loader`, :meth:`__len__` is the number of images; use
+    :meth:`batch_len` for the number of batches.
+    
+    Args:
+        source: A data source. It can be a file path, a file path pattern, or a
+            directory.
+        max_samples: The maximum number of datapoints from the given
+            :param:`source` to process. Default: ``None``.
+        batch_size: The number of samples in a single forward pass.
+            Default: ``1``.
+        bucket_by: How to group images. One of: ``'shape'`` (exact
+            :math:`[H, W]`) or ``'aspect_ratio'``. Default: ``'shape'``.
+        stride: If given, pad each batch so that its height and width are
+            multiples of :param:`stride`. Default: ``None``.
+        aspect_ratio_precision: The number of decimals used to round the
+            aspect ratio when :param:`bucket_by` is ``'aspect_ratio'``.
+            Default: ``1``.
+        area_ratio: The ratio between the largest and the smallest area of the
+            images of an ``'aspect_ratio'`` bucket, which bounds the padded
+            area of each image. Default: ``2.0``.
+        to_rgb: If ``True``, convert the image from BGR to RGB.
+            Default: ``False``.
+        to_tensor: If ``True``, convert the image from :class:`numpy.ndarray` to
+            :class:`torch.Tensor`. Default: ``False``.
+        normalize: If ``True``, normalize the image to :math:`[0.0, 1.0]`.
+            Default: ``True``.
+        verbose: Verbosity mode of video loader backend. Default: ``False``.
+    """
+    
+    def __init__(
+        self,
+        source                : core.Path,
+        max_samples           : int | None = None,
+        batch_size            : int        = 1,
+        bucket_by             : str        = "shape",
+        stride                : int | None = None,
+        aspect_ratio_precision: int        = 1,
+        area_ratio            : float      = 2.0,
+        to_rgb                : bool       = True,
+        to_tensor             : bool       = False,
+        normalize             : bool       = False,
+        verbose               : bool       = False,
+        *args, **kwargs
+    ):
+        if bucket_by not in ["shape", "aspect_ratio"]:
+            raise ValueError(
+                f"bucket_by must be one of: 'shape', 'aspect_ratio', but got "
+                f"{bucket_by}."
+            )
+        if area_ratio <= 1.0:
+            raise ValueError(f"area_ratio must be > 1.0, but got {area_ratio}.")
+        self.bucket_by              = bucket_by
+        self.stride                 = stride
+        self.aspect_ratio_precision = aspect_ratio_precision
+        self.area_ratio             = area_ratio
+        self.shapes                 = []
+        self.batches                = []
+        self.batch_index            = 0
+        super().__init__(
+            source      = source,
+            max_samples = max_samples,
+            batch_size  = batch_size,
+            to_rgb      = to_rgb,
+            to_tensor   = to_tensor,
+            normalize   = normalize,
+            verbose     = verbose
+        )
+    
+    def __next__(self) -> tuple[torch.Tensor | np.ndarray, list, list, list, list]:
+        """Load the next batch of images from the disk.
+        
+        Return:
+            Images of shape :math:`[B, H, W, C]` or :math:`[B, C, H, W]`.
+            A :class"`list` of image indexes
+            A :class:`list` of image files.
+            A :class:`list` of images' relative paths corresponding to data.
+            A :class:`list` of images' original sizes in :math:`[H, W]` format.
+        """
+        if self.batch_index >= len(self.batches):
+            raise StopIteration
+        
+        batch  = self.batches[self.batch_index]
+        sizes  = [self.shapes[i] for i in batch]
+        h      = max(s[0] for s in sizes)
+        w      = max(s[1] for s in sizes)
+        if self.stride:
+            h = int(np.ceil(h / self.stride) * self.stride)
+            w = int(np.ceil(w / self.stride) * self.stride)
+        
+        images    = []
+        files     = []
+        rel_paths = []
+        for i in batch:
+            file  = self.images[i]
+            image = read_image(path=file, to_rgb=self.to_rgb, to_tensor=False)
+            ph    = h - image.shape[0]
+            pw    = w - image.shape[1]
+            if ph > 0 or pw > 0:
+                border = cv2.BORDER_REFLECT_101 \
+                    if ph < image.shape[0] and pw < image.shape[1] \
+                    else cv2.BORDER_REPLICATE
+                image  = cv2.copyMakeBorder(image, 0, ph, 0, pw, border)
+            images.append(image)
+            files.append(file)
+            rel_paths.append(str(file).replace(str(self.source) + "/", ""))
+        
+        images = np.stack(images, axis=0)
+        if self.to_tensor:
+            images = core.to_image_tensor(input=images, keepdim=True, normalize=self.normalize)
+        self.index       += len(batch)
+        self.batch_index += 1
+        return images, list(batch), files, rel_paths, sizes
+    
+    def __len__(self) -> int:
+        """Return the number of images in the dataset."""
+        return self.num_images
+    
+    def batch_len(self) -> int:
+        """Return the number of batches."""
+        return len(self.batches)
+    
+    def init(self):
+        """Initialize the data source and group the images into buckets."""
+        super().init()
+        images = []
+        shapes = []
+        for path in self.images[:self.num_images]:
+            try:
+                shapes.append(read_image_shape(path=path))
+                images.append(path)
+            except IOError as e:
+                console.log(f"[red]{e} Skipped.")
+        self.images     = images
+        self.shapes     = shapes
+        self.num_images = len(images)
+        
+        buckets = {}
+        for i, (h, w) in enumerate(self.shapes):
+            if self.bucket_by == "shape":
+                key = (h, w)
+            else:
+                key = (
+                    round(w / h, self.aspect_ratio_precision),
+                    int(np.floor(np.log(h * w) / np.log(self.area_ratio))),
+                )
+            buckets.setdefault(key, []).append(i)
+        
+        self.batches = [
+            indexes[j:j + self.batch_size]
+            for indexes in buckets.values()
+            for j in range(0, len(indexes), self.batch_size)
+        ]
+        if self.verbose:
+            console.log(
+                f"{self.num_images} images in {len(buckets)} buckets, "
+                f"{len(self.batches)} batches."
+            )
+    
+    def reset(self):
+        """Reset and start over."""
+        self.index       = 0
+        self.batch_index = 0
+    
+    @staticmethod
+    def unpad(
+        images: torch.Tensor | np.ndarray,
+        sizes : list[list[int]],
+    ) -> list[torch.Tensor | np.ndarray]:
+        """Crop padded outputs back to their original sizes.
+        
+        Args:
+            images: A batch of shape :math:`[B, C, H, W]` (:class:`torch.Tensor`)
+                or :math:`[B, H, W, C]` (:class:`numpy.ndarray`).
+            sizes: The original sizes returned by :meth:`__next__`.
+        
+        Return:
+            A :class:`list` of images, one per item in the batch.
+        """
+        if isinstance(images, torch.Tensor):
+            return [images[i:i + 1, ..., :h, :w] for i, (h, w) in enumerate(sizes)]
+        return [images[i, :h, :w] for i, (h, w) in enumerate(sizes)]
+
+
 class VideoLoader(Loader, ABC):
     """The base class for all video loaders.
     
@@ -16,6 +16,7 @@ __all__ = [
     "ColorConstancyLoss",
     "EdgeConstancyLoss",
     "ExposureControlLoss",
+    "FusedZeroReferenceLoss",
     "GradientL1Loss",
     "IlluminationSmoothnessLoss",
     "PSNRLoss",
@@ -25,6 +26,7 @@ __all__ = [
     "SpatialConsistencyLoss",
 ]
 
+import weakref
 from typing import Literal
 
 import piqa
@@ -246,7 +248,7 @@ class ExposureControlLoss(Loss):
         x    = input
         x    = torch.mean(x, 1, keepdim=True)
         mean = self.pool(x)
-        loss = torch.pow(mean - torch.FloatTensor([self.mean_val]).to(input.device), 2)
+        loss = torch.pow(mean - self.mean_val, 2)
         loss = reduce_loss(loss=loss, reduction=self.reduction)
         return loss
 
@@ -867,3 +869,215 @@ class SpatialConsistencyLoss(Loss):
         return loss
 
 # endregion
+
+
+# region Zero-Reference Loss
+
+@LOSSES.register(name="fused_zero_reference_loss")
+class FusedZeroReferenceLoss(Loss):
+    """The weighted sum of the zero-reference losses used to train curve
+    estimation models (Zero-DCE, Zero-ADCE, GCE-Net), computed in a single
+    pass.
+    
+    It returns the same value as summing :class:`BrightnessConstancyLoss`,
+    :class:`ColorConstancyLoss`, :class:`ChannelRatioConsistencyLoss`,
+    :class:`EdgeConstancyLoss`, :class:`ExposureControlLoss`,
+    :class:`ChannelConsistencyLoss`, :class:`SpatialConsistencyLoss`, and
+    :class:`IlluminationSmoothnessLoss` with their weights, but:
+        - The channel mean of the enhanced image is computed once, pooled once
+          for the spatial consistency term, and the exposure term pools the
+          result further when its patch size is a multiple of the spatial one.
+        - All spatial consistency kernels are stacked into one convolution,
+          applied once to the difference of the pooled images.
+        - The terms that only depend on the input image (the GBEM prior, the
+          input's Laplacian pyramid level, and pooled channel mean) are computed
+          without gradient and cached until the next batch.
+    
+    Args:
+        bri_gamma: The :math:`\gamma` of the GBEM prior. Default: ``2.8``.
+        exp_patch_size: The patch size of the exposure control term.
+            Default: ``16``.
+        exp_mean_val: The well-exposedness level of the exposure control term.
+            Default: ``0.6``.
+        spa_num_regions: The number of neighboring regions of the spatial
+            consistency term. Default: ``4``.
+        spa_patch_size: The patch size of the spatial consistency term.
+            Default: ``4``.
+        weight_*: The weight of each term. A term is skipped when its weight is
+            ``0``.
+        reduction: Specifies the reduction to apply to the output.
+            Default: ``'mean'``.
+        verbose: If ``True``, log every term. Default: ``False``.
+    """
+    
+    def __init__(
+        self,
+        bri_gamma      : float           = 2.8,
+        exp_patch_size : int             = 16,
+        exp_mean_val   : float           = 0.6,
+        spa_num_regions: int             = 4,
+        spa_patch_size : int             = 4,
+        weight_bri     : float           = 1,
+        weight_col     : float           = 5,
+        weight_crl     : float           = 1,
+        weight_edge    : float           = 5,
+        weight_exp     : float           = 10,
+        weight_kl      : float           = 5,
+        weight_spa     : float           = 1,
+        weight_tvA     : float           = 1600,
+        reduction      : Reduction | str = "mean",
+        verbose        : bool            = False,
+        *args, **kwargs
+    ):
+        super().__init__(reduction=reduction)
+        self.weight_bri  = weight_bri
+        self.weight_col  = weight_col
+        self.weight_crl  = weight_crl
+        self.weight_edge = weight_edge
+        self.weight_exp  = weight_exp
+        self.weight_kl   = weight_kl
+        self.weight_spa  = weight_spa
+        self.weight_tvA  = weight_tvA
+        self.verbose     = verbose
+        
+        self.loss_bri  = BrightnessConstancyLoss(reduction=reduction, gamma=bri_gamma)
+        self.loss_col  = ColorConstancyLoss(reduction=reduction)
+        self.loss_crl  = ChannelRatioConsistencyLoss(reduction=reduction)
+        self.loss_kl   = ChannelConsistencyLoss(reduction=reduction)
+        self.loss_edge = EdgeConstancyLoss(reduction=reduction)
+        self.loss_exp  = ExposureControlLoss(
+            reduction  = reduction,
+            patch_size = exp_patch_size,
+            mean_val   = exp_mean_val,
+        )
+        self.loss_spa  = SpatialConsistencyLoss(
+            num_regions = spa_num_regions,
+            patch_size  = spa_patch_size,
+            reduction   = reduction,
+        )
+        self.loss_tvA  = IlluminationSmoothnessLoss(reduction=reduction)
+        
+        # Stack the spatial consistency kernels, 3x3 kernels are zero-padded
+        # to 5x5 when mixed with 5x5 kernels so that one convolution applies
+        # all of them.
+        kernels = [p.data for n, p in self.loss_spa.named_parameters() if n.startswith("weight_")]
+        k       = max(w.shape[-1] for w in kernels)
+        kernels = [F.pad(w, [(k - w.shape[-1]) // 2] * 4) for w in kernels]
+        self.register_buffer("spa_kernel", torch.cat(kernels, dim=0), persistent=False)
+        self.spa_padding = k // 2
+        
+        exp_patch = core.to_2tuple(exp_patch_size)
+        spa_patch = core.to_2tuple(spa_patch_size)
+        self.exp_from_spa = (
+            exp_patch[0] % spa_patch[0] == 0 and exp_patch[1] % spa_patch[1] == 0
+        )
+        self.exp_pool     = (exp_patch[0] // spa_patch[0], exp_patch[1] // spa_patch[1])
+        
+        self._input_ref   = None
+        self._input_stats = {}
+    
+    def __str__(self) -> str:
+        return f"fused_zero_reference_loss"
+    
+    @torch.no_grad()
+    def input_stats(self, input: torch.Tensor) -> dict:
+        """Compute (or return the cached) terms that only depend on the input
+        image. The cache is kept while the same input tensor is alive and has
+        not been modified in-place. Inference tensors have no version counter,
+        so their terms are computed without the cache.
+        """
+        cache = not input.is_inference()
+        ref   = self._input_ref() if self._input_ref is not None else None
+        if cache and ref is input and self._input_stats.get("version") == input._version:
+            return self._input_stats
+        
+        stats = {"version": input._version if cache else None}
+        if self.weight_bri > 0:
+            stats["prior"] = prior.get_guided_brightness_enhancement_map_prior(
+                input, self.loss_bri.gamma, self.loss_bri.ksize
+            )
+        if self.weight_edge > 0:
+            stats["edge"] = self.loss_edge.laplacian_kernel(input)
+        if self.weight_spa > 0:
+            stats["pool"] = self.loss_spa.pool(torch.mean(input, 1, keepdim=True))
+        if not cache:
+            return stats
+        self._input_ref   = weakref.ref(input)
+        self._input_stats = stats
+        return stats
+    
+    def forward(
+        self,
+        input   : torch.Tensor,
+        target  : list[torch.Tensor],
+        previous: torch.Tensor = None,
+        **_
+    ) -> tuple[torch.Tensor, torch.Tensor]:
+        if not isinstance(target, list | tuple) or len(target) not in [2, 3]:
+            raise TypeError(
+                f"target must be a list of (a, enhance) or (a, p, enhance), "
+                f"but got {type(target)}."
+            )
+        a       = target[0]
+        p       = target[1] if len(target) == 3 else None
+        enhance = target[-1]
+        stats   = self.input_stats(input)
+        
+        # Enhanced image statistics shared by the exposure and spatial terms
+        mean     = torch.mean(enhance, 1, keepdim=True) if self.weight_exp > 0 or self.weight_spa > 0 else None
+        spa_pool = self.loss_spa.pool(mean) if mean is not None and (self.weight_spa > 0 or self.exp_from_spa) else None
+        
+        loss_bri = 0
+        if self.weight_bri > 0:
+            if p is None:
+                raise ValueError(f"weight_bri > 0 requires target to be (a, p, enhance).")
+            loss_bri = torch.sqrt((stats["prior"] - p) ** 2 + (self.loss_bri.eps * self.loss_bri.eps))
+            loss_bri = reduce_loss(loss=loss_bri, reduction=self.reduction)
+        loss_col  = self.loss_col(input=enhance) if self.weight_col > 0 else 0
+        loss_edge = 0
+        if self.weight_edge > 0:
+            assert enhance.shape == input.shape
+            loss_edge = self.loss_edge.laplacian_kernel(enhance) - stats["edge"]
+            loss_edge = torch.sqrt(loss_edge ** 2 + (self.loss_edge.eps * self.loss_edge.eps))
+            loss_edge = reduce_loss(loss=loss_edge, reduction=self.reduction)
+        loss_exp = 0
+        if self.weight_exp > 0:
+            exp_mean = F.avg_pool2d(spa_pool, self.exp_pool) if self.exp_from_spa else self.loss_exp.pool(mean)
+            loss_exp = reduce_loss(loss=torch.pow(exp_mean - self.loss_exp.mean_val, 2), reduction=self.reduction)
+        loss_kl  = self.loss_kl(input=enhance, target=input) if self.weight_kl > 0 else 0
+        loss_spa = 0
+        if self.weight_spa > 0:
+            if self.spa_kernel.device != input.device:
+                self.spa_kernel = self.spa_kernel.to(input.device)
+            d        = F.conv2d(spa_pool - stats["pool"], self.spa_kernel, padding=self.spa_padding)
+            loss_spa = reduce_loss(loss=torch.pow(d, 2).sum(dim=1, keepdim=True), reduction=self.reduction)
+        loss_tvA = self.loss_tvA(input=a) if self.weight_tvA > 0 else 0
+        loss_crl = 0
+        if self.weight_crl > 0:
+            if previous is not None and enhance.shape == previous.shape:
+                loss_crl = self.loss_crl(input=enhance, target=previous)
+            else:
+                loss_crl = self.loss_crl(input=enhance, target=input)
+        
+        loss = (
+              self.weight_bri  * loss_bri
+            + self.weight_col  * loss_col
+            + self.weight_crl  * loss_crl
+            + self.weight_edge * loss_edge
+            + self.weight_exp  * loss_exp
+            + self.weight_tvA  * loss_tvA
+            + self.weight_kl   * loss_kl
+            + self.weight_spa  * loss_spa
+        )
+        
+        if self.verbose:
+            console.log(f"{self.loss_bri.__str__():<30} : {loss_bri}")
+            console.log(f"{self.loss_col.__str__():<30} : {loss_col}")
+            console.log(f"{self.loss_edge.__str__():<30} : {loss_edge}")
+            console.log(f"{self.loss_exp.__str__():<30} : {loss_exp}")
+            console.log(f"{self.loss_kl.__str__():<30} : {loss_kl}")
+            console.log(f"{self.loss_spa.__str__():<30} : {loss_spa}")
+            console.log(f"{self.loss_tvA.__str__():<30} : {loss_tvA}")
+        return loss, enhance
+
+# endregion
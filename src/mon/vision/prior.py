@@ -6,15 +6,21 @@
 from __future__ import annotations
 
 __all__ = [
+    "PriorMemo",
     "get_bright_channel_prior",
     "get_dark_channel_prior",
     "get_guided_brightness_enhancement_map_prior",
+    "prior_memo",
 ]
 
+import weakref
+from typing import Callable
+
 import cv2
 import kornia
 import numpy as np
 import torch
+from torch.nn import functional as F
 
 from mon.vision import core
 
@@ -22,46 +28,165 @@ console      = core.console
 _current_dir = core.Path(__file__).absolute().parent
 
 
+# region Memo
+
+class PriorMemo:
+    """A small per-batch memo of priors computed from :class:`torch.Tensor`
+    images.
+    
+    Within one training or inference step, the same prior is often requested
+    several times for the same input batch (e.g., by the model's forward pass
+    and by a loss function). An entry is only reused while the input tensor is
+    the very same object (tracked with a weak reference) and has not been
+    modified in-place, so a new batch never returns a stale prior.
+    
+    Inference tensors (created under :func:`torch.inference_mode`) have no
+    version counter, and values that require grad would keep their autograd
+    graph alive across steps, so both are computed without the memo.
+    
+    Args:
+        capacity: The maximum number of entries. Default: ``8``.
+    """
+    
+    def __init__(self, capacity: int = 8):
+        self.capacity = capacity
+        self.entries  = {}
+        self.hits     = 0
+        self.misses   = 0
+    
+    def get(self, fn: Callable, input: torch.Tensor, *args) -> torch.Tensor:
+        """Return ``fn(input, *args)``, reusing the memoized result if
+        possible.
+        """
+        if input.is_inference():
+            return fn(input, *args)
+        key   = (fn.__name__, id(input), args)
+        entry = self.entries.get(key)
+        if entry is not None:
+            ref, version, value = entry
+            if ref() is input and version == input._version:
+                self.hits += 1
+                return value
+        self.misses += 1
+        value = fn(input, *args)
+        if value.requires_grad:
+            return value
+        self.entries = {k: e for k, e in self.entries.items() if e[0]() is not None}
+        while len(self.entries) >= self.capacity:
+            self.entries.pop(next(iter(self.entries)))
+        self.entries[key] = (weakref.ref(input), input._version, value)
+        return value
+    
+    def clear(self):
+        """Remove all entries."""
+        self.entries = {}
+        self.hits    = 0
+        self.misses  = 0
+
+
+prior_memo = PriorMemo()
+
+# endregion
+
+
 # region Image Feature Prior: Intensity & Gradient
 
+def _pad_window(patch_size: tuple[int, int]) -> list[int]:
+    """Return the :func:`torch.nn.functional.pad` padding of a window anchored
+    at its center, as :func:`cv2.erode` does.
+    """
+    kh, kw = patch_size
+    return [kw // 2, kw - 1 - kw // 2, kh // 2, kh - 1 - kh // 2]
+
+
+def _min_filter(input: torch.Tensor, patch_size: tuple[int, int]) -> torch.Tensor:
+    """Separable min filter. Pixels outside the image are ignored, as the
+    default border of :func:`cv2.erode`.
+    """
+    kh, kw = patch_size
+    x = F.pad(-input, _pad_window(patch_size), mode="constant", value=-float("inf"))
+    x = F.max_pool2d(x, kernel_size=(kh, 1), stride=1)
+    x = F.max_pool2d(x, kernel_size=(1, kw), stride=1)
+    return -x
+
+
+def _dark_channel_prior_torch(input: torch.Tensor, patch_size: tuple[int, int]) -> torch.Tensor:
+    return _min_filter(torch.amin(input, dim=1, keepdim=True), patch_size)
+
+
+def _bright_channel_prior_torch(input: torch.Tensor, patch_size: tuple[int, int]) -> torch.Tensor:
+    # Same morphology as the NumPy version, which erodes the max channel.
+    return _min_filter(torch.amax(input, dim=1, keepdim=True), patch_size)
+
+
+def _gbem_prior_torch(
+    input        : torch.Tensor,
+    gamma        : float,
+    denoise_ksize: int | None,
+) -> torch.Tensor:
+    if denoise_ksize is not None:
+        input = kornia.filters.median_blur(input, denoise_ksize)
+    # The V channel of HSV is the maximum of the RGB channels.
+    v = torch.amax(input, dim=1, keepdim=True)
+    return torch.pow((1 - v), gamma)
+
+
 def get_bright_channel_prior(
-    input     : np.ndarray,
+    input     : torch.Tensor | np.ndarray,
     patch_size: int | tuple[int, int],
-) -> np.ndarray:
+    memo      : bool = True,
+) -> torch.Tensor | np.ndarray:
     """Get the bright channel prior from an image.
     
     Args:
-        input: An image in :math:`[H, W, C]` format.
+        input: An image in :math:`[H, W, C]` format, or a batch of images in
+            :math:`[B, C, H, W]` format.
         patch_size: Window size.
+        memo: If ``True``, reuse the prior already computed for the same
+            :class:`torch.Tensor` batch. Default: ``True``.
         
     Returns:
-        An :class:`numpy.ndarray` bright channel as prior.
+        An :class:`numpy.ndarray` bright channel as prior, or a
+        :class:`torch.Tensor` of shape :math:`[B, 1, H, W]`.
     """
+    patch_size = core.to_2tuple(patch_size)
+    if isinstance(input, torch.Tensor):
+        if memo:
+            return prior_memo.get(_bright_channel_prior_torch, input, patch_size)
+        return _bright_channel_prior_torch(input, patch_size)
     # b, g, r      = cv2.split(input)
     # dark_channel = cv2.max(cv2.min(r, g), b)
     dark_channel = np.max(input, axis=2)
-    patch_size   = core.to_2tuple(patch_size)
     kernel       = cv2.getStructuringElement(cv2.MORPH_RECT, patch_size)
     dcp          = cv2.erode(dark_channel, kernel)
     return dcp
 
 
 def get_dark_channel_prior(
-    input     : np.ndarray,
+    input     : torch.Tensor | np.ndarray,
     patch_size: int | tuple[int, int],
-) -> np.ndarray:
+    memo      : bool = True,
+) -> torch.Tensor | np.ndarray:
     """Get the dark channel prior from an image.
     
     Args:
-        input: An image in :math:`[H, W, C]` format.
+        input: An image in :math:`[H, W, C]` format, or a batch of images in
+            :math:`[B, C, H, W]` format.
         patch_size: Window size.
+        memo: If ``True``, reuse the prior already computed for the same
+            :class:`torch.Tensor` batch. Default: ``True``.
         
     Returns:
-        An :class:`numpy.ndarray` dark channel as prior.
+        An :class:`numpy.ndarray` dark channel as prior, or a
+        :class:`torch.Tensor` of shape :math:`[B, 1, H, W]`.
     """
+    patch_size = core.to_2tuple(patch_size)
+    if isinstance(input, torch.Tensor):
+        if memo:
+            return prior_memo.get(_dark_channel_prior_torch, input, patch_size)
+        return _dark_channel_prior_torch(input, patch_size)
     # b, g, r      = cv2.split(input)
     # dark_channel = cv2.min(cv2.min(r, g), b)
-    patch_size   = core.to_2tuple(patch_size)
     dark_channel = np.min(input, axis=2)
     kernel       = cv2.getStructuringElement(cv2.MORPH_RECT, patch_size)
     dcp          = cv2.erode(dark_channel, kernel)
@@ -72,6 +197,7 @@ def get_guided_brightness_enhancement_map_prior(
     input        : torch.Tensor | np.ndarray,
     gamma        : float      = 2.5,
     denoise_ksize: int | None = None,
+    memo         : bool       = True,
 ) -> torch.Tensor | np.ndarray:
     """Get the Guided Brightness Enhancement Map (GBEM) prior from an RGB image.
     
@@ -90,24 +216,24 @@ def get_guided_brightness_enhancement_map_prior(
             :math:`[N, C, H, W]` or :math:`[H, W, C]` format.
         gamma: A parameter controls the curvature of the map.
         denoise_ksize: Window size for de-noising operation. Default: ``None``.
+        memo: If ``True``, reuse the prior already computed for the same
+            :class:`torch.Tensor` batch. Default: ``True``.
         
     Returns:
         An :class:`numpy.ndarray` brightness enhancement map as prior.
     """
     if isinstance(input, torch.Tensor):
-        if denoise_ksize is not None:
-            input = kornia.filters.median_blur(input, denoise_ksize)
-        hsv  = kornia.color.rgb_to_hsv(input)
-        v    = core.get_channel(input=hsv, index=(2, 3), keep_dim=True)  # hsv[:, 2:3, :, :]
-        attn = torch.pow((1 - v), gamma)
+        if memo:
+            return prior_memo.get(_gbem_prior_torch, input, gamma, denoise_ksize)
+        attn = _gbem_prior_torch(input, gamma, denoise_ksize)
     elif isinstance(input, np.ndarray):
         if denoise_ksize is not None:
             input = cv2.medianBlur(input, denoise_ksize)
-        hsv = cv2.cvtColor(input, cv2.COLOR_RGB2HSV)
-        if hsv.dtype != np.float64:
-            hsv  = hsv.astype("float64")
-            hsv /= 255.0
-        v    = core.get_channel(input=hsv, index=(2, 3), keep_dim=True)  # hsv[:, :, 2:3]
+        # The V channel of HSV is the maximum of the RGB channels.
+        v = np.max(input, axis=2, keepdims=True)
+        if v.dtype != np.float64:
+            v  = v.astype("float64")
+            v /= 255.0
         attn = np.power((1 - v), gamma)
     else:
         raise TypeError
@@ -9,12 +9,17 @@ https://www.geeksforgeeks.org/concatenate-images-using-opencv-in-python/
 from __future__ import annotations
 
 __all__ = [
-    "get_grid_size", "imshow", "imshow_classification", "imshow_enhancement",
-    "move_figure", "plt",
+    "flush_image_writes", "get_grid_size", "imshow", "imshow_classification",
+    "imshow_enhancement", "move_figure", "plt", "render_enhancement",
+    "write_image_async",
 ]
 
+import atexit
+import collections
+import concurrent.futures
 from typing import Any
 
+import cv2
 import matplotlib
 import numpy as np
 import torch
@@ -318,8 +323,14 @@ def imshow_enhancement(
     max_n      : int | None  = None,
     nrow       : int | None  = 8,
     wait_time  : float       = 0.01,
+    diff       : bool        = False,
+    show       : bool        = True,
 ):
-    """Show image enhancement results using matplotlib.
+    """Show image enhancement results with OpenCV.
+    
+    The panels are composed into one uint8 canvas by
+    :func:`render_enhancement`, saved in the background by
+    :func:`write_image_async`, and shown with :func:`cv2.imshow`.
     
     Args:
         winname: The name of the window to display the image in.
@@ -328,64 +339,172 @@ def imshow_enhancement(
             input, pred, target, enhanced image, ...). If given a dictionary,
             the key will be used as the column label.
         label: A sequence of images' labels :class:`str`. Default: ``None``.
-        denormalize: If ``True``, convert image to :math:`[0, 255]`.
-            Default: ``True``.
-        scale: Scale the size of matplotlib figure. Default: ``1`` means
-            :math:`size x 1`.
-        save_config: Save figure config. Default: ``None``.
+        denormalize: If ``True``, the images are in :math:`[0.0, 1.0]` and are
+            converted to :math:`[0, 255]`. Default: ``True``.
+        scale: Multiply the pixel size of each panel. Default: ``1``.
+        save_config: Save config: ``'filepath'`` and optionally ``'quality'``
+            (JPEG quality). Default: ``None``.
         max_n: Show max n images if :param:`image` has a batch size of more than
             :param:`max_n` images. Default: ``None`` means show all.
-        nrow: The maximum number of items to display in a row. The final grid
-            size is :math:`(n / nrow, nrow)`. If ``None``, then the number of
-            items in a row will be the same as the number of items in the
-            :class:`list`. Default: ``8``.
-        wait_time: Wait for some time (in seconds) to display the figure then
-            reset. Default: ``0``.
+        nrow: Unused, kept for compatibility: each image of the batch is a row.
+        wait_time: Wait for some time (in seconds) to display the canvas.
+            Default: ``0.01``.
+        diff: If ``True``, add a heatmap of the absolute difference between the
+            ``'pred'`` and ``'target'`` panels. Default: ``False``.
+        show: If ``True``, show the canvas in a window. Default: ``True``.
     """
-    # Prepare image and label
-    header = list(image.keys())
-    image  = list(image.values())
-    image  = [core.to_list_of_3d_image(i) for i in image]
-    max_n  = max_n if isinstance(max_n, int) else len(image[0])
-    image  = [i[: max_n] for i in image]
-    
-    assert len(image) == len(header)
-    if label is not None:
-        label = builtins.to_list(label)
-        label = label[:max_n]
-        assert len(image[0]) == len(label)
-    
-    # Draw figure
-    ncols = len(image)
-    nrows = max_n
-    fig, axs = plt.subplots(
-        nrows   = nrows,
-        ncols   = ncols,
-        figsize = [ncols * scale, nrows * scale],
-        num     = abs(hash(winname)) % (10 ** 8),
-        squeeze = False,
-        clear   = True
+    canvas = render_enhancement(
+        image       = image,
+        label       = label,
+        denormalize = denormalize,
+        scale       = scale,
+        max_n       = max_n,
+        diff        = diff,
     )
-    # move_figure(x=0, y=0)
+    if save_config:
+        save_config = dict(save_config)
+        write_image_async(
+            path    = save_config.pop("filepath"),
+            image   = canvas,
+            quality = save_config.get("quality", 95),
+        )
+    if show:
+        cv2.imshow(winname, canvas)
+        cv2.waitKey(max(1, int(wait_time * 1000)))
+    return canvas
+
+
+def _to_uint8_batch(
+    image      : torch.Tensor | np.ndarray,
+    max_n      : int | None,
+    denormalize: bool,
+) -> np.ndarray:
+    """Convert a batch to a uint8 RGB array of shape :math:`[N, H, W, 3]` in
+    one operation (on the image's device for tensors).
+    """
+    if isinstance(image, torch.Tensor):
+        x = image.detach()
+        x = x if x.ndim == 4 else x.unsqueeze(0)
+        x = x[:max_n]
+        x = (x.float().clamp(0, 1) * 255.0).round() if denormalize else x.float().clamp(0, 255)
+        x = x.to(torch.uint8)
+        x = x.expand(-1, 3, -1, -1) if x.shape[1] == 1 else x[:, :3]
+        return x.permute(0, 2, 3, 1).contiguous().cpu().numpy()
+    x = np.asarray(image)
+    x = x if x.ndim == 4 else x[None]
+    x = x[:max_n]
+    if x.shape[-1] not in [1, 3, 4]:  # [N, C, H, W]
+        x = x.transpose(0, 2, 3, 1)
+    if x.dtype != np.uint8:
+        x = np.clip(x * 255.0 if denormalize else x, 0, 255).round().astype(np.uint8)
+    return np.repeat(x, 3, axis=-1) if x.shape[-1] == 1 else x[..., :3]
+
+
+def render_enhancement(
+    image      : dict,
+    label      : str | list[str] | None = None,
+    denormalize: bool       = True,
+    scale      : float      = 1,
+    max_n      : int | None = None,
+    diff       : bool       = False,
+) -> np.ndarray:
+    """Compose image enhancement results into a single uint8 BGR canvas with
+    OpenCV and NumPy: one column per item of :param:`image` (with its key as
+    the header), one row per image of the batch.
     
-    [ax.set_title(l) for ax, l in zip(axs[0], header)]
-    for i, img in enumerate(image):
-        for j, im in enumerate(img):
-            im = core.to_image_nparray(
-                input=im, keepdim=False, denormalize=denormalize)
-            axs[j, i].imshow(np.asarray(im), aspect="auto")
-            axs[j, i].set(xticklabels=[], yticklabels=[], xticks=[], yticks=[])
-        # if label is not None:
-        #     axs[i].set_title(label[i])
-    plt.get_current_fig_manager().set_window_title(winname)
-    plt.tight_layout()
-    plt.subplots_adjust(wspace=0.0, hspace=0.0)
+    Args:
+        image: A :class:`dict` of batches of shape :math:`[B, C, H, W]` (or
+            :math:`[B, H, W, C]` arrays), e.g., ``{'input': ..., 'pred': ...}``.
+        label: The labels of the rows. Default: ``None``.
+        denormalize: If ``True``, the images are in :math:`[0.0, 1.0]`.
+            Default: ``True``.
+        scale: Multiply the pixel size of each panel (unlike the figure size in
+            inches of the matplotlib functions). Keep it at ``1`` for
+            full-resolution batches, as ``2`` gives a canvas with four times
+            the pixels. Default: ``1``.
+        max_n: The maximum number of rows. Default: ``None`` means all.
+        diff: If ``True``, add a heatmap of :math:`|pred - target|` when both
+            are given. Default: ``False``.
     
-    # Save figure
-    if save_config:
-        filepath = save_config.pop("filepath")
-        plt.savefig(filepath, **save_config)
+    Returns:
+        A uint8 BGR image.
+    """
+    header = list(image.keys())
+    panels = [_to_uint8_batch(i, max_n, denormalize) for i in image.values()]
+    if diff and "pred" in image and "target" in image:
+        p, t = panels[header.index("pred")], panels[header.index("target")]
+        if p.shape == t.shape:
+            d = np.abs(p.astype(np.int16) - t.astype(np.int16)).max(axis=-1).astype(np.uint8)
+            d = np.stack([cv2.applyColorMap(x, cv2.COLORMAP_JET)[..., ::-1] for x in d])
+            panels.append(d)
+            header.append("|pred - target|")
     
-    plt.pause(wait_time)
+    n    = min(len(x) for x in panels)
+    h, w = panels[0].shape[1:3]
+    h, w = max(1, int(h * scale)), max(1, int(w * scale))
+    if label is not None:
+        label = core.to_list(x=label)[:n]
+    
+    bar    = 24
+    canvas = np.full((bar + n * h, len(panels) * w, 3), 255, dtype=np.uint8)
+    for j, (name, batch) in enumerate(zip(header, panels)):
+        x0 = j * w
+        cv2.putText(canvas, str(name), (x0 + 4, bar - 7), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 0), 1, cv2.LINE_AA)
+        for i in range(n):
+            cell = batch[i]
+            if cell.shape[:2] != (h, w):
+                cell = cv2.resize(cell, (w, h), interpolation=cv2.INTER_AREA)
+            canvas[bar + i * h:bar + (i + 1) * h, x0:x0 + w] = cell[..., ::-1]
+            if j == 0 and label is not None and i < len(label):
+                cv2.putText(canvas, str(label[i]), (x0 + 4, bar + i * h + 16), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1, cv2.LINE_AA)
+    return canvas
+
+# endregion
+
+
+# region Writer
+
+_writer         = None
+_pending_writes = collections.deque()
+
+
+def write_image_async(
+    path     : core.Path | str,
+    image    : np.ndarray,
+    quality  : int = 95,
+    max_queue: int = 8,
+):
+    """Write a uint8 BGR image with :func:`cv2.imwrite` on a background
+    thread. When :param:`max_queue` writes are pending, wait for the oldest
+    one, so a slow disk cannot pile up images in memory.
+    """
+    global _writer
+    if _writer is None:
+        _writer = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="imwrite")
+        atexit.register(flush_image_writes)
+    while len(_pending_writes) >= max_queue:
+        _pending_writes.popleft().result()
+    path = core.Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    _pending_writes.append(_writer.submit(_write_image, path, image, quality))
+
+
+def _write_image(path: core.Path, image: np.ndarray, quality: int):
+    """Write an image on the writer thread, and log a failure instead of
+    losing it silently.
+    """
+    try:
+        ok = cv2.imwrite(str(path), image, [cv2.IMWRITE_JPEG_QUALITY, int(quality)])
+    except cv2.error as e:
+        console.log(f"[red]Failed to write {path}: {e}")
+        return
+    if not ok:
+        console.log(f"[red]Failed to write {path}.")
+
+
+def flush_image_writes():
+    """Wait until all images queued by :func:`write_image_async` are written."""
+    while len(_pending_writes) > 0:
+        _pending_writes.popleft().result()
 
 # endregion
@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for :mod:`mon.vision.enhance.adjust`."""
+
+from __future__ import annotations
+
+import unittest
+
+import cv2
+import numpy as np
+import torch
+
+from mon.vision.enhance import adjust
+
+
+# region Helper Function
+
+def random_image(shape: tuple[int, ...], seed: int = 0) -> np.ndarray:
+    """A low-contrast uint8 image, so that equalization changes it."""
+    rng = np.random.default_rng(seed)
+    return (rng.random(shape) * 100 + 40).astype(np.uint8)
+
+# endregion
+
+
+# region TestCase
+
+class TestApplyLUT(unittest.TestCase):
+
+    def setUp(self):
+        self.image = random_image((2, 24, 32, 3))
+        self.lut   = adjust.get_gamma_lut(2.2)
+        self.table = np.round(self.lut * 255.0).astype(np.uint8)
+
+    def test_numpy_matches_cv2(self):
+        expected = cv2.LUT(self.image[0], self.table)
+        self.assertTrue(np.array_equal(adjust.apply_lut(self.image[0], self.lut), expected))
+        self.assertTrue(np.array_equal(adjust.adjust_gamma(self.image[0], 2.2), expected))
+
+    def test_tensor_matches_numpy(self):
+        expected = adjust.apply_lut(self.image, self.lut)
+        tensor   = torch.from_numpy(self.image).permute(0, 3, 1, 2)
+        output   = adjust.adjust_gamma(tensor, 2.2).permute(0, 2, 3, 1).numpy()
+        self.assertTrue(np.array_equal(output, expected))
+
+    def test_float_tensor_interpolates(self):
+        tensor = torch.from_numpy(self.image).permute(0, 3, 1, 2).float() / 255.0
+        output = adjust.apply_lut(tensor, self.lut)
+        self.assertEqual(output.dtype, torch.float32)
+        expected = torch.from_numpy(self.lut).float()[torch.from_numpy(self.image).long()].permute(0, 3, 1, 2)
+        self.assertTrue(torch.allclose(output, expected, atol=1e-5))
+
+    def test_tables_cache_is_bounded(self):
+        adjust._get_lut_table.cache_clear()
+        for gamma in np.linspace(0.5, 3.0, 200):
+            adjust.adjust_gamma(self.image[0], gamma)
+        info = adjust._get_lut_table.cache_info()
+        self.assertEqual(info.currsize, info.maxsize)
+        adjust.adjust_gamma(self.image[0], 3.0)
+        self.assertEqual(adjust._get_lut_table.cache_info().hits, info.hits + 1)
+
+
+class TestEqualizeHistogram(unittest.TestCase):
+
+    def setUp(self):
+        self.image = random_image((3, 24, 32, 3), seed=1)
+
+    def test_gray_matches_cv2(self):
+        gray     = self.image[0, ..., 0]
+        expected = cv2.equalizeHist(gray)
+        output   = adjust.equalize_histogram(gray)
+        self.assertEqual(output.shape, gray.shape)
+        self.assertLessEqual(np.abs(output.astype(int) - expected.astype(int)).max(), 1)
+
+    def test_batch_matches_cv2_per_channel(self):
+        output = adjust.equalize_histogram(self.image)
+        for i in range(self.image.shape[0]):
+            for j in range(self.image.shape[-1]):
+                expected = cv2.equalizeHist(np.ascontiguousarray(self.image[i, ..., j]))
+                self.assertLessEqual(np.abs(output[i, ..., j].astype(int) - expected.astype(int)).max(), 1)
+
+    def test_tensor_matches_numpy(self):
+        expected = adjust.equalize_histogram(self.image)
+        tensor   = torch.from_numpy(self.image).permute(0, 3, 1, 2)
+        output   = adjust.equalize_histogram(tensor)
+        self.assertEqual(output.dtype, torch.uint8)
+        self.assertTrue(np.array_equal(output.permute(0, 2, 3, 1).numpy(), expected))
+
+
+class TestCLAHE(unittest.TestCase):
+
+    def test_matches_cv2(self):
+        image = random_image((2, 64, 64, 3), seed=2)
+        op    = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(4, 4))
+        gray  = adjust.clahe(image[0, ..., 0], clip_limit=2.0, grid_size=(4, 4))
+        self.assertTrue(np.array_equal(gray, op.apply(np.ascontiguousarray(image[0, ..., 0]))))
+        output = adjust.clahe(image, clip_limit=2.0, grid_size=(4, 4))
+        self.assertEqual(output.shape, image.shape)
+        for i in range(image.shape[0]):
+            for j in range(image.shape[-1]):
+                expected = op.apply(np.ascontiguousarray(image[i, ..., j]))
+                self.assertTrue(np.array_equal(output[i, ..., j], expected))
+
+    def test_tensor_shape_and_dtype(self):
+        image  = torch.from_numpy(random_image((2, 64, 64, 3), seed=3)).permute(0, 3, 1, 2)
+        output = adjust.clahe(image, clip_limit=2.0, grid_size=(4, 4))
+        self.assertEqual(output.shape, image.shape)
+        self.assertEqual(output.dtype, torch.uint8)
+
+# endregion
+
+
+# region Main
+
+if __name__ == "__main__":
+    unittest.main()
+
+# endregion
@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for :mod:`mon.vision.geometry.bbox`."""
+
+from __future__ import annotations
+
+import unittest
+
+import numpy as np
+import torch
+import torchvision
+
+from mon.vision.geometry import bbox
+
+
+# region Helper Function
+
+def random_boxes(n: int, seed: int = 0, size: float = 100.0) -> np.ndarray:
+    """Random XYXY boxes with a positive width and height."""
+    rng = np.random.default_rng(seed)
+    xy  = rng.random((n, 2)) * size
+    wh  = rng.random((n, 2)) * size / 2 + 1
+    return np.concatenate([xy, xy + wh], axis=1)
+
+# endregion
+
+
+# region TestCase
+
+class TestBBoxIoU(unittest.TestCase):
+
+    def setUp(self):
+        self.b1 = random_boxes(7,  seed=0)
+        self.b2 = random_boxes(11, seed=1)
+        self.t1 = torch.from_numpy(self.b1)
+        self.t2 = torch.from_numpy(self.b2)
+
+    def assert_matches(self, fn, reference, atol: float = 1e-6):
+        expected = reference(self.t1, self.t2)
+        output_t = fn(self.t1, self.t2)
+        output_n = fn(self.b1, self.b2)
+        self.assertEqual(tuple(output_t.shape), (7, 11))
+        self.assertIsInstance(output_n, np.ndarray)
+        self.assertTrue(torch.allclose(output_t, expected, atol=atol))
+        self.assertTrue(np.allclose(output_n, output_t.numpy(), atol=atol))
+
+    def test_iou(self):
+        self.assert_matches(bbox.get_bbox_iou, torchvision.ops.box_iou)
+
+    def test_iou2(self):
+        self.assert_matches(bbox.get_bbox_iou2, torchvision.ops.box_iou)
+
+    def test_giou(self):
+        self.assert_matches(bbox.get_bbox_giou, torchvision.ops.generalized_box_iou)
+
+    def test_diou(self):
+        self.assert_matches(bbox.get_bbox_diou, torchvision.ops.distance_box_iou, atol=1e-5)
+
+    def test_ciou(self):
+        self.assert_matches(bbox.get_bbox_ciou, torchvision.ops.complete_box_iou, atol=1e-5)
+
+    def test_batched_leading_dims(self):
+        t1 = self.t1.expand(3, -1, -1)
+        t2 = self.t2.expand(3, -1, -1)
+        iou = bbox.get_bbox_iou(t1, t2)
+        self.assertEqual(tuple(iou.shape), (3, 7, 11))
+        self.assertTrue(torch.allclose(iou[1], torchvision.ops.box_iou(self.t1, self.t2)))
+
+    def test_single_iou(self):
+        expected = torchvision.ops.box_iou(self.t1, self.t2[:7]).diagonal()
+        self.assertTrue(torch.allclose(bbox.get_single_bbox_iou(self.t1, self.t2[:7]), expected))
+        self.assertTrue(np.allclose(bbox.get_single_bbox_iou(self.b1, self.b2[:7]), expected.numpy()))
+
+
+class TestBBoxNMS(unittest.TestCase):
+
+    def setUp(self):
+        rng          = np.random.default_rng(2)
+        # Clusters of overlapping boxes so that NMS suppresses some of them.
+        centers      = random_boxes(6, seed=3, size=200.0)
+        boxes        = np.repeat(centers, 8, axis=0) + rng.normal(0, 4, (48, 4))
+        boxes[:, 2:] = np.maximum(boxes[:, 2:], boxes[:, :2] + 1)
+        self.boxes   = boxes
+        self.scores  = rng.random(48)
+        self.classes = rng.integers(0, 3, 48)
+
+    def test_nms(self):
+        for iou_threshold in [0.3, 0.5, 0.7]:
+            with self.subTest(iou_threshold=iou_threshold):
+                expected = torchvision.ops.nms(
+                    torch.from_numpy(self.boxes).float(), torch.from_numpy(self.scores).float(), iou_threshold
+                ).numpy()
+                keep_n   = bbox.bbox_nms(self.boxes, self.scores, iou_threshold)
+                keep_t   = bbox.bbox_nms(torch.from_numpy(self.boxes), torch.from_numpy(self.scores), iou_threshold)
+                self.assertLess(len(expected), len(self.boxes))
+                self.assertTrue(np.array_equal(keep_n, expected))
+                self.assertTrue(np.array_equal(keep_t.numpy(), expected))
+
+    def test_batched_nms(self):
+        expected = torchvision.ops.batched_nms(
+            torch.from_numpy(self.boxes).float(),
+            torch.from_numpy(self.scores).float(),
+            torch.from_numpy(self.classes),
+            0.5,
+        ).numpy()
+        keep_n = bbox.bbox_batched_nms(self.boxes, self.scores, self.classes, 0.5)
+        keep_t = bbox.bbox_batched_nms(
+            torch.from_numpy(self.boxes), torch.from_numpy(self.scores), torch.from_numpy(self.classes), 0.5
+        )
+        self.assertTrue(np.array_equal(keep_n, expected))
+        self.assertTrue(np.array_equal(keep_t.numpy(), expected))
+
+    def test_empty(self):
+        keep = bbox.bbox_nms(np.zeros((0, 4)), np.zeros(0))
+        self.assertEqual(len(keep), 0)
+
+
+class TestBBoxConversion(unittest.TestCase):
+
+    def test_round_trip(self):
+        boxes = random_boxes(5, seed=4)
+        for b in [boxes, torch.from_numpy(boxes)]:
+            with self.subTest(type=type(b).__name__):
+                xywh = bbox.bbox_xyxy_to_xywh(b)
+                back = bbox.bbox_xywh_to_xyxy(xywh)
+                self.assertTrue(np.allclose(np.asarray(back), boxes))
+                norm = bbox.bbox_xyxy_to_cxcywhn(b, 200, 300)
+                back = bbox.bbox_cxcywhn_to_xyxy(norm, 200, 300)
+                self.assertTrue(np.allclose(np.asarray(back), boxes))
+
+# endregion
+
+
+# region Main
+
+if __name__ == "__main__":
+    unittest.main()
+
+# endregion
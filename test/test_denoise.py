@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for :mod:`mon.vision.enhance.denoise`."""
+
+from __future__ import annotations
+
+import unittest
+
+import torch
+
+from mon.vision.enhance import denoise
+
+
+# region Helper Function
+
+def tv_energy(
+    x        : torch.Tensor,
+    f        : torch.Tensor,
+    weight   : float,
+    isotropic: bool = True,
+) -> torch.Tensor:
+    """The ROF energy :math:`\\frac{1}{2} \\|x - f\\|_2^2 + \\lambda TV(x)` of
+    each image, with forward differences.
+    """
+    gx = torch.zeros_like(x)
+    gy = torch.zeros_like(x)
+    gx[..., :, :-1] = x[..., :, 1:] - x[..., :, :-1]
+    gy[..., :-1, :] = x[..., 1:, :] - x[..., :-1, :]
+    tv = torch.sqrt(gx ** 2 + gy ** 2) if isotropic else gx.abs() + gy.abs()
+    return 0.5 * ((x - f) ** 2).sum(dim=(1, 2, 3)) + weight * tv.sum(dim=(1, 2, 3))
+
+# endregion
+
+
+# region TestCase
+
+class TestTVDenoise(unittest.TestCase):
+
+    def setUp(self):
+        torch.manual_seed(0)
+        clean      = torch.zeros(2, 3, 32, 32)
+        clean[..., 8:24, 8:24] = 1.0
+        self.clean = clean
+        self.noisy = (clean + 0.2 * torch.randn_like(clean)).clamp(0, 1)
+
+    def test_energy_decreases(self):
+        for isotropic in [True, False]:
+            with self.subTest(isotropic=isotropic):
+                e0 = tv_energy(self.noisy, self.noisy, 0.1, isotropic)
+                x, iters = denoise.chambolle_pock_tv_denoise(
+                    self.noisy, weight=0.1, isotropic=isotropic, tol=0, max_iters=200
+                )
+                e1 = tv_energy(x, self.noisy, 0.1, isotropic)
+                self.assertEqual(iters, 200)
+                self.assertTrue(bool((e1 < e0).all()))
+
+    def test_more_iterations_lower_energy(self):
+        x1, _ = denoise.chambolle_pock_tv_denoise(self.noisy, weight=0.1, tol=0, max_iters=10)
+        x2, _ = denoise.chambolle_pock_tv_denoise(self.noisy, weight=0.1, tol=0, max_iters=300)
+        e1    = tv_energy(x1, self.noisy, 0.1)
+        e2    = tv_energy(x2, self.noisy, 0.1)
+        self.assertTrue(bool((e2 <= e1 * (1 + 1e-4)).all()))
+
+    def test_removes_noise(self):
+        x, _ = denoise.chambolle_pock_tv_denoise(self.noisy, weight=0.1, max_iters=300)
+        self.assertLess(float(((x - self.clean) ** 2).mean()), float(((self.noisy - self.clean) ** 2).mean()))
+
+    def test_early_stop_and_dtype(self):
+        x, iters = denoise.chambolle_pock_tv_denoise(self.noisy.double(), weight=0.1, tol=1e-3, max_iters=1000)
+        self.assertLess(iters, 1000)
+        self.assertEqual(x.dtype, torch.float64)
+        self.assertEqual(x.shape, self.noisy.shape)
+
+    def test_zero_weight(self):
+        x, iters = denoise.chambolle_pock_tv_denoise(self.noisy, weight=0)
+        self.assertEqual(iters, 0)
+        self.assertTrue(torch.equal(x, self.noisy))
+
+# endregion
+
+
+# region Main
+
+if __name__ == "__main__":
+    unittest.main()
+
+# endregion
@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for :func:`mon.nn.data.dataset.run_on_rank_zero`."""
+
+from __future__ import annotations
+
+import tempfile
+import unittest
+from unittest import mock
+
+from torch import distributed
+
+from mon.nn.data import dataset
+
+
+# region Helper Function
+
+class Counter:
+
+    def __init__(self, value: list[str]):
+        self.value = value
+        self.calls = 0
+
+    def __call__(self) -> list[str]:
+        self.calls += 1
+        return self.value
+
+
+def fake_distributed(rank: int, broadcast_value: tuple) -> mock.MagicMock:
+    """A two-process group as seen from :param:`rank`. The broadcast fills the
+    list with :param:`broadcast_value` on the other ranks.
+    """
+    d = mock.MagicMock()
+    d.is_available.return_value   = True
+    d.is_initialized.return_value  = True
+    d.get_world_size.return_value  = 2
+    d.get_rank.return_value        = rank
+
+    def broadcast_object_list(objects: list, src: int = 0):
+        if rank != src:
+            objects[0] = broadcast_value
+
+    d.broadcast_object_list.side_effect = broadcast_object_list
+    return d
+
+# endregion
+
+
+# region TestCase
+
+class TestRunOnRankZero(unittest.TestCase):
+
+    def test_without_process_group(self):
+        fn = Counter(["a.png", "b.png"])
+        self.assertEqual(dataset.run_on_rank_zero(fn), ["a.png", "b.png"])
+        self.assertEqual(fn.calls, 1)
+
+    def test_single_process_group(self):
+        with tempfile.TemporaryDirectory() as d:
+            distributed.init_process_group("gloo", init_method=f"file://{d}/store", rank=0, world_size=1)
+            try:
+                fn = Counter(["a.png"])
+                self.assertEqual(dataset.run_on_rank_zero(fn), ["a.png"])
+                self.assertEqual(fn.calls, 1)
+                with self.assertRaises(FileNotFoundError):
+                    dataset.run_on_rank_zero(lambda: open(f"{d}/missing.png"))
+            finally:
+                distributed.destroy_process_group()
+
+    def test_rank_zero_builds_and_broadcasts(self):
+        fn = Counter(["a.png"])
+        with mock.patch.object(dataset, "distributed", fake_distributed(0, None)) as d:
+            self.assertEqual(dataset.run_on_rank_zero(fn), ["a.png"])
+        self.assertEqual(fn.calls, 1)
+        self.assertEqual(d.broadcast_object_list.call_args.args[0], [(["a.png"], None)])
+
+    def test_other_ranks_receive_the_result(self):
+        fn = Counter(["b.png"])
+        with mock.patch.object(dataset, "distributed", fake_distributed(1, (["a.png"], None))):
+            self.assertEqual(dataset.run_on_rank_zero(fn), ["a.png"])
+        self.assertEqual(fn.calls, 0)
+
+    def test_error_is_raised_on_every_rank(self):
+        with mock.patch.object(dataset, "distributed", fake_distributed(1, (None, ValueError("bad root")))):
+            with self.assertRaisesRegex(ValueError, "bad root"):
+                dataset.run_on_rank_zero(Counter([]))
+
+# endregion
+
+
+# region Main
+
+if __name__ == "__main__":
+    unittest.main()
+
+# endregion
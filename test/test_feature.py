@@ -0,0 +1,171 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for :mod:`mon.vision.feature`."""
+
+from __future__ import annotations
+
+import unittest
+
+import cv2
+import numpy as np
+import torch
+
+from mon.vision import feature
+
+
+# region Helper Function
+
+class DummyEmbedder(feature.DeepEmbedder):
+    """A 1x1 convolution followed by global average pooling, so that the
+    feature of a uniformly colored crop does not depend on its size.
+    """
+    
+    def init_model(self):
+        torch.manual_seed(0)
+        self.model = torch.nn.Sequential(
+            torch.nn.Conv2d(3, 8, 1),
+            torch.nn.AdaptiveAvgPool2d(1),
+            torch.nn.Flatten(),
+        ).eval()
+    
+    def preprocess(self, images: np.ndarray) -> torch.Tensor:
+        input = torch.from_numpy(np.ascontiguousarray(images)).permute(0, 3, 1, 2).float()
+        return torch.nn.functional.interpolate(input, size=self.image_size, mode="bilinear")
+    
+    def forward(self, input: torch.Tensor) -> torch.Tensor:
+        return self.model(input)
+    
+    def postprocess(self, indexes, images, input, pred, *args, **kwargs) -> list[np.ndarray]:
+        return [p.numpy() for p in pred]
+
+
+def block_frames(num_frames: int = 2, block: int = 16) -> tuple[torch.Tensor, list[tuple]]:
+    """Frames made of uniformly colored blocks, and one box inside each block
+    as ``(frame, x1, y1, x2, y2)``.
+    """
+    rng    = np.random.default_rng(0)
+    frames = torch.from_numpy(rng.random((num_frames, 3, 4, 4))).float()
+    frames = frames.repeat_interleave(block, dim=2).repeat_interleave(block, dim=3)
+    boxes  = []
+    for b in range(num_frames):
+        for y in range(4):
+            for x in range(4):
+                x1, y1 = x * block + 2, y * block + 3
+                boxes.append((b, x1, y1, x1 + 10 - y, y1 + 8 - x))
+    return frames, boxes
+
+
+def textured_images(num_images: int, h: int, w: int, seed: int = 0) -> np.ndarray:
+    """Upscaled noise images with enough corners for ORB keypoints."""
+    rng    = np.random.default_rng(seed)
+    images = (rng.random((num_images, h // 4, w // 4, 3)) * 255).astype(np.uint8)
+    return np.stack([cv2.resize(i, (w, h), interpolation=cv2.INTER_NEAREST) for i in images])
+
+# endregion
+
+
+# region TestCase
+
+class TestDeepEmbedder(unittest.TestCase):
+
+    def setUp(self):
+        self.embedder       = DummyEmbedder(config=None, weight=None, image_size=32, buckets=(4, 8))
+        self.frames, boxes  = block_frames()
+        self.boxes          = torch.tensor(boxes, dtype=torch.float32)
+
+    def test_matches_per_crop_embed(self):
+        output = self.embedder.embed_boxes(self.frames, self.boxes)
+        self.assertEqual(tuple(output.shape), (len(self.boxes), 8))
+        for j, (b, x1, y1, x2, y2) in enumerate(self.boxes.long().tolist()):
+            crop     = self.frames[b, :, y1:y2, x1:x2].permute(1, 2, 0).numpy()
+            expected = torch.from_numpy(self.embedder.embed([j], crop[None])[0])
+            expected = torch.nn.functional.normalize(expected, dim=0)
+            self.assertTrue(torch.allclose(output[j], expected, atol=1e-5))
+
+    def test_box_formats(self):
+        expected  = self.embedder.embed_boxes(self.frames, self.boxes)
+        per_frame = [self.boxes[self.boxes[:, 0] == b, 1:] for b in range(len(self.frames))]
+        self.assertTrue(torch.allclose(self.embedder.embed_boxes(self.frames, per_frame), expected, atol=1e-6))
+        single = self.embedder.embed_boxes(self.frames[0], per_frame[0])
+        self.assertTrue(torch.allclose(single, expected[:len(per_frame[0])], atol=1e-6))
+
+    def test_empty(self):
+        output = self.embedder.embed_boxes(self.frames, torch.zeros(0, 4))
+        self.assertEqual(tuple(output.shape), (0, 8))
+        self.embedder.embed_boxes(self.frames, self.boxes[:3])
+        output = self.embedder.embed_boxes(self.frames, [torch.zeros(0, 4), torch.zeros(0, 4)])
+        self.assertEqual(tuple(output.shape), (0, 8))
+
+
+class TestHOGEmbedder(unittest.TestCase):
+
+    def setUp(self):
+        self.embedder = feature.HOGEmbedder()
+        self.images   = textured_images(5, 128, 64)
+
+    def test_embed_batch_matches_embed(self):
+        expected = np.stack([f.reshape(-1) for f in self.embedder.embed(None, self.images)])
+        output   = self.embedder.embed_batch(None, self.images)
+        self.assertEqual(output.shape, (5, self.embedder.hog.getDescriptorSize()))
+        self.assertTrue(np.allclose(output, expected, atol=1e-6))
+
+    def test_threads_match(self):
+        crops    = [textured_images(1, 40 + 8 * i, 32 + 4 * i, seed=i)[0] for i in range(6)]
+        expected = self.embedder.embed_batch(None, crops)
+        threaded = feature.HOGEmbedder(num_workers=3).embed_batch(None, crops)
+        self.assertTrue(np.array_equal(threaded, expected))
+
+    def test_cache(self):
+        embedder = feature.HOGEmbedder(cache_every=2)
+        first    = embedder.embed_batch([7], self.images[:1])
+        second   = embedder.embed_batch([7], self.images[1:2])
+        third    = embedder.embed_batch([7], self.images[1:2])
+        self.assertTrue(np.array_equal(first, second))
+        self.assertFalse(np.array_equal(second, third))
+
+    def test_empty(self):
+        output = self.embedder.embed_batch(None, [])
+        self.assertEqual(output.shape, (0, self.embedder.hog.getDescriptorSize()))
+
+
+class TestORBEmbedder(unittest.TestCase):
+
+    def setUp(self):
+        self.embedder = feature.ORBEmbedder(num_features=16)
+        self.images   = textured_images(3, 96, 96)
+
+    def test_zero_padded_descriptors(self):
+        output = self.embedder.embed_batch(None, self.images)
+        self.assertEqual(output.shape, (3, 16, 32))
+        self.assertEqual(output.dtype, np.uint8)
+        for image, f in zip(self.images, output):
+            _, des = self.embedder.orb.detectAndCompute(image, None)
+            k      = min(len(des), 16)
+            self.assertTrue(np.array_equal(f[:k], des[:k]))
+            self.assertFalse(np.any(f[k:]))
+
+    def test_no_keypoints(self):
+        flat   = np.full((2, 64, 64, 3), 128, np.uint8)
+        output = self.embedder.embed_batch(None, flat)
+        self.assertEqual(output.shape, (2, 16, 32))
+        self.assertFalse(np.any(output))
+
+    def test_threads_match(self):
+        expected = self.embedder.embed_batch(None, self.images)
+        threaded = feature.ORBEmbedder(num_features=16, num_workers=3).embed_batch(None, self.images)
+        self.assertTrue(np.array_equal(threaded, expected))
+
+    def test_empty(self):
+        output = self.embedder.embed_batch(None, [])
+        self.assertEqual((output.shape, output.dtype), ((0, 16, 32), np.uint8))
+
+# endregion
+
+
+# region Main
+
+if __name__ == "__main__":
+    unittest.main()
+
+# endregion
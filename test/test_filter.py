@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for :mod:`mon.vision.filter`."""
+
+from __future__ import annotations
+
+import unittest
+
+import torch
+
+from mon.vision import filter
+
+
+# region Helper Function
+
+def naive_box_filter(input: torch.Tensor, radius: int) -> torch.Tensor:
+    """Mean over the part of each :math:`(2r + 1) \\times (2r + 1)` window
+    that lies inside the image, one pixel at a time.
+    """
+    h, w   = input.shape[-2:]
+    output = torch.empty_like(input)
+    for y in range(h):
+        for x in range(w):
+            y0, y1 = max(0, y - radius), min(h, y + radius + 1)
+            x0, x1 = max(0, x - radius), min(w, x + radius + 1)
+            output[..., y, x] = input[..., y0:y1, x0:x1].mean(dim=(-2, -1))
+    return output
+
+# endregion
+
+
+# region TestCase
+
+class TestBoxFilter(unittest.TestCase):
+
+    def test_matches_naive_box_filter(self):
+        torch.manual_seed(0)
+        input = torch.rand(2, 3, 17, 23, dtype=torch.float64)
+        for radius in [1, 2, 4]:
+            with self.subTest(radius=radius):
+                output = filter.box_filter_torch(input, radius)
+                self.assertEqual(output.shape, input.shape)
+                self.assertTrue(torch.allclose(output, naive_box_filter(input, radius)))
+
+    def test_constant_image(self):
+        input  = torch.full((1, 1, 12, 12), 0.5)
+        output = filter.box_filter_torch(input, 3)
+        self.assertTrue(torch.allclose(output, input))
+
+    def test_radius_too_large(self):
+        with self.assertRaises(ValueError):
+            filter.box_filter_torch(torch.rand(1, 1, 5, 5), 2)
+
+# endregion
+
+
+# region Main
+
+if __name__ == "__main__":
+    unittest.main()
+
+# endregion
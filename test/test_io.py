@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for :class:`mon.vision.io.BucketImageLoader`."""
+
+from __future__ import annotations
+
+import tempfile
+import unittest
+
+import cv2
+import numpy as np
+import torch
+
+import mon
+from mon.vision import io
+
+
+# region Helper Function
+
+def write_images(root: mon.Path, shapes: list[tuple[int, int]]) -> list[np.ndarray]:
+    """Write one random PNG per shape, named so they sort in order."""
+    rng    = np.random.default_rng(0)
+    images = []
+    for i, (h, w) in enumerate(shapes):
+        image = (rng.random((h, w, 3)) * 255).astype(np.uint8)
+        cv2.imwrite(str(root / f"{i:02d}.png"), image)
+        images.append(image[..., ::-1])  # The loader returns RGB.
+    return images
+
+# endregion
+
+
+# region TestCase
+
+class TestBucketImageLoader(unittest.TestCase):
+
+    def setUp(self):
+        self.dir    = tempfile.TemporaryDirectory()
+        self.root   = mon.Path(self.dir.name)
+        self.shapes = [(20, 30), (20, 30), (40, 60), (20, 30), (22, 33), (40, 60)]
+        self.images = write_images(self.root, self.shapes)
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_bucket_by_shape(self):
+        loader = io.BucketImageLoader(source=self.root, batch_size=2, bucket_by="shape")
+        self.assertEqual(len(loader), 6)
+        self.assertEqual(loader.batch_len(), 4)
+        batches = [list(batch[1]) for batch in loader]
+        self.assertEqual(batches, [[0, 1], [3], [2, 5], [4]])
+
+    def test_bucket_by_aspect_ratio(self):
+        loader = io.BucketImageLoader(source=self.root, batch_size=4, bucket_by="aspect_ratio")
+        # The 22x33 image shares the bucket of the 20x30 ones, the 40x60 images
+        # are 4x larger and get their own.
+        batches = [list(batch[1]) for batch in loader]
+        self.assertEqual(batches, [[0, 1, 3, 4], [2, 5]])
+
+    def test_padding_and_unpad(self):
+        loader = io.BucketImageLoader(source=self.root, batch_size=4, bucket_by="aspect_ratio", stride=8)
+        images, indexes, files, rel_paths, sizes = next(iter(loader))
+        self.assertEqual(images.shape, (4, 24, 40, 3))
+        self.assertEqual(sizes, [[20, 30], [20, 30], [20, 30], [22, 33]])
+        for i, image in zip(indexes, io.BucketImageLoader.unpad(images, sizes)):
+            self.assertTrue(np.array_equal(image, self.images[i]))
+
+    def test_unpad_tensor(self):
+        loader = io.BucketImageLoader(source=self.root, batch_size=4, bucket_by="aspect_ratio", to_tensor=True)
+        images, indexes, _, _, sizes = next(iter(loader))
+        self.assertEqual(tuple(images.shape), (4, 3, 22, 33))
+        for i, image in zip(indexes, io.BucketImageLoader.unpad(images, sizes)):
+            expected = torch.from_numpy(self.images[i].copy()).permute(2, 0, 1)
+            self.assertEqual(tuple(image.shape), (1, 3) + self.shapes[i])
+            self.assertTrue(torch.equal(image[0], expected))
+
+    def test_skip_unreadable(self):
+        (self.root / "99.png").write_bytes(b"not an image")
+        with self.assertRaises(IOError):
+            io.read_image_shape(self.root / "99.png")
+        loader = io.BucketImageLoader(source=self.root, batch_size=2)
+        self.assertEqual(len(loader), 6)
+        self.assertNotIn(self.root / "99.png", loader.images)
+
+# endregion
+
+
+# region Main
+
+if __name__ == "__main__":
+    unittest.main()
+
+# endregion
@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for :meth:`mon.nn.model.Model.log_step` and
+:meth:`mon.nn.model.Model.log_epoch`.
+"""
+
+from __future__ import annotations
+
+import unittest
+from unittest import mock
+
+import torch
+
+import mon
+from mon.nn import metric as mmetric
+
+
+# region Helper Function
+
+def build_zerodce(log_every_n_steps: int | None) -> mon.ZeroDCE:
+    model = mon.ZeroDCE(
+        config            = "zerodce.yaml",
+        hparams           = None,
+        channels          = 3,
+        num_classes       = None,
+        classlabels       = None,
+        weights           = False,
+        fullname          = "zerodce",
+        metrics           = {
+            "train": mmetric.MeanAbsoluteError(),
+            "val"  : mmetric.MeanAbsoluteError(),
+            "test" : None,
+        },
+        log_every_n_steps = log_every_n_steps,
+        verbose           = False,
+    )
+    return model
+
+
+def logged(log: mock.MagicMock) -> list[tuple[str, dict]]:
+    return [(c.kwargs["name"], c.kwargs) for c in log.call_args_list]
+
+# endregion
+
+
+# region TestCase
+
+class TestLogStep(unittest.TestCase):
+
+    def setUp(self):
+        torch.manual_seed(0)
+        self.model  = build_zerodce(log_every_n_steps=2)
+        self.pred   = torch.rand(4, 3, 8, 8)
+        self.target = torch.rand(4, 3, 8, 8)
+        self.loss   = torch.tensor(0.5)
+
+    def test_epoch_loss_is_synced_once_per_epoch(self):
+        with mock.patch.object(self.model, "log") as log:
+            self.model.log_step("train", self.loss, self.pred, self.target, batch_idx=1)
+        (name, kwargs), = logged(log)
+        self.assertEqual(name, "train/loss")
+        self.assertEqual((kwargs["on_step"], kwargs["on_epoch"], kwargs["sync_dist"]), (False, True, True))
+        self.assertEqual(kwargs["batch_size"], 4)
+
+    def test_step_loss_follows_each_phase_batch_index(self):
+        with mock.patch.object(self.model, "log") as log:
+            for batch_idx in range(5):
+                self.model.log_step("train", self.loss, self.pred, self.target, batch_idx=batch_idx)
+                # A validation batch in between must not shift the train cadence.
+                self.model.log_step("val", self.loss, self.pred, self.target, batch_idx=0)
+        names = [name for name, _ in logged(log)]
+        self.assertEqual(names.count("train/loss_step"), 3)
+        self.assertEqual(names.count("val/loss_step"),   5)
+        step = [kwargs for name, kwargs in logged(log) if name == "train/loss_step"][0]
+        self.assertEqual((step["on_step"], step["sync_dist"], step["rank_zero_only"]), (True, False, True))
+
+    def test_step_logging_disabled(self):
+        model = build_zerodce(log_every_n_steps=0)
+        with mock.patch.object(model, "log") as log:
+            model.log_step("train", self.loss, self.pred, self.target, batch_idx=0)
+        self.assertEqual([name for name, _ in logged(log)], ["train/loss"])
+
+    def test_metrics_accumulate_until_epoch_end(self):
+        metric = self.model.train_metrics[0]
+        preds  = [torch.rand(2, 3, 8, 8) for _ in range(3)]
+        with mock.patch.object(self.model, "log") as log:
+            for i, pred in enumerate(preds):
+                self.model.log_step("train", None, pred, self.target[:2], batch_idx=i)
+            self.assertEqual(log.call_count, 0)
+            self.model.log_epoch("train")
+        (name, kwargs), = logged(log)
+        expected = torch.stack([(p - self.target[:2]).abs().mean() for p in preds]).mean()
+        self.assertEqual(name, f"train/{metric.name}")
+        self.assertTrue(torch.allclose(kwargs["value"], expected, atol=1e-6))
+        self.assertFalse(metric.update_called)
+
+    def test_log_epoch_skips_metrics_without_updates(self):
+        with mock.patch.object(self.model, "log") as log:
+            self.model.log_epoch("val")
+            self.model.log_epoch("test")
+        self.assertEqual(log.call_count, 0)
+
+# endregion
+
+
+# region Main
+
+if __name__ == "__main__":
+    unittest.main()
+
+# endregion
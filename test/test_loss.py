@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for :mod:`mon.vision.nn.loss`."""
+
+from __future__ import annotations
+
+import unittest
+
+import torch
+
+from mon.vision import nn
+
+
+# region Helper Function
+
+def separate_zero_reference_loss(
+    loss    : nn.FusedZeroReferenceLoss,
+    input   : torch.Tensor,
+    target  : list[torch.Tensor],
+    previous: torch.Tensor | None = None,
+) -> torch.Tensor:
+    """The weighted sum of the separate zero-reference losses, computed the
+    way the ``ZeroReferenceLoss`` of Zero-ADCE and GCE-Net did before they were
+    fused.
+    """
+    a, p, enhance = target
+    if previous is not None and enhance.shape == previous.shape:
+        loss_crl = loss.loss_crl(input=enhance, target=previous)
+    else:
+        loss_crl = loss.loss_crl(input=enhance, target=input)
+    return (
+          loss.weight_bri  * loss.loss_bri(input=p, target=input)
+        + loss.weight_col  * loss.loss_col(input=enhance)
+        + loss.weight_crl  * loss_crl
+        + loss.weight_edge * loss.loss_edge(input=enhance, target=input)
+        + loss.weight_exp  * loss.loss_exp(input=enhance)
+        + loss.weight_tvA  * loss.loss_tvA(input=a)
+        + loss.weight_kl   * loss.loss_kl(input=enhance, target=input)
+        + loss.weight_spa  * loss.loss_spa(input=enhance, target=input)
+    )
+
+# endregion
+
+
+# region TestCase
+
+class TestFusedZeroReferenceLoss(unittest.TestCase):
+
+    def setUp(self):
+        torch.manual_seed(0)
+        self.input   = torch.rand(2, 3, 64, 64)
+        self.a       = torch.rand(2, 24, 64, 64) * 2 - 1
+        self.p       = torch.rand(2, 1, 64, 64)
+        self.enhance = torch.rand(2, 3, 64, 64, requires_grad=True)
+
+    def test_equals_sum_of_separate_losses(self):
+        loss      = nn.FusedZeroReferenceLoss()
+        target    = [self.a, self.p, self.enhance]
+        fused, _  = loss(input=self.input, target=target)
+        separate  = separate_zero_reference_loss(loss, self.input, target)
+        self.assertTrue(torch.allclose(fused, separate, rtol=1e-4, atol=1e-5))
+
+    def test_equals_sum_with_previous(self):
+        loss      = nn.FusedZeroReferenceLoss()
+        target    = [self.a, self.p, self.enhance]
+        previous  = torch.rand(2, 3, 64, 64)
+        fused, _  = loss(input=self.input, target=target, previous=previous)
+        separate  = separate_zero_reference_loss(loss, self.input, target, previous)
+        self.assertTrue(torch.allclose(fused, separate, rtol=1e-4, atol=1e-5))
+
+    def test_exposure_patch_not_multiple_of_spatial_patch(self):
+        loss      = nn.FusedZeroReferenceLoss(exp_patch_size=6, spa_patch_size=4)
+        self.assertFalse(loss.exp_from_spa)
+        target    = [self.a, self.p, self.enhance]
+        fused, _  = loss(input=self.input, target=target)
+        separate  = separate_zero_reference_loss(loss, self.input, target)
+        self.assertTrue(torch.allclose(fused, separate, rtol=1e-4, atol=1e-5))
+
+    def test_gradients_match(self):
+        loss   = nn.FusedZeroReferenceLoss()
+        target = [self.a, self.p, self.enhance]
+        fused, _ = loss(input=self.input, target=target)
+        grad_fused, = torch.autograd.grad(fused, self.enhance)
+        separate = separate_zero_reference_loss(loss, self.input, target)
+        grad_separate, = torch.autograd.grad(separate, self.enhance)
+        self.assertTrue(torch.allclose(grad_fused, grad_separate, rtol=1e-4, atol=1e-6))
+
+    def test_input_cache(self):
+        loss   = nn.FusedZeroReferenceLoss()
+        stats1 = loss.input_stats(self.input)
+        stats2 = loss.input_stats(self.input)
+        self.assertIs(stats1, stats2)
+        self.input.add_(0.0)  # Bumps the version counter
+        self.assertIsNot(loss.input_stats(self.input), stats1)
+
+    def test_inference_tensor(self):
+        loss = nn.FusedZeroReferenceLoss()
+        with torch.inference_mode():
+            input   = self.input.clone()
+            target  = [self.a.clone(), self.p.clone(), self.enhance.detach().clone()]
+            fused, _ = loss(input=input, target=target)
+        self.assertTrue(torch.isfinite(fused))
+
+# endregion
+
+
+# region Main
+
+if __name__ == "__main__":
+    unittest.main()
+
+# endregion
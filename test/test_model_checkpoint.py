@@ -0,0 +1,175 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for the asynchronous writes of
+:class:`mon.nn.callback.model_checkpoint.ModelCheckpoint`.
+"""
+
+from __future__ import annotations
+
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+import torch
+
+from mon.core import pathlib
+from mon.nn.callback import model_checkpoint
+
+
+# region Helper Function
+
+class Connector:
+
+    def __init__(self):
+        self.weight = torch.zeros(4)
+
+    def dump_checkpoint(self, weights_only: bool = False) -> dict:
+        return {"state_dict": {"weight": self.weight}}
+
+
+class Strategy:
+
+    def __init__(self):
+        self.removed = []
+
+    def barrier(self, name: str | None = None):
+        pass
+
+    def remove_checkpoint(self, filepath: str):
+        self.removed.append(str(filepath))
+        if os.path.exists(filepath):
+            os.remove(filepath)
+
+
+class Trainer:
+    """The parts of a :class:`lightning.pytorch.Trainer` the writes use."""
+
+    is_global_zero = True
+
+    def __init__(self):
+        self._checkpoint_connector = Connector()
+        self.strategy              = Strategy()
+
+
+def load_weight(filepath: pathlib.Path) -> torch.Tensor:
+    return torch.load(filepath)["state_dict"]["weight"]
+
+# endregion
+
+
+# region TestCase
+
+class TestAsyncCheckpoint(unittest.TestCase):
+
+    def setUp(self):
+        self.dir      = tempfile.TemporaryDirectory()
+        self.root     = pathlib.Path(self.dir.name)
+        self.trainer  = Trainer()
+        self.callback = model_checkpoint.ModelCheckpoint(dirpath=self.root, async_save=True, max_pending_saves=2)
+
+    def tearDown(self):
+        self.callback.teardown(self.trainer, None, "fit")
+        self.dir.cleanup()
+
+    def write(self, filepath: pathlib.Path, value: float):
+        self.trainer._checkpoint_connector.weight = torch.full((4,), value)
+        self.callback._write_checkpoint(self.trainer, filepath)
+
+    def test_atomic_write(self):
+        filepath = self.root / "weights" / "last.ckpt"
+        self.write(filepath, 1.0)
+        self.callback.flush()
+        self.assertTrue(torch.equal(load_weight(filepath), torch.full((4,), 1.0)))
+        # A failed write leaves the previous file intact and no temp file.
+        with self.assertRaises(Exception):
+            model_checkpoint.ModelCheckpoint._atomic_save({"fn": lambda: None}, filepath)
+        self.assertTrue(torch.equal(load_weight(filepath), torch.full((4,), 1.0)))
+        self.assertEqual(sorted(p.name for p in filepath.parent.iterdir()), ["last.ckpt"])
+
+    def test_snapshot_is_taken_before_the_write(self):
+        filepath = self.root / "last.ckpt"
+        self.write(filepath, 1.0)
+        # Updating the weights in place after the save must not change it.
+        self.trainer._checkpoint_connector.weight.fill_(2.0)
+        self.callback.flush()
+        self.assertTrue(torch.equal(load_weight(filepath), torch.full((4,), 1.0)))
+
+    def test_writes_in_order(self):
+        filepath = self.root / "last.ckpt"
+        original = model_checkpoint.ModelCheckpoint._atomic_save
+        written  = []
+
+        def slow_save(checkpoint: dict, path: pathlib.Path):
+            time.sleep(0.01)
+            original(checkpoint, path)
+            written.append(float(checkpoint["state_dict"]["weight"][0]))
+
+        with mock.patch.object(self.callback, "_atomic_save", slow_save):
+            for value in range(5):
+                self.write(filepath, float(value))
+            self.callback.flush()
+        self.assertEqual(written, [0.0, 1.0, 2.0, 3.0, 4.0])
+        self.assertTrue(torch.equal(load_weight(filepath), torch.full((4,), 4.0)))
+
+    def test_remove_after_write(self):
+        filepath = self.root / "epoch=0.ckpt"
+        original = model_checkpoint.ModelCheckpoint._atomic_save
+
+        def slow_save(checkpoint: dict, path: pathlib.Path):
+            time.sleep(0.05)
+            original(checkpoint, path)
+
+        with mock.patch.object(self.callback, "_atomic_save", slow_save):
+            self.write(filepath, 1.0)
+            self.callback._remove_checkpoint(self.trainer, str(filepath))
+            self.callback.flush()
+        self.assertEqual(self.trainer.strategy.removed, [str(filepath)])
+        self.assertFalse(filepath.exists())
+
+    def test_pending_writes_are_bounded(self):
+        release  = threading.Event()
+        original = model_checkpoint.ModelCheckpoint._atomic_save
+
+        def blocked_save(checkpoint: dict, path: pathlib.Path):
+            release.wait(timeout=10)
+            original(checkpoint, path)
+
+        with mock.patch.object(self.callback, "_atomic_save", blocked_save):
+            self.write(self.root / "a.ckpt", 1.0)
+            self.write(self.root / "b.ckpt", 2.0)
+            # Removes hold no snapshot and never wait.
+            self.callback._remove_checkpoint(self.trainer, str(self.root / "old.ckpt"))
+            third = threading.Thread(target=self.write, args=(self.root / "c.ckpt", 3.0))
+            third.start()
+            third.join(timeout=0.2)
+            self.assertTrue(third.is_alive())
+            release.set()
+            third.join(timeout=10)
+            self.assertFalse(third.is_alive())
+            self.callback.flush()
+        for name, value in [("a", 1.0), ("b", 2.0), ("c", 3.0)]:
+            self.assertTrue(torch.equal(load_weight(self.root / f"{name}.ckpt"), torch.full((4,), value)))
+
+    def test_flush_raises_write_errors(self):
+        def failed_save(checkpoint: dict, path: pathlib.Path):
+            raise OSError("disk full")
+
+        with mock.patch.object(self.callback, "_atomic_save", failed_save):
+            self.write(self.root / "last.ckpt", 1.0)
+            with self.assertRaises(OSError):
+                self.callback.flush()
+        self.assertEqual(len(self.callback._pending), 0)
+
+# endregion
+
+
+# region Main
+
+if __name__ == "__main__":
+    unittest.main()
+
+# endregion
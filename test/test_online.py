@@ -0,0 +1,145 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for the online adaptation in ``bin/enhance/online.py``."""
+
+from __future__ import annotations
+
+import sys
+import threading
+import unittest
+
+import torch
+
+import mon
+
+_enhance_dir = mon.Path(__file__).absolute().parent.parent / "bin" / "enhance"
+if str(_enhance_dir) not in sys.path:
+    sys.path.insert(0, str(_enhance_dir))
+
+import online
+
+
+# region Helper Function
+
+class Gain(torch.nn.Module):
+    """A one-parameter zero-reference model that learns to map its input to
+    mid-gray. :attr:`gate`, if set, blocks :meth:`forward_loss` until it is
+    released, and :attr:`started` is set when it is entered.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.weight  = torch.nn.Parameter(torch.ones(()))
+        self.gate    = None
+        self.started = None
+        self.batches = []
+
+    def forward(self, input: torch.Tensor, augment: bool = False, profile: bool = False) -> torch.Tensor:
+        return input * self.weight
+
+    def forward_loss(self, input: torch.Tensor, target: torch.Tensor | None) -> tuple[torch.Tensor, torch.Tensor]:
+        self.batches.append(input.shape[0])
+        if self.started is not None:
+            self.started.set()
+        if self.gate is not None:
+            self.gate.wait(timeout=10)
+        pred = self(input)
+        return pred, ((pred - 0.5) ** 2).mean()
+
+
+def fail(input: torch.Tensor, target: torch.Tensor | None):
+    raise RuntimeError("boom")
+
+
+def build_adapter(**kwargs) -> online.OnlineAdapter:
+    model = Gain()
+    return online.OnlineAdapter(
+        model     = model,
+        optimizer = torch.optim.SGD(model.parameters(), lr=0.5),
+        clip_grad = 0,
+        **kwargs
+    )
+
+# endregion
+
+
+# region TestCase
+
+class TestOnlineAdapter(unittest.TestCase):
+
+    def setUp(self):
+        torch.manual_seed(0)
+        self.frames = torch.rand(6, 3, 8, 8) * 0.2 + 0.8
+
+    def test_inline_updates(self):
+        adapter = build_adapter(update_every=2, micro_batch=3)
+        for i in range(6):
+            adapter.observe(self.frames[i:i + 1])
+        self.assertEqual(adapter.stats["updates"], 3)
+        # Micro-batches are the last min(seen, micro_batch) frames.
+        self.assertEqual(adapter.model.batches, [2, 3, 3])
+        # Inline, inference uses the adapted weights right away.
+        self.assertIs(adapter.infer_model, adapter.model)
+        self.assertLess(float(adapter.model.weight), 1.0)
+        output = adapter.enhance(self.frames[:1])
+        self.assertTrue(torch.allclose(output, self.frames[:1] * adapter.model.weight))
+        adapter.close()
+
+    def test_batch_keeps_the_newest_frame_size(self):
+        adapter = build_adapter(update_every=10, micro_batch=4)
+        adapter.observe(torch.rand(2, 3, 8, 8))
+        adapter.observe(torch.rand(1, 3, 16, 16))
+        self.assertEqual(tuple(adapter.get_batch().shape), (1, 3, 16, 16))
+        adapter.observe(torch.rand(1, 3, 8, 8))
+        self.assertEqual(tuple(adapter.get_batch().shape), (3, 3, 8, 8))
+
+    def test_background_inference_does_not_wait(self):
+        adapter = build_adapter(update_every=1, background=True)
+        # Set after the adapter deep-copies the model for inference.
+        adapter.model.gate    = gate = threading.Event()
+        adapter.model.started = threading.Event()
+        try:
+            adapter.observe(self.frames[:1])
+            self.assertTrue(adapter.model.started.wait(timeout=10))
+            # The update is blocked: inference still runs, on the old weights.
+            output = adapter.enhance(self.frames[1:2])
+            self.assertTrue(torch.equal(output, self.frames[1:2]))
+            # Frames keep accumulating while the update runs.
+            adapter.observe(self.frames[1:2])
+            adapter.observe(self.frames[2:3])
+            self.assertEqual(adapter.num_new, 2)
+        finally:
+            gate.set()
+            adapter.close()
+        self.assertEqual(adapter.stats["updates"], 1)
+        self.assertEqual(float(adapter.infer_model.weight), float(adapter.model.weight))
+        self.assertFalse(adapter.infer_model.weight.requires_grad)
+
+    def test_background_error_is_raised(self):
+        adapter = build_adapter(update_every=1, background=True)
+        adapter.model.forward_loss = fail
+        adapter.observe(self.frames[:1])
+        adapter.future.exception(timeout=10)
+        with self.assertRaisesRegex(RuntimeError, "boom"):
+            adapter.observe(self.frames[1:2])
+        adapter.executor.shutdown(wait=True)
+
+    def test_summary(self):
+        adapter = build_adapter(update_every=2)
+        for i in range(4):
+            adapter.enhance(self.frames[i:i + 1])
+            adapter.observe(self.frames[i:i + 1])
+        summary = adapter.summary(wall_time=2.0)
+        self.assertEqual((summary["frames"], summary["updates"]), (4, 2))
+        self.assertEqual(summary["throughput (frames/s)"], 2.0)
+
+# endregion
+
+
+# region Main
+
+if __name__ == "__main__":
+    unittest.main()
+
+# endregion
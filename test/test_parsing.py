@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for :mod:`mon.nn.parsing`."""
+
+from __future__ import annotations
+
+import copy
+import unittest
+
+import torch
+
+from mon.nn import parsing
+
+
+# region Helper Function
+
+# A Zero-DCE-like backbone with long skip connections.
+config = {
+    "name"    : "test",
+    "channels": 3,
+    "backbone": [
+        # [from,   number, module,   args(out_channels, ...)]
+        [-1,       1,      "Identity", []],                # 0
+        [-1,       1,      "Conv2d",   [8, 3, 1, 1]],      # 1
+        [-1,       1,      "ReLU",     [True]],            # 2
+        [-1,       1,      "Conv2d",   [8, 3, 1, 1]],      # 3
+        [-1,       1,      "ReLU",     [True]],            # 4
+        [-1,       1,      "Conv2d",   [8, 3, 1, 1]],      # 5
+        [-1,       1,      "ReLU",     [True]],            # 6
+        [[4, 6],   1,      "Concat",   []],                # 7
+        [-1,       1,      "Conv2d",   [8, 3, 1, 1]],      # 8
+        [-1,       1,      "ReLU",     [True]],            # 9
+        [[2, 9],   1,      "Concat",   []],                # 10
+        [-1,       1,      "Conv2d",   [3, 3, 1, 1]],      # 11
+        [[-1, 0],  1,      "Concat",   []],                # 12
+    ],
+    "head"    : [],
+}
+
+
+def forward_once(
+    model    : torch.nn.Sequential,
+    save     : list[int],
+    input    : torch.Tensor,
+    out_index: int = -1,
+) -> torch.Tensor:
+    """The loop of :meth:`mon.nn.model.Model.forward_once` before it ran a
+    :class:`mon.nn.parsing.ForwardPlan`.
+    """
+    x = input
+    y = []
+    for m in model:
+        if m.f != -1:
+            if isinstance(m.f, int):
+                x = y[m.f]
+            else:
+                x = [x if j == -1 else y[j] for j in m.f]
+        x = m(x)
+        y.append(x if m.i in save else None)
+    if out_index > -1 and out_index in save:
+        return y[out_index]
+    return x
+
+# endregion
+
+
+# region TestCase
+
+class TestForwardPlan(unittest.TestCase):
+
+    def setUp(self):
+        torch.manual_seed(0)
+        self.model, self.save, _ = parsing.parse_model(d=copy.deepcopy(config), ch=[3])
+        self.model.eval()
+        self.input = torch.rand(2, 3, 16, 16)
+
+    def test_matches_forward_once(self):
+        plan = parsing.ForwardPlan(model=self.model, save=self.save)
+        with torch.no_grad():
+            expected = forward_once(self.model, self.save, self.input)
+            output   = plan.run(model=self.model, input=self.input)
+        self.assertTrue(torch.equal(output, expected))
+
+    def test_matches_forward_once_with_out_index(self):
+        for out_index in [2, 4, 5]:
+            with self.subTest(out_index=out_index):
+                plan = parsing.ForwardPlan(model=self.model, save=self.save, out_index=out_index)
+                with torch.no_grad():
+                    expected = forward_once(self.model, self.save, self.input, out_index)
+                    output   = plan.run(model=self.model, input=self.input)
+                self.assertTrue(torch.equal(output, expected))
+
+    def test_gradients_match(self):
+        plan     = parsing.ForwardPlan(model=self.model, save=self.save)
+        params   = list(self.model.parameters())
+        expected = torch.autograd.grad(forward_once(self.model, self.save, self.input).sum(), params)
+        output   = torch.autograd.grad(plan.run(model=self.model, input=self.input).sum(), params)
+        for e, o in zip(expected, output):
+            self.assertTrue(torch.allclose(e, o))
+
+    def test_releases_dead_outputs(self):
+        plan = parsing.ForwardPlan(model=self.model, save=self.save)
+        self.assertLess(plan.peak_live, len(self.model))
+        released = sorted(j for r in plan.release for j in r)
+        self.assertNotIn(plan.out_index, released)
+
+    def test_graph_module_matches(self):
+        plan = parsing.ForwardPlan(model=self.model, save=self.save)
+        gm   = plan.to_graph_module(model=self.model)
+        with torch.no_grad():
+            self.assertTrue(torch.equal(gm(self.input), plan.run(model=self.model, input=self.input)))
+
+# endregion
+
+
+# region Main
+
+if __name__ == "__main__":
+    unittest.main()
+
+# endregion
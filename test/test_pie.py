@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for :mod:`mon.vision.enhance.llie.pie` against the reference
+implementation in ``src/lib/vision/enhance/llie/pie``.
+"""
+
+from __future__ import annotations
+
+import sys
+import unittest
+
+import numpy as np
+import torch
+
+import mon
+from mon.vision.enhance.llie import pie as mon_pie
+
+_pie_dir = mon.Path(__file__).absolute().parent.parent / "src" / "lib" / "vision" / "enhance" / "llie" / "pie"
+if str(_pie_dir) not in sys.path:
+    sys.path.insert(0, str(_pie_dir))
+
+import pie
+
+
+# region TestCase
+
+class TestPIE(unittest.TestCase):
+
+    def setUp(self):
+        rng        = np.random.default_rng(0)
+        self.v     = (rng.random((24, 32)) * 120 + 10).astype(np.float32)
+        self.model = mon.PIE(weights=False, fullname="pie", verbose=False).eval()
+
+    def test_solve_matches_reference(self):
+        expected = pie.optimizAlgo(self.v, 1000, 0.01, 10, 0.1, 0.1, 0.1)
+        output   = self.model.solve(torch.from_numpy(self.v)[None, None])[0, 0].numpy()
+        self.assertEqual(self.model.num_iters, 2)
+        self.assertTrue(np.allclose(output, expected, atol=0.5))
+
+    def test_derivative_otfs_are_bounded_cache(self):
+        mon_pie._get_derivative_otfs.cache_clear()
+        first = mon_pie.get_derivative_otfs(24, 32)
+        self.assertIs(mon_pie.get_derivative_otfs(24, 32, torch.device("cpu"))[0], first[0])
+        for h in range(16):
+            mon_pie.get_derivative_otfs(h + 1, 8)
+        info  = mon_pie._get_derivative_otfs.cache_info()
+        self.assertLessEqual(info.currsize, info.maxsize)
+
+# endregion
+
+
+# region Main
+
+if __name__ == "__main__":
+    unittest.main()
+
+# endregion
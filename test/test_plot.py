@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for the thumbnail cache in ``bin/enhance/plot.py``."""
+
+from __future__ import annotations
+
+import os
+import sys
+import tempfile
+import unittest
+
+import cv2
+import numpy as np
+
+import mon
+
+_enhance_dir = mon.Path(__file__).absolute().parent.parent / "bin" / "enhance"
+if str(_enhance_dir) not in sys.path:
+    sys.path.insert(0, str(_enhance_dir))
+
+import plot
+
+
+# region TestCase
+
+class TestThumbnailCache(unittest.TestCase):
+
+    def setUp(self):
+        self.dir   = tempfile.TemporaryDirectory()
+        self.root  = mon.Path(self.dir.name)
+        self.image = self.root / "image.png"
+        self.cache = plot.ThumbnailCache(cache_dir=self.root / "cache")
+        cv2.imwrite(str(self.image), np.full((40, 60, 3), 64, np.uint8))
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def thumbnails(self) -> list[mon.Path]:
+        return sorted(self.cache.cache_dir.rglob("*.png"))
+
+    def test_hit_after_miss(self):
+        first  = self.cache.read(self.image, 20)
+        second = self.cache.read(self.image, 20)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+        self.assertTrue(np.array_equal(first, second))
+
+    def test_changed_source_evicts_stale_thumbnail(self):
+        self.cache.read(self.image, 20)
+        self.cache.read(self.image, 30)
+        stale = self.thumbnails()
+        self.assertEqual(len(stale), 2)
+        cv2.imwrite(str(self.image), np.full((40, 60, 3), 128, np.uint8))
+        os.utime(self.image, ns=(0, 1))
+        image = self.cache.read(self.image, 20)
+        self.assertEqual(int(image[0, 0, 0]), 128)
+        # Only the size-20 thumbnail was replaced; the size-30 one is kept.
+        thumbs = self.thumbnails()
+        self.assertEqual(len(thumbs), 2)
+        self.assertNotIn(stale[0] if stale[0].name.startswith("20-") else stale[1], thumbs)
+
+    def test_clear(self):
+        self.cache.read(self.image, 20)
+        self.cache.clear()
+        self.assertEqual(self.thumbnails(), [])
+        self.assertTrue(self.cache.cache_dir.is_dir())
+
+# endregion
+
+
+# region Main
+
+if __name__ == "__main__":
+    unittest.main()
+
+# endregion
@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for the dataset handling of ``bin/enhance/predict.py``."""
+
+from __future__ import annotations
+
+import sys
+import tempfile
+import unittest
+
+import mon
+
+_enhance_dir = mon.Path(__file__).absolute().parent.parent / "bin" / "enhance"
+if str(_enhance_dir) not in sys.path:
+    sys.path.insert(0, str(_enhance_dir))
+
+import predict
+
+
+# region TestCase
+
+class TestDatasetNames(unittest.TestCase):
+
+    def setUp(self):
+        self.dir  = tempfile.TemporaryDirectory()
+        self.root = mon.Path(self.dir.name)
+        for d in ["a/test/lime/low", "b/test/lime/low", "a/test/dicm/low", "c/lime"]:
+            (self.root / d).mkdir(parents=True)
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_unique_names_are_kept(self):
+        datasets = predict.resolve_datasets([self.root / "a/test/lime/low", self.root / "a/test/dicm/low"])
+        self.assertEqual(predict.get_dataset_names(datasets), ["lime", "dicm"])
+
+    def test_collisions_are_prefixed(self):
+        datasets = predict.resolve_datasets(str(self.root / "*/test/*/low"))
+        self.assertEqual(predict.get_dataset_names(datasets), ["dicm", "a-test-lime", "b-test-lime"])
+        datasets = predict.resolve_datasets([self.root / "a/test/lime/low", self.root / "c/lime"])
+        self.assertEqual(predict.get_dataset_names(datasets), ["test-lime", "c-lime"])
+
+# endregion
+
+
+# region Main
+
+if __name__ == "__main__":
+    unittest.main()
+
+# endregion
@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for :mod:`mon.vision.prior`."""
+
+from __future__ import annotations
+
+import unittest
+
+import numpy as np
+import torch
+
+from mon.vision import prior
+
+
+# region Helper Function
+
+def mean_channel(input: torch.Tensor) -> torch.Tensor:
+    return input.mean(dim=1, keepdim=True)
+
+# endregion
+
+
+# region TestCase
+
+class TestPriorMemo(unittest.TestCase):
+
+    def setUp(self):
+        torch.manual_seed(0)
+        self.memo  = prior.PriorMemo(capacity=2)
+        self.input = torch.rand(2, 3, 16, 16)
+
+    def test_hit_on_same_tensor(self):
+        value1 = self.memo.get(mean_channel, self.input)
+        value2 = self.memo.get(mean_channel, self.input)
+        self.assertIs(value1, value2)
+        self.assertEqual((self.memo.hits, self.memo.misses), (1, 1))
+
+    def test_miss_after_inplace_change(self):
+        value1 = self.memo.get(mean_channel, self.input)
+        self.input.mul_(0.5)
+        value2 = self.memo.get(mean_channel, self.input)
+        self.assertIsNot(value1, value2)
+        self.assertTrue(torch.allclose(value2, value1 * 0.5))
+        self.assertEqual((self.memo.hits, self.memo.misses), (0, 2))
+
+    def test_miss_on_other_tensor_or_args(self):
+        self.memo.get(mean_channel, self.input)
+        self.memo.get(mean_channel, self.input.clone())
+        self.memo.get(prior._dark_channel_prior_torch, self.input, (3, 3))
+        self.memo.get(prior._dark_channel_prior_torch, self.input, (5, 5))
+        self.assertEqual((self.memo.hits, self.memo.misses), (0, 4))
+
+    def test_capacity(self):
+        inputs = [torch.rand(1, 3, 4, 4) for _ in range(4)]
+        for x in inputs:
+            self.memo.get(mean_channel, x)
+        self.assertLessEqual(len(self.memo.entries), 2)
+
+    def test_inference_tensor(self):
+        with torch.inference_mode():
+            input  = torch.rand(2, 3, 16, 16)
+            value1 = self.memo.get(mean_channel, input)
+            value2 = self.memo.get(mean_channel, input)
+        self.assertTrue(torch.equal(value1, value2))
+        self.assertEqual(len(self.memo.entries), 0)
+
+    def test_grad_values_are_not_stored(self):
+        input = self.input.clone().requires_grad_(True)
+        value = self.memo.get(mean_channel, input)
+        self.assertTrue(value.requires_grad)
+        self.assertEqual(len(self.memo.entries), 0)
+
+    def test_gbem_prior_under_inference_mode(self):
+        with torch.inference_mode():
+            attn = prior.get_guided_brightness_enhancement_map_prior(self.input.clone(), 2.8, None)
+        self.assertEqual(attn.shape, (2, 1, 16, 16))
+
+
+class TestTensorPriors(unittest.TestCase):
+
+    def test_dark_channel_matches_numpy(self):
+        rng    = np.random.default_rng(0)
+        image  = rng.random((20, 24, 3)).astype(np.float32)
+        tensor = torch.from_numpy(image).permute(2, 0, 1)[None]
+        for patch_size in [3, 4, 7]:
+            with self.subTest(patch_size=patch_size):
+                expected = prior.get_dark_channel_prior(image, patch_size)
+                output   = prior.get_dark_channel_prior(tensor, patch_size, memo=False)
+                self.assertTrue(np.allclose(output[0, 0].numpy(), expected))
+
+    def test_bright_channel_matches_numpy(self):
+        rng    = np.random.default_rng(0)
+        image  = rng.random((20, 24, 3)).astype(np.float32)
+        tensor = torch.from_numpy(image).permute(2, 0, 1)[None]
+        for patch_size in [3, 4, 7]:
+            with self.subTest(patch_size=patch_size):
+                expected = prior.get_bright_channel_prior(image, patch_size)
+                output   = prior.get_bright_channel_prior(tensor, patch_size, memo=False)
+                self.assertTrue(np.allclose(output[0, 0].numpy(), expected))
+
+# endregion
+
+
+# region Main
+
+if __name__ == "__main__":
+    unittest.main()
+
+# endregion
@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for :mod:`mon.nn.profiler`."""
+
+from __future__ import annotations
+
+import copy
+import math
+import tempfile
+import unittest
+
+import torch
+
+from mon.nn import parsing, profiler
+
+
+# region Helper Function
+
+config = {
+    "name"    : "test",
+    "channels": 3,
+    "backbone": [
+        # [from,   number, module,        args(out_channels, ...)]
+        [-1,       1,      "Identity",    []],                # 0
+        [-1,       1,      "Conv2d",      [8, 3, 1, 1]],      # 1
+        [-1,       1,      "BatchNorm2d", []],                # 2
+        [-1,       1,      "ReLU",        [True]],            # 3
+        [-1,       1,      "Conv2d",      [8, 3, 1, 1]],      # 4
+        [[3, 4],   1,      "Concat",      []],                # 5
+        [-1,       1,      "Conv2d",      [3, 3, 1, 1]],      # 6
+    ],
+    "head"    : [],
+}
+
+# endregion
+
+
+# region TestCase
+
+class TestLayerProfiler(unittest.TestCase):
+
+    def setUp(self):
+        torch.manual_seed(0)
+        self.model, self.save, _ = parsing.parse_model(d=copy.deepcopy(config), ch=[3])
+        self.plan  = parsing.ForwardPlan(model=self.model, save=self.save)
+        self.input = torch.rand(2, 3, 16, 16)
+
+    def test_output_matches_plan_in_eval_mode(self):
+        self.model.eval()
+        with torch.no_grad():
+            expected = self.plan.run(model=self.model, input=self.input)
+            output   = profiler.LayerProfiler(warmup=2, runs=2).run(self.model, self.plan, self.input)
+        self.assertTrue(torch.equal(output, expected))
+
+    def test_running_stats_update_once_in_train_mode(self):
+        self.model.train()
+        reference = copy.deepcopy(self.model)
+        expected  = self.plan.run(model=reference, input=self.input)
+        output    = profiler.LayerProfiler(warmup=3, runs=5).run(self.model, self.plan, self.input)
+        self.assertTrue(torch.allclose(output, expected, atol=1e-6))
+        bn, ref_bn = self.model[2], reference[2]
+        self.assertTrue(torch.allclose(bn.running_mean, ref_bn.running_mean))
+        self.assertTrue(torch.allclose(bn.running_var,  ref_bn.running_var))
+        self.assertEqual(int(bn.num_batches_tracked), 1)
+        # The caller's train mode is restored on every submodule.
+        self.assertTrue(all(m.training for m in self.model.modules()))
+
+    def test_records(self):
+        self.model.eval()
+        p = profiler.LayerProfiler(warmup=0, runs=1)
+        with torch.no_grad():
+            p.run(self.model, self.plan, self.input)
+        self.assertEqual([r["index"] for r in p.records], list(range(len(self.model))))
+        self.assertAlmostEqual(sum(r["time (%)"] for r in p.records), 100.0, places=3)
+        conv = p.records[1]
+        if not math.isnan(conv["GFLOPs"]):
+            # 2 FLOPs per multiply-add of a 3x3 conv from 3 to 8 channels.
+            self.assertAlmostEqual(conv["GFLOPs"] * 1e9, 2 * 2 * 8 * 16 * 16 * 3 * 9, delta=1)
+        with tempfile.TemporaryDirectory() as d:
+            p.to_csv(f"{d}/profile.csv")
+            with open(f"{d}/profile.csv") as f:
+                self.assertEqual(len(f.readlines()), len(self.model) + 1)
+
+# endregion
+
+
+# region Main
+
+if __name__ == "__main__":
+    unittest.main()
+
+# endregion
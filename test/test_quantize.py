@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for :mod:`mon.nn.quantize`."""
+
+from __future__ import annotations
+
+import copy
+import unittest
+
+import torch
+
+from mon.nn import parsing, quantize
+
+
+# region Helper Function
+
+config = {
+    "name"    : "test",
+    "channels": 3,
+    "backbone": [
+        # [from,   number, module,   args(out_channels, ...)]
+        [-1,       1,      "Identity", []],                # 0
+        [-1,       1,      "Conv2d",   [8, 3, 1, 1]],      # 1
+        [-1,       1,      "ReLU",     [True]],            # 2
+        [-1,       1,      "Conv2d",   [8, 3, 1, 1]],      # 3
+        [-1,       1,      "ReLU",     [True]],            # 4
+        [[2, 4],   1,      "Concat",   []],                # 5
+        [-1,       1,      "Conv2d",   [3, 3, 1, 1]],      # 6
+        [-1,       1,      "Sigmoid",  []],                # 7
+    ],
+    "head"    : [],
+}
+
+
+class Net(torch.nn.Module):
+    """The smallest model with a config-parsed :attr:`model` and :attr:`save`."""
+
+    def __init__(self):
+        super().__init__()
+        torch.manual_seed(0)
+        self.model, self.save, _ = parsing.parse_model(d=copy.deepcopy(config), ch=[3])
+
+    def forward(self, input: torch.Tensor) -> torch.Tensor:
+        return parsing.ForwardPlan(model=self.model, save=self.save).run(model=self.model, input=input)
+
+
+def get_backend() -> str:
+    engines = torch.backends.quantized.supported_engines
+    return "fbgemm" if "fbgemm" in engines else "qnnpack"
+
+# endregion
+
+
+# region TestCase
+
+class TestQuantizeModelPTQ(unittest.TestCase):
+
+    def setUp(self):
+        torch.manual_seed(0)
+        self.model   = Net().eval()
+        self.samples = [(torch.rand(2, 3, 16, 16), None) for _ in range(4)]
+
+    def test_quantize(self):
+        qnet, report = quantize.quantize_model_ptq(
+            model                 = self.model,
+            calibration_data      = self.samples,
+            backend               = get_backend(),
+            sensitivity_threshold = None,
+            verbose               = False,
+        )
+        self.assertGreater(len(report["quantized_segments"]), 0)
+        self.assertEqual(report["num_samples"], 4)
+        self.assertGreater(report["psnr_int8_vs_fp32"], 25.0)
+        self.assertGreater(report["latency_fp32_ms"], 0.0)
+        self.assertGreater(report["latency_int8_ms"], 0.0)
+        with torch.no_grad():
+            self.assertEqual(qnet(self.samples[0][0]).shape, self.model(self.samples[0][0]).shape)
+        # The original model is left in fp32.
+        self.assertIsInstance(self.model.model[1], torch.nn.Conv2d)
+
+    def test_restores_engine(self):
+        engine  = torch.backends.quantized.engine
+        engines = [e for e in torch.backends.quantized.supported_engines if e != "none"]
+        backend = next((e for e in ["fbgemm", "qnnpack"] if e in engines and e != engine), get_backend())
+        quantize.quantize_model_ptq(self.model, self.samples, backend=backend, verbose=False)
+        self.assertEqual(torch.backends.quantized.engine, engine)
+
+    def test_skip_layers(self):
+        _, report = quantize.quantize_model_ptq(
+            model                 = self.model,
+            calibration_data      = [x for x, _ in self.samples],
+            backend               = get_backend(),
+            skip_layers           = [6],
+            sensitivity_threshold = None,
+            verbose               = False,
+        )
+        for s in report["quantized_segments"]:
+            self.assertNotIn(6, s)
+
+    def test_data_loader_batches(self):
+        batches   = [(x, None, {"name": "sample"}) for x, _ in self.samples]
+        _, report = quantize.quantize_model_ptq(self.model, batches, backend=get_backend(), verbose=False)
+        self.assertEqual(report["num_samples"], 4)
+
+    def test_empty_calibration_data(self):
+        with self.assertRaises(ValueError):
+            quantize.quantize_model_ptq(self.model, [], verbose=False)
+
+# endregion
+
+
+# region Main
+
+if __name__ == "__main__":
+    unittest.main()
+
+# endregion
@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for the batched RetinexDIP in ``src/lib/vision/enhance/llie/retinexdip``."""
+
+from __future__ import annotations
+
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+import torch
+from PIL import Image
+
+import mon
+
+_retinexdip_dir = mon.Path(__file__).absolute().parent.parent / "src" / "lib" / "vision" / "enhance" / "llie" / "retinexdip"
+if str(_retinexdip_dir) not in sys.path:
+    sys.path.insert(0, str(_retinexdip_dir))
+
+import retinexdip
+
+
+# region Helper Function
+
+def random_images(n: int, seed: int) -> list[Image.Image]:
+    rng = np.random.default_rng(seed)
+    return [Image.fromarray((rng.random((40, 48, 3)) * 80).astype(np.uint8)) for _ in range(n)]
+
+
+def run_batch(output_dir: mon.Path, seed: int, warm_start: dict | None) -> retinexdip.BatchEnhancement:
+    images = random_images(2, seed)
+    s      = retinexdip.BatchEnhancement(
+        images      = images,
+        image_names = [output_dir / f"{seed}-{i}.png" for i in range(len(images))],
+        num_iter    = 2,
+        warm_start  = warm_start,
+        image_size  = 64,
+        device      = "cpu",
+    )
+    s.optimize()
+    return s
+
+# endregion
+
+
+# region TestCase
+
+class TestBatchEnhancement(unittest.TestCase):
+
+    def test_nets_start_from_the_same_weights(self):
+        with tempfile.TemporaryDirectory() as d:
+            images = random_images(3, 0)
+            s      = retinexdip.BatchEnhancement(
+                images      = images,
+                image_names = [mon.Path(d) / f"{i}.png" for i in range(len(images))],
+                num_iter    = 1,
+                image_size  = 64,
+                device      = "cpu",
+            )
+        for params in [s.reflection_params, s.illumination_params]:
+            for v in params.values():
+                self.assertTrue(torch.equal(v[0], v[1]))
+                self.assertTrue(torch.equal(v[0], v[2]))
+
+    def test_warm_start_over_two_batches(self):
+        with tempfile.TemporaryDirectory() as d:
+            first  = run_batch(mon.Path(d), seed=0, warm_start=None)
+            second = run_batch(mon.Path(d), seed=1, warm_start=first.state_dict())
+            third  = run_batch(mon.Path(d), seed=2, warm_start=second.state_dict())
+            self.assertEqual(third.num_steps, 2)
+            self.assertEqual(len(list(mon.Path(d).glob("*.png"))), 6)
+
+    def test_warm_start_initializes_every_net(self):
+        with tempfile.TemporaryDirectory() as d:
+            state  = run_batch(mon.Path(d), seed=0, warm_start=None).state_dict()
+            images = random_images(2, 1)
+            s      = retinexdip.BatchEnhancement(
+                images      = images,
+                image_names = [mon.Path(d) / f"{i}.png" for i in range(len(images))],
+                warm_start  = state,
+                image_size  = 64,
+                device      = "cpu",
+            )
+        for key, params in [("reflection", s.reflection_params), ("illumination", s.illumination_params)]:
+            for k, v in params.items():
+                self.assertTrue(torch.allclose(v[0], state[key][k]))
+                self.assertTrue(torch.allclose(v[1], state[key][k]))
+        self.assertTrue(torch.equal(s.reflection_net_inputs[0].cpu(), state["reflection_input"]))
+
+# endregion
+
+
+# region Main
+
+if __name__ == "__main__":
+    unittest.main()
+
+# endregion
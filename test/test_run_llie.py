@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for the LLIE grid scheduler in ``bin/enhance/run_llie.py``."""
+
+from __future__ import annotations
+
+import json
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+import mon
+
+_enhance_dir = mon.Path(__file__).absolute().parent.parent / "bin" / "enhance"
+if str(_enhance_dir) not in sys.path:
+    sys.path.insert(0, str(_enhance_dir))
+
+import run_llie
+
+
+# region Helper Function
+
+def build_cells(models: list[str]) -> list[run_llie.Cell]:
+    return [
+        run_llie.Cell(
+            model        = m,
+            variant      = "none",
+            suffix       = "none",
+            train_data   = "lol-v1",
+            epochs       = 1,
+            project      = "vision/enhance/llie",
+            use_data_dir = False,
+            checkpoint   = "best",
+        )
+        for m in models
+    ]
+
+
+class RecordingScheduler(run_llie.Scheduler):
+    """Record when each job starts and ends instead of running it."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.events = []
+        self.lock   = threading.Lock()
+
+    def run_job(self, job: run_llie.Job) -> bool:
+        with self.lock:
+            self.events.append(("start", job.id))
+        time.sleep(0.02)
+        with self.lock:
+            self.events.append(("end", job.id))
+        return True
+
+# endregion
+
+
+# region TestCase
+
+class TestScheduler(unittest.TestCase):
+
+    def setUp(self):
+        self.dir      = tempfile.TemporaryDirectory()
+        self.root     = mon.Path(self.dir.name)
+        self.datasets = ["lol-v1", "dicm"]
+        self.jobs     = run_llie.build_jobs(
+            cells        = build_cells(["zerodce", "sci"]),
+            tasks        = ["train", "predict", "evaluate"],
+            predict_data = self.datasets,
+        )
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def scheduler(self, cls=run_llie.Scheduler, **kwargs) -> run_llie.Scheduler:
+        return cls(
+            jobs       = self.jobs,
+            state_file = self.root / "state.json",
+            max_cpus   = 64,
+            max_memory = 1024.0,
+            log_dir    = self.root / "logs",
+            **kwargs
+        )
+
+    def test_build_jobs(self):
+        self.assertEqual(list(self.jobs), [
+            "train/zerodce-lol-v1",
+            "predict/zerodce/lol-v1", "metric/zerodce/lol-v1",
+            "predict/zerodce/dicm",   "metric/zerodce/dicm",
+            "train/sci-lol-v1",
+            "predict/sci/lol-v1",     "metric/sci/lol-v1",
+            "predict/sci/dicm",       "metric/sci/dicm",
+        ])
+        self.assertEqual(self.jobs["predict/sci/dicm"].deps, ["train/sci-lol-v1"])
+        self.assertEqual(self.jobs["metric/sci/dicm"].deps,  ["predict/sci/dicm"])
+        # Without the train task, predict jobs have no dependency.
+        jobs = run_llie.build_jobs(build_cells(["sci"]), ["predict", "evaluate"], self.datasets)
+        self.assertEqual(jobs["predict/sci/dicm"].deps, [])
+
+    def test_dry_run(self):
+        status = self.scheduler(dry_run=True).run()
+        self.assertEqual(set(status.values()), {"pending"})
+        self.assertFalse((self.root / "state.json").exists())
+
+    def test_pending_dependency_reruns_dependents(self):
+        state = {
+            id: {"status": "done", "signature": job.signature, "finished": time.time()}
+            for id, job in self.jobs.items() if job.kind == "metric"
+        }
+        (self.root / "state.json").write_text(json.dumps(state))
+        status = self.scheduler(dry_run=True).run()
+        self.assertEqual(status["metric/sci/dicm"], "pending")
+
+    def test_order_and_serial_metrics(self):
+        scheduler = self.scheduler(cls=RecordingScheduler)
+        status    = scheduler.run()
+        self.assertEqual(set(status.values()), {"done"})
+        events    = scheduler.events
+        position  = {(e, id): i for i, (e, id) in enumerate(events)}
+        for id, job in self.jobs.items():
+            for d in job.deps:
+                self.assertLess(position[("end", d)], position[("start", id)])
+        # Metric jobs never overlap.
+        running = 0
+        for e, id in events:
+            if self.jobs[id].kind == "metric":
+                running += 1 if e == "start" else -1
+                self.assertLessEqual(running, 1)
+        self.assertTrue((self.root / "state.json").is_file())
+
+# endregion
+
+
+# region Main
+
+if __name__ == "__main__":
+    unittest.main()
+
+# endregion
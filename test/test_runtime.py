@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for :mod:`mon.nn.runtime`."""
+
+from __future__ import annotations
+
+import importlib.util
+import json
+import tempfile
+import unittest
+
+import torch
+
+from mon.nn import runtime
+
+
+# region Helper Function
+
+def build_model() -> torch.nn.Module:
+    torch.manual_seed(0)
+    return torch.nn.Sequential(
+        torch.nn.Conv2d(3, 8, 3, 1, 1),
+        torch.nn.ReLU(),
+        torch.nn.Conv2d(8, 3, 3, 1, 1),
+        torch.nn.Sigmoid(),
+    ).eval()
+
+
+class Reshape(torch.nn.Module):
+    """A layer whose traced graph is tied to the example input's shape."""
+
+    def forward(self, input: torch.Tensor) -> torch.Tensor:
+        b, c, h, w = input.shape
+        return input.reshape(b, c, h * w).mean(dim=2).view(b, c, 1, 1).expand(b, c, 16, 16)
+
+# endregion
+
+
+# region TestCase
+
+class TestTorchScriptBackend(unittest.TestCase):
+
+    def setUp(self):
+        self.dir   = tempfile.TemporaryDirectory()
+        self.model = build_model()
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def save(self, model: torch.nn.Module, dims: list[int], method: str) -> str:
+        path   = f"{self.dir.name}/model.pt"
+        script = torch.jit.trace(model, torch.rand(dims)) if method == "trace" else torch.jit.script(model)
+        torch.jit.save(script, path, _extra_files={"input_dims": json.dumps({"dims": dims, "method": method})})
+        return path
+
+    def test_parity(self):
+        backend = runtime.build_backend("torchscript", path=self.save(self.model, [1, 3, 16, 16], "trace"))
+        input   = torch.rand(2, 3, 24, 32)
+        matched, errors = runtime.check_backend_parity(self.model, backend, input, verbose=False)
+        self.assertTrue(matched)
+        self.assertLess(max(errors), 1e-5)
+
+    def test_parity_mismatch(self):
+        backend = runtime.build_backend("torchscript", path=self.save(self.model, [1, 3, 16, 16], "script"))
+        other   = build_model()
+        with torch.no_grad():
+            other[2].bias.add_(0.5)
+        matched, _ = runtime.check_backend_parity(other, backend, torch.rand(1, 3, 16, 16), verbose=False)
+        self.assertFalse(matched)
+
+    def test_input_shape(self):
+        backend = runtime.build_backend("torchscript", path=self.save(self.model, [1, 3, 16, 16], "script"))
+        self.assertEqual(backend.input_shape, [None, 3, None, None])
+        backend = runtime.build_backend("torchscript", path=self.save(Reshape(), [1, 3, 16, 16], "trace"))
+        self.assertEqual(backend.input_shape, [1, 3, 16, 16])
+        # Warmup uses the traced shape instead of the requested one.
+        backend.warmup(input_dims=[1, 3, 48, 64], runs=1)
+
+
+@unittest.skipIf(importlib.util.find_spec("onnxruntime") is None, "onnxruntime is not installed")
+class TestONNXRuntimeBackend(unittest.TestCase):
+
+    def setUp(self):
+        self.dir   = tempfile.TemporaryDirectory()
+        self.model = build_model()
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def export(self, dynamic: bool) -> str:
+        path   = f"{self.dir.name}/model.onnx"
+        kwargs = {"dynamic_axes": {"input": {0: "batch", 2: "height", 3: "width"}}} if dynamic else {}
+        torch.onnx.export(self.model, torch.rand(1, 3, 16, 16), path, input_names=["input"], **kwargs)
+        return path
+
+    def test_parity(self):
+        backend = runtime.build_backend("onnx", path=self.export(dynamic=True))
+        self.assertEqual(backend.input_shape, [None, 3, None, None])
+        matched, _ = runtime.check_backend_parity(self.model, backend, torch.rand(2, 3, 24, 32), verbose=False)
+        self.assertTrue(matched)
+
+    def test_static_warmup(self):
+        backend = runtime.build_backend("onnx", path=self.export(dynamic=False))
+        self.assertEqual(backend.input_shape, [1, 3, 16, 16])
+        backend.warmup(input_dims=[1, 3, 48, 64], runs=1)
+
+# endregion
+
+
+# region Main
+
+if __name__ == "__main__":
+    unittest.main()
+
+# endregion
@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for :mod:`mon.vision.enhance.llie.temporal`."""
+
+from __future__ import annotations
+
+import unittest
+
+import torch
+
+import mon
+
+
+# region Helper Function
+
+def build_zerodce() -> mon.ZeroDCE:
+    model = mon.ZeroDCE(
+        config      = "zerodce.yaml",
+        hparams     = None,
+        channels    = 3,
+        num_classes = None,
+        classlabels = None,
+        weights     = False,
+        fullname    = "zerodce",
+        verbose     = False,
+    )
+    return model.eval()
+
+
+def enhanced(output) -> torch.Tensor:
+    return output[-1] if isinstance(output, list | tuple) else output
+
+
+class Half(torch.nn.Module):
+
+    def forward(self, input: torch.Tensor) -> torch.Tensor:
+        return input * 0.5
+
+# endregion
+
+
+# region TestCase
+
+class TestTemporalCurveEnhancer(unittest.TestCase):
+
+    def setUp(self):
+        torch.manual_seed(0)
+        self.model  = build_zerodce()
+        self.frames = torch.rand(1, 3, 32, 32).repeat(6, 1, 1, 1)
+        self.frames = self.frames + 0.01 * torch.rand_like(self.frames)
+
+    def test_every_frame_matches_model(self):
+        temporal = mon.TemporalCurveEnhancer(model=self.model, interval=1, momentum=0.0)
+        with torch.no_grad():
+            expected = enhanced(self.model.forward_once(self.frames))
+        _, output = temporal(self.frames)
+        self.assertTrue(torch.allclose(output, expected, atol=1e-6))
+        self.assertEqual(temporal.reuse_ratio, 0.0)
+
+    def test_head_image_input_is_not_the_raw_frame(self):
+        # Layer 0 feeds both the backbone and the curve head.
+        half     = Half()
+        half.i   = self.model.model[0].i
+        half.f   = self.model.model[0].f
+        self.model.model[0] = half
+        temporal = mon.TemporalCurveEnhancer(model=self.model, interval=1, momentum=0.0)
+        with torch.no_grad():
+            expected = enhanced(self.model.forward_once(self.frames))
+        _, output = temporal(self.frames)
+        self.assertTrue(torch.allclose(output, expected, atol=1e-6))
+
+    def test_reuse_between_key_frames(self):
+        temporal = mon.TemporalCurveEnhancer(model=self.model, interval=3, momentum=0.0)
+        curves, _ = temporal(self.frames)
+        self.assertEqual(temporal.num_keyframes, 2)
+        self.assertTrue(torch.equal(curves[0], curves[1]))
+        self.assertTrue(torch.equal(curves[0], curves[2]))
+        self.assertFalse(torch.equal(curves[2], curves[3]))
+
+    def test_scene_change_forces_key_frame(self):
+        temporal = mon.TemporalCurveEnhancer(model=self.model, interval=100, scene_threshold=0.05)
+        frames   = self.frames.clone()
+        frames[3:] = 1.0 - frames[3:]
+        temporal(frames)
+        self.assertEqual(temporal.num_keyframes, 2)
+
+# endregion
+
+
+# region Main
+
+if __name__ == "__main__":
+    unittest.main()
+
+# endregion
@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for :mod:`mon.nn.callback.throughput`."""
+
+from __future__ import annotations
+
+import types
+import unittest
+from typing import Any
+
+import torch
+
+from mon.nn.callback import throughput
+
+
+# region Helper Function
+
+class Clock:
+    """A fake clock that the monitor reads instead of the wall time."""
+
+    def __init__(self):
+        self.t = 0.0
+
+    def __call__(self, pl_module: Any) -> float:
+        return self.t
+
+    def advance(self, seconds: float):
+        self.t += seconds
+
+
+class Module:
+    """The parts of a :class:`lightning.pytorch.LightningModule` the monitor uses."""
+
+    device   = torch.device("cpu")
+    training = True
+
+    def on_before_batch_transfer(self, batch: Any, dataloader_idx: int) -> Any:
+        return batch
+
+    def on_after_batch_transfer(self, batch: Any, dataloader_idx: int) -> Any:
+        return batch
+
+
+class Logger:
+
+    def __init__(self):
+        self.metrics = []
+
+    def log_metrics(self, metrics: dict, step: int):
+        self.metrics.append((step, metrics))
+
+# endregion
+
+
+# region TestCase
+
+class TestTrainingThroughputMonitor(unittest.TestCase):
+
+    def setUp(self):
+        self.clock    = Clock()
+        self.logger   = Logger()
+        self.trainer  = types.SimpleNamespace(global_step=0, loggers=[self.logger])
+        self.module   = Module()
+        self.monitor  = throughput.TrainingThroughputMonitor(window=4, log_every_n_steps=2, synchronize=False)
+        self.monitor._now = self.clock
+        self.monitor.on_train_start(self.trainer, self.module)
+        self.monitor.on_train_epoch_start(self.trainer, self.module)
+
+    def step(self, data: float, h2d: float, forward: float, backward: float, optimizer: float):
+        batch = (torch.zeros(4, 3, 8, 8), torch.zeros(4))
+        self.clock.advance(data)
+        batch = self.module.on_before_batch_transfer(batch, 0)
+        self.clock.advance(h2d)
+        batch = self.module.on_after_batch_transfer(batch, 0)
+        self.monitor.on_train_batch_start(self.trainer, self.module, batch, 0)
+        self.clock.advance(forward)
+        self.monitor.on_before_backward(self.trainer, self.module, torch.zeros(()))
+        self.clock.advance(backward)
+        self.monitor.on_after_backward(self.trainer, self.module)
+        self.clock.advance(optimizer)
+        self.trainer.global_step += 1
+        self.monitor.on_train_batch_end(self.trainer, self.module, None, batch, 0)
+
+    def test_phases(self):
+        self.step(data=0.01, h2d=0.002, forward=0.02, backward=0.03, optimizer=0.005)
+        h = self.monitor.history[-1]
+        for phase, expected in [("data", 0.01), ("h2d", 0.002), ("forward", 0.02), ("backward", 0.03), ("optimizer", 0.005)]:
+            self.assertAlmostEqual(h[phase], expected, places=9)
+        self.assertAlmostEqual(h["total"], 0.067, places=9)
+        self.assertEqual(h["samples"], 4)
+
+    def test_summary_and_logging(self):
+        for _ in range(2):
+            self.step(data=0.1, h2d=0.0, forward=0.05, backward=0.03, optimizer=0.02)
+        summary = self.monitor.summary()
+        self.assertAlmostEqual(summary["data_ms"],         100.0, places=6)
+        self.assertAlmostEqual(summary["data_ratio"],      0.5,   places=6)
+        self.assertAlmostEqual(summary["step_ms"],         200.0, places=6)
+        self.assertAlmostEqual(summary["samples_per_sec"], 20.0,  places=6)
+        # Logged at global step 2 only, with the data wait above the threshold.
+        self.assertEqual([s for s, _ in self.logger.metrics], [2])
+        self.assertIn("throughput/forward_ms", self.logger.metrics[0][1])
+        self.assertTrue(self.monitor.warned)
+
+    def test_rolling_window(self):
+        self.step(data=1.0, h2d=0.0, forward=0.0, backward=0.0, optimizer=0.0)
+        for _ in range(4):
+            self.step(data=0.0, h2d=0.0, forward=0.01, backward=0.0, optimizer=0.0)
+        self.assertEqual(len(self.monitor.history), 4)
+        self.assertEqual(self.monitor.summary()["data_ms"], 0.0)
+
+    def test_missing_backward_is_charged_to_forward(self):
+        batch = torch.zeros(2, 3, 8, 8)
+        self.monitor.on_train_batch_start(self.trainer, self.module, batch, 0)
+        self.clock.advance(0.04)
+        self.monitor.on_train_batch_end(self.trainer, self.module, None, batch, 0)
+        h = self.monitor.history[-1]
+        self.assertAlmostEqual(h["forward"], 0.04, places=9)
+        self.assertEqual((h["backward"], h["optimizer"], h["samples"]), (0.0, 0.0, 2))
+
+    def test_validation_transfer_is_not_recorded(self):
+        self.module.training = False
+        self.module.on_before_batch_transfer(torch.zeros(1), 0)
+        self.assertNotIn("fetched", self.monitor.marks)
+
+    def test_hooks_are_restored(self):
+        self.assertIn("on_before_batch_transfer", vars(self.module))
+        self.monitor.on_train_end(self.trainer, self.module)
+        self.assertNotIn("on_before_batch_transfer", vars(self.module))
+        self.assertNotIn("on_after_batch_transfer",  vars(self.module))
+
+# endregion
+
+
+# region Main
+
+if __name__ == "__main__":
+    unittest.main()
+
+# endregion
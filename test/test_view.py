@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for :mod:`mon.vision.view`."""
+
+from __future__ import annotations
+
+import tempfile
+import unittest
+
+import cv2
+import numpy as np
+import torch
+
+from mon.vision import view
+
+
+# region TestCase
+
+class TestRenderEnhancement(unittest.TestCase):
+
+    def setUp(self):
+        torch.manual_seed(0)
+        self.input  = torch.rand(4, 3, 24, 32)
+        self.target = torch.rand(4, 3, 24, 32)
+        self.pred   = torch.rand(4, 3, 24, 32)
+
+    def test_canvas_shape(self):
+        canvas = view.render_enhancement(
+            image = {"input": self.input, "target": self.target, "pred": self.pred},
+            max_n = 3,
+        )
+        self.assertEqual(canvas.dtype, np.uint8)
+        # One header bar, one row per image, one column per item.
+        self.assertEqual(canvas.shape[1:], (3 * 32, 3))
+        self.assertGreater(canvas.shape[0], 3 * 24)
+        fewer  = view.render_enhancement(
+            image = {"input": self.input, "target": self.target, "pred": self.pred},
+            max_n = 2,
+        )
+        self.assertEqual(canvas.shape[0] - fewer.shape[0], 24)
+
+    def test_scale(self):
+        canvas1 = view.render_enhancement(image={"input": self.input}, scale=1)
+        canvas2 = view.render_enhancement(image={"input": self.input}, scale=0.5)
+        self.assertEqual(canvas1.shape[1], 32)
+        self.assertEqual(canvas2.shape[1], 16)
+
+    def test_diff_panel(self):
+        image  = {"input": self.input, "target": self.target, "pred": self.pred}
+        canvas = view.render_enhancement(image=image, diff=True)
+        self.assertEqual(canvas.shape[1], 4 * 32)
+        # No diff panel without both pred and target.
+        canvas = view.render_enhancement(image={"input": self.input, "pred": self.pred}, diff=True)
+        self.assertEqual(canvas.shape[1], 2 * 32)
+
+    def test_zero_diff_is_the_colormap_minimum(self):
+        canvas = view.render_enhancement(image={"target": self.pred, "pred": self.pred}, diff=True)
+        bar    = canvas.shape[0] - 4 * 24
+        cell   = canvas[bar:, 2 * 32:]
+        zero   = cv2.applyColorMap(np.zeros((1, 1), np.uint8), cv2.COLORMAP_JET)[0, 0]
+        self.assertTrue(np.all(cell == zero))
+
+    def test_uint8_conversion(self):
+        image  = torch.tensor([0.0, 0.5, 1.0, 2.0]).view(1, 1, 2, 2)
+        canvas = view.render_enhancement(image={"input": image})
+        cell   = canvas[-2:, :, 0]
+        self.assertEqual(cell.tolist(), [[0, 128], [255, 255]])
+        # Gray images are repeated to 3 channels, and RGB is written as BGR.
+        self.assertTrue(np.all(canvas[-2:, :, 0] == canvas[-2:, :, 2]))
+        rgb    = torch.zeros(1, 3, 2, 2)
+        rgb[:, 0] = 1.0
+        canvas = view.render_enhancement(image={"input": rgb})
+        self.assertEqual(canvas[-1, 0].tolist(), [0, 0, 255])
+
+    def test_numpy_input(self):
+        image  = (np.random.default_rng(0).random((2, 24, 32, 3)) * 255).astype(np.uint8)
+        canvas = view.render_enhancement(image={"input": image}, denormalize=False)
+        self.assertTrue(np.array_equal(canvas[-24:, :, ::-1], image[1]))
+
+
+class TestWriteImageAsync(unittest.TestCase):
+
+    def test_write_and_flush(self):
+        canvas = np.full((8, 8, 3), 128, np.uint8)
+        with tempfile.TemporaryDirectory() as d:
+            path = f"{d}/sub/debug.jpg"
+            view.write_image_async(path, canvas, quality=90)
+            view.flush_image_writes()
+            self.assertEqual(cv2.imread(path).shape, (8, 8, 3))
+
+# endregion
+
+
+# region Main
+
+if __name__ == "__main__":
+    unittest.main()
+
+# endregion